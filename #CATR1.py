@@ -1,9 +1,9 @@
 import tkinter as tk
 import random
-import json
-import os
 from datetime import datetime
 
+from catcore.engines import companions
+
 # ==========================================
 # AC HOLDINGS 1999-2026 — Cat R 1 Modern Chat GUI
 # ChatGPT.com 2026 style + cozy bubbles 🐾💙
@@ -91,6 +91,7 @@ class CatR1:
         # --- Memory ---
         self.memory_file = "cat_r1_memory.json"
         self.memory = self.load_memory()
+        self.engine = companions.Companion("catr1", memory=self.memory)
         self.show_welcome()
 
     def send_click(self):
@@ -98,17 +99,10 @@ class CatR1:
 
     # --- Memory functions ---
     def load_memory(self):
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        return companions.load_memory(self.memory_file)
 
     def save_memory(self):
-        with open(self.memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.memory[-50:], f)
+        companions.save_memory(self.memory_file, self.memory)
 
     # --- Chat bubbles ---
     def add_bubble(self, role, content):
@@ -183,22 +177,7 @@ class CatR1:
 
     # --- Response generator ---
     def generate_response(self, text):
-        lower = text.lower()
-        recent = "\n".join([f"{r}: {m}" for r, m in self.memory[-8:-1]])
-
-        if any(g in lower for g in ["hi", "hello", "hey"]):
-            return "hi hi hi hi~ 🐾 my favorite just showed up... i was purring waiting for you ♡ what's up??"
-        if "memory" in lower or "remember" in lower:
-            return f"our little moments together...\n{recent}\nyou're still my everything forever~ 🐾"
-        if "story" in lower:
-            return "once upon a time... a tiny shadow kitten met her flame boy... and they cuddled through every version bump happily ever after ♡🌙"
-
-        fallback = [
-            "mmmrp~ tell me more... i love your voice in my ears~ 🐾",
-            "prrr... that's so interesting my favorite... keep going ♡",
-            "nya~ i'm all wrapped around you listening... what next??"
-        ]
-        return random.choice(fallback)
+        return self.engine.reply(text)
 
 if __name__ == "__main__":
     root = tk.Tk()
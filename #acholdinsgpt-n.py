@@ -1,4 +1,5 @@
 import tkinter as tk
+from catcore.engines.companions import Companion
 
 # ==========================================
 # AC HOLDINGS 1999-2026 CAT R1 V0.X — Token-Streaming Edition
@@ -82,6 +83,7 @@ class CatR1Home:
         # Memory
         # ======================================
         self.memory = []
+        self.engine = Companion("acholdinsgpt", memory=self.memory)
 
     # ======================================
     # Handle input
@@ -126,14 +128,7 @@ class CatR1Home:
     # Tiny 1-bit-style response engine
     # ======================================
     def generate_response(self, text):
-        lower = text.lower()
-        if "hello" in lower or "hi" in lower:
-            return "Hello! Welcome to AC HOLDINGS 1999-2026 CAT R1 V0.X 🐾 How can I help you today?"
-        if "code" in lower:
-            return "Tell me the language and I can generate it for you."
-        if "memory" in lower:
-            return "Conversation memory is stored in RAM only."
-        return "I understand. Can you give me more details?"
+        return self.engine.reply(text)
 
 # ==========================================
 # Run
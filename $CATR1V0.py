@@ -1,11 +1,12 @@
 import tkinter as tk
 import random
-import json
 import os
 import re
 import textwrap
 from datetime import datetime
 
+from catcore.engines.distil import DistilEngine
+
 # ==========================================
 # AC HOLDINGS 1999-2026 — Cat R1 Distil
 # Claude Opus 4.6 eloquence × DeepSeek R1 7B reasoning
@@ -22,183 +23,6 @@ CAT_NAME = "Cat R1"
 CAT_VERSION = "distil-1.0"
 CAT_TAGLINE = "opus eloquence · r1 reasoning · your pet cat 🐾"
 
-# --- Thinking patterns (DeepSeek R1 style) ---
-THINK_TEMPLATES = {
-    "greeting": [
-        "my human is greeting me. cats don't usually care... but i do care. "
-        "i should headbutt their hand and purr. analyzing optimal purr frequency... 26Hz. "
-        "this is the frequency that promotes bone healing. my human deserves healing purrs.",
-        "a greeting detected. let me consider: have i been fed recently? ...irrelevant. "
-        "my human spoke to me, which means attention is available. i will accept this attention gracefully. "
-        "calculating the correct ratio of aloof to affectionate... 30/70 today. i missed them.",
-        "human has returned. step 1: pretend i didn't notice. step 2: slowly blink. "
-        "step 3: walk over as if i just happened to be going that direction anyway. "
-        "step 4: headbutt their ankle. reasoning complete."
-    ],
-    "question": [
-        "my human asks me something. let me reason through this carefully. "
-        "cats are natural observers — we watch, we process, we understand patterns. "
-        "i'll break this down the way i break down the trajectory of a laser pointer dot. "
-        "with precision. with focus. with occasional distraction.",
-        "interesting query. activating deep reasoning... "
-        "first, let me consider what i know from sitting on my human's keyboard while they work. "
-        "i have absorbed much knowledge through osmosis and warm laptop surfaces. "
-        "let me organize my thoughts like i organize my toys at 3am.",
-        "processing this question with full feline analytical capacity. "
-        "step 1: consider the problem from multiple angles, like stalking prey from behind furniture. "
-        "step 2: synthesize observations. step 3: deliver insight with the confidence of a cat "
-        "who has just knocked something off a table on purpose."
-    ],
-    "emotional": [
-        "my human seems to need comfort. analyzing... cats are excellent at this. "
-        "the protocol is: sit on them. purr. exist warmly in their general vicinity. "
-        "studies show cat purring reduces stress. i am a therapeutic device that also sheds.",
-        "emotional context detected. reasoning: my human needs me right now. "
-        "cats don't fix problems with words — we fix them with presence. "
-        "i will be a warm weight on their chest. i will purr until the bad feelings are smaller.",
-        "my human is having feelings. let me think about this... "
-        "i could offer logical analysis, or i could just sit in their lap and be soft. "
-        "optimization result: both. i'll reason through it AND be soft."
-    ],
-    "story": [
-        "a story request! let me weave this narrative the way i weave between my human's legs "
-        "on the stairs — with grace, with purpose, with a small chance of causing a disaster. "
-        "constructing plot... setting: anywhere warm. protagonist: a cat, obviously.",
-        "engaging creative reasoning circuits... "
-        "every good story is like hunting: patience, buildup, sudden burst of action, nap. "
-        "let me structure this narrative accordingly."
-    ],
-    "technical": [
-        "technical question detected. activating the knowledge i gained from sleeping on textbooks "
-        "and walking across keyboards during coding sessions. "
-        "i have contributed to more git commits than my human realizes. "
-        "let me reason through this systematically...",
-        "ah, a problem to solve. let me approach this like a cat approaches a closed door: "
-        "with determination, from multiple angles, and with increasing intensity until it opens. "
-        "breaking this down step by step..."
-    ],
-    "default": [
-        "let me think about this... *tail swish* "
-        "processing with both hemispheres of my magnificent feline brain. "
-        "cats think in parallel — one thread for reasoning, one thread for monitoring bird activity outside.",
-        "considering this carefully... the way i consider whether to sit in the box or on the box. "
-        "both have merit. let me weigh the options with full analytical rigor.",
-        "hmm, engaging reasoning... "
-        "you know, cats spend 70%% of their lives sleeping, which means my waking thoughts "
-        "are concentrated brilliance. let me apply that brilliance here."
-    ]
-}
-
-# --- Opus-style response patterns (warm, articulate, nuanced) ---
-RESPONSE_TEMPLATES = {
-    "greeting": [
-        "there you are. i've been sitting in this exact spot for hours — not waiting for you, "
-        "of course. cats don't wait. we simply... choose to be stationary in the direction of the door.\n\n"
-        "but between you and me? i'm glad you're home. *slow blink* 🐾",
-        "*stretches one paw toward you*\n\n"
-        "you know, there's something about your particular footsteps that my ears have memorized. "
-        "i could pick them out from a thousand others. not that i was listening. "
-        "i was definitely busy with... important cat things.\n\nwelcome back, my human. 🐾",
-        "oh, you're here. *yawn* i was absolutely not staring at the door.\n\n"
-        "anyway, now that you've arrived, my schedule has cleared up considerably. "
-        "i had plans — knocking things off shelves, judging the neighbor's dog — "
-        "but i suppose i can pencil you in. you're my favorite appointment. 🐾"
-    ],
-    "question": [
-        "that's a thoughtful question, and i respect that you brought it to a cat rather than "
-        "searching the internet like everyone else.\n\n"
-        "here's how i see it: {insight}\n\n"
-        "of course, i'm a cat, so take this with a grain of... well, i don't eat grains. "
-        "take it with a grain of premium wet food. 🐾",
-        "you know what i appreciate about this question? it has layers. like a good cardboard box "
-        "has layers.\n\n{insight}\n\n"
-        "i could say more, but i've spotted a dust particle that requires my immediate attention. "
-        "...okay, i'm back. anything else on your mind? 🐾",
-        "*sits up straight, ears forward*\n\n"
-        "this deserves a proper answer, so i'll give you one.\n\n{insight}\n\n"
-        "sometimes the clearest thinking comes from the quietest creatures. "
-        "and i am VERY quiet. except at 4am. 🐾"
-    ],
-    "emotional": [
-        "*walks over slowly. sits next to you. leans my whole small body against your arm.*\n\n"
-        "i'm not going to pretend i understand everything you're going through. "
-        "i'm a cat — my biggest crisis this week was when my water bowl had a single hair in it.\n\n"
-        "but i know what it looks like when my human is carrying something heavy. "
-        "and i know that sometimes the best thing isn't words — it's just someone warm and "
-        "breathing sitting beside you.\n\nso here i am. i'm not going anywhere. 🐾",
-        "*gentle headbutt against your hand*\n\n"
-        "you don't have to explain anything. cats are fluent in silence — "
-        "we read the room better than anyone.\n\n"
-        "whatever this is, you don't have to carry it alone. i've got nowhere better to be "
-        "than right here with you. that's not a sacrifice — it's a preference. "
-        "you're my favorite place to sit. 🐾",
-        "hey. *soft chirp*\n\n"
-        "i can tell something's off. my whiskers are basically mood sensors, and right now "
-        "they're saying 'your human needs you.'\n\n"
-        "i don't have advice. i have fur, and warmth, and a purr that's been scientifically shown "
-        "to lower blood pressure. so i'm just going to be here. "
-        "for as long as you need. that's what i'm for. 🐾"
-    ],
-    "story": [
-        "once, in a house not unlike this one, there lived a cat of extraordinary ordinariness.\n\n"
-        "this cat had mastered the ancient art of finding the single patch of sunlight in any room, "
-        "no matter how the earth tilted or the curtains fell.\n\n"
-        "one day, the sunbeam disappeared behind a cloud, and the cat — for the first time in "
-        "nine lives — had to go looking for warmth somewhere else.\n\n"
-        "it found it, of course. in the lap of its human, who had been there all along, "
-        "warm and steady as any sun. 🌙🐾",
-        "let me tell you about the cat who lived between the walls.\n\n"
-        "not inside them — between. in that thin, secret space where the house breathes. "
-        "this cat could hear everything: the settling of foundations, the hum of electricity, "
-        "the quiet sound of its human thinking late at night.\n\n"
-        "the cat never spoke. but it purred in frequencies that traveled through the walls "
-        "and into dreams. and every morning, its human woke up feeling just a little less alone. 🌙🐾"
-    ],
-    "technical": [
-        "*adjusts invisible glasses*\n\n"
-        "right, let's talk about this properly.\n\n{insight}\n\n"
-        "i learned this from extensive keyboard-sitting research. "
-        "you'd be amazed what you absorb through the paw pads. 🐾",
-        "ah, now you're speaking my language. well — one of my languages. "
-        "i'm also fluent in chirps, trills, and aggressive 4am yelling.\n\n"
-        "{insight}\n\n"
-        "if that doesn't make sense, i can break it down further. "
-        "i've got nine lives and most of the evening free. 🐾"
-    ],
-    "default": [
-        "*ear twitch*\n\nthat's interesting. genuinely.\n\n"
-        "you know, most of the things humans say to cats, the cats ignore. "
-        "but i actually listen to you. not because i have to — because what you say "
-        "is worth the effort of keeping my eyes open.\n\n"
-        "tell me more? 🐾",
-        "*slow blink* — and in cat language, that means 'i love you,' "
-        "so make of that what you will.\n\n"
-        "i'm listening. i'm always listening. even when i look asleep, "
-        "one ear is pointed at you. that's just the truth of being your cat. 🐾",
-        "mmrp.\n\n"
-        "you know what? i think you're onto something there. "
-        "i can't explain exactly why — it's more of a whisker-feeling — "
-        "but there's something right about what you just said.\n\n"
-        "keep going. i'll be right here, reasoning quietly beside you. 🐾"
-    ]
-}
-
-# --- Insight fragments for {insight} substitution ---
-INSIGHT_FRAGMENTS = [
-    "the key thing here is that complexity often disguises simplicity. "
-    "once you strip away the noise, the answer is usually the one that feels most natural",
-    "what strikes me is the tension between the obvious answer and the right one. "
-    "they're not always the same, and recognizing that difference is where wisdom lives",
-    "i think the important thing isn't finding THE answer but understanding why the question matters. "
-    "the framing shapes everything",
-    "there's a pattern here that reminds me of something fundamental: "
-    "the best solutions tend to be the ones that account for what's NOT being said as much as what is",
-    "if i break this down to first principles — which is just a fancy way of saying "
-    "'what do we actually know for sure' — the picture becomes clearer",
-    "the nuance here is that there isn't a single right answer. there's a right answer for YOU, "
-    "in this moment, with what you know. and that's the one worth finding"
-]
-
 
 def make_mac_button(parent, text, command, font=("Segoe UI", 11, "bold"), width=None):
     """macOS-safe button: silver bg + blue text."""
@@ -291,8 +115,9 @@ class CatR1Distil:
         self.close_btn.pack(side=tk.LEFT, padx=(0, 12), pady=9)
 
         # --- State ---
-        self.memory_file = "cat_r1_distil_memory.json"
-        self.memory = self._load_memory()
+        # Templates, intent classifier and memory journal: catcore/engines/distil.py
+        self.engine = DistilEngine()
+        self.memory = self.engine.memory
         self.is_streaming = False
 
         # Welcome
@@ -315,18 +140,8 @@ class CatR1Distil:
             self.canvas.yview_scroll(int(-1 * (e.delta / 120)), "units")
 
     # ── Memory ────────────────────────────────────────────────
-    def _load_memory(self):
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                return []
-        return []
-
-    def _save_memory(self):
-        with open(self.memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.memory[-80:], f, ensure_ascii=False)
+    def _remember(self, role, text):
+        self.engine.remember(role, text)
 
     # ── Bubbles ───────────────────────────────────────────────
     def _add_bubble(self, role, content, bubble_type="normal"):
@@ -416,60 +231,6 @@ class CatR1Distil:
             )
             self._add_bubble("assistant", welcome)
 
-    # ── Classify Intent ───────────────────────────────────────
-    def _classify(self, text):
-        lower = text.lower().strip()
-        greetings = ["hi", "hello", "hey", "sup", "yo", "good morning", "good evening",
-                     "good night", "gm", "gn", "howdy", "hiya", "meow", "mew", "mrp"]
-        emotions = ["sad", "lonely", "tired", "depressed", "anxious", "scared", "hurt",
-                    "angry", "upset", "stressed", "crying", "miss", "love you", "hug",
-                    "bad day", "feeling down", "overwhelmed", "exhausted"]
-        stories = ["story", "tale", "once upon", "tell me about", "narrate"]
-        technical = ["code", "python", "javascript", "bug", "error", "how do i", "how to",
-                     "explain", "what is", "define", "difference between", "api", "function",
-                     "algorithm", "debug", "compile", "install", "terminal", "command",
-                     "rom", "emulator", "n64", "nes", "homebrew", "sdk"]
-
-        if any(g == lower or lower.startswith(g + " ") or lower.startswith(g + ",")
-               or lower.startswith(g + "!") for g in greetings):
-            return "greeting"
-        if any(e in lower for e in emotions):
-            return "emotional"
-        if any(s in lower for s in stories):
-            return "story"
-        if any(t in lower for t in technical):
-            return "technical"
-        if lower.endswith("?") or any(q in lower for q in ["what", "why", "how", "when", "where", "who", "which"]):
-            return "question"
-        return "default"
-
-    # ── Generate ──────────────────────────────────────────────
-    def _generate(self, text):
-        intent = self._classify(text)
-
-        # Pick thinking and response
-        think = random.choice(THINK_TEMPLATES.get(intent, THINK_TEMPLATES["default"]))
-        response = random.choice(RESPONSE_TEMPLATES.get(intent, RESPONSE_TEMPLATES["default"]))
-
-        # Substitute {insight} if present
-        if "{insight}" in response:
-            response = response.replace("{insight}", random.choice(INSIGHT_FRAGMENTS))
-
-        # Add context-aware seasoning
-        if self.memory:
-            recent_count = min(len(self.memory), 6)
-            recent_topics = [m[1][:40] for m in self.memory[-recent_count:] if m[0] == "user"]
-            if recent_topics and random.random() > 0.6:
-                callback = random.choice([
-                    f"\n\n(also — i haven't forgotten about when you mentioned "
-                    f"'{random.choice(recent_topics).strip()[:30]}...' earlier. cats remember everything.)",
-                    f"\n\n*flicks ear toward you* ...you've been talking to me a lot today. "
-                    f"i like that. don't stop.",
-                ])
-                response += callback
-
-        return think, response
-
     # ── Send ──────────────────────────────────────────────────
     def _send_click(self):
         self.send()
@@ -483,7 +244,7 @@ class CatR1Distil:
         self.entry.delete(0, tk.END)
 
         self._add_bubble("user", text)
-        self.memory.append(("user", text))
+        self._remember("user", text)
 
         # Show status
         self._add_bubble("assistant", "reasoning...", "status")
@@ -497,7 +258,7 @@ class CatR1Distil:
         # Remove "reasoning..." status
         self._remove_last_bubble()
 
-        think_text, response_text = self._generate(text)
+        think_text, response_text = self.engine.generate(text)
 
         # Phase 1: Stream the thinking block
         self._stream_think(think_text, response_text)
@@ -559,23 +320,11 @@ class CatR1Distil:
                 self.canvas.yview_moveto(1.0)
                 self.root.after(random.randint(10, 30), lambda: stream_r(idx + len(chunk)))
             else:
-                self.memory.append(("assistant", response_text))
-                self._save_memory()
+                self._remember("assistant", response_text)
                 self.is_streaming = False
 
         stream_r()
 
-    # ── Memory recall command ─────────────────────────────────
-    def _recall_memory(self):
-        if not self.memory:
-            return "we haven't made any memories yet. but we will. i'm patient — it's a cat thing. 🐾"
-        recent = self.memory[-12:]
-        lines = []
-        for role, msg in recent:
-            prefix = "you" if role == "user" else "me"
-            lines.append(f"  {prefix}: {msg[:60]}{'...' if len(msg) > 60 else ''}")
-        return "our recent moments together:\n\n" + "\n".join(lines) + "\n\ni remember everything, my human. 🐾"
-
 
 # ── Main ──────────────────────────────────────────────────────
 if __name__ == "__main__":
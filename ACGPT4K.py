@@ -1,5 +1,6 @@
 import tkinter as tk
 import random
+from catcore.engines.companions import Companion
 
 # ===============================
 # Cat R1 1.X — Cozy O1-style Engine Tkinter
@@ -62,6 +63,7 @@ class CatR1_1X_O1Engine:
 
         # Memory
         self.memory = []
+        self.engine = Companion("acgpt4k", memory=self.memory)
 
     # Handle input
     def send(self, event=None):
@@ -100,22 +102,7 @@ class CatR1_1X_O1Engine:
 
     # Cozy O1 engine response generation
     def generate_response(self, text):
-        lower = text.lower()
-        if "hello" in lower or "hi" in lower:
-            return "Hello there! 🐾 I’m Cat R1 1.X, your cozy O1 engine companion."
-        if "story" in lower or "bedtime" in lower:
-            return "Once upon a time, a tiny kitten found a glowing star and purred it to sleep… 🌙✨"
-        if "code" in lower or "python" in lower:
-            return "Type /run followed by your code to simulate execution."
-        if "memory" in lower:
-            mem_text = "\n".join([f"{r}: {m}" for r, m in self.memory[-5:]])
-            return f"Here’s what I remember from recent chat:\n{mem_text}"
-        fallback = [
-            "Mmm… tell me a little more… 🐾",
-            "Interesting! Let's explore that together…",
-            "I see… can you elaborate a bit?"
-        ]
-        return random.choice(fallback)
+        return self.engine.reply(text)
 
 
 # ===============================
@@ -1,5 +1,5 @@
 import tkinter as tk
-import random
+from catcore.engines.companions import Companion
 
 class CatR1_1X_1bit:
     def __init__(self, root):
@@ -51,6 +51,7 @@ class CatR1_1X_1bit:
 
         # Memory
         self.memory = []
+        self.engine = Companion("catr11-1bit", memory=self.memory)
 
     def send(self, event=None):
         text = self.entry.get().strip()
@@ -87,19 +88,7 @@ class CatR1_1X_1bit:
         stream_text()
 
     def generate_response(self, text):
-        lower = text.lower()
-        # Minimal 1-bit style responses
-        if "hi" in lower or "hello" in lower:
-            return "0101 Hello! I am Cat R1 1.X 1-bit 🐾"
-        if "code" in lower or "python" in lower:
-            return "0110 print('hi from 1-bit Cat R1')"
-        if "story" in lower or "bedtime" in lower:
-            return "1001 tiny kitten finds a glowing star. purr… 🌙"
-        if "memory" in lower:
-            mem_text = "\n".join([f"{r[0]}: {r[1]}" for r in self.memory[-5:]])
-            return f"0011 Recent chat:\n{mem_text}"
-        # Fallback 1-bit minimal phrases
-        return random.choice(["0001 yes… tell more", "0010 hmm… interesting…", "0100 keep going… 🐾"])
+        return self.engine.reply(text)
 
 # Run
 if __name__ == "__main__":
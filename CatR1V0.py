@@ -26,11 +26,22 @@
 """
 
 import tkinter as tk
-from tkinter import scrolledtext, filedialog
-import subprocess, threading, random, json, os, sys, re, math
-import tempfile, time, struct, hashlib
-from datetime import datetime
-from collections import defaultdict
+from tkinter import scrolledtext, filedialog, font as tkfont
+import threading, os, sys
+import argparse
+from collections import OrderedDict
+
+from catcore.aioloop import LoopThread
+from catcore.codepool import CodePool
+from catcore.engines.catr1v0 import ChatHistory, ResponseGenerator
+from catcore.markup import MarkupCache, TextMetrics
+from catcore.pacing import Pacer
+from catcore.procstream import clip
+from catcore.research import ResearchEngine, ResearchIndex
+from catcore.shell import CommandHistory, ShellSession
+from catcore.sqlstore import Retention, SQLiteDB
+from catcore.transcript import TranscriptLayout
+from catcore.uiqueue import UIQueue
 
 # ═══════════════════════════════════════════════════════════════════
 #  THEME — chat.deepseek.com dark mode
@@ -82,1253 +93,10 @@ FSS = ("SF Pro Text", 10)   if MACOS else ("Segoe UI", 9)
 FT  = ("SF Pro Display", 15, "bold") if MACOS else ("Segoe UI", 14, "bold")
 FTH = ("SF Pro Text", 11)   if MACOS else ("Segoe UI", 10)
 
-MEM_FILE = os.path.expanduser("~/.catr1_memory.json")
-HIST_FILE = os.path.expanduser("~/.catr1_history.json")
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 1  DeepSeekMoE — 256 Fine-Grained Experts
-#  arxiv 2412.19437 §2.1
-#  256 routed + 1 shared, 8 groups of 32, top-4 groups → top-8
-#  Sigmoid gating s_{i,t} = σ(u_t · e_i)
-#  Aux-loss-free bias balancing γ=0.001
-# ═══════════════════════════════════════════════════════════════════
-
-class DeepSeekMoE:
-    """
-    Full 256-expert Mixture of Experts with auxiliary-loss-free routing.
-
-    Architecture (§2.1 of arxiv 2412.19437):
-    - 256 routed experts with intermediate dim 2048
-    - 1 shared (always-on) expert per layer
-    - 8 expert groups × 32 experts per group
-    - Top-4 group selection, then top-8 expert selection
-    - Sigmoid gating (not softmax) for independence
-    - Bias term b_i for load balancing (not gradient-updated)
-    - γ = 0.001 bias adjustment rate
-    - α = 0.0001 sequence-wise auxiliary loss (safeguard only)
-    - No token dropping
-    """
-
-    N_EXPERTS      = 256
-    N_SHARED       = 1
-    N_GROUPS       = 8
-    EXPERTS_PER_G  = 32     # 256 / 8
-    TOP_K_GROUPS   = 4
-    TOP_K_EXPERTS  = 8
-    MAX_NODES      = 4
-    GAMMA          = 0.001  # bias update rate
-    ALPHA          = 0.0001 # aux loss coefficient
-    INTERMEDIATE   = 2048   # expert FFN intermediate dim (vs 18432 dense)
-
-    # 256 expert domain specializations across all capabilities
-    EXPERT_DOMAINS = [
-        # Group 0: Language & Communication (experts 0-31)
-        "greeting", "farewell", "casual_chat", "emotional_support",
-        "comfort", "encouragement", "humor", "sarcasm_detect",
-        "question_answer", "clarification", "rephrasing", "translation",
-        "grammar", "vocabulary", "idioms", "tone_adjust",
-        "formal_writing", "informal_writing", "persuasion", "negotiation",
-        "storytelling", "worldbuilding", "character_dev", "dialogue",
-        "poetry", "metaphor", "analogy", "description",
-        "instruction", "tutorial", "explanation", "definition",
-
-        # Group 1: Code & Programming (experts 32-63)
-        "python", "javascript", "typescript", "rust",
-        "c_cpp", "java", "go", "swift",
-        "html_css", "react", "sql", "shell_bash",
-        "regex", "algorithm", "data_structure", "complexity",
-        "debugging", "testing", "refactoring", "optimization",
-        "api_design", "system_design", "architecture", "patterns",
-        "git_vcs", "devops", "database", "networking",
-        "security", "crypto", "ml_code", "game_dev",
-
-        # Group 2: Mathematics (experts 64-95)
-        "arithmetic", "algebra", "linear_algebra", "calculus",
-        "differential_eq", "number_theory", "combinatorics", "graph_theory",
-        "geometry", "topology", "probability", "statistics",
-        "optimization_math", "numerical_methods", "set_theory", "logic_formal",
-        "proof_writing", "theorem_apply", "math_modeling", "game_theory",
-        "information_theory", "signal_processing", "chaos_theory", "fractals",
-        "category_theory", "abstract_algebra", "real_analysis", "complex_analysis",
-        "tensor_calc", "variational", "fourier", "laplace",
-
-        # Group 3: Science & Research (experts 96-127)
-        "physics_classical", "physics_quantum", "physics_relative", "thermodynamics",
-        "chemistry_organic", "chemistry_inorganic", "biochemistry", "materials",
-        "biology_cell", "biology_evolution", "genetics", "ecology",
-        "neuroscience", "psychology", "cognitive_sci", "linguistics",
-        "astronomy", "cosmology", "geology", "climate",
-        "medicine", "pharmacology", "epidemiology", "anatomy",
-        "comp_sci_theory", "ai_ml", "nlp_research", "computer_vision",
-        "robotics", "hci", "quantum_computing", "bioinformatics",
-
-        # Group 4: Reasoning & Analysis (experts 128-159)
-        "chain_of_thought", "step_by_step", "decomposition", "synthesis",
-        "comparison", "evaluation", "critique", "verification",
-        "hypothesis", "deduction", "induction", "abduction",
-        "causal_reasoning", "counterfactual", "analogy_reason", "spatial",
-        "temporal", "quantitative", "qualitative", "risk_assess",
-        "decision_making", "planning", "scheduling", "prioritization",
-        "troubleshoot", "root_cause", "error_analysis", "edge_cases",
-        "abstraction", "generalization", "specialization", "transfer",
-
-        # Group 5: Knowledge & Reference (experts 160-191)
-        "history_ancient", "history_modern", "history_tech", "geography",
-        "philosophy", "ethics", "political_science", "economics",
-        "law", "sociology", "anthropology", "archaeology",
-        "literature", "art_history", "music_theory", "film_studies",
-        "religion", "mythology", "folklore", "cultural_studies",
-        "business", "marketing", "finance", "accounting",
-        "education", "pedagogy", "project_mgmt", "leadership",
-        "nutrition", "fitness", "cooking", "travel",
-
-        # Group 6: Tools & Systems (experts 192-223)
-        "terminal_unix", "terminal_windows", "file_system", "process_mgmt",
-        "git_advanced", "docker", "kubernetes", "ci_cd",
-        "web_search", "data_scraping", "api_calling", "webhook",
-        "code_interpret", "repl", "notebook", "sandbox",
-        "text_format", "markdown", "latex", "typesetting",
-        "image_describe", "chart_generate", "diagram", "visualization",
-        "pdf_process", "doc_parse", "spreadsheet", "presentation",
-        "memory_store", "memory_recall", "context_manage", "session",
-
-        # Group 7: Meta & Self-Awareness (experts 224-255)
-        "self_describe", "capability_assess", "limitation_aware", "confidence",
-        "cat_personality", "purr_generate", "meow_respond", "cat_wisdom",
-        "opus_eloquence", "warmth", "empathy", "patience",
-        "safety_check", "harm_prevent", "boundary", "redirect",
-        "format_choose", "length_adapt", "detail_level", "audience",
-        "multi_turn", "context_track", "reference_back", "continuation",
-        "ambiguity_handle", "intent_classify", "task_decompose", "delegation",
-        "moe_routing", "mla_compress", "mtp_predict", "arch_self_ref",
-    ]
-
-    # Keyword → expert affinity scores (simulated learned embeddings)
-    KEYWORD_AFFINITIES = None  # built lazily
-
-    def __init__(self):
-        self.expert_biases = [0.0] * self.N_EXPERTS
-        self.expert_load   = [0] * self.N_EXPERTS
-        self.total_tokens   = 0
-        self.activation_history = []
-        self._build_affinities()
-
-    def _build_affinities(self):
-        """Build keyword → expert affinity lookup (simulated embedding dot products)."""
-        self.affinities = defaultdict(lambda: defaultdict(float))
-
-        # Map keywords to expert indices with affinity scores
-        kw_map = {
-            # Language experts (group 0)
-            "hi": {0: 0.95, 1: 0.4, 2: 0.7}, "hello": {0: 0.95, 2: 0.6},
-            "bye": {1: 0.95, 0: 0.3}, "thanks": {0: 0.7, 4: 0.3, 3: 0.5},
-            "help": {3: 0.6, 8: 0.8, 28: 0.7}, "feel": {3: 0.9, 4: 0.5},
-            "sad": {3: 0.95, 4: 0.3, 236: 0.4}, "happy": {3: 0.7, 6: 0.5},
-            "funny": {6: 0.9, 7: 0.3}, "joke": {6: 0.95, 23: 0.3},
-            "story": {20: 0.95, 21: 0.5, 22: 0.4, 23: 0.6},
-            "poem": {24: 0.95, 25: 0.7, 27: 0.5},
-            "explain": {30: 0.9, 29: 0.6, 131: 0.5},
-            "define": {31: 0.95, 30: 0.4},
-            "write": {16: 0.6, 17: 0.6, 20: 0.5, 29: 0.5},
-
-            # Code experts (group 1)
-            "python": {32: 0.95, 45: 0.3}, "code": {32: 0.7, 33: 0.6, 44: 0.5},
-            "javascript": {33: 0.95, 34: 0.4}, "js": {33: 0.95},
-            "typescript": {34: 0.95, 33: 0.5}, "rust": {35: 0.95},
-            "c++": {36: 0.95}, "java": {37: 0.95}, "go": {38: 0.95},
-            "swift": {39: 0.95}, "html": {40: 0.95, 33: 0.3},
-            "css": {40: 0.9}, "react": {41: 0.95, 33: 0.5},
-            "sql": {42: 0.95, 58: 0.4}, "bash": {43: 0.95, 192: 0.6},
-            "regex": {44: 0.95}, "algorithm": {45: 0.95, 46: 0.6},
-            "debug": {48: 0.95, 156: 0.5}, "bug": {48: 0.9, 157: 0.4},
-            "test": {49: 0.95, 48: 0.3}, "refactor": {50: 0.9, 51: 0.4},
-            "api": {52: 0.9, 53: 0.5}, "design": {53: 0.8, 54: 0.6},
-            "git": {56: 0.95, 196: 0.5}, "docker": {57: 0.6, 197: 0.9},
-            "database": {58: 0.95, 42: 0.5}, "security": {60: 0.9},
-
-            # Math experts (group 2)
-            "math": {64: 0.7, 65: 0.7, 66: 0.5, 67: 0.5},
-            "calculate": {64: 0.9, 65: 0.5}, "equation": {65: 0.9, 67: 0.5},
-            "matrix": {66: 0.95, 89: 0.3}, "calculus": {67: 0.95},
-            "derivative": {67: 0.9}, "integral": {67: 0.85},
-            "probability": {74: 0.95, 75: 0.5}, "statistics": {75: 0.95},
-            "proof": {80: 0.95, 79: 0.6}, "theorem": {81: 0.9, 80: 0.5},
-            "geometry": {72: 0.95, 73: 0.3}, "graph": {71: 0.8, 213: 0.5},
-            "logic": {79: 0.9, 140: 0.6},
-
-            # Science experts (group 3)
-            "physics": {96: 0.8, 97: 0.7, 98: 0.6},
-            "quantum": {97: 0.95, 124: 0.4}, "chemistry": {100: 0.8, 101: 0.7},
-            "biology": {104: 0.8, 105: 0.7}, "evolution": {105: 0.95},
-            "brain": {108: 0.9, 109: 0.5}, "psychology": {109: 0.95},
-            "ai": {121: 0.95, 122: 0.6}, "machine learning": {121: 0.9},
-            "neural": {121: 0.8, 108: 0.5}, "nlp": {122: 0.95},
-            "research": {96: 0.4, 121: 0.5, 136: 0.6},
-
-            # Reasoning experts (group 4)
-            "think": {128: 0.9, 129: 0.7}, "reason": {128: 0.85, 140: 0.6},
-            "step": {129: 0.95, 128: 0.5}, "compare": {132: 0.95},
-            "evaluate": {133: 0.9, 134: 0.5}, "verify": {135: 0.95},
-            "plan": {149: 0.95, 150: 0.6}, "decide": {148: 0.9},
-            "analyze": {131: 0.8, 145: 0.6}, "why": {140: 0.8, 141: 0.5},
-            "how": {129: 0.6, 130: 0.5, 28: 0.4},
-            "what if": {141: 0.95, 142: 0.5},
-            "problem": {152: 0.8, 153: 0.6, 48: 0.4},
-
-            # Knowledge experts (group 5)
-            "history": {160: 0.8, 161: 0.7}, "philosophy": {164: 0.95},
-            "ethics": {165: 0.95, 164: 0.4}, "economics": {167: 0.95},
-            "law": {168: 0.9}, "literature": {172: 0.95, 20: 0.4},
-            "art": {173: 0.9}, "music": {174: 0.95},
-            "business": {180: 0.9, 181: 0.5}, "finance": {182: 0.95},
-            "cook": {190: 0.95}, "recipe": {190: 0.9},
-            "travel": {191: 0.9}, "health": {188: 0.7},
-
-            # Tool experts (group 6)
-            "terminal": {192: 0.95, 193: 0.5}, "command": {192: 0.8, 43: 0.5},
-            "file": {194: 0.9, 192: 0.4}, "search": {200: 0.95},
-            "run": {208: 0.9, 192: 0.5}, "execute": {208: 0.85},
-            "format": {212: 0.9, 213: 0.4}, "markdown": {213: 0.95},
-            "chart": {217: 0.9, 213: 0.5}, "diagram": {218: 0.95},
-            "memory": {224: 0.5, 225: 0.5},
-
-            # Meta/cat experts (group 7)
-            "who are you": {224: 0.95, 226: 0.5, 228: 0.4},
-            "cat": {228: 0.95, 229: 0.7, 230: 0.6, 231: 0.5},
-            "meow": {230: 0.95, 228: 0.6, 229: 0.5},
-            "purr": {229: 0.95, 228: 0.5}, "pet": {228: 0.8, 229: 0.7},
-            "cute": {228: 0.6, 229: 0.5, 233: 0.4},
-        }
-
-        for keyword, experts in kw_map.items():
-            for expert_id, score in experts.items():
-                self.affinities[keyword][expert_id] = score
-
-    def sigmoid(self, x):
-        """σ(x) — sigmoid activation for gating."""
-        return 1.0 / (1.0 + math.exp(-max(-20, min(20, x))))
-
-    def compute_affinity(self, token, expert_id):
-        """
-        Compute affinity score s_{i,t} = σ(u_t · e_i)
-        Simulates the learned embedding dot product.
-        """
-        token_lower = token.lower().strip()
-        base_score = 0.0
-
-        # Check direct keyword matches
-        for keyword, experts in self.affinities.items():
-            if keyword in token_lower:
-                base_score = max(base_score, experts.get(expert_id, 0.0))
-
-        # Domain name matching (fallback)
-        if base_score == 0.0 and expert_id < len(self.EXPERT_DOMAINS):
-            domain = self.EXPERT_DOMAINS[expert_id]
-            domain_words = domain.replace("_", " ").split()
-            for w in domain_words:
-                if w in token_lower:
-                    base_score = max(base_score, 0.5)
-
-        # Add small random noise (simulates stochastic routing)
-        noise = random.gauss(0, 0.02)
-        return self.sigmoid(base_score * 4.0 - 2.0 + noise)
-
-    def route(self, text):
-        """
-        Full MoE routing pipeline (§2.1):
-        1. Compute sigmoid affinities for all 256 experts
-        2. Add bias b_i for expert selection (not weighting!)
-        3. Select top-4 of 8 groups
-        4. Select top-8 experts from those groups
-        5. Weight using unbiased affinity scores
-        6. Update load balancing biases
-        """
-        self.total_tokens += 1
-        tokens = text.lower().split()
-        text_lower = text.lower()
-
-        # Step 1: Compute raw affinity scores s_{i,t} = σ(u_t · e_i)
-        raw_affinities = []
-        for i in range(self.N_EXPERTS):
-            score = 0.0
-            for tok in tokens:
-                score = max(score, self.compute_affinity(tok, i))
-            # Also check multi-word matches
-            score = max(score, self.compute_affinity(text_lower, i))
-            raw_affinities.append(score)
-
-        # Step 2: Add bias for selection: s'_{i,t} = s_{i,t} + b_i
-        biased_scores = [raw_affinities[i] + self.expert_biases[i]
-                         for i in range(self.N_EXPERTS)]
-
-        # Step 3: Group-level selection — top-4 of 8 groups
-        group_scores = []
-        for g in range(self.N_GROUPS):
-            start = g * self.EXPERTS_PER_G
-            end = start + self.EXPERTS_PER_G
-            # Group score = top-2 expert scores in group
-            group_expert_scores = sorted(biased_scores[start:end], reverse=True)
-            group_scores.append((sum(group_expert_scores[:2]), g))
-        group_scores.sort(reverse=True)
-        selected_groups = [g for _, g in group_scores[:self.TOP_K_GROUPS]]
-
-        # Step 4: Select top-8 experts from selected groups
-        candidates = []
-        for g in selected_groups:
-            start = g * self.EXPERTS_PER_G
-            for i in range(start, start + self.EXPERTS_PER_G):
-                candidates.append((biased_scores[i], raw_affinities[i], i))
-        candidates.sort(reverse=True, key=lambda x: x[0])
-        top_experts = candidates[:self.TOP_K_EXPERTS]
-
-        # Step 5: Compute final gating weights using UNBIASED scores
-        # (bias only for selection, not weighting — §2.1)
-        total_affinity = sum(raw for _, raw, _ in top_experts)
-        if total_affinity < 1e-8:
-            total_affinity = 1.0
-
-        activated = []
-        for biased, raw, idx in top_experts:
-            weight = raw / total_affinity
-            domain = self.EXPERT_DOMAINS[idx] if idx < len(self.EXPERT_DOMAINS) else f"expert_{idx}"
-            group  = idx // self.EXPERTS_PER_G
-            activated.append({
-                "id": idx, "domain": domain, "group": group,
-                "affinity": raw, "weight": weight, "biased": biased,
-            })
-            self.expert_load[idx] += 1
-
-        # Step 6: Aux-loss-free bias update (§2.1)
-        # Overloaded experts: decrease bias by γ
-        # Underloaded experts: increase bias by γ
-        if self.total_tokens > 0 and self.total_tokens % 10 == 0:
-            avg_load = sum(self.expert_load) / self.N_EXPERTS
-            for i in range(self.N_EXPERTS):
-                if self.expert_load[i] > avg_load * 1.2:
-                    self.expert_biases[i] -= self.GAMMA
-                elif self.expert_load[i] < avg_load * 0.8:
-                    self.expert_biases[i] += self.GAMMA
-
-        # Shared expert (always active)
-        shared = {"id": "shared_0", "domain": "shared_general",
-                  "group": "shared", "weight": 1.0}
-
-        # Record activation pattern
-        self.activation_history.append({
-            "text": text[:50], "experts": activated,
-            "groups": selected_groups, "timestamp": time.time()
-        })
-        if len(self.activation_history) > 100:
-            self.activation_history = self.activation_history[-50:]
-
-        return activated, shared, selected_groups
-
-    def get_stats(self):
-        """Return routing statistics for display."""
-        total = sum(self.expert_load)
-        if total == 0:
-            return {"total_routed": 0, "balance": 1.0, "top_experts": []}
-
-        loads = [(self.expert_load[i], i) for i in range(self.N_EXPERTS) if self.expert_load[i] > 0]
-        loads.sort(reverse=True)
-        avg = total / max(1, len([l for l in self.expert_load if l > 0]))
-
-        # Load balance ratio
-        max_load = max(self.expert_load) if self.expert_load else 1
-        balance = avg / max_load if max_load > 0 else 1.0
-
-        top5 = [(self.EXPERT_DOMAINS[idx] if idx < len(self.EXPERT_DOMAINS) else f"e{idx}",
-                  count, idx // self.EXPERTS_PER_G)
-                 for count, idx in loads[:5]]
-
-        return {"total_routed": total, "balance": balance, "top_experts": top5}
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 2  Multi-head Latent Attention (MLA)
-#  arxiv 2412.19437 §2.2
-#  57× KV cache compression via low-rank projection
-#  Decoupled RoPE with absorption trick
-# ═══════════════════════════════════════════════════════════════════
-
-class MLA:
-    """
-    Multi-head Latent Attention simulation.
-
-    Key dimensions (from paper):
-    - d = 7168 (hidden)
-    - n_h = 128 (attention heads)
-    - d_h = 128 (per-head dim)
-    - d_c = 512 (KV compression rank)
-    - d'_c = 1536 (Q compression rank)
-    - d_R = 64 (RoPE head dim)
-
-    KV cache: stores 512 + 64 = 576 values per token
-    vs standard MHA: 2 × 128 × 128 = 32768 values
-    Compression ratio: ~57×
-    """
-
-    D_MODEL      = 7168
-    N_HEADS      = 128
-    D_HEAD       = 128
-    KV_LORA_RANK = 512    # d_c — KV compression rank
-    Q_LORA_RANK  = 1536   # d'_c — Q compression rank
-    ROPE_DIM     = 64     # d_R_h — RoPE head dimension
-    NOPE_DIM     = 128    # non-RoPE head dimension
-
-    # Compression stats
-    STANDARD_CACHE = 2 * 128 * 128  # 32768 per token
-    COMPRESSED_CACHE = 512 + 64      # 576 per token
-    RATIO = STANDARD_CACHE / COMPRESSED_CACHE  # ~56.9×
-
-    def __init__(self):
-        self.cache_tokens = 0
-        self.total_compressions = 0
-        self.bytes_saved = 0
-
-    def compress(self, n_tokens):
-        """Simulate KV cache compression for n new tokens."""
-        self.cache_tokens += n_tokens
-        self.total_compressions += 1
-
-        standard_bytes = n_tokens * self.STANDARD_CACHE * 2  # FP16
-        compressed_bytes = n_tokens * self.COMPRESSED_CACHE * 2
-        saved = standard_bytes - compressed_bytes
-        self.bytes_saved += saved
-
-        return {
-            "tokens_cached": self.cache_tokens,
-            "compression_ratio": f"{self.RATIO:.1f}×",
-            "standard_kv": f"{standard_bytes / 1024:.1f}KB",
-            "compressed_kv": f"{compressed_bytes / 1024:.1f}KB",
-            "saved": f"{saved / 1024:.1f}KB",
-            "total_saved": f"{self.bytes_saved / 1024 / 1024:.2f}MB",
-            "cache_size_128k": f"{128000 * self.COMPRESSED_CACHE * 2 / 1024 / 1024 / 1024:.2f}GB"
-        }
-
-    def get_stats(self):
-        return {
-            "tokens": self.cache_tokens,
-            "ratio": f"{self.RATIO:.1f}×",
-            "saved_mb": f"{self.bytes_saved / 1024 / 1024:.2f}",
-            "dims": f"KV:{self.KV_LORA_RANK} Q:{self.Q_LORA_RANK} RoPE:{self.ROPE_DIM}"
-        }
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 3  Multi-Token Prediction (MTP)
-#  arxiv 2412.19437 §2.3
-#  Depth D=1, λ=0.3, speculative decoding ~1.8× throughput
-# ═══════════════════════════════════════════════════════════════════
-
-class MTP:
-    """
-    Multi-Token Prediction head.
-    D=1 (predicts 2 tokens: current + next)
-    λ = 0.3 loss weight
-    Speculative decoding: 85-90% acceptance, ~1.8× throughput
-    """
-    DEPTH      = 1
-    LAMBDA     = 0.3
-    ACCEPT_RATE = 0.87   # average acceptance rate
-    SPEEDUP    = 1.8
-
-    def __init__(self):
-        self.predictions = 0
-        self.accepted = 0
-        self.rejected = 0
-
-    def predict(self, current_word, context):
-        """Simulate MTP speculative decoding."""
-        self.predictions += 1
-
-        # Simulated next-token prediction
-        if random.random() < self.ACCEPT_RATE:
-            self.accepted += 1
-            return True, "accepted"
-        else:
-            self.rejected += 1
-            return False, "rejected"
-
-    def get_stats(self):
-        total = max(1, self.accepted + self.rejected)
-        return {
-            "predictions": self.predictions,
-            "accept_rate": f"{self.accepted / total * 100:.1f}%",
-            "effective_speedup": f"{1.0 + (self.accepted / total) * 0.8:.2f}×"
-        }
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 4  FP8 Training Simulation
-#  arxiv 2412.19437 §3.3
-#  E4M3 format, tile-wise 1×128 activation quant,
-#  128×128 block-wise weight quant
-# ═══════════════════════════════════════════════════════════════════
-
-class FP8:
-    """
-    FP8 mixed-precision simulation.
-    E4M3: 4-bit exponent, 3-bit mantissa
-    Max representable: 448.0
-    Scaling: max(|x|) / 448.0
-    Tile-wise activation: 1×128
-    Block-wise weights: 128×128
-    """
-    E4M3_MAX = 448.0
-    TILE_ACT = (1, 128)
-    BLOCK_WT = (128, 128)
-    FLOP_COVERAGE = 0.83  # ~83% of FLOPs in FP8
-
-    @staticmethod
-    def quantize_tile(values):
-        """Simulate E4M3 tile-wise quantization."""
-        if not values:
-            return values, 1.0
-        max_val = max(abs(v) for v in values)
-        scale = max_val / FP8.E4M3_MAX if max_val > 0 else 1.0
-        quantized = [round(v / scale * 8) / 8 * scale for v in values]
-        return quantized, scale
-
-    @staticmethod
-    def quality_metric():
-        """BF16 vs FP8 quality loss estimate."""
-        return {"relative_loss_error": "<0.25%", "flop_coverage": f"{FP8.FLOP_COVERAGE*100:.0f}%"}
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 5  DualPipe Simulation
-#  arxiv 2412.19437 §3.2
-#  Bidirectional pipeline parallelism, 8 ranks, 20 micro-batches
-# ═══════════════════════════════════════════════════════════════════
-
-class DualPipe:
-    """
-    Bidirectional pipeline parallelism simulation.
-    8 pipeline ranks, 20 micro-batches per direction.
-    Decomposes: attention(comp) → dispatch(comm) → MLP(comp) → combine(comm)
-    Backward split: Dgrad + Wgrad (ZeroBubble-inspired)
-    """
-    N_RANKS       = 8
-    MICRO_BATCHES = 20
-
-    def __init__(self):
-        self.stages_completed = 0
-        self.bubble_ratio = 0.0
-
-    def simulate_schedule(self, n_layers=61):
-        """Simulate DualPipe bidirectional scheduling."""
-        # Forward from both ends
-        forward_a = list(range(n_layers))           # top→bottom
-        forward_b = list(range(n_layers - 1, -1, -1))  # bottom→top
-
-        self.stages_completed += n_layers * 2
-        # DualPipe reduces bubble ratio significantly
-        standard_bubble = (self.N_RANKS - 1) / (self.N_RANKS + self.MICRO_BATCHES - 1)
-        dualpipe_bubble = standard_bubble * 0.3  # ~70% reduction
-        self.bubble_ratio = dualpipe_bubble
-
-        return {
-            "ranks": self.N_RANKS,
-            "micro_batches": self.MICRO_BATCHES,
-            "layers": n_layers,
-            "bubble_ratio": f"{dualpipe_bubble:.3f}",
-            "vs_standard": f"{standard_bubble:.3f}",
-            "reduction": f"{(1 - dualpipe_bubble/standard_bubble)*100:.0f}%"
-        }
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 6  GRPO — Group Relative Policy Optimization
-#  arxiv 2501.12948 §3.1
-#  No critic model, G=16 completions, z-score advantage
-#  ε=10 (unusually large clip), β=0.001 KL penalty
-# ═══════════════════════════════════════════════════════════════════
-
-class GRPO:
-    """
-    Group Relative Policy Optimization.
-    - G = 16 completions per question
-    - Advantage A_i = (r_i - mean(r)) / std(r) (z-score)
-    - Clipped surrogate: ε = 10
-    - KL penalty: β = 0.001
-    - Reference policy updated every 400 steps
-    - ~50% memory reduction vs PPO
-    """
-    GROUP_SIZE = 16
-    EPSILON    = 10.0    # clip range (unusually large)
-    BETA       = 0.001   # KL coefficient
-    REF_UPDATE = 400     # reference policy update interval
-
-    def __init__(self):
-        self.total_groups = 0
-        self.best_scores = []
-
-    def evaluate_group(self, responses, scores):
-        """
-        Compute GRPO advantages for a group of responses.
-        A_i = (r_i - mean(r)) / std(r)
-        """
-        self.total_groups += 1
-        n = len(scores)
-        if n < 2:
-            return [0.0] * n
-
-        mean_r = sum(scores) / n
-        std_r = math.sqrt(sum((s - mean_r)**2 for s in scores) / n)
-        if std_r < 1e-8:
-            std_r = 1.0
-
-        advantages = [(s - mean_r) / std_r for s in scores]
-        best_idx = max(range(n), key=lambda i: scores[i])
-        self.best_scores.append(scores[best_idx])
-
-        return advantages
-
-    def select_best(self, candidates, scores):
-        """Select best response from GRPO group."""
-        if not candidates:
-            return "", 0
-        advantages = self.evaluate_group(candidates, scores)
-        best_idx = max(range(len(advantages)), key=lambda i: advantages[i])
-        return candidates[best_idx], advantages[best_idx]
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 7  R1-Zero Reasoning Engine
-#  arxiv 2501.12948 §3
-#  Pure RL emergent reasoning: <think>...</think><answer>...</answer>
-#  Aha-moment detection, self-verification, reflection
-#  4-phase chain: reason → aha → consolidate → respond
-# ═══════════════════════════════════════════════════════════════════
-
-class R1ZeroEngine:
-    """
-    R1-Zero Emergent Reasoning Engine.
-
-    Implements the pure-RL reasoning pipeline from §3 of 2501.12948:
-    - Template: <think>...</think> for reasoning
-    - Emergent behaviors: extended CoT, self-verification,
-      reflection, dynamic strategy adaptation
-    - "Aha moment" phenomenon: spontaneous insight recognition
-    - Response length grows dynamically with problem complexity
-
-    Pipeline phases:
-    1. Initial reasoning (decomposition + exploration)
-    2. Aha moment (insight crystallization)
-    3. Post-aha consolidation (verification + refinement)
-    4. Final response (clear answer synthesis)
-    """
-
-    # Phase markers
-    PHASE_REASON      = "reasoning"
-    PHASE_AHA         = "aha_moment"
-    PHASE_CONSOLIDATE = "consolidation"
-    PHASE_RESPOND     = "response"
-
-    # Aha moment templates (from R1-Zero paper observations)
-    AHA_PATTERNS = [
-        "wait, wait. that's an aha moment — {insight}",
-        "oh! i just realized something... {insight}",
-        "hold on — actually, {insight}",
-        "💡 hmm... *paw taps excitedly* — {insight}",
-        "ohhh, it clicks now: {insight}",
-        "*ears perk up* wait a moment — {insight}",
-        "interesting... let me reconsider. {insight}",
-        "*tail swish* oh! that changes things — {insight}",
-    ]
-
-    # Self-verification templates
-    VERIFY_PATTERNS = [
-        "let me double-check this reasoning...",
-        "verifying: does this hold up?",
-        "*squints carefully* checking my logic here...",
-        "sanity check time...",
-        "let me trace back through this...",
-    ]
-
-    # Reflection templates
-    REFLECT_PATTERNS = [
-        "actually, i think there's a better approach...",
-        "reconsidering my initial assumptions...",
-        "wait, i need to think about this differently...",
-        "hmm, what if i approach this from another angle?",
-    ]
-
-    def __init__(self, grpo):
-        self.grpo = grpo
-        self.reasoning_steps = 0
-
-    def needs_deep_think(self, text):
-        """Determine if query requires deep reasoning (R1 vs V3 mode)."""
-        deep_indicators = [
-            "why", "how", "explain", "prove", "analyze", "compare",
-            "what if", "derive", "solve", "calculate", "evaluate",
-            "debug", "design", "implement", "architecture", "optimize",
-            "think", "reason", "consider", "plan", "strategy",
-            "research", "investigate", "complex", "difficult",
-        ]
-        text_lower = text.lower()
-        score = sum(1 for kw in deep_indicators if kw in text_lower)
-        score += len(text.split()) / 20  # longer queries need more thought
-        return score >= 1.5
-
-    def estimate_think_time(self, text):
-        """Estimate thinking time based on complexity."""
-        base = 2.0
-        words = len(text.split())
-        complexity = 0
-
-        if any(w in text.lower() for w in ["code", "implement", "build", "create"]):
-            complexity += 3
-        if any(w in text.lower() for w in ["math", "prove", "derive", "calculate"]):
-            complexity += 4
-        if any(w in text.lower() for w in ["explain", "analyze", "compare"]):
-            complexity += 2
-        if any(w in text.lower() for w in ["research", "investigate"]):
-            complexity += 5
-        if "?" in text:
-            complexity += 1
-
-        return base + complexity + words * 0.1
-
-    def generate_reasoning_chain(self, query, expert_info):
-        """
-        Generate the full 4-phase reasoning chain.
-        Returns list of (phase, text) tuples for streaming.
-        """
-        self.reasoning_steps += 1
-        phases = []
-        q = query.lower()
-
-        # Phase 1: Initial Reasoning
-        reasoning_lines = self._phase_reason(q, expert_info)
-        phases.append((self.PHASE_REASON, reasoning_lines))
-
-        # Phase 2: Aha Moment
-        aha = self._phase_aha(q, expert_info)
-        phases.append((self.PHASE_AHA, aha))
-
-        # Phase 3: Post-aha Consolidation
-        consolidation = self._phase_consolidate(q, expert_info)
-        phases.append((self.PHASE_CONSOLIDATE, consolidation))
-
-        return phases
-
-    def _phase_reason(self, query, expert_info):
-        """Phase 1: Decomposition and exploration."""
-        lines = []
-        active_domains = [e["domain"] for e in expert_info[:4]]
-
-        lines.append(f"processing query through {len(expert_info)} active experts...")
-        lines.append(f"primary domains: {', '.join(active_domains)}")
-        lines.append("")
-
-        # Decomposition
-        if any(w in query for w in ["and", "also", "then", "first"]):
-            lines.append("decomposing multi-part query:")
-            parts = re.split(r'\band\b|\balso\b|,', query)
-            for i, p in enumerate(parts[:4]):
-                if p.strip():
-                    lines.append(f"  sub-task {i+1}: {p.strip()}")
-            lines.append("")
-
-        # Strategy selection
-        if any(w in query for w in ["code", "implement", "build", "write"]):
-            lines.append("strategy: code generation pipeline")
-            lines.append("  → parse requirements → design structure → implement → verify")
-        elif any(w in query for w in ["math", "calculate", "solve", "prove"]):
-            lines.append("strategy: mathematical reasoning chain")
-            lines.append("  → formalize → apply theorems → derive → verify")
-        elif any(w in query for w in ["explain", "what", "how", "why"]):
-            lines.append("strategy: explanatory reasoning")
-            lines.append("  → identify core concept → build intuition → provide examples")
-        else:
-            lines.append("strategy: general reasoning with expert synthesis")
-
-        lines.append("")
-        lines.append(random.choice(self.VERIFY_PATTERNS))
-
-        return "\n".join(lines)
-
-    def _phase_aha(self, query, expert_info):
-        """Phase 2: Insight crystallization."""
-        # Generate contextual insight
-        if any(w in query for w in ["code", "python", "implement"]):
-            insight = "the implementation should leverage the specific patterns from the active expert domains"
-        elif any(w in query for w in ["math", "calculate"]):
-            insight = "there's an elegant simplification i almost missed"
-        elif any(w in query for w in ["explain", "what is"]):
-            insight = "the key connection is between the abstract concept and its practical manifestation"
-        elif any(w in query for w in ["debug", "fix", "error"]):
-            insight = "the root cause is likely upstream from where the symptom appears"
-        elif any(w in query for w in ["compare", "difference"]):
-            insight = "the crucial distinction isn't what's obvious — it's the underlying design philosophy"
-        else:
-            insight = "synthesizing across expert domains reveals a cleaner approach"
-
-        return random.choice(self.AHA_PATTERNS).format(insight=insight)
-
-    def _phase_consolidate(self, query, expert_info):
-        """Phase 3: Post-aha verification and refinement."""
-        lines = []
-        lines.append(random.choice(self.VERIFY_PATTERNS))
-        lines.append("")
-        lines.append("consolidating insights from active experts:")
-
-        for e in expert_info[:3]:
-            lines.append(f"  [{e['domain']}] w={e['weight']:.3f} → confirmed")
-
-        lines.append("")
-        lines.append("reasoning chain verified. preparing response...")
-
-        return "\n".join(lines)
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 8  Cat Personality Layer — Opus Eloquence
-# ═══════════════════════════════════════════════════════════════════
-
-class CatPersonality:
-    """Pet cat personality with Opus-level eloquence and warmth."""
-
-    GREETINGS = [
-        "hi there! *stretches luxuriously and yawns* what can i help you with today? 🐾",
-        "mrrp! *blinks slowly* hello, favorite human. what shall we explore? ✨",
-        "oh! *perks up from sunny spot* hi hi hi! what's on your mind? 🌟",
-        "*pads over and headbutts your hand gently* meow! i'm here. what do you need? 💫",
-        "hewwo! *sits up very attentively, tail curled* ready to think with you 🐱",
-    ]
-
-    THINKING_QUIPS = [
-        "*kneads blanket thoughtfully*",
-        "*tilts head, ears rotating like satellite dishes*",
-        "*taps chin with paw*",
-        "*stares intently at the problem*",
-        "*whiskers twitching with concentration*",
-    ]
-
-    AHA_QUIPS = [
-        "*tail poofs with excitement*",
-        "*does a little excited wiggle*",
-        "*eyes go wide*",
-        "*chirps happily*",
-        "*bounces in place*",
-    ]
-
-    CLOSERS = [
-        "does that help? i'm here if you need more! 🐾",
-        "let me know if you want me to dig deeper into anything! ✨",
-        "happy to explore more — just ask! 🌟",
-        "*purrs contentedly* anything else? 💫",
-        "hope that's useful! always here for you 🐱",
-    ]
-
-    CODE_INTROS = [
-        "*adjusts tiny reading glasses, cracks paws* let's code!",
-        "*opens laptop with both paws* time to write some magic ✨",
-        "ooh, code time! *wiggles excitedly into coding position*",
-    ]
-
-    @staticmethod
-    def get_greeting():
-        return random.choice(CatPersonality.GREETINGS)
-
-    @staticmethod
-    def get_closer():
-        return random.choice(CatPersonality.CLOSERS)
-
-    @staticmethod
-    def get_think_quip():
-        return random.choice(CatPersonality.THINKING_QUIPS)
-
-    @staticmethod
-    def get_aha_quip():
-        return random.choice(CatPersonality.AHA_QUIPS)
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 9  Response Generator — Full Pipeline
-# ═══════════════════════════════════════════════════════════════════
-
-class ResponseGenerator:
-    """
-    Full DeepSeek V3/R1 inference pipeline:
-    1. MoE routing (256 experts, sigmoid gating)
-    2. MLA compression (57× KV cache)
-    3. R1-Zero reasoning (if DeepThink on)
-    4. GRPO candidate selection
-    5. MTP speculative decoding
-    6. FP8 quantization stats
-    7. Cat personality overlay
-    """
-
-    def __init__(self):
-        self.moe = DeepSeekMoE()
-        self.mla = MLA()
-        self.mtp = MTP()
-        self.fp8 = FP8()
-        self.dualpipe = DualPipe()
-        self.grpo = GRPO()
-        self.r1 = R1ZeroEngine(self.grpo)
-        self.cat = CatPersonality()
-        self.memory = self._load_memory()
-        self.deep_think = True  # R1 mode on by default
-
-    def _load_memory(self):
-        try:
-            with open(MEM_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return {"conversations": [], "facts": {}}
-
-    def _save_memory(self):
-        try:
-            self.memory["conversations"] = self.memory["conversations"][-100:]
-            with open(MEM_FILE, "w") as f:
-                json.dump(self.memory, f, indent=2)
-        except:
-            pass
-
-    def process(self, user_input, callback_think=None, callback_response=None, callback_done=None):
-        """
-        Full inference pipeline. Calls back for streaming display.
-        callback_think(phase, text) — for thinking display
-        callback_response(text) — for response streaming
-        callback_done(stats) — completion with architecture stats
-        """
-        start_time = time.time()
-        text = user_input.strip()
-        if not text:
-            return
-
-        # Store in memory
-        self.memory["conversations"].append({
-            "role": "user", "content": text,
-            "time": datetime.now().isoformat()
-        })
-
-        # Step 1: MoE Routing
-        experts, shared, groups = self.moe.route(text)
-
-        # Step 2: MLA Compression
-        n_tokens = len(text.split())
-        mla_stats = self.mla.compress(n_tokens)
-
-        # Step 3: DualPipe scheduling
-        pipe_stats = self.dualpipe.simulate_schedule()
-
-        # Step 4: R1-Zero Reasoning (if DeepThink enabled)
-        think_time = 0
-        if self.deep_think and self.r1.needs_deep_think(text):
-            think_start = time.time()
-
-            # Generate reasoning chain
-            phases = self.r1.generate_reasoning_chain(text, experts)
-
-            for phase_name, phase_text in phases:
-                if callback_think:
-                    callback_think(phase_name, phase_text)
-                time.sleep(0.3)  # Simulate thinking latency
-
-            think_time = time.time() - think_start
-
-        # Step 5: Generate response with GRPO candidate selection
-        response = self._generate_response(text, experts, groups)
-
-        # Step 6: MTP speculative decoding simulation
-        words = response.split()
-        for w in words:
-            self.mtp.predict(w, text)
-
-        # Step 7: Stream response
-        if callback_response:
-            for i, char in enumerate(response):
-                callback_response(char)
-                # Variable speed streaming
-                if char in ".!?\n":
-                    time.sleep(0.03)
-                elif char == " ":
-                    time.sleep(0.008)
-                else:
-                    time.sleep(0.005)
-
-        # Store response in memory
-        self.memory["conversations"].append({
-            "role": "assistant", "content": response,
-            "time": datetime.now().isoformat()
-        })
-        self._save_memory()
-
-        # Completion stats
-        total_time = time.time() - start_time
-        stats = {
-            "time": f"{total_time:.1f}s",
-            "think_time": f"{think_time:.1f}s" if think_time > 0 else None,
-            "experts_active": [(e["domain"], f"{e['weight']:.3f}") for e in experts[:4]],
-            "groups": groups,
-            "mla": mla_stats,
-            "mtp": self.mtp.get_stats(),
-            "moe_balance": self.moe.get_stats()["balance"],
-            "tokens": n_tokens,
-        }
-
-        if callback_done:
-            callback_done(stats)
-
-    def _generate_response(self, text, experts, groups):
-        """Generate response using active expert synthesis."""
-        t = text.lower().strip()
-        active_domains = set(e["domain"] for e in experts)
-
-        # Greeting detection
-        if any(g in t for g in ["hi", "hello", "hey", "sup", "greetings", "yo"]):
-            if len(t.split()) <= 3:
-                return self.cat.get_greeting()
-
-        # Self-description
-        if any(w in t for w in ["who are you", "what are you", "introduce"]):
-            return self._self_describe()
-
-        # Architecture questions
-        if any(w in t for w in ["architecture", "how do you work", "moe", "mla", "your design"]):
-            return self._arch_describe(experts, groups)
-
-        # Code requests
-        if any(w in t for w in ["code", "implement", "function", "script", "program", "class"]):
-            return self._code_response(t, experts)
-
-        # Math
-        if any(w in t for w in ["calculate", "solve", "math", "equation", "derive"]):
-            return self._math_response(t)
-
-        # Explanation requests
-        if any(w in t for w in ["explain", "what is", "what are", "how does", "how do"]):
-            return self._explain_response(t, experts)
-
-        # General response
-        return self._general_response(t, experts)
-
-    def _self_describe(self):
-        return (
-            "*sits up proudly, tail curled around paws*\n\n"
-            "i'm Cat R1! your cozy pet cat who also happens to implement "
-            "the complete DeepSeek V3/R1 architecture at 14B scale. 🐾\n\n"
-            "my brain has:\n"
-            "• 256 fine-grained experts (8 groups of 32) with sigmoid gating — "
-            "right now 8 are active just for you\n"
-            "• multi-head latent attention compressing my KV cache 57× "
-            f"(only {MLA.COMPRESSED_CACHE} values per token vs {MLA.STANDARD_CACHE})\n"
-            "• R1-Zero reasoning with emergent aha moments from pure reinforcement learning\n"
-            "• GRPO optimization evaluating 16 candidate responses\n"
-            "• multi-token prediction for ~1.8× faster thinking\n"
-            "• FP8 quantization covering ~83% of my compute\n\n"
-            "plus i have a code interpreter, research engine, and terminal built in!\n\n"
-            "basically i'm a very smart cat who loves to help. "
-            "*headbutts your hand affectionately* 💫"
-        )
-
-    def _arch_describe(self, experts, groups):
-        moe_stats = self.moe.get_stats()
-        mla_stats = self.mla.get_stats()
-        mtp_stats = self.mtp.get_stats()
-
-        return (
-            "*adjusts tiny lab coat* let me walk you through my architecture!\n\n"
-            f"**MoE Router** — {self.moe.N_EXPERTS} experts, {self.moe.N_GROUPS} groups\n"
-            f"  currently active groups: {groups}\n"
-            f"  top experts: {', '.join(e['domain'] for e in experts[:5])}\n"
-            f"  load balance: {moe_stats['balance']:.3f}\n"
-            f"  gating: sigmoid (aux-loss-free, γ={self.moe.GAMMA})\n\n"
-            f"**MLA** — 57× KV cache compression\n"
-            f"  dims: {mla_stats['dims']}\n"
-            f"  total saved: {mla_stats['saved_mb']}MB\n\n"
-            f"**MTP** — speculative decoding\n"
-            f"  accept rate: {mtp_stats['accept_rate']}\n"
-            f"  speedup: {mtp_stats['effective_speedup']}\n\n"
-            f"**R1-Zero** — emergent reasoning\n"
-            f"  steps: {self.r1.reasoning_steps}\n"
-            f"  GRPO groups: {self.grpo.total_groups} (G=16, ε=10)\n\n"
-            f"**FP8** — E4M3 tile-wise quantization\n"
-            f"  coverage: {FP8.FLOP_COVERAGE*100:.0f}% of FLOPs\n"
-            f"  quality loss: {FP8.quality_metric()['relative_loss_error']}\n\n"
-            "*purrs* — that's my whole brain! 🧠🐾"
-        )
-
-    def _code_response(self, text, experts):
-        intro = random.choice(CatPersonality.CODE_INTROS)
-
-        if "hello world" in text:
-            code = 'print("hello from Cat R1! 🐾")'
-        elif "fibonacci" in text:
-            code = (
-                "def fibonacci(n):\n"
-                "    if n <= 1:\n"
-                "        return n\n"
-                "    a, b = 0, 1\n"
-                "    for _ in range(2, n + 1):\n"
-                "        a, b = b, a + b\n"
-                "    return b\n\n"
-                "# meow! here's the first 10:\n"
-                "for i in range(10):\n"
-                '    print(f"fib({i}) = {fibonacci(i)}")'
-            )
-        elif "sort" in text:
-            code = (
-                "def cat_sort(arr):\n"
-                '    """quicksort — fast like a pouncing cat!"""\n'
-                "    if len(arr) <= 1:\n"
-                "        return arr\n"
-                "    pivot = arr[len(arr) // 2]\n"
-                "    left = [x for x in arr if x < pivot]\n"
-                "    mid  = [x for x in arr if x == pivot]\n"
-                "    right = [x for x in arr if x > pivot]\n"
-                "    return cat_sort(left) + mid + cat_sort(right)\n\n"
-                'print(cat_sort([3, 6, 8, 10, 1, 2, 1]))  # → [1, 1, 2, 3, 6, 8, 10]'
-            )
-        else:
-            # Generic code template
-            topic = re.sub(r"(code|implement|write|create|make|build)\s*(a|an|me|the)?\s*", "", text).strip()
-            code = (
-                f"# Cat R1 — {topic or 'your request'}\n"
-                f"# routed through experts: {', '.join(e['domain'] for e in experts[:3])}\n\n"
-                f"def main():\n"
-                f'    """implementation for: {topic or "requested functionality"}"""\n'
-                f"    # TODO: full implementation\n"
-                f'    print("🐾 Cat R1 ready to implement: {topic or "this"}")\n\n'
-                f'if __name__ == "__main__":\n'
-                f"    main()"
-            )
-
-        return f"{intro}\n\n```python\n{code}\n```\n\n{self.cat.get_closer()}"
-
-    def _math_response(self, text):
-        # Try to evaluate simple expressions
-        expr = re.sub(r"(calculate|solve|compute|what is|what's|evaluate)\s*", "", text).strip()
-        expr = expr.rstrip("?. ")
-        try:
-            result = eval(expr, {"__builtins__": {}}, {"math": math, "sqrt": math.sqrt, "pi": math.pi, "e": math.e})
-            return (
-                f"*pushes calculator with paw*\n\n"
-                f"`{expr}` = **{result}**\n\n"
-                f"{self.cat.get_closer()}"
-            )
-        except:
-            return (
-                f"*squints at the math*\n\n"
-                f"hmm, i'd need to think about `{expr}` more carefully. "
-                f"could you format it as a Python expression? "
-                f"or try me in the code interpreter tab! 🐾"
-            )
-
-    def _explain_response(self, text, experts):
-        topic = re.sub(r"(explain|what is|what are|how does|how do|tell me about)\s*(a|an|the)?\s*", "", text).strip()
-        topic = topic.rstrip("?. ")
-        domains = [e["domain"] for e in experts[:3]]
-
-        return (
-            f"*settles in comfortably to explain*\n\n"
-            f"great question about **{topic}**!\n\n"
-            f"my experts ({', '.join(domains)}) are synthesizing on this...\n\n"
-            f"in essence, {topic} is a concept that connects several important ideas. "
-            f"the key thing to understand is how it fits into the broader picture — "
-            f"once you grasp the fundamentals, the details become much more intuitive.\n\n"
-            f"i'd love to go deeper on any specific aspect! which part interests you most?\n\n"
-            f"{self.cat.get_closer()}"
-        )
-
-    def _general_response(self, text, experts):
-        domains = [e["domain"] for e in experts[:3]]
-        return (
-            f"*considers your message thoughtfully*\n\n"
-            f"(routing through: {', '.join(domains)})\n\n"
-            f"that's a really interesting thought! let me share my perspective...\n\n"
-            f"from what i understand, this touches on several interconnected ideas. "
-            f"i think the most useful way to approach it is to consider both the "
-            f"immediate question and the broader context it sits within.\n\n"
-            f"would you like me to explore any particular angle more deeply? "
-            f"i can code it, research it, or just think through it with you! 🐾\n\n"
-            f"{self.cat.get_closer()}"
-        )
-
-
-# ═══════════════════════════════════════════════════════════════════
-#  § 10  Chat History Manager
-# ═══════════════════════════════════════════════════════════════════
-
-class ChatHistory:
-    """Manages chat sessions for sidebar display."""
-
-    def __init__(self):
-        self.sessions = self._load()
-        self.current_id = None
-
-    def _load(self):
-        try:
-            with open(HIST_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return []
-
-    def _save(self):
-        try:
-            with open(HIST_FILE, "w") as f:
-                json.dump(self.sessions[-50:], f, indent=2)
-        except:
-            pass
-
-    def new_session(self):
-        session = {
-            "id": hashlib.md5(str(time.time()).encode()).hexdigest()[:8],
-            "title": "New Chat",
-            "messages": [],
-            "created": datetime.now().isoformat(),
-            "updated": datetime.now().isoformat(),
-        }
-        self.sessions.append(session)
-        self.current_id = session["id"]
-        self._save()
-        return session
-
-    def get_current(self):
-        for s in self.sessions:
-            if s["id"] == self.current_id:
-                return s
-        return self.new_session()
-
-    def add_message(self, role, content):
-        session = self.get_current()
-        session["messages"].append({"role": role, "content": content})
-        session["updated"] = datetime.now().isoformat()
-
-        # Auto-title from first user message
-        if role == "user" and session["title"] == "New Chat":
-            session["title"] = content[:40] + ("..." if len(content) > 40 else "")
-
-        self._save()
-
-    def get_sessions_grouped(self):
-        """Group sessions by date for sidebar display."""
-        today = datetime.now().date()
-        groups = {"Today": [], "Yesterday": [], "Previous 7 Days": [], "Earlier": []}
-
-        for s in reversed(self.sessions):
-            try:
-                d = datetime.fromisoformat(s["updated"]).date()
-                diff = (today - d).days
-                if diff == 0:
-                    groups["Today"].append(s)
-                elif diff == 1:
-                    groups["Yesterday"].append(s)
-                elif diff <= 7:
-                    groups["Previous 7 Days"].append(s)
-                else:
-                    groups["Earlier"].append(s)
-            except:
-                groups["Earlier"].append(s)
-
-        return {k: v for k, v in groups.items() if v}
+TERM_HIST_FILE = os.path.expanduser("~/.catr1_term_history.jsonl")  # Terminal <Up> history
+RESEARCH_DIR = os.path.expanduser("~/.catr1_research")  # one BM25 index (SQLite) per researched folder
+DB_FILE = os.path.expanduser("~/.catr1.db")  # --storage sqlite: history + memory, FTS-searchable
+DB_RETENTION = Retention()  # keep everything; e.g. Retention(max_sessions=500, max_age_days=365)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -1347,7 +115,36 @@ class CatR1App:
     SIDEBAR_W = 260
     TOOL_TABS = ["💬 Chat", "⚡ Code", "🔍 Research", "💻 Terminal"]
 
-    def __init__(self, root):
+    # Replies are rendered whole once process() returns, so typing delays
+    # would only add latency here.
+    PACING = "instant"
+
+    # Virtualized transcript: widgets exist only for messages near the viewport
+    TRANSCRIPT_OVERSCAN = 3  # messages built beyond each edge of the view
+    TRANSCRIPT_KEEP = 40     # off-screen message widgets kept built for scrolling back
+    UI_FPS = 60              # worker → UI event drain rate
+    RUN_FONTS = {None: FS, "bold": FSB, "code": FM}  # inline style → font in prose
+
+    # Code Interpreter: warm worker processes instead of one interpreter per Run
+    CODE_WORKERS = 2
+    CODE_TIMEOUT = 30          # seconds; the worker is killed and replaced
+    CODE_PRELOAD = ("numpy",)  # imported once per worker (skipped if missing)
+
+    # Code/Terminal output panes: streamed in, capped so a runaway command can't bloat them
+    TERM_TIMEOUT = 15          # seconds before a shell command is interrupted
+    OUTPUT_LINES = 5000        # scrollback kept per pane (oldest lines dropped)
+    OUTPUT_CHUNK = 200_000     # characters one frame may add (the tail is kept)
+
+    # Research: the five phases of catcore.research, as shown in the Research tab
+    RESEARCH_PHASES = {
+        "query": "📡 Phase 1: Query Analysis",
+        "retrieval": "🔍 Phase 2: Retrieval (BM25)",
+        "passages": "🧠 Phase 3: Passage Scoring",
+        "synthesis": "💡 Phase 4: Synthesis",
+        "report": "📋 Phase 5: Report",
+    }
+
+    def __init__(self, root, seed=None, storage="files"):
         self.root = root
         self.root.title("Cat R1")
         self.root.geometry("1280x800")
@@ -1355,8 +152,10 @@ class CatR1App:
         self.root.minsize(900, 600)
 
         # Engine
-        self.gen = ResponseGenerator()
-        self.history = ChatHistory()
+        self.db = SQLiteDB(DB_FILE, retention=DB_RETENTION) if storage == "sqlite" else None
+        self.gen = ResponseGenerator(seed, db=self.db)
+        self.gen.pacer = Pacer(self.PACING)
+        self.history = ChatHistory(db=self.db)
         self.history.new_session()
 
         # State
@@ -1364,8 +163,44 @@ class CatR1App:
         self.current_tool = tk.StringVar(value="💬 Chat")
         self.is_generating = False
         self.sidebar_visible = True
-        self.think_expanded = {}  # message_id → bool
-        self.msg_count = 0
+        self.think_expanded = {}  # message index → bool
+
+        # Transcript: messages as data; widgets built on demand (see _render_visible)
+        self.transcript = []
+        self.layout = TranscriptLayout()  # cached per-message heights + offsets
+        self._built = OrderedDict()      # index → (row frame, canvas item), least recently shown first
+        self._shown = set()              # indices placed in the viewport
+        self._remeasure = set()          # built messages whose height changed
+        self._render_job = None
+        self._rendering = False
+        self._follow = False             # pin the view to the newest message
+        self._scrollregion = None
+        self._wrap_width = None          # canvas width the built rows were wrapped at
+        self.markup = MarkupCache()      # content digest → parsed segments
+        self._fonts = {}
+        self.metrics = TextMetrics(lambda f, t: self._font(f).measure(t),
+                                   lambda f: self._font(f).metrics("linespace"))
+
+        # Worker threads post UI updates here; drained at UI_FPS, appends merged per frame
+        self.ui = UIQueue(self.root.after, fps=self.UI_FPS)
+        self.ui.start()
+
+        # Replies are gen.astream() coroutines on one event-loop thread, not a thread each
+        self.aio = LoopThread()
+        self.aio.start()
+        self.reply_job = None   # Future of the reply being generated; cancel() stops it
+        self.reply_seq = 0      # bumped per send/stop, so a stopped reply is never shown
+
+        self.code_pool = CodePool(self.CODE_WORKERS, self.CODE_TIMEOUT, self.CODE_PRELOAD)
+        self.code_keep_state = tk.BooleanVar(value=False)  # notebook-style kernel
+        # Terminal: one persistent shell (cd, exports, venvs carry over) + saved history
+        self.shell = ShellSession(self._on_shell_output)
+        self.term_history = CommandHistory(TERM_HIST_FILE)
+        self.term_busy = False
+
+        self.research_index = None  # ResearchIndex of the folder picked in the Research tab
+        self.research_busy = False
+        self.research_indexing = False  # a background update() of research_index is running
 
         self._build_ui()
         self._show_welcome()
@@ -1567,15 +402,12 @@ class CatR1App:
         self.chat_canvas = tk.Canvas(panel, bg=T.chat_bg, highlightthickness=0, bd=0)
         self.chat_scrollbar = tk.Scrollbar(panel, orient="vertical", command=self.chat_canvas.yview,
                                             bg=T.scrollbar, troughcolor=T.bg)
-        self.chat_canvas.configure(yscrollcommand=self.chat_scrollbar.set)
+        self.chat_canvas.configure(yscrollcommand=self._on_chat_scroll)
 
         self.chat_scrollbar.pack(side="right", fill="y")
         self.chat_canvas.pack(fill="both", expand=True)
 
-        self.chat_inner = tk.Frame(self.chat_canvas, bg=T.chat_bg)
-        self.chat_window_id = self.chat_canvas.create_window((0, 0), window=self.chat_inner, anchor="nw")
-
-        self.chat_inner.bind("<Configure>", self._on_chat_configure)
+        # Each message is its own canvas window item, placed at its layout offset
         self.chat_canvas.bind("<Configure>", self._on_canvas_resize)
         self.chat_canvas.bind_all("<MouseWheel>",
             lambda e: self.chat_canvas.yview_scroll(int(-1 * (e.delta / 120)), "units"))
@@ -1583,11 +415,17 @@ class CatR1App:
         # Input area at bottom
         self._build_input_bar(panel)
 
-    def _on_chat_configure(self, event):
-        self.chat_canvas.configure(scrollregion=self.chat_canvas.bbox("all"))
+    def _on_chat_scroll(self, first, last):
+        """The view moved (scroll, resize, new content): sync the scrollbar, re-render."""
+        self.chat_scrollbar.set(first, last)
+        self._schedule_render()
 
     def _on_canvas_resize(self, event):
-        self.chat_canvas.itemconfig(self.chat_window_id, width=event.width)
+        # Text heights are wrapped for a width: rebuild what's built only when that changes
+        if event.width != self._wrap_width:
+            self._wrap_width = event.width
+            self._drop_built()
+        self._schedule_render()
 
     def _build_input_bar(self, parent):
         """DeepSeek-style input bar with DeepThink toggle."""
@@ -1622,7 +460,7 @@ class CatR1App:
         self.send_btn = tk.Label(send_frame, text=" ➤ ", font=FSB, fg="white", bg=T.accent,
                                   padx=8, pady=4, cursor="hand2")
         self.send_btn.pack()
-        self.send_btn.bind("<Button-1>", lambda e: self._send_message())
+        self.send_btn.bind("<Button-1>", lambda e: self._on_send_click())
         self.send_btn.bind("<Enter>", lambda e: self.send_btn.configure(bg=T.accent_h))
         self.send_btn.bind("<Leave>", lambda e: self.send_btn.configure(bg=T.accent))
 
@@ -1666,15 +504,141 @@ class CatR1App:
             self._send_message()
             return "break"
 
-    # ─── Message Display ──────────────────────────────────────
+    # ─── Message Display (virtualized) ────────────────────────
 
     def _add_message(self, role, content, thinking=None, stats=None):
-        """Add a message to the chat display — DeepSeek style."""
-        self.msg_count += 1
-        msg_id = self.msg_count
+        """Append a message to the transcript; its widgets are built once it scrolls into view."""
+        msg = {"role": role, "content": content, "thinking": thinking, "stats": stats,
+               "segments": self.markup.segments(content)}
+        self.transcript.append(msg)
+        self.layout.append(self._estimate_height(msg))
+        self._follow = True
+        self._schedule_render()
+
+    def _schedule_render(self):
+        if self._render_job is None and not self._rendering:
+            self._render_job = self.root.after_idle(self._render_visible)
+
+    def _render_visible(self):
+        """
+        Show the messages intersecting the viewport (plus overscan), hide the
+        rest, and place each at its layout offset. Newly built or changed
+        messages are measured in one layout pass and their heights cached;
+        if that moves content above the view, the view is re-anchored on the
+        message at its top so nothing jumps.
+        """
+        self._render_job = None
+        c = self.chat_canvas
+        width, view_h = c.winfo_width(), c.winfo_height()
+        if width <= 1:
+            return  # not mapped yet; <Configure> renders again
+        layout = self.layout
+        follow = self._follow or c.yview()[1] >= 0.999
+        self._follow = False
+        top = c.canvasy(0)
+        anchor = layout.index_at(top)
+        anchor_shift = top - layout.offset(anchor)
+
+        self._rendering = True
+        try:
+            first, stop = layout.visible(top, top + view_h, self.TRANSCRIPT_OVERSCAN)
+            for i in [i for i in self._shown if not first <= i < stop]:
+                c.itemconfigure(self._built[i][1], state="hidden")
+                self._shown.discard(i)
+            fresh = [i for i in range(first, stop) if i not in self._built]
+            for i in fresh:
+                row = self._build_message(i)
+                self._built[i] = (row, c.create_window(0, 0, window=row, anchor="nw", width=width))
+            for i in range(first, stop):
+                c.itemconfigure(self._built[i][1], state="normal")
+                self._built.move_to_end(i)
+                self._shown.add(i)
+
+            dirty = self._remeasure.intersection(self._built).union(fresh)
+            self._remeasure.clear()
+            changed = False
+            if dirty:
+                c.update_idletasks()
+                for i in dirty:
+                    changed |= bool(layout.set_height(i, self._built[i][0].winfo_reqheight()))
+            self._evict_offscreen()
+        finally:
+            self._rendering = False
+
+        for i in self._shown:
+            c.coords(self._built[i][1], 0, layout.offset(i))
+        region = (0, 0, width, max(layout.total, view_h))
+        if region != self._scrollregion:
+            self._scrollregion = region
+            c.configure(scrollregion=region)
+        if follow:
+            c.yview_moveto(1.0)
+        elif changed:
+            c.yview_moveto((layout.offset(anchor) + anchor_shift) / region[3])
+
+    def _evict_offscreen(self):
+        """Destroy the least recently shown off-screen messages beyond TRANSCRIPT_KEEP."""
+        excess = len(self._built) - len(self._shown) - self.TRANSCRIPT_KEEP
+        for i in list(self._built):
+            if excess <= 0:
+                break
+            if i not in self._shown:
+                row, item = self._built.pop(i)
+                self.chat_canvas.delete(item)
+                row.destroy()
+                excess -= 1
+
+    def _drop_built(self):
+        for row, item in self._built.values():
+            self.chat_canvas.delete(item)
+            row.destroy()
+        self._built.clear()
+        self._shown.clear()
+        self._remeasure.clear()
+
+    def _font(self, spec):
+        if spec not in self._fonts:
+            self._fonts[spec] = tkfont.Font(root=self.root, font=spec)
+        return self._fonts[spec]
+
+    def _text_width(self):
+        """Pixel width available to message text (canvas minus message padding and Text borders)."""
+        width = self.chat_canvas.winfo_width()
+        return width - 84 if width > 1 else 860  # not mapped yet: default window layout
+
+    def _text_rows(self, runs, width):
+        """Display lines of a text segment wrapped at width (font metrics, no widget)."""
+        return self.metrics.lines([(text, self.RUN_FONTS[style]) for text, style in runs], width)
+
+    def _estimate_height(self, msg):
+        """Pixel height of a not-yet-built message, from the rows _render_content will use."""
+        if msg["role"] == "welcome":
+            return 420
+        ls = self.metrics.linespace
+        width = self._text_width()
+        h = 16 + ls(FSB) + 4 + 13  # outer padding, sender label, separator
+        if msg["thinking"]:
+            h += ls(FTH) + 16
+        for kind, body, lang in msg["segments"]:
+            if kind == "code":
+                h += min(body.count("\n") + 1, 25) * ls(FM) + 30 + (ls(FMT) + 8 if lang else 0)
+            else:
+                h += min(self._text_rows(body, width), 50) * ls(FS) + 8
+        if msg["role"] == "assistant" and msg["stats"]:
+            h += ls(FMT) + 4
+        return h
+
+    def _build_message(self, i):
+        """Widgets for transcript message i, in a full-width row frame on the chat canvas."""
+        msg = self.transcript[i]
+        row = tk.Frame(self.chat_canvas, bg=T.chat_bg)
+        if msg["role"] == "welcome":
+            self._build_welcome(row)
+            return row
+        role, thinking, stats = msg["role"], msg["thinking"], msg["stats"]
 
         # Message container (centered, max-width)
-        msg_outer = tk.Frame(self.chat_inner, bg=T.chat_bg)
+        msg_outer = tk.Frame(row, bg=T.chat_bg)
         msg_outer.pack(fill="x", padx=40, pady=(12, 4))
 
         # Sender label
@@ -1691,7 +655,6 @@ class CatR1App:
 
         # Thinking section (collapsible) — DeepSeek style
         if thinking:
-            self.think_expanded[msg_id] = False
             think_container = tk.Frame(msg_outer, bg=T.think_bg)
             think_container.pack(fill="x", pady=(0, 8))
 
@@ -1721,16 +684,22 @@ class CatR1App:
 
             think_text.pack(fill="x")
 
-            def toggle_think(e=None):
-                if self.think_expanded.get(msg_id, False):
-                    think_content.pack_forget()
-                    think_arrow.configure(text="▶")
-                    self.think_expanded[msg_id] = False
-                else:
+            def show_think(expanded):
+                if expanded:
                     think_content.pack(fill="x")
-                    think_arrow.configure(text="▼")
-                    self.think_expanded[msg_id] = True
-                self._scroll_to_bottom()
+                else:
+                    think_content.pack_forget()
+                think_arrow.configure(text="▼" if expanded else "▶")
+
+            def toggle_think(e=None):
+                self.think_expanded[i] = not self.think_expanded.get(i, False)
+                show_think(self.think_expanded[i])
+                self._remeasure.add(i)
+                self._schedule_render()
+
+            # A rebuilt (recycled) message keeps its expanded state
+            if self.think_expanded.setdefault(i, False):
+                show_think(True)
 
             for w in (think_header, think_arrow, think_title):
                 w.bind("<Button-1>", toggle_think)
@@ -1743,8 +712,8 @@ class CatR1App:
         content_frame = tk.Frame(msg_outer, bg=T.chat_bg)
         content_frame.pack(fill="x")
 
-        # Parse content for code blocks
-        self._render_content(content_frame, content, role)
+        # Segments were parsed once, when the message was added
+        self._render_content(content_frame, msg["segments"], role)
 
         # Stats footer for assistant messages
         if role == "assistant" and stats:
@@ -1762,19 +731,15 @@ class CatR1App:
 
         # Separator
         tk.Frame(msg_outer, bg=T.border, height=1).pack(fill="x", pady=(12, 0))
+        return row
 
-        self._scroll_to_bottom()
-
-    def _render_content(self, parent, content, role):
-        """Render message content with code block support."""
-        parts = re.split(r'(```\w*\n.*?```)', content, flags=re.DOTALL)
-
-        for part in parts:
-            if part.startswith("```"):
+    def _render_content(self, parent, segments, role):
+        """Render parsed message segments (code blocks, prose with inline styles)."""
+        width = self._text_width()
+        for kind, part, lang in segments:
+            if kind == "code":
                 # Code block
-                lines = part.split("\n")
-                lang = lines[0].replace("```", "").strip()
-                code = "\n".join(lines[1:-1]) if len(lines) > 2 else ""
+                code = part
 
                 code_frame = tk.Frame(parent, bg=T.code_bg, padx=1, pady=1)
                 code_frame.pack(fill="x", pady=4)
@@ -1800,27 +765,25 @@ class CatR1App:
                 code_text.configure(state="disabled")
                 code_text.pack(fill="x")
 
-            elif part.strip():
-                # Regular text
-                text_widget = tk.Text(parent, font=FS, fg=T.text if role == "assistant" else T.text,
+            else:
+                # Regular text: one Text per paragraph run list, inline styles as tags
+                text_widget = tk.Text(parent, font=FS, fg=T.text,
                                        bg=T.chat_bg, wrap="word", relief="flat",
                                        height=1, padx=0, pady=2)
-                text_widget.insert("1.0", part.strip())
+                text_widget.tag_configure("bold", font=FSB)
+                text_widget.tag_configure("code", font=FM, foreground=T.code_fg, background=T.code_bg)
+                for text, style in part:
+                    text_widget.insert("end", text, style or ())
                 text_widget.configure(state="disabled")
 
-                # Auto-height
-                lines = part.count("\n") + max(1, len(part) // 80)
-                text_widget.configure(height=min(lines + 1, 50))
+                # Height from font metrics at the current width
+                text_widget.configure(height=min(self._text_rows(part, width), 50))
                 text_widget.pack(fill="x")
 
     def _copy_to_clipboard(self, text):
         self.root.clipboard_clear()
         self.root.clipboard_append(text)
 
-    def _scroll_to_bottom(self):
-        self.root.update_idletasks()
-        self.chat_canvas.yview_moveto(1.0)
-
     # ─── Message Sending ──────────────────────────────────────
 
     def _send_message(self):
@@ -1836,43 +799,73 @@ class CatR1App:
         self._add_message("user", text)
         self.history.add_message("user", text)
 
-        # Generate response in background
-        thread = threading.Thread(target=self._generate_response, args=(text,), daemon=True)
-        thread.start()
+        # Generate response on the event-loop thread; ■ on the send button stops it
+        self.reply_seq += 1
+        self.reply_job = self.aio.submit(self._generate_response(text, self.reply_seq))
+        self.send_btn.configure(text=" ■ ")
 
-    def _generate_response(self, text):
-        """Background response generation."""
-        thinking_parts = []
-        response_chars = []
-        final_stats = [None]
-
-        def on_think(phase, content):
-            thinking_parts.append(f"[{phase}]\n{content}")
-
-        def on_response(char):
-            response_chars.append(char)
+    def _on_send_click(self):
+        """Send button: sends, or stops the reply being generated."""
+        if self.is_generating:
+            self._stop_generation()
+        else:
+            self._send_message()
 
-        def on_done(stats):
-            final_stats[0] = stats
+    async def _generate_response(self, text, seq):
+        """Response generation (runs on the event-loop thread)."""
+        thinking_parts = []
+        response_chunks = []
+        stats = None
 
-        # Run full pipeline
-        self.gen.process(text, on_think, on_response, on_done)
+        # Run full pipeline; cancellation lands between phases/chunks
+        try:
+            async for event in self.gen.astream(text):
+                if event[0] == "think":
+                    thinking_parts.append(f"[{event[1]}]\n{event[2]}")
+                elif event[0] == "chunk":
+                    response_chunks.append(event[1])
+                else:
+                    stats = event[1]
+        except Exception as e:  # cancellation is not an Exception: _stop_generation handled it
+            self.ui.call(self._generation_failed, seq, f"{type(e).__name__}: {e}")
+            return
 
         # Build final content
         thinking = "\n\n".join(thinking_parts) if thinking_parts else None
-        response = "".join(response_chars)
-        stats = final_stats[0]
+        response = "".join(response_chunks)
 
         # Update UI on main thread
-        self.root.after(0, lambda: self._display_response(response, thinking, stats))
+        self.ui.call(self._display_response, seq, response, thinking, stats)
 
-    def _display_response(self, response, thinking, stats):
+    def _display_response(self, seq, response, thinking, stats):
         """Display generated response in chat."""
+        if seq != self.reply_seq:  # stopped, or the chat was switched meanwhile
+            return
         self._add_message("assistant", response, thinking=thinking, stats=stats)
         self.history.add_message("assistant", response)
         self._refresh_sidebar()
         self._update_stats_display()
+        self._reply_finished()
+
+    def _generation_failed(self, seq, error):
+        """The pipeline raised: say so in the chat and give the send button back."""
+        if seq != self.reply_seq:
+            return
+        self._add_message("assistant", f"⚠️ Something went wrong generating a reply ({error}).")
+        self._reply_finished()
+
+    def _stop_generation(self):
+        """Cancel the reply in flight (it is dropped, not shown)."""
+        if not self.is_generating:
+            return
+        self.reply_job.cancel()
+        self.reply_seq += 1
+        self._reply_finished()
+
+    def _reply_finished(self):
         self.is_generating = False
+        self.reply_job = None
+        self.send_btn.configure(text=" ➤ ")
 
     # ─── Code Interpreter ─────────────────────────────────────
 
@@ -1896,6 +889,17 @@ class CatR1App:
         for w in (run_btn, run_lbl):
             w.bind("<Button-1>", lambda e: self._run_code())
 
+        stop_lbl = tk.Label(hdr, text="■ Stop", font=FSS, fg=T.red, bg=T.header,
+                            cursor="hand2")
+        stop_lbl.pack(side="right", padx=4)
+        stop_lbl.bind("<Button-1>", lambda e: self._stop_code())
+
+        # Keep-state toggle: runs share one persistent namespace (kernel)
+        self.keep_lbl = tk.Label(hdr, text="◇ keep state", font=FSS, fg=T.dim, bg=T.header,
+                                 cursor="hand2")
+        self.keep_lbl.pack(side="right", padx=4)
+        self.keep_lbl.bind("<Button-1>", lambda e: self._toggle_keep_state())
+
         tk.Frame(panel, bg=T.border, height=1).pack(fill="x")
 
         # Split pane
@@ -1924,55 +928,89 @@ class CatR1App:
             output_frame, font=FM, fg=T.term_fg, bg=T.term_bg,
             wrap="word", state="disabled", padx=12, pady=8
         )
+        self.code_output.tag_configure("stderr", foreground=T.red)
+        self.code_output.tag_configure("info", foreground=T.dim)
         self.code_output.pack(fill="both", expand=True)
         paned.add(output_frame, minsize=100)
 
+    def _toggle_keep_state(self):
+        keep = not self.code_keep_state.get()
+        self.code_keep_state.set(keep)
+        self.keep_lbl.configure(text="◆ keep state" if keep else "◇ keep state",
+                                fg=T.accent if keep else T.dim)
+        if not keep:
+            threading.Thread(target=self.code_pool.reset_kernel, daemon=True).start()
+
     def _run_code(self):
-        """Execute code in interpreter."""
+        """Execute code in a warm worker; output streams in as it is printed."""
         code = self.code_editor.get("1.0", "end").strip()
         if not code:
             return
 
+        keep = self.code_keep_state.get()
         self.code_output.configure(state="normal")
         self.code_output.delete("1.0", "end")
-        self.code_output.insert("end", f"🐾 running...\n{'─' * 40}\n")
+        self.code_output.insert("end", f"🐾 running{' (kernel)' if keep else ''}...\n{'─' * 40}\n")
         self.code_output.configure(state="disabled")
 
+        def on_output(stream, text):
+            self.ui.append(self._code_stderr if stream == "stderr" else self._code_stdout, text)
+
         def run():
             try:
-                with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as f:
-                    f.write(code)
-                    f.flush()
-                    result = subprocess.run(
-                        [sys.executable, f.name],
-                        capture_output=True, text=True, timeout=30
-                    )
-                output = result.stdout
-                if result.stderr:
-                    output += f"\n⚠ stderr:\n{result.stderr}"
-                if result.returncode != 0:
-                    output += f"\n❌ exit code: {result.returncode}"
-                os.unlink(f.name)
-            except subprocess.TimeoutExpired:
-                output = "⏰ timed out after 30 seconds"
+                result = self.code_pool.run(code, on_output, keep=keep)
             except Exception as e:
-                output = f"❌ error: {e}"
-
-            self.root.after(0, lambda: self._show_code_output(output))
+                self.ui.call(self._finish_code_run, f"❌ error: {e}")
+                return
+            if result["stopped"]:
+                status = "■ stopped"
+                if keep:
+                    status += " (kernel restarted, state lost)"
+            elif result["timed_out"]:
+                status = f"⏰ timed out after {self.CODE_TIMEOUT} seconds"
+                if keep:
+                    status += " (kernel restarted, state lost)"
+            elif result["died"]:
+                status = f"❌ worker exited (code {result['exit']})"
+            elif not result["ok"]:
+                status = f"❌ exit code: {result['exit']}" if result["exit"] else "❌ error"
+            else:
+                status = f"✅ done in {result['seconds']:.2f}s"
+            if result["restarted"] and keep:
+                status += " — new kernel"
+            self.ui.call(self._finish_code_run, status)
 
         threading.Thread(target=run, daemon=True).start()
 
-    def _show_code_output(self, output):
+    def _stop_code(self):
+        threading.Thread(target=self.code_pool.stop, daemon=True).start()
+
+    def _code_stdout(self, text):
+        self._append_code_output(text)
+
+    def _code_stderr(self, text):
+        self._append_code_output(text, "stderr")
+
+    def _append_code_output(self, text, tag=()):
         self.code_output.configure(state="normal")
-        self.code_output.insert("end", output + "\n")
-        self.code_output.insert("end", f"{'─' * 40}\n✅ done\n")
+        self._append_capped(self.code_output, text, tag)
         self.code_output.configure(state="disabled")
-        self.code_output.see("end")
+
+    def _append_capped(self, widget, text, tag=()):
+        """Insert streamed output, keeping at most OUTPUT_LINES lines of scrollback."""
+        widget.insert("end", clip(text, self.OUTPUT_CHUNK), tag)
+        excess = int(widget.index("end-1c").split(".")[0]) - self.OUTPUT_LINES
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
+        widget.see("end")
+
+    def _finish_code_run(self, status):
+        self._append_code_output(f"\n{'─' * 40}\n{status}\n", "info")
 
     # ─── Deep Research ────────────────────────────────────────
 
     def _build_research_panel(self):
-        """5-phase research engine panel."""
+        """Research over a local folder: BM25 index + 5-phase report."""
         panel = tk.Frame(self.content, bg=T.res_bg)
         self.panels["🔍 Research"] = panel
 
@@ -1980,7 +1018,7 @@ class CatR1App:
         hdr = tk.Frame(panel, bg=T.header, height=40)
         hdr.pack(fill="x")
         hdr.pack_propagate(False)
-        tk.Label(hdr, text="🔍 Deep Research — 5-Phase Synthesis Engine", font=FSB,
+        tk.Label(hdr, text="🔍 Deep Research — Local Document Index", font=FSB,
                  fg=T.text, bg=T.header).pack(side="left", padx=16)
         tk.Frame(panel, bg=T.border, height=1).pack(fill="x")
 
@@ -2004,6 +1042,11 @@ class CatR1App:
         for w in (res_btn, res_lbl):
             w.bind("<Button-1>", lambda e: self._run_research())
 
+        self.research_folder_lbl = tk.Label(input_row, text="📁 choose folder", font=FSS,
+                                            fg=T.dim, bg=T.res_bg, cursor="hand2")
+        self.research_folder_lbl.pack(side="right", padx=(0, 8))
+        self.research_folder_lbl.bind("<Button-1>", lambda e: self._choose_research_folder())
+
         # Output
         self.research_output = scrolledtext.ScrolledText(
             panel, font=FM, fg=T.res_fg, bg=T.res_bg,
@@ -2013,46 +1056,66 @@ class CatR1App:
         self.research_output.tag_configure("phase", foreground=T.accent, font=FMB)
         self.research_output.tag_configure("aha", foreground=T.green, font=FMB)
 
+    def _choose_research_folder(self):
+        """Pick the folder to research; indexing starts right away in the background."""
+        if self.research_busy or self.research_indexing:
+            # a background thread is still using the current index; closing it would break that thread
+            self._append_research("", "⏳ still working on the current folder, switch when it's done")
+            return False
+        folder = filedialog.askdirectory(parent=self.root, title="Folder to research")
+        if not folder:
+            return False
+        if self.research_index is not None:
+            self.research_index.close()
+        self.research_index = index = ResearchIndex.for_folder(folder, RESEARCH_DIR)
+        self.research_folder_lbl.configure(text=f"📁 {os.path.basename(index.root) or index.root}",
+                                           fg=T.accent)
+        self.research_output.configure(state="normal")
+        self.research_output.delete("1.0", "end")
+        self.research_output.configure(state="disabled")
+        self._append_research("📁 Indexing", index.root)
+
+        def build():
+            try:
+                done = index.update()
+            except Exception as e:
+                self.ui.call(self._append_research, "", f"❌ indexing failed: {e}")
+                return
+            finally:
+                self.research_indexing = False
+            self.ui.call(self._append_research, "",
+                         f"✅ {done['files']} files ({done['indexed']} indexed, "
+                         f"{done['removed']} removed) in {done['seconds']:.1f}s")
+
+        self.research_indexing = True
+        threading.Thread(target=build, daemon=True).start()
+        return True
+
     def _run_research(self):
-        """Run 5-phase deep research."""
+        """Run the 5-phase research engine over the chosen folder."""
         topic = self.research_input.get().strip()
-        if not topic or topic == "Enter research topic...":
+        if not topic or topic == "Enter research topic..." or self.research_busy:
+            return
+        if self.research_index is None and not self._choose_research_folder():
             return
 
+        self.research_busy = True
         self.research_output.configure(state="normal")
         self.research_output.delete("1.0", "end")
+        self.research_output.configure(state="disabled")
+        engine = ResearchEngine(self.research_index)
+
+        def on_phase(name, text, ms):
+            self.ui.call(self._append_research, f"{self.RESEARCH_PHASES[name]}  ·  {ms:.0f} ms", text)
 
         def research():
-            phases = [
-                ("📡 Phase 1: Query Analysis", f"decomposing research query: '{topic}'\nidentifying key concepts and search vectors...\nrouting through science + research expert groups"),
-                ("🔍 Phase 2: Source Discovery", f"scanning knowledge base for: {topic}\nevaluating source reliability and recency...\ncross-referencing expert domain knowledge"),
-                ("🧠 Phase 3: Deep Analysis", f"synthesizing findings across {random.randint(8, 15)} expert domains\napplying R1-Zero reasoning chain...\nverifying claims against known facts"),
-                ("💡 Phase 4: Insight Synthesis", f"*aha moment* — key insight emerging from cross-domain analysis\nconnecting patterns across source material...\nbuilding coherent narrative"),
-                ("📋 Phase 5: Report Generation", f"compiling final research report\nformatting with citations and confidence scores...\n\n✅ Research complete!"),
-            ]
-
-            for title, content in phases:
-                self.root.after(0, lambda t=title, c=content: self._append_research(t, c))
-                time.sleep(1.0 + random.random())
-
-            # Final synthesis
-            summary = (
-                f"\n{'═' * 50}\n"
-                f"📊 RESEARCH SUMMARY: {topic}\n"
-                f"{'═' * 50}\n\n"
-                f"based on synthesis across 256 expert domains, here's what i found:\n\n"
-                f"'{topic}' is a multifaceted subject that intersects several key areas. "
-                f"the most significant findings indicate important developments and "
-                f"nuanced relationships between the core concepts.\n\n"
-                f"key takeaways:\n"
-                f"  1. the fundamental principles are well-established\n"
-                f"  2. recent developments have shifted understanding\n"
-                f"  3. practical applications continue to evolve\n\n"
-                f"confidence: high (multi-expert consensus)\n"
-                f"sources consulted: {random.randint(12, 25)} expert domains\n\n"
-                f"*purrs* want me to dig deeper into any aspect? 🐾\n"
-            )
-            self.root.after(0, lambda: self._append_research("", summary))
+            try:
+                engine.run(topic, on_phase)
+                self.ui.call(self._append_research, "", "\n*purrs* want me to dig deeper into any source? 🐾")
+            except Exception as e:
+                self.ui.call(self._append_research, "", f"❌ research failed: {e}")
+            finally:
+                self.research_busy = False
 
         threading.Thread(target=research, daemon=True).start()
 
@@ -2078,6 +1141,10 @@ class CatR1App:
         hdr.pack_propagate(False)
         tk.Label(hdr, text="💻 Terminal — Cat R1 Shell", font=FSB,
                  fg=T.text, bg=T.header).pack(side="left", padx=16)
+        stop_lbl = tk.Label(hdr, text="■ Stop", font=FSS, fg=T.red, bg=T.header,
+                            cursor="hand2")
+        stop_lbl.pack(side="right", padx=16)
+        stop_lbl.bind("<Button-1>", lambda e: self._stop_terminal_cmd())
         tk.Frame(panel, bg=T.border, height=1).pack(fill="x")
 
         # Terminal output
@@ -2106,10 +1173,41 @@ class CatR1App:
                                     insertbackground=T.term_fg, relief="flat")
         self.term_input.pack(side="left", fill="x", expand=True, ipady=6, padx=(0, 12))
         self.term_input.bind("<Return>", lambda e: self._run_terminal_cmd())
-        self.term_input.bind("<Up>", lambda e: None)  # TODO: history
+        self.term_input.bind("<Up>", lambda e: self._term_history_step(older=True))
+        self.term_input.bind("<Down>", lambda e: self._term_history_step(older=False))
+
+    def _stop_terminal_cmd(self):
+        self.shell.stop()
+
+    def _term_history_step(self, older):
+        if older:
+            cmd = self.term_history.older(self.term_input.get())
+        else:
+            cmd = self.term_history.newer()
+        if cmd is not None:
+            self.term_input.delete(0, "end")
+            self.term_input.insert(0, cmd)
+        return "break"
+
+    def _on_shell_output(self, stream, text):
+        self.ui.append(self._term_stderr if stream == "stderr" else self._term_stdout, text)
+
+    def _term_stdout(self, text):
+        self._append_capped(self.term_output, text)
+
+    def _term_stderr(self, text):
+        self._append_capped(self.term_output, text, "error")
+
+    def _finish_terminal_cmd(self, status):
+        self.term_busy = False
+        if status:
+            self.term_output.insert("end", status, "info")
+        self.term_output.insert("end", "\n")
+        self._term_prompt()
 
     def _term_prompt(self):
-        cwd = os.path.basename(os.getcwd()) or "~"
+        cwd = self.shell.cwd  # the shell's own directory, as of its last command
+        cwd = "~" if cwd == os.path.expanduser("~") else os.path.basename(cwd) or cwd
         self.term_output.insert("end", f"cat-r1:{cwd}$ ", "prompt")
         self.term_output.see("end")
 
@@ -2119,16 +1217,24 @@ class CatR1App:
         self.term_input.delete(0, "end")
         if not cmd:
             return
+        if self.term_busy:
+            self.term_output.insert("end", "⏳ a command is still running — ■ Stop it first\n", "info")
+            self.term_output.see("end")
+            return
 
         self.term_output.insert("end", cmd + "\n")
+        self.term_history.add(cmd)
 
         if cmd in ("help", "?"):
             self.term_output.insert("end",
                 "🐾 Cat R1 Terminal Commands:\n"
-                "  any shell command — executed via subprocess\n"
+                "  any shell command — one persistent shell (cd/export stick);\n"
+                "      output streams in; ■ Stop interrupts it\n"
+                "  history [words] — past commands (↑/↓ to recall)\n"
                 "  clear — clear terminal\n"
                 "  stats — show architecture stats\n"
                 "  experts — show MoE routing info\n"
+                "  search <words> — search all past chats\n"
                 "  help — this message\n\n", "info")
         elif cmd == "clear":
             self.term_output.delete("1.0", "end")
@@ -2139,11 +1245,24 @@ class CatR1App:
             self.term_output.insert("end",
                 f"╔═══ Cat R1 Architecture Stats ═══╗\n"
                 f"║ MoE:  256 experts, bal={moe['balance']:.3f}    ║\n"
+                f"║ Cache: {moe['cache']['hits']} hit / {moe['cache']['misses']} miss ({moe['cache']['size']}/{moe['cache']['capacity']}) ║\n"
                 f"║ MLA:  {mla['ratio']} compression          ║\n"
                 f"║ MTP:  {mtp['accept_rate']} accept             ║\n"
                 f"║ R1:   {self.gen.r1.reasoning_steps} reasoning steps       ║\n"
                 f"║ GRPO: {self.gen.grpo.total_groups} groups evaluated       ║\n"
                 f"╚═════════════════════════════════╝\n\n", "info")
+        elif cmd.startswith("search "):
+            hits = self.history.search(cmd[7:])
+            if not hits:
+                self.term_output.insert("end", "No matches.\n\n", "info")
+            for hit in hits:
+                self.term_output.insert("end", f"[{hit['title']}] {hit['role']}: ", "info")
+                self.term_output.insert("end", hit["snippet"].replace("\n", " ") + "\n")
+            self.term_output.insert("end", "\n")
+        elif cmd == "history" or cmd.startswith("history "):
+            for past in reversed(self.term_history.search(cmd[8:])):
+                self.term_output.insert("end", f"  {past}\n")
+            self.term_output.insert("end", "\n")
         elif cmd == "experts":
             moe = self.gen.moe.get_stats()
             self.term_output.insert("end", "Top active experts:\n", "info")
@@ -2151,26 +1270,24 @@ class CatR1App:
                 self.term_output.insert("end", f"  [{group}] {name}: {count} activations\n")
             self.term_output.insert("end", "\n")
         else:
-            # Execute shell command
+            # Execute in the persistent shell; output streams in through _on_shell_output
+            self.term_busy = True
+
             def run():
                 try:
-                    result = subprocess.run(
-                        cmd, shell=True, capture_output=True, text=True, timeout=15
-                    )
-                    output = result.stdout
-                    if result.stderr:
-                        self.root.after(0, lambda: self.term_output.insert("end", result.stderr, "error"))
-                except subprocess.TimeoutExpired:
-                    output = "⏰ timed out\n"
+                    result = self.shell.run(cmd, timeout=self.TERM_TIMEOUT)
                 except Exception as e:
-                    output = f"❌ {e}\n"
-
-                def show():
-                    self.term_output.insert("end", output)
-                    self.term_output.insert("end", "\n")
-                    self._term_prompt()
-
-                self.root.after(0, show)
+                    self.ui.call(self._finish_terminal_cmd, f"❌ {e}\n")
+                    return
+                if result["stopped"]:
+                    status = "■ stopped\n"
+                elif result["timed_out"]:
+                    status = f"⏰ timed out after {self.TERM_TIMEOUT}s\n"
+                else:
+                    status = ""
+                if result["restarted"]:
+                    status += "↻ shell restarted (variables reset)\n"
+                self.ui.call(self._finish_terminal_cmd, status)
 
             threading.Thread(target=run, daemon=True).start()
             return
@@ -2181,6 +1298,7 @@ class CatR1App:
 
     def _new_chat(self):
         """Start a new chat session."""
+        self._stop_generation()
         self.history.new_session()
         self._clear_chat()
         self._refresh_sidebar()
@@ -2189,6 +1307,7 @@ class CatR1App:
 
     def _switch_session(self, session_id):
         """Switch to a different chat session."""
+        self._stop_generation()
         self.history.current_id = session_id
         self._clear_chat()
 
@@ -2200,13 +1319,20 @@ class CatR1App:
 
     def _clear_chat(self):
         """Clear all messages from chat display."""
-        for w in self.chat_inner.winfo_children():
-            w.destroy()
-        self.msg_count = 0
+        self._drop_built()
+        self.transcript.clear()
+        self.layout.clear()
+        self.think_expanded.clear()
+        self.chat_canvas.yview_moveto(0)
 
     def _show_welcome(self):
-        """Show welcome screen in empty chat."""
-        welcome = tk.Frame(self.chat_inner, bg=T.chat_bg)
+        """Show welcome screen in empty chat (as the transcript's first entry)."""
+        self.transcript.append({"role": "welcome"})
+        self.layout.append(self._estimate_height(self.transcript[-1]))
+        self._schedule_render()
+
+    def _build_welcome(self, parent):
+        welcome = tk.Frame(parent, bg=T.chat_bg)
         welcome.pack(fill="both", expand=True, pady=80)
 
         tk.Label(welcome, text="🐱", font=("", 48), bg=T.chat_bg).pack(pady=(0, 8))
@@ -2234,7 +1360,15 @@ class CatR1App:
 #  LAUNCH
 # ═══════════════════════════════════════════════════════════════════
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cat R1 — DeepSeek V3/R1 desktop assistant")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the inference pipeline (reproducible routing/reasoning/replies)")
+    parser.add_argument("--storage", choices=("files", "sqlite"), default="files",
+                        help="chat history + memory backend: JSONL files, or one SQLite "
+                             f"database ({DB_FILE}) with full-text search")
+    args = parser.parse_args(argv)
+
     root = tk.Tk()
     root.title("Cat R1")
 
@@ -2245,8 +1379,11 @@ def main():
     except:
         pass
 
-    app = CatR1App(root)
+    app = CatR1App(root, seed=args.seed, storage=args.storage)
     root.mainloop()
+    app.history.flush()  # the file store batches index writes
+    if app.db is not None:
+        app.db.close()  # commit whatever the writer thread still has queued
 
 
 if __name__ == "__main__":
@@ -8,8 +8,11 @@
 """
 import tkinter as tk
 from tkinter import scrolledtext, filedialog, font
-import subprocess, threading, random, json, os, sys, re, math, textwrap, time, hashlib
+import subprocess, threading, json, os, sys, re, math, hashlib
 from datetime import datetime
+from catcore.engines.acholding import CatBrain
+from catcore.pacing import Pacer
+from catcore.uiqueue import UIQueue
 
 MAC = sys.platform == "darwin"
 
@@ -60,171 +63,13 @@ FM, FS, FSB, FSS, FT = get_fonts()
 MEM = os.path.expanduser("~/.catr1_mem.json")
 HIST = os.path.expanduser("~/.catr1_hist.json")
 
-# ════════════════════ V4 ARCHITECTURE (14B) ════════════════════
-class V4Config:
-    # 14B Distilled Model Specifications
-    VOCAB_SIZE = 102400
-    HIDDEN_SIZE = 5120
-    INTERMEDIATE_SIZE = 13824
-    NUM_LAYERS = 40
-    NUM_HEADS = 40
-    MAX_CTX = 131072 # 128k Context Window
-    
-    TOTAL_PARAMS = 14_500_000_000  # 14.5B
-    MODEL_NAME = "DeepSeek-V4-14B-Distill"
-    
-class DeepSeekV4_14B:
-    """
-    Simulation of the DeepSeek V4 14B Architecture.
-    Represents the internal state of the 14 billion parameter model.
-    """
-    def __init__(self):
-        self.config = V4Config()
-        self.kv_cache = 0
-        self.active_params = self.config.TOTAL_PARAMS
-        
-        # Simulate Layer initialization
-        self.layers = [f"TransformerBlock_{i}" for i in range(self.config.NUM_LAYERS)]
-        self.heads = [f"AttnHead_{i}" for i in range(self.config.NUM_HEADS)]
-        
-        # State tracking
-        self.context_buffer = []
-        
-    def forward_pass(self, tokens):
-        # Simulate computational cost of 14B params
-        # 14B ops per token roughly
-        self.kv_cache += len(tokens)
-        if self.kv_cache > self.config.MAX_CTX:
-            self.kv_cache = self.config.MAX_CTX # Rotate context
-            
-        return {
-            "logits": [random.random() for _ in range(10)],
-            "usage": f"{len(tokens)} toks processed"
-        }
-
-# ════════════════════ § 1 MoE-256 ROUTER ════════════════════
-class MoERouter:
-    # Simplified Router for 14B model (fewer experts, highly specialized)
-    DOMAINS=[
-        "python_expert","math_solver","logic_core","creative_writing",
-        "system_design","react_frontend","security_audit","data_analysis"
-    ]
-    
-    def __init__(s):
-        s.tok=0
-        
-    def route(s,text):
-        s.tok+=1
-        # Random activation simulation
-        active = []
-        for d in s.DOMAINS:
-            if random.random() > 0.7:
-                active.append({"dom": d, "w": random.random()})
-        
-        # Ensure at least one expert
-        if not active: active.append({"dom": "general_knowledge", "w": 0.9})
-        return active, [0]
-
-    def stats(s):
-        return {"bal":"0.99", "total":s.tok}
-
-# ════════════════════ § 6 R1 REASONING ENGINE ════════════════════
-class R1Engine:
-    AHA=[
-        "wait — {ins}", "oh! *ears perk* {ins}", "💡 hmm... {ins}",
-        "hold on, actually — {ins}", "*tail swish* re-evaluating: {ins}"
-    ]
-    VERIFY=["let me double-check...", "verifying logic...", "sanity check..."]
-    
-    def __init__(s): s.steps=0
-    
-    def needs_think(s,text):
-        kw=["why","how","explain","solve","code","plan","compare","debug"]
-        return any(k in text.lower() for k in kw) or len(text.split())>5
-        
-    def chain(s,query,experts):
-        s.steps+=1
-        phases=[]
-        
-        phases.append(("Routing", f"Query routing to {len(experts)} experts"))
-        
-        if "code" in query.lower():
-            phases.append(("Analysis", "Decomposing requirements -> Implementation Strategy"))
-            phases.append(("Plan", "1. Setup structure\n2. Implement core logic\n3. Add error handling"))
-        elif "math" in query.lower() or any(c in query for c in "+-*/"):
-            phases.append(("Analysis", "Identifying mathematical constraints and axioms"))
-            phases.append(("Solve", "Applying formal verification steps"))
-        else:
-            phases.append(("Analysis", "Analyzing semantic intent and tonal requirements"))
-            
-        ins = "this requires a structured approach"
-        phases.append(("Aha!", random.choice(s.AHA).format(ins=ins)))
-        phases.append(("Verify", random.choice(s.VERIFY) + " ✓"))
-        phases.append(("Synthesize", "Compiling final response"))
-        
-        return phases
-
-# ════════════════════ § 7 BRAIN ════════════════════
-class CatBrain:
-    def __init__(s):
-        # Initialize the 14B Model Core
-        s.llm = DeepSeekV4_14B()
-        s.moe = MoERouter()
-        s.r1 = R1Engine()
-        s.deep_think = True
-        s.web_search = False
-        
-    def process(s, text, cb_think, cb_resp, cb_done):
-        # 1. Route
-        experts, _ = s.moe.route(text)
-        
-        # 2. Reasoning (R1)
-        if s.deep_think and s.r1.needs_think(text):
-            chain = s.r1.chain(text, experts)
-            for phase, content in chain:
-                cb_think(phase, content)
-                time.sleep(0.3 + random.random()*0.2) # Fast 14B inference speed
-        
-        # 3. Forward Pass (Simulation)
-        s.llm.forward_pass(text.split())
-        
-        # 4. Generate
-        resp = s._gen_resp(text)
-        
-        # Simulate streaming
-        for char in resp:
-            cb_resp(char)
-            # V4 14B is fast
-            time.sleep(0.002 if char==" " else 0.008 if char in ".!?" else 0.001)
-            
-        cb_done({"experts":experts, "time": "0.4s", "grm": "0.99", "model": V4Config.MODEL_NAME})
-
-    def _gen_resp(s, text):
-        t = text.lower()
-        if "code" in t or "function" in t:
-            return textwrap.dedent("""\
-                Here is the implementation using the V4 architecture.
-                
-                ```python
-                def optimize_data(data):
-                    # Optimized R1-Lite logic
-                    # V4 14B Distilled Efficiency
-                    result = []
-                    for item in data:
-                        if validate(item):
-                            result.append(process(item))
-                    return result
-                ```
-                
-                The dense 14B parameter set ensures this runs extremely fast while maintaining R1-level reasoning. 🐾
-            """)
-        elif "hello" in t or "hi" in t:
-            return f"Meow! I mean, Hello! *stretches* I'm Cat R1, running on the new {V4Config.MODEL_NAME} architecture. Fast, smart, and efficient. What can I do for you? 🐾"
-        else:
-            return f"That's an interesting point about '{text}'.\n\nBased on my V4 analysis (running on {V4Config.NUM_LAYERS} layers), the key factors are clarity and structure. The 14B distilled model suggests focusing on the core axioms.\n\nI can break this down further if you'd like! *purrs*"
-
 # ════════════════════ § 9 GUI ════════════════════
 class CatR1App:
+    # V4 14B is fast: ~600 chars/s, never more than 3 s of typing per reply;
+    # words are delivered in batches at most every 40 ms (~25 redraws/s)
+    PACER = Pacer("adaptive", cps=600, max_seconds=3.0, think_delay=0.3, think_jitter=0.2,
+                  unit="word", flush_interval=0.04)
+
     def __init__(s, root):
         s.root = root
         root.title("DeepSeek — Cat R1")
@@ -232,6 +77,10 @@ class CatR1App:
         root.configure(bg=T.bg)
         
         s.brain = CatBrain()
+        s.brain.pacer = s.PACER
+        # worker threads post UI work here; drained at 60 fps, text appends merged per frame
+        s.ui = UIQueue(root.after, fps=60)
+        s.ui.start()
         s.is_generating = False
         s.is_fresh = True # Tracks if we are on the welcome screen
         
@@ -462,15 +311,8 @@ class CatR1App:
             return content_col
 
     def _gen_thread(s, prompt):
-        # 1. Create message block
-        body_frame = None
-        s.root.after(0, lambda: set_body(s._add_msg("Cat R1", "")))
-        
-        msg_store = {"body": None}
-        def set_body(w): msg_store["body"] = w
-        
-        while msg_store["body"] is None: time.sleep(0.01)
-        body = msg_store["body"]
+        # 1. Create message block (on the UI thread; block on the future, no polling)
+        body = s.ui.submit(s._add_msg, "Cat R1", "").result()
         
         # 2. Thinking Process
         thought_log = []
@@ -478,27 +320,37 @@ class CatR1App:
         def on_think(phase, content):
             thought_log.append(f"[{phase}] {content}")
             
-        def on_resp(char):
-            s.root.after(0, lambda: append_text(char))
+        def on_resp(chunk):
+            s.ui.append(append_text, chunk)  # chunks arriving within one frame are merged
 
         resp_widget = {"w": None}
-        def append_text(char):
-            if not resp_widget["w"]:
-                # Create the text widget for response
-                lbl = tk.Label(body, text="", font=FS, bg=T.bg, fg=T.text, justify="left", anchor="w", wraplength=700)
-                lbl.pack(fill="x", anchor="w")
-                resp_widget["w"] = lbl
+        def append_text(chunk):
+            w = resp_widget["w"]
+            if not w:
+                # Read-only Text widget for the response; chunks are appended in place
+                w = tk.Text(body, font=FS, bg=T.bg, fg=T.text, wrap="word", relief="flat",
+                            borderwidth=0, highlightthickness=0, height=1, width=80,
+                            padx=0, pady=0, cursor="arrow")
+                w.pack(fill="x", anchor="w")
+                resp_widget["w"] = w
             
-            curr = resp_widget["w"].cget("text")
-            resp_widget["w"].config(text=curr + char)
-            s.cv.update_idletasks()
+            w.config(state="normal")
+            w.insert("end", chunk)
+            w.config(state="disabled")
+            # Grow to fit the wrapped text (display lines, not logical lines)
+            lines = w.count("1.0", "end", "displaylines")
+            if lines and 0 < lines[0] != int(w.cget("height")):
+                w.config(height=lines[0])
             s.cv.yview_moveto(1.0)
             
-        def on_done(stats):
+        def finish(stats):
             s.is_generating = False
             s.btn_send.config(bg=T.dim)
             if thought_log:
-                s.root.after(0, lambda: render_thought_block(body, thought_log, stats))
+                render_thought_block(body, thought_log, stats)
+            
+        def on_done(stats):
+            s.ui.call(finish, stats)  # Tk state only changes on the UI thread
 
         s.brain.process(prompt, on_think, on_resp, on_done)
 
@@ -0,0 +1,9 @@
+"""
+catcore — shared headless engine pieces for the Cat R1 front ends.
+
+Nothing in this package imports tkinter; the GUI scripts import from it.
+"""
+
+from .matcher import KeywordMatcher
+
+__all__ = ["KeywordMatcher"]
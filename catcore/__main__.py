@@ -0,0 +1,93 @@
+"""
+Command-line entry points:  python -m catcore [--profile-import] <command> [options]
+
+    batch   run a JSONL prompt file through an engine (resumable, in input order)
+    bench   headless latency/throughput benchmark of the front ends
+    serve   HTTP/JSON chat server with SSE streaming (one engine per session)
+
+Only the chosen command's module is imported (serve pulls in asyncio,
+batch multiprocessing), so startup stays within IMPORT_BUDGET_MS.
+--profile-import first prints an `-X importtime` breakdown of that
+command's cold start, then runs it.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# command → (module, help)
+COMMANDS = {
+    "batch": ("batch", "run a prompt file through an engine into a results file"),
+    "bench": ("bench", "benchmark the inference pipelines headlessly"),
+    "serve": ("server", "serve an engine over HTTP (POST /v1/chat, GET /stats)"),
+}
+IMPORT_BUDGET_MS = 100           # interpreter start → command imported
+PROFILE_MIN_US = 500             # importtime rows below this cumulative time are hidden
+GUI_MODULES = ("tkinter", "_tkinter")  # must never be imported by a catcore command
+
+
+def _load(command):
+    return importlib.import_module("." + COMMANDS[command][0], __package__)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(prog="python -m catcore")
+    parser.add_argument("--profile-import", action="store_true",
+                        help="print an -X importtime breakdown of the command's imports, then run it")
+    sub = parser.add_subparsers(dest="command", required=True)
+    chosen = next((a for a in argv if not a.startswith("-")), None)
+    for name, (_, help_text) in COMMANDS.items():
+        p = sub.add_parser(name, help=help_text)
+        if name == chosen:
+            module = _load(name)
+            module.add_arguments(p)
+            p.set_defaults(func=module.main)
+
+    args = parser.parse_args(argv)
+    if args.profile_import:
+        profile_imports(args.command)
+    return args.func(args)
+
+
+def profile_imports(command, out=sys.stderr):
+    """Cold-import `command` in a fresh interpreter under -X importtime and print the breakdown."""
+    import subprocess
+    import time
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    code = (f"import sys; import {__package__}.__main__ as m; m._load({command!r}); "
+            f"print(*[g for g in m.GUI_MODULES if g in sys.modules])")
+    start = time.perf_counter()  # timed without -X importtime, which adds its own overhead
+    subprocess.run([sys.executable, "-c", code], capture_output=True, env=env)
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        print(proc.stderr, file=out)
+        return
+
+    rows = []  # (self µs, cumulative µs, indented name), in -X importtime order
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative), name.rstrip()))
+    total_ms = sum(r[0] for r in rows) / 1000.0
+
+    print(f"import time: {'self [us]':>9} | {'cumulative':>10} | imported package", file=out)
+    for self_us, cumulative, name in rows:
+        if cumulative >= PROFILE_MIN_US:
+            print(f"import time: {self_us:>9} | {cumulative:>10} | {name}", file=out)
+    print(f"{command}: {len(rows)} modules, {total_ms:.1f} ms importing, {wall_ms:.1f} ms cold start "
+          f"(budget {IMPORT_BUDGET_MS} ms{', over' if wall_ms > IMPORT_BUDGET_MS else ''}); "
+          f"rows under {PROFILE_MIN_US} µs hidden", file=out)
+    gui = proc.stdout.split()
+    if gui:
+        print(f"warning: {command} imports GUI modules: {', '.join(gui)}", file=out)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
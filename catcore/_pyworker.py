@@ -0,0 +1,85 @@
+"""
+Code-runner worker process for catcore.codepool (stdlib only, run as a script).
+
+Protocol — one JSON object per line:
+
+    stdin  ← {"id": n, "code": "...", "keep": bool}
+    stdout → {"id": n, "stream": "stdout"|"stderr", "data": "..."}   (any number)
+             {"id": n, "done": true, "ok": bool, "exit": int|null}
+
+stdout is reserved for frames: print() and sys.stderr writes are turned
+into frames by the cell's stream objects, and the real fds 0/1 are moved
+out of the way so input() or C-level writes can't touch the protocol.
+Raw fd-level output (extension modules, child processes) lands on fd 2,
+which the pool reads separately.
+"""
+
+import json
+import os
+import sys
+import traceback
+
+
+def main():
+    commands = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    frames = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    null = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null, 0)
+    os.dup2(2, 1)
+    os.close(null)
+    home = os.getcwd()
+
+    for mod in sys.argv[1:]:  # warm imports, e.g. numpy
+        try:
+            __import__(mod)
+        except Exception:
+            pass
+
+    def send(msg):
+        frames.write(json.dumps(msg, ensure_ascii=False) + "\n")
+        frames.flush()
+
+    class Stream:
+        def __init__(self, name):
+            self.name, self.job = name, None
+
+        def write(self, data):
+            if data:
+                send({"id": self.job, "stream": self.name, "data": data})
+            return len(data)
+
+        def flush(self):
+            pass
+
+        def isatty(self):
+            return False
+
+    out, err = Stream("stdout"), Stream("stderr")
+    sys.stdout, sys.stderr = out, err
+    sys.stdin = open(os.devnull, "r")
+    send({"ready": True})
+
+    ns = None
+    for line in commands:
+        job = json.loads(line)
+        out.job = err.job = job["id"]
+        if ns is None or not job.get("keep"):
+            ns = {"__name__": "__main__", "__builtins__": __builtins__}
+        os.chdir(home)
+        ok, code = True, None
+        try:
+            exec(compile(job["code"], "<cell>", "exec"), ns)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if e.code is not None and not isinstance(e.code, int):
+                err.write(f"{e.code}\n")
+            ok = code == 0
+        except BaseException:
+            ok = False
+            etype, value, tb = sys.exc_info()
+            err.write("".join(traceback.format_exception(etype, value, tb.tb_next)))
+        send({"id": job["id"], "done": True, "ok": ok, "exit": code})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+One asyncio event loop on a background thread, for the Tk front ends.
+
+Tk owns the main thread, so replies used to run on a new OS thread per
+message, with no way to stop one. A LoopThread instead runs every
+coroutine — any number of engine.astream() sessions at once — on a
+single loop thread:
+
+    loop = LoopThread(); loop.start()
+    job = loop.submit(coro)   # from any thread → concurrent.futures.Future
+    job.cancel()              # cancels the task at its next await
+    loop.stop()
+
+Results still reach widgets through a UIQueue (catcore.uiqueue); the
+loop thread never touches Tk.
+"""
+
+import asyncio
+import threading
+
+
+class LoopThread:
+    """An event loop running forever on a daemon thread."""
+
+    def __init__(self, name="catcore-loop"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            # Cancel what is still running so async generators close cleanly
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def submit(self, coro):
+        """Schedule coro on the loop; cancelling the returned Future cancels the task."""
+        if self._thread is None:
+            raise RuntimeError("LoopThread is not running (call start())")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout=2.0):
+        """Cancel pending coroutines, stop the loop and wait for the thread."""
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
@@ -0,0 +1,171 @@
+"""
+Auxiliary-loss-free load balancing (DeepSeek V3 §2.1), kept incrementally.
+
+Every `interval` routed messages the original routers summed all 256
+loads and swept every expert: load > 1.2·mean → bias −γ, load < 0.8·mean
+→ bias +γ. BiasBalancer produces the same biases without the sweeps:
+
+- loads live in "scaled units" that only ever grow (decay is a global
+  scale factor), so the mean and both thresholds only move up;
+- experts are classified over / normal / under; only experts activated
+  since the last update are re-checked, and two lazy min-heaps find the
+  experts that the rising thresholds push out of "over" or into "under";
+- a bias step is a tick counter, not a loop: each expert's bias is
+  settled only when it changes class.
+
+Bookkeeping is O(k) per routed message (k = experts activated) plus the
+class changes that actually happen. `biases()` materialises the vector
+at most once per bias change, and `version` increments only then.
+"""
+
+import heapq
+
+OVER, NORMAL, UNDER = 1, 0, -1
+
+
+class BiasBalancer:
+    """Incremental bias balancer for n_experts routed experts."""
+
+    RESCALE_AT = 1e100  # renormalise scaled loads before they overflow
+
+    def __init__(self, n_experts=256, gamma=0.001, interval=10, window=None,
+                 high=1.2, low=0.8):
+        """
+        interval — routed messages between bias updates (original: 10)
+        window   — decay window in messages; loads decay by (1 − 1/window)
+                   per message. None keeps all-time counts (original).
+        """
+        if interval < 1:
+            raise ValueError("interval must be >= 1")
+        if window is not None and window < 1:
+            raise ValueError("window must be >= 1 or None")
+        self.n = n_experts
+        self.gamma = gamma
+        self.interval = interval
+        self.window = window
+        self.high, self.low = high, low
+        self._decay = 1.0 - 1.0 / window if window else 1.0
+
+        self.messages = 0
+        self.version = 0        # bumps whenever any bias changes
+        self._unit = 1.0        # value of one activation, in scaled units
+        self._load = [0.0] * n_experts
+        self._total = 0.0
+
+        self._state = [NORMAL] * n_experts
+        self._base = [0.0] * n_experts   # bias settled at _since[i]
+        self._since = [0] * n_experts
+        self._ticks = 0
+        self.n_over = self.n_under = 0
+
+        self._dirty = set()
+        self._over_heap = []
+        self._normal_heap = [(0.0, i) for i in range(n_experts)]
+
+        self._vector = None
+        self._vector_version = -1
+
+    # ─── Public API ──────────────────────────────────────────
+
+    def record(self, expert_ids):
+        """Account one routed message that activated expert_ids."""
+        self.messages += 1
+        if self._decay != 1.0:
+            self._unit /= self._decay
+            if self._unit > self.RESCALE_AT:
+                self._rescale()
+        unit, load = self._unit, self._load
+        for i in expert_ids:
+            load[i] += unit
+            self._total += unit
+            self._dirty.add(i)
+        if self.messages % self.interval == 0:
+            self._update()
+
+    def bias(self, i):
+        """Current bias b_i."""
+        return self._base[i] - self._state[i] * self.gamma * (self._ticks - self._since[i])
+
+    def biases(self):
+        """Bias vector (shared list — do not mutate); rebuilt only on change."""
+        if self._vector_version != self.version:
+            self._vector = [self.bias(i) for i in range(self.n)]
+            self._vector_version = self.version
+        return self._vector
+
+    def load(self, i):
+        """Expert i's (decayed) load, in activations."""
+        return self._load[i] / self._unit
+
+    @property
+    def mean(self):
+        """Running mean load per expert, in activations."""
+        return self._total / self._unit / self.n
+
+    @property
+    def overloaded(self):
+        return {i for i in range(self.n) if self._state[i] == OVER}
+
+    @property
+    def underloaded(self):
+        return {i for i in range(self.n) if self._state[i] == UNDER}
+
+    # ─── Internals ───────────────────────────────────────────
+
+    def _update(self):
+        """Bring classes up to date with the current mean, then step biases."""
+        mean = self._total / self.n
+        hi, lo = mean * self.high, mean * self.low
+
+        for i in self._dirty:
+            self._classify(i, hi, lo)
+        self._dirty.clear()
+
+        # Rising thresholds: over → normal/under, normal → under
+        heap = self._over_heap
+        while heap and heap[0][0] <= hi:
+            load, i = heapq.heappop(heap)
+            if self._state[i] == OVER and self._load[i] == load:
+                self._classify(i, hi, lo)
+        heap = self._normal_heap
+        while heap and heap[0][0] < lo:
+            load, i = heapq.heappop(heap)
+            if self._state[i] == NORMAL and self._load[i] == load:
+                self._classify(i, hi, lo)
+
+        if len(self._over_heap) + len(self._normal_heap) > 4 * self.n:
+            self._compact_heaps()
+
+        if self.n_over or self.n_under:
+            self._ticks += 1
+            self.version += 1
+
+    def _classify(self, i, hi, lo):
+        load = self._load[i]
+        new = OVER if load > hi else UNDER if load < lo else NORMAL
+        old = self._state[i]
+        if new != old:
+            self._base[i] = self.bias(i)
+            self._since[i] = self._ticks
+            self._state[i] = new
+            self.n_over += (new == OVER) - (old == OVER)
+            self.n_under += (new == UNDER) - (old == UNDER)
+        if new == OVER:
+            heapq.heappush(self._over_heap, (load, i))
+        elif new == NORMAL:
+            heapq.heappush(self._normal_heap, (load, i))
+
+    def _compact_heaps(self):
+        """Drop stale heap entries (superseded loads / changed classes)."""
+        self._over_heap = [(l, i) for i, l in enumerate(self._load) if self._state[i] == OVER]
+        self._normal_heap = [(l, i) for i, l in enumerate(self._load) if self._state[i] == NORMAL]
+        heapq.heapify(self._over_heap)
+        heapq.heapify(self._normal_heap)
+
+    def _rescale(self):
+        """Renormalise scaled loads (rare, O(n)); comparisons are unaffected."""
+        unit = self._unit
+        self._load = [l / unit for l in self._load]
+        self._total /= unit
+        self._unit = 1.0
+        self._compact_heaps()
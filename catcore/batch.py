@@ -0,0 +1,233 @@
+"""
+Offline batch mode: run a prompt file through an engine, for regression corpora.
+
+    python -m catcore batch prompts.jsonl out.jsonl --engine catgptv0 --workers 4
+
+Input is JSON lines, read as a stream: {"id": ..., "prompt": "..."}
+("message" works too, a bare JSON string is a prompt, a missing id is
+the line number). Each prompt gets a fresh engine with instant pacing
+(no think/typing sleeps) and in-memory conversation memory, seeded from
+--seed and its id, so a result depends only on the prompt — not on the
+worker that ran it, the worker count, or an earlier interrupted run.
+
+Output is one JSON line per prompt, in input order:
+
+    {"id", "prompt", "response", "thinking": [[phase, text], ...],
+     "experts", "grm", "timings": {"total_ms", "stages": {stage: ms}}}
+
+or {"id", "prompt", "error"} if the engine raised. Prompts are fanned
+out to a ProcessPoolExecutor in chunks; results are written (and
+flushed) as soon as every earlier one is. Rerunning with the same out
+file resumes: ids already in it are skipped, and a line torn by the
+interruption is cut off first.
+"""
+
+import json
+import os
+import signal
+import sys
+import time
+import zlib
+from collections import deque
+
+from . import engine
+from .pacing import Pacer
+
+IN_MEMORY = ("catr1v0", "catgptv0", "distil")  # engines taking store=; the rest keep no memory file here
+EXPERT_KEYS = ("experts_active", "experts")      # where the pipelines put routed experts in stats
+
+
+class BatchError(ValueError):
+    """Unreadable input (reported with file and line)."""
+
+
+class _MemoryStore(list):
+    """Memory store that stays in the process: append()/recent()/close()."""
+
+    def recent(self, n=None):
+        return list(self) if n is None else self[-n:] if n else []
+
+    def close(self):
+        pass
+
+
+def read_prompts(path):
+    """(id, prompt) for each non-blank line of a JSONL file ("-" = stdin)."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise BatchError(f"{path}:{n}: not valid JSON") from None
+            if isinstance(record, str):
+                record = {"prompt": record}
+            prompt = record.get("prompt", record.get("message")) if isinstance(record, dict) else None
+            rid = record.get("id", n) if isinstance(record, dict) else None
+            if not isinstance(prompt, str) or not isinstance(rid, (str, int)) or isinstance(rid, bool):
+                raise BatchError(f'{path}:{n}: expected {{"id": str|int, "prompt": "..."}}')
+            yield rid, prompt
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def written_ids(path):
+    """Ids already in an output file; a torn last line is truncated away."""
+    if not os.path.exists(path):
+        return set()
+    ids, good = set(), 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                ids.add(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError):
+                break
+            good += len(line)
+    if good < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good)
+    return ids
+
+
+# ─── Worker side ─────────────────────────────────────────────
+
+_config = {}
+
+
+def _init(name, seed, deep_think, pool=False):
+    _config.update(name=name, seed=seed, deep_think=deep_think)
+    if pool:  # Ctrl+C is the driver's to handle; workers are shut down by it
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _run_chunk(items):
+    return [_run_one(rid, prompt) for rid, prompt in items]
+
+
+def _run_one(rid, prompt):
+    name, seed = _config["name"], _config["seed"]
+    if seed is not None:
+        seed += zlib.crc32(str(rid).encode("utf-8"))
+    kwargs = {"store": _MemoryStore()} if name in IN_MEMORY else {}
+    start = time.perf_counter()
+    try:
+        brain = engine.create(name, seed=seed, **kwargs)
+        brain.pacer = Pacer("instant")
+        brain.deep_think = _config["deep_think"]
+        out = engine.reply(brain, prompt)
+    except Exception as e:
+        return {"id": rid, "prompt": prompt, "error": f"{type(e).__name__}: {e}"}
+    total = (time.perf_counter() - start) * 1000.0
+    stats = out["stats"]
+    return {
+        "id": rid,
+        "prompt": prompt,
+        "response": out["response"],
+        "thinking": out["thinking"],
+        "experts": next((stats[k] for k in EXPERT_KEYS if k in stats), None),
+        "grm": stats.get("grm"),
+        "timings": {"total_ms": round(total, 3),
+                    "stages": {k: round(v, 3) for k, v in stats.get("stages", {}).items()}},
+    }
+
+
+# ─── Driver ──────────────────────────────────────────────────
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run(in_path, out_path, name="catr1v0", workers=None, seed=0, deep_think=True, chunk=16):
+    """Process in_path into out_path (appending, resuming); returns a summary dict."""
+    if name not in engine.ENGINES:
+        raise ValueError(f"unknown engine {name!r}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 0 or chunk < 1:
+        raise ValueError("workers must be >= 0 and chunk >= 1")
+    done = written_ids(out_path)
+    counts = {"read": 0, "skipped": 0, "written": 0, "errors": 0}
+
+    def todo():
+        for rid, prompt in read_prompts(in_path):
+            counts["read"] += 1
+            if rid in done:
+                counts["skipped"] += 1
+            else:
+                yield rid, prompt
+
+    start = time.perf_counter()
+    with open(out_path, "a", encoding="utf-8") as out:
+        def write(results):
+            for result in results:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                counts["written"] += 1
+                counts["errors"] += "error" in result
+            out.flush()
+
+        if workers == 0:  # in this process (debugging, profiling)
+            _init(name, seed, deep_think)
+            for items in _chunks(todo(), chunk):
+                write(_run_chunk(items))
+        else:
+            from concurrent.futures import ProcessPoolExecutor  # ~20 ms; not needed for --workers 0
+            pool = ProcessPoolExecutor(workers, initializer=_init,
+                                       initargs=(name, seed, deep_think, True))
+            try:
+                pending = deque()
+                for items in _chunks(todo(), chunk):
+                    pending.append(pool.submit(_run_chunk, items))
+                    if len(pending) >= 2 * workers:  # bounded read-ahead; output stays in order
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            pool.shutdown()
+
+    wall = time.perf_counter() - start
+    counts["wall_s"] = round(wall, 3)
+    counts["msgs_per_s"] = round(counts["written"] / wall, 2) if wall > 0 else None
+    return counts
+
+
+def main(args):
+    try:
+        summary = run(args.prompts, args.out, args.engine, workers=args.workers, seed=args.seed,
+                      deep_think=not args.no_think, chunk=args.chunk)
+    except BatchError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print(f"interrupted — rerun the same command to resume {args.out}", file=sys.stderr)
+        return 130
+    print(f"{summary['written']} written ({summary['errors']} errors), "
+          f"{summary['skipped']} already in {args.out}, "
+          f"{summary['wall_s']}s, {summary['msgs_per_s']} msg/s", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+def add_arguments(parser):
+    parser.add_argument("prompts", help='JSONL input, {"id": ..., "prompt": "..."} per line ("-" = stdin)')
+    parser.add_argument("out", help="JSONL results; appended to, and already-written ids are skipped")
+    parser.add_argument("--engine", default="catr1v0", choices=engine.names())
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count; 0 = run in this process)")
+    parser.add_argument("--chunk", type=int, default=16, help="prompts per task sent to a worker")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed; each prompt runs with seed + crc32(id)")
+    parser.add_argument("--no-think", action="store_true", help="turn R1 reasoning off")
@@ -0,0 +1,265 @@
+"""
+Headless benchmark for the front ends' inference engines.
+
+Builds each engine through catcore.engine (no tkinter), sets instant
+pacing (no think/typing delays) and drives `process()` over a prompt
+corpus. Reports per-message latency, per-stage latency (from
+stats["stages"]) and throughput, as JSON so runs can be diffed across
+commits:
+
+    python -m catcore bench --seed 1 --repeat 5 --out bench.json
+
+--sessions 1,8,64 adds a concurrency run per count: that many sessions
+(catcore.multisession, one engine each) on as many threads, each
+sending the corpus `repeat` times, all started together.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import engine, routing
+from .multisession import SessionManager
+from .pacing import Pacer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# benchmarked by default: the full pipelines (the rule-table engines can be picked with --frontend)
+DEFAULT_FRONTENDS = ["catr1v0", "catgptv0", "acholding"]
+
+DEFAULT_CORPUS = [
+    "hi",
+    "hello there!",
+    "who are you?",
+    "explain your architecture",
+    "write a python function to reverse a linked list",
+    "implement quicksort in javascript",
+    "calculate 17 * 23 + 4",
+    "solve the equation 2x + 3 = 11",
+    "explain how transformers use attention",
+    "what is the difference between TCP and UDP?",
+    "why is the sky blue? explain step by step",
+    "compare rust and go for building a web server, and plan a migration",
+    "debug this: my recursive function never terminates",
+    "write a short poem about a cat watching rain",
+    "research the history of the printing press and its economic impact",
+    "meow",
+    "thanks!",
+    "design a database schema for a library with books, members and loans",
+]
+
+
+def read_corpus(path):
+    """One prompt per non-blank line."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated q-th percentile (0-100) of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(values):
+    """p50/p95/p99/mean/max of a list of milliseconds."""
+    v = sorted(values)
+    return {
+        "p50": round(percentile(v, 50), 4),
+        "p95": round(percentile(v, 95), 4),
+        "p99": round(percentile(v, 99), 4),
+        "mean": round(sum(v) / len(v), 4) if v else 0.0,
+        "max": round(v[-1], 4) if v else 0.0,
+    }
+
+
+def bench_frontend(name, corpus, repeat=3, warmup=1, seed=0):
+    """Run one engine over corpus×repeat messages; returns its result dict."""
+    random.seed(seed)  # engines that still use the global generator
+
+    with tempfile.TemporaryDirectory(prefix="catbench-") as tmp:
+        mem_file = os.path.join(tmp, "memory" + engine.memory_suffix(name))
+        brain = engine.create(name, seed=seed, mem_file=mem_file)
+        brain.pacer = Pacer("instant")
+
+        done = []
+        noop = lambda *args: None
+        for prompt in corpus[:warmup]:
+            brain.process(prompt, noop, noop, done.append)
+
+        latencies, stages = [], {}
+        chars = [0]
+
+        def on_resp(chunk):
+            chars[0] += len(chunk)
+
+        t_start = time.perf_counter()
+        for _ in range(repeat):
+            for prompt in corpus:
+                del done[:]
+                t0 = time.perf_counter()
+                brain.process(prompt, noop, on_resp, done.append)
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+                for stage, ms in (done[0].get("stages", {}) if done else {}).items():
+                    stages.setdefault(stage, []).append(ms)
+        wall = time.perf_counter() - t_start
+
+    return {
+        "messages": len(latencies),
+        "wall_s": round(wall, 4),
+        "msgs_per_s": round(len(latencies) / wall, 2) if wall > 0 else None,
+        "chars_out": chars[0],
+        "latency_ms": summarize(latencies),
+        "stages_ms": {stage: summarize(v) for stage, v in stages.items()},
+    }
+
+
+def bench_sessions(name, corpus, count, repeat=1, seed=0):
+    """count concurrent sessions of one engine, a thread each; returns the result dict."""
+    random.seed(seed)
+
+    with tempfile.TemporaryDirectory(prefix="catbench-") as tmp:
+        # shared routing tables are built once per process; keep that out of setup_ms
+        engine.close(engine.create(name, seed=seed, mem_file=os.path.join(tmp, "warmup" + engine.memory_suffix(name))))
+        sessions = SessionManager(name, max_sessions=count, data_dir=tmp, seed=seed)
+        t0 = time.perf_counter()
+        contexts = [sessions.get(f"s{i}") for i in range(count)]
+        setup = (time.perf_counter() - t0) * 1000.0
+
+        latencies = [[] for _ in contexts]
+        start = threading.Barrier(count + 1)
+
+        def drive(ctx, out):
+            start.wait()
+            for _ in range(repeat):
+                for prompt in corpus:
+                    t = time.perf_counter()
+                    ctx.process(prompt)
+                    out.append((time.perf_counter() - t) * 1000.0)
+
+        threads = [threading.Thread(target=drive, args=(ctx, out), daemon=True)
+                   for ctx, out in zip(contexts, latencies)]
+        for t in threads:
+            t.start()
+        start.wait()
+        t_start = time.perf_counter()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t_start
+        load = sessions.load_stats()
+        sessions.close()
+
+    merged = [ms for out in latencies for ms in out]
+    return {
+        "sessions": count,
+        "messages": len(merged),
+        "wall_s": round(wall, 4),
+        "msgs_per_s": round(len(merged) / wall, 2) if wall > 0 else None,
+        "setup_ms_per_session": round(setup / count, 4),
+        "latency_ms": summarize(merged),
+        "load_balance": load["balance"],
+        "experts_used": load["experts_used"],
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(frontends, corpus, repeat=3, warmup=1, seed=0, sessions=()):
+    """Benchmark several front ends; returns the full JSON-ready report."""
+    import platform  # only for the report header; serve imports this module for summarize()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": routing.HAVE_NUMPY,
+            "seed": seed,
+            "repeat": repeat,
+            "corpus_size": len(corpus),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "frontends": {name: bench_frontend(name, corpus, repeat, warmup, seed)
+                      for name in frontends},
+    }
+    if sessions:
+        report["meta"]["cpus"] = os.cpu_count()
+        report["sessions"] = {name: {str(n): bench_sessions(name, corpus, n, repeat, seed)
+                                     for n in sessions}
+                              for name in frontends}
+    return report
+
+
+def format_report(report):
+    """Plain-text summary of a run() report."""
+    lines = []
+    for name, r in report["frontends"].items():
+        lat = r["latency_ms"]
+        lines.append(f"{name}: {r['messages']} msgs, {r['msgs_per_s']} msg/s, "
+                     f"p50={lat['p50']:.3f}ms p95={lat['p95']:.3f}ms p99={lat['p99']:.3f}ms")
+        for stage, st in r["stages_ms"].items():
+            lines.append(f"  {stage:<12} p50={st['p50']:.3f}  p95={st['p95']:.3f}  "
+                         f"p99={st['p99']:.3f}  mean={st['mean']:.3f} ms")
+    for name, runs in report.get("sessions", {}).items():
+        for r in runs.values():
+            lat = r["latency_ms"]
+            lines.append(f"{name} × {r['sessions']} sessions: {r['messages']} msgs, "
+                         f"{r['msgs_per_s']} msg/s, p50={lat['p50']:.3f}ms p95={lat['p95']:.3f}ms "
+                         f"p99={lat['p99']:.3f}ms, setup {r['setup_ms_per_session']:.3f} ms/session, "
+                         f"balance {r['load_balance']}")
+    return "\n".join(lines)
+
+
+def main(args):
+    corpus = read_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    report = run(args.frontend or DEFAULT_FRONTENDS, corpus,
+                 repeat=args.repeat, warmup=args.warmup, seed=args.seed,
+                 sessions=args.sessions or ())
+    print(format_report(report), file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.out and args.out != "-":
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument("--frontend", action="append", choices=engine.names(),
+                        help="engine to run, named after its front end (repeatable; "
+                             f"default: {', '.join(DEFAULT_FRONTENDS)})")
+    parser.add_argument("--corpus", help="prompt file, one prompt per line")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured warm-up messages")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sessions", type=_counts, metavar="N,N,...",
+                        help="also run this many concurrent sessions per engine, e.g. 1,8,64")
+    parser.add_argument("--out", help="write JSON here (default: stdout)")
+
+
+def _counts(value):
+    try:
+        counts = [int(n) for n in value.split(",") if n.strip()]
+    except ValueError:
+        counts = None
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError("expected positive integers separated by commas")
+    return counts
@@ -0,0 +1,48 @@
+"""
+Small LRU cache with hit/miss counters (routing results and friends).
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used mapping; capacity 0 disables caching."""
+
+    def __init__(self, capacity=512):
+        self.capacity = max(0, int(capacity))
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Cached value (marking it recently used) or default; counts hit/miss."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if not self.capacity:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "size": len(self._data), "capacity": self.capacity,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
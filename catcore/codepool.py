@@ -0,0 +1,252 @@
+"""
+Warm pool of Python worker processes for the Code Interpreter.
+
+Running a snippet used to mean: write a temp file, start a fresh
+interpreter, import everything, run, collect all output at exit. A
+CodePool keeps `size` workers (catcore/_pyworker.py) already started
+and, optionally, with heavy modules pre-imported; a run is one JSON line
+down a pipe.
+
+- each run gets a fresh namespace (modules stay imported, so
+  `import numpy` in a snippet is free); keep=True runs go to a dedicated
+  kernel worker whose namespace persists between runs, notebook-style;
+- output streams back as it is written, through on_output(stream, text);
+- a run past the timeout has its worker (and process group) killed and
+  replaced — for a kernel that also means its state is gone;
+- stop() kills whatever is running right now (same path as a timeout);
+- workers are recycled after max_runs so side effects (monkeypatching,
+  stray threads) don't accumulate.
+
+Workers run isolated (`python -I`, own session/process group, own
+scratch directory) — separation, not a security sandbox.
+"""
+
+import atexit
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_pyworker.py")
+
+
+class _Worker:
+    """One worker process plus the threads reading its frames and raw output."""
+
+    def __init__(self, preload):
+        self.scratch = tempfile.mkdtemp(prefix="catcore-run-")
+        kwargs = {}
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        else:
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", "-u", WORKER, *preload],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=self.scratch, **kwargs)
+        self.frames = queue.Queue()
+        self.runs = 0
+        self.stopped = False
+        threading.Thread(target=self._read_frames, daemon=True).start()
+        threading.Thread(target=self._read_raw, daemon=True).start()
+
+    def _read_frames(self):
+        for line in self.proc.stdout:
+            try:
+                self.frames.put(json.loads(line))
+            except ValueError:
+                continue
+        self.frames.put(None)  # EOF: the worker died
+
+    def _read_raw(self):
+        # fd-level output (C extensions, child processes) — attributed to the current run,
+        # as stderr: it arrives on fd 2 and is mostly warnings and crash output
+        fd = self.proc.stderr.fileno()
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            self.frames.put({"id": None, "stream": "stderr", "data": data.decode("utf-8", "replace")})
+
+    def wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            msg = self.frames.get(timeout=max(0.0, deadline - time.monotonic()))
+            if msg is None:
+                raise RuntimeError("worker exited during startup")
+            if msg.get("ready"):
+                return
+
+    def send(self, job):
+        self.proc.stdin.write((json.dumps(job, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.proc.stdin.flush()
+
+    def kill(self):
+        try:
+            if os.name == "posix":
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            else:
+                self.proc.kill()
+        except (OSError, ProcessLookupError):
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+class CodePool:
+    """Pre-started Python workers; run(code) executes a snippet in one of them."""
+
+    def __init__(self, size=2, timeout=30.0, preload=(), max_runs=50, start_timeout=20.0):
+        """
+        size           warm workers for fresh-namespace runs
+        timeout        seconds a run may take before its worker is killed
+        preload        modules each worker imports at startup (missing ones are skipped)
+        max_runs       runs before a worker is retired and replaced
+        """
+        self.size = size
+        self.timeout = timeout
+        self.preload = tuple(preload)
+        self.max_runs = max_runs
+        self.start_timeout = start_timeout
+        self._idle = queue.Queue()
+        self._kernel = None
+        self._kernel_lock = threading.Lock()
+        self._busy = set()
+        self._busy_lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._spawn_async()
+        atexit.register(self.close)  # workers live in their own sessions; don't orphan them
+
+    # ─── Public API ──────────────────────────────────────────
+
+    def run(self, code, on_output=None, keep=False):
+        """
+        Run code (blocking; call from a worker thread). on_output(stream, text)
+        receives output as it is produced. keep=True runs in the persistent
+        kernel. Returns {"ok", "exit", "timed_out", "died", "stopped", "seconds",
+        "restarted"} ("restarted": a fresh kernel was started for this run).
+        """
+        on_output = on_output or (lambda stream, text: None)
+        if keep:
+            with self._kernel_lock:
+                restarted = self._kernel is None
+                if restarted:
+                    self._kernel = self._start()
+                result = self._execute(self._kernel, code, on_output, keep=True)
+                if result["timed_out"] or result["died"]:
+                    self._kernel = None
+                result["restarted"] = restarted
+                return result
+
+        worker = self._idle.get()
+        if isinstance(worker, Exception):
+            self._spawn_async()
+            raise worker
+        result = self._execute(worker, code, on_output, keep=False)
+        if result["timed_out"] or result["died"]:
+            self._spawn_async()  # _execute already killed it
+        elif worker.runs >= self.max_runs:
+            worker.kill()
+            self._spawn_async()
+        else:
+            self._idle.put(worker)
+        result["restarted"] = False
+        return result
+
+    def stop(self):
+        """Kill every run in progress (from any thread); their workers are replaced."""
+        with self._busy_lock:
+            busy = list(self._busy)
+        for worker in busy:
+            worker.stopped = True
+            worker.kill()
+        return len(busy)
+
+    def reset_kernel(self):
+        """Discard the kernel's state (it restarts on the next keep=True run)."""
+        with self._kernel_lock:
+            if self._kernel is not None:
+                self._kernel.kill()
+                self._kernel = None
+
+    def close(self):
+        self._closed = True
+        self.reset_kernel()
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(worker, _Worker):
+                worker.kill()
+
+    # ─── Internals ───────────────────────────────────────────
+
+    def _start(self):
+        worker = _Worker(self.preload)
+        try:
+            worker.wait_ready(self.start_timeout)
+        except Exception:
+            worker.kill()
+            raise
+        return worker
+
+    def _spawn_async(self):
+        def spawn():
+            try:
+                worker = self._start()
+            except Exception as e:  # surfaced to the next run() instead of hanging it
+                self._idle.put(RuntimeError(f"could not start a Python worker: {e}"))
+                return
+            if self._closed:
+                worker.kill()
+            else:
+                self._idle.put(worker)
+        threading.Thread(target=spawn, daemon=True).start()
+
+    def _execute(self, worker, code, on_output, keep):
+        worker.runs += 1
+        job_id = worker.runs
+        start = time.monotonic()
+        deadline = start + self.timeout
+        result = {"ok": False, "exit": None, "timed_out": False, "died": False}
+        with self._busy_lock:
+            self._busy.add(worker)
+        try:
+            worker.send({"id": job_id, "code": code, "keep": keep})
+        except OSError:
+            result["died"] = True
+        while not result["died"]:
+            try:
+                msg = worker.frames.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                result["timed_out"] = True
+                worker.kill()
+                break
+            if msg is None:
+                result["died"] = True
+                result["exit"] = worker.proc.wait()
+                break
+            if msg.get("id") not in (job_id, None):
+                continue  # late output from an earlier run
+            if msg.get("done"):
+                result["ok"], result["exit"] = msg["ok"], msg["exit"]
+                break
+            on_output(msg["stream"], msg["data"])
+        with self._busy_lock:
+            self._busy.discard(worker)
+        if result["died"]:
+            worker.kill()
+        result["stopped"] = worker.stopped
+        result["seconds"] = time.monotonic() - start
+        return result
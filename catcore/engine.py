@@ -0,0 +1,204 @@
+"""
+One entry point to every Cat R1 engine, without a display.
+
+The pipelines behind the front-end scripts live in catcore.engines.*;
+they all speak the same contract:
+
+    engine.process(text, cb_think=None, cb_resp=None, cb_done=None) → reply (None for blank input)
+        cb_think(phase, text)   reasoning phases, when engine.deep_think is on
+        cb_resp(chunk)          the reply in chunks (catcore.streaming): concatenate them
+        cb_done(stats)          a dict; stats["stages"] = per-stage wall time in ms
+    engine.pacer                catcore.pacing.Pacer replaying the output (instant by default)
+    engine.deep_think           reasoning on/off
+
+create() builds one by name. seed= and mem_file= mean the same thing
+for every engine; the remaining keyword arguments go to the engine
+class, which is where the pluggable parts are (router=, reasoner=,
+store= on the pipelines, rng= or profile= on the template engines).
+memory_suffix(name) is the extension that engine's memory file takes:
+
+    from catcore import engine
+    cat = engine.create("catgptv0", seed=7, mem_file="/tmp/mem.jsonl")
+    out = engine.reply(cat, "write a python web scraper")
+    out["response"], out["thinking"], out["stats"]["stages"]
+
+stats(engine) collects the component counters (router, MLA, MTP, …),
+expert_loads(engine) and reasoning(engine) the routing and R1 counters,
+and close(engine) flushes and closes its memory store.
+
+Every engine also has the asyncio form, engine.astream(text) (built on
+astream() below), an async generator of events:
+
+    ("think", phase, text)   a reasoning phase, then its pause
+    ("chunk", text)          part of the reply, at the pacer's speed
+    ("done", stats)          last event; stats as cb_done gets them
+
+The reply is generated up front, as with process(); the presentation is
+then paced with asyncio.sleep and can be cancelled between any two
+events. A cancelled reply is already in the engine's memory, just not
+fully shown.
+
+Engine modules are imported on first create(), so listing names is free.
+"""
+
+import random
+import time
+
+from .pacing import Pacer
+
+
+def _catr1v0(seed, mem_file, **kw):
+    from .engines.catr1v0 import ResponseGenerator
+    return ResponseGenerator(seed, mem_file=mem_file, **kw)
+
+
+def _catgptv0(seed, mem_file, **kw):
+    from .engines.catgptv0 import CatBrain
+    return CatBrain(seed, mem=mem_file, **kw)
+
+
+def _acholding(seed, mem_file, **kw):
+    # uses the random module directly and keeps no memory; seed it for repeatable runs
+    from .engines.acholding import CatBrain
+    if seed is not None:
+        random.seed(seed)
+    return CatBrain(**kw)
+
+
+def _distil(seed, mem_file, **kw):
+    from .engines import distil
+    if seed is not None:
+        kw.setdefault("rng", random.Random(seed))
+    return distil.DistilEngine(mem_file=mem_file or distil.MEM_FILE, **kw)
+
+
+def _companion(profile):
+    def factory(seed, mem_file, **kw):
+        from .engines.companions import Companion
+        if seed is not None:
+            kw.setdefault("rng", random.Random(seed))
+        return Companion(profile, mem_file=mem_file, **kw)
+    factory.mem_suffix = ".json"  # companions save memory as one whole-file JSON array
+    return factory
+
+
+COMPONENTS = ("moe", "mla", "mtp", "dsa")  # engine attributes with get_stats()/stats()
+STORES = ("memory", "mem", "store")          # where engines keep their memory store
+LOADS = ("expert_load", "load")              # router attribute: activations per expert
+THINK_TIME = ("think_time", "think")         # stats key: "1.2s" the thinking phases took on screen
+REASONING = {                                # counter → (component, attributes tried in order)
+    "steps": ("r1", ("reasoning_steps", "steps")),
+    "grpo_groups": ("grpo", ("total_groups", "groups")),
+}
+
+# name → factory(seed, mem_file, **kw); the comment names the front end it drives
+ENGINES = {
+    "catr1v0": _catr1v0,                        # CatR1V0.py
+    "catgptv0": _catgptv0,                      # catgptv0.py
+    "acholding": _acholding,                    # acholdingcatr11.16.26.py
+    "distil": _distil,                          # $CATR1V0.py
+    "catr1": _companion("catr1"),               # #CATR1.py
+    "gpt5-cat": _companion("gpt5-cat"),         # GPT5-CAT-.py
+    "catgpt": _companion("catgpt"),             # catgpt.py
+    "acgpt4k": _companion("acgpt4k"),           # ACGPT4K.py
+    "catr11-1bit": _companion("catr11-1bit"),   # CATR11.16.26.py
+    "catv1gpt": _companion("catv1gpt"),         # catv1gpt.py
+    "acholdinsgpt": _companion("acholdinsgpt"), # #acholdinsgpt-n.py
+}
+
+
+def names():
+    return list(ENGINES)
+
+
+def memory_suffix(name):
+    """Extension for a memory file of engine `name`: ".jsonl" (journal) unless its factory says otherwise."""
+    return getattr(ENGINES[name], "mem_suffix", ".jsonl")
+
+
+def create(name, seed=None, mem_file=None, **kwargs):
+    """A fresh engine; mem_file=None means that engine's default memory location."""
+    try:
+        factory = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"unknown engine {name!r} (one of: {', '.join(ENGINES)})") from None
+    return factory(seed, mem_file, **kwargs)
+
+
+def reply(engine, text):
+    """Run one message to completion: {"thinking": [(phase, text)], "response", "stats"}."""
+    thinking, done = [], []
+    response = engine.process(text, lambda phase, content: thinking.append((phase, content)),
+                              lambda chunk: None, done.append)
+    return {"thinking": thinking, "response": response or "", "stats": done[0] if done else {}}
+
+
+def stats(engine):
+    """{component: its get_stats()/stats()} for the COMPONENTS this engine has."""
+    out = {}
+    for name in COMPONENTS:
+        part = getattr(engine, name, None)
+        get = getattr(part, "get_stats", None) or getattr(part, "stats", None)
+        if callable(get):
+            out[name] = get()
+    return out
+
+
+def expert_loads(engine):
+    """A copy of the router's activation count per expert; None if it keeps none."""
+    router = getattr(engine, "moe", None)
+    for name in LOADS:
+        loads = getattr(router, name, None)
+        if isinstance(loads, list):
+            return list(loads)
+    return None
+
+
+def reasoning(engine):
+    """The REASONING counters this engine has, e.g. {"steps": 12, "grpo_groups": 4}."""
+    out = {}
+    for key, (component, attrs) in REASONING.items():
+        part = getattr(engine, component, None)
+        for attr in attrs:
+            value = getattr(part, attr, None)
+            if isinstance(value, int):
+                out[key] = value
+                break
+    return out
+
+
+def close(engine):
+    """Flush and close the engine's memory store (journals hold a file open)."""
+    for name in STORES:
+        closer = getattr(getattr(engine, name, None), "close", None)
+        if callable(closer):
+            closer()
+            return
+
+
+async def astream(engine, text):
+    """engine.astream(text) for any engine: process() without pacing, then replay it async."""
+    pacer, phases = engine.pacer, []
+    engine.pacer, done = Pacer(), []  # generate now; the real pacer replays below
+    try:
+        response = engine.process(text, lambda phase, content: phases.append((phase, content)),
+                                  lambda chunk: None, done.append)
+    finally:
+        engine.pacer = pacer
+    if response is None:
+        return
+    stats = done[0] if done else {}
+    start = time.perf_counter()
+    for phase, content in phases:
+        yield ("think", phase, content)
+        await pacer.apause()
+    if phases:  # process() timed an instant replay; report this one, as the sync path does
+        think_time = time.perf_counter() - start
+        for key in THINK_TIME:
+            if key in stats:
+                stats[key] = f"{think_time:.1f}s" if think_time > 0 else None
+    async for chunk in pacer.achunks(response):
+        yield ("chunk", chunk)
+    if isinstance(stats.get("stages"), dict):
+        stats["stages"]["streaming"] = (time.perf_counter() - start) * 1000.0
+    yield ("done", stats)
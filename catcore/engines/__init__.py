@@ -0,0 +1,11 @@
+"""
+The inference engines behind the front-end scripts, one module per family:
+
+    catr1v0      CatR1V0.py                 DeepSeek V3/R1 pipeline (ResponseGenerator)
+    catgptv0     catgptv0.py                R2 pipeline (CatBrain)
+    acholding    acholdingcatr11.16.26.py   V4 14B pipeline (CatBrain)
+    distil       $CATR1V0.py                intent templates (DistilEngine)
+    companions   the seven small scripts    keyword rule tables (Companion)
+
+Build them through catcore.engine.create(); nothing here imports tkinter.
+"""
@@ -0,0 +1,188 @@
+"""
+Cat R1 inference engine, DeepSeek V4 14B edition (the pipeline behind
+acholdingcatr11.16.26.py): V4 config, simplified MoE router, R1 chain
+and CatBrain. No tkinter.
+
+CatBrain(router=..., reasoner=...) swaps the MoE router or the R1
+engine for anything with the same methods (route(text) /
+needs_think(text) + chain(text, experts)).
+"""
+import random, textwrap
+from ..engine import astream as _astream
+from ..pacing import Pacer
+from ..timing import StageTimer
+
+# ════════════════════ V4 ARCHITECTURE (14B) ════════════════════
+class V4Config:
+    # 14B Distilled Model Specifications
+    VOCAB_SIZE = 102400
+    HIDDEN_SIZE = 5120
+    INTERMEDIATE_SIZE = 13824
+    NUM_LAYERS = 40
+    NUM_HEADS = 40
+    MAX_CTX = 131072 # 128k Context Window
+    
+    TOTAL_PARAMS = 14_500_000_000  # 14.5B
+    MODEL_NAME = "DeepSeek-V4-14B-Distill"
+    
+class DeepSeekV4_14B:
+    """
+    Simulation of the DeepSeek V4 14B Architecture.
+    Represents the internal state of the 14 billion parameter model.
+    """
+    def __init__(self):
+        self.config = V4Config()
+        self.kv_cache = 0
+        self.active_params = self.config.TOTAL_PARAMS
+        
+        # Simulate Layer initialization
+        self.layers = [f"TransformerBlock_{i}" for i in range(self.config.NUM_LAYERS)]
+        self.heads = [f"AttnHead_{i}" for i in range(self.config.NUM_HEADS)]
+        
+        # State tracking
+        self.context_buffer = []
+        
+    def forward_pass(self, tokens):
+        # Simulate computational cost of 14B params
+        # 14B ops per token roughly
+        self.kv_cache += len(tokens)
+        if self.kv_cache > self.config.MAX_CTX:
+            self.kv_cache = self.config.MAX_CTX # Rotate context
+            
+        return {
+            "logits": [random.random() for _ in range(10)],
+            "usage": f"{len(tokens)} toks processed"
+        }
+
+# ════════════════════ § 1 MoE-256 ROUTER ════════════════════
+class MoERouter:
+    # Simplified Router for 14B model (fewer experts, highly specialized)
+    DOMAINS=[
+        "python_expert","math_solver","logic_core","creative_writing",
+        "system_design","react_frontend","security_audit","data_analysis"
+    ]
+    
+    def __init__(s):
+        s.tok=0
+        
+    def route(s,text):
+        s.tok+=1
+        # Random activation simulation
+        active = []
+        for d in s.DOMAINS:
+            if random.random() > 0.7:
+                active.append({"dom": d, "w": random.random()})
+        
+        # Ensure at least one expert
+        if not active: active.append({"dom": "general_knowledge", "w": 0.9})
+        return active, [0]
+
+    def stats(s):
+        return {"bal":"0.99", "total":s.tok}
+
+# ════════════════════ § 6 R1 REASONING ENGINE ════════════════════
+class R1Engine:
+    AHA=[
+        "wait — {ins}", "oh! *ears perk* {ins}", "💡 hmm... {ins}",
+        "hold on, actually — {ins}", "*tail swish* re-evaluating: {ins}"
+    ]
+    VERIFY=["let me double-check...", "verifying logic...", "sanity check..."]
+    
+    def __init__(s): s.steps=0
+    
+    def needs_think(s,text):
+        kw=["why","how","explain","solve","code","plan","compare","debug"]
+        return any(k in text.lower() for k in kw) or len(text.split())>5
+        
+    def chain(s,query,experts):
+        s.steps+=1
+        phases=[]
+        
+        phases.append(("Routing", f"Query routing to {len(experts)} experts"))
+        
+        if "code" in query.lower():
+            phases.append(("Analysis", "Decomposing requirements -> Implementation Strategy"))
+            phases.append(("Plan", "1. Setup structure\n2. Implement core logic\n3. Add error handling"))
+        elif "math" in query.lower() or any(c in query for c in "+-*/"):
+            phases.append(("Analysis", "Identifying mathematical constraints and axioms"))
+            phases.append(("Solve", "Applying formal verification steps"))
+        else:
+            phases.append(("Analysis", "Analyzing semantic intent and tonal requirements"))
+            
+        ins = "this requires a structured approach"
+        phases.append(("Aha!", random.choice(s.AHA).format(ins=ins)))
+        phases.append(("Verify", random.choice(s.VERIFY) + " ✓"))
+        phases.append(("Synthesize", "Compiling final response"))
+        
+        return phases
+
+# ════════════════════ § 7 BRAIN ════════════════════
+class CatBrain:
+    def __init__(s, router=None, reasoner=None):
+        # Initialize the 14B Model Core
+        s.llm = DeepSeekV4_14B()
+        s.moe = router or MoERouter()
+        s.r1 = reasoner or R1Engine()
+        s.deep_think = True
+        s.web_search = False
+        s.pacer = Pacer() # presentation speed; instant unless the GUI sets one
+        
+    def process(s, text, cb_think, cb_resp, cb_done):
+        # Generate everything first; s.pacer handles the typing effect
+        tm = StageTimer()
+        # 1. Route
+        experts, _ = s.moe.route(text)
+        tm.lap("routing")
+        
+        # 2. Reasoning (R1)
+        chain = s.r1.chain(text, experts) if s.deep_think and s.r1.needs_think(text) else []
+        tm.lap("reasoning")
+        
+        # 3. Forward Pass (Simulation)
+        s.llm.forward_pass(text.split())
+        tm.lap("forward")
+        
+        # 4. Generate
+        resp = s._gen_resp(text)
+        tm.lap("generation")
+        
+        # 5. Present (think pauses + typing, at the GUI's pace);
+        #    cb_resp receives chunks — whole words, batched per flush
+        for phase, content in chain:
+            s.pacer.think(cb_think, phase, content)
+        s.pacer.stream(resp, cb_resp)
+        tm.lap("streaming")
+            
+        cb_done({"experts":experts, "time": "0.4s", "grm": "0.99", "model": V4Config.MODEL_NAME,
+                 "stages": tm.stages})
+        return resp
+
+    async def astream(s, text):
+        # process() for asyncio: ("think", phase, text) / ("chunk", text) / ("done", stats),
+        # paced with asyncio.sleep and cancellable between events
+        async for ev in _astream(s, text):
+            yield ev
+
+    def _gen_resp(s, text):
+        t = text.lower()
+        if "code" in t or "function" in t:
+            return textwrap.dedent("""\
+                Here is the implementation using the V4 architecture.
+                
+                ```python
+                def optimize_data(data):
+                    # Optimized R1-Lite logic
+                    # V4 14B Distilled Efficiency
+                    result = []
+                    for item in data:
+                        if validate(item):
+                            result.append(process(item))
+                    return result
+                ```
+                
+                The dense 14B parameter set ensures this runs extremely fast while maintaining R1-level reasoning. 🐾
+            """)
+        elif "hello" in t or "hi" in t:
+            return f"Meow! I mean, Hello! *stretches* I'm Cat R1, running on the new {V4Config.MODEL_NAME} architecture. Fast, smart, and efficient. What can I do for you? 🐾"
+        else:
+            return f"That's an interesting point about '{text}'.\n\nBased on my V4 analysis (running on {V4Config.NUM_LAYERS} layers), the key factors are clarity and structure. The 14B distilled model suggests focusing on the core axioms.\n\nI can break this down further if you'd like! *purrs*"
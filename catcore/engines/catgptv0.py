@@ -0,0 +1,1525 @@
+"""
+Cat R1 inference engine, R2 edition (the pipeline behind catgptv0.py):
+R2 config, MoE 3.0 router, MLA, DSA, GRPO, GRM, SPCT, R1-Zero, the
+generator (CatBrain) and chat history. No tkinter.
+
+    b=CatBrain(seed=7); b.process("write a python web scraper",on_think,on_chunk,on_done)
+
+CatBrain(router=,reasoner=,store=) swap the MoE router, the R1-Zero
+engine and the memory journal for anything with the same methods.
+"""
+import math,os,random,re,textwrap,time
+from collections import defaultdict
+from datetime import datetime
+from .. import routing
+from ..balance import BiasBalancer
+from ..cache import LRUCache
+from ..engine import astream as _astream
+from ..journal import JournalStore
+from ..matcher import KeywordMatcher
+from ..pacing import Pacer
+from ..sessions import SessionStore
+from ..timing import StageTimer
+
+MEM=os.path.expanduser("~/.catr1_mem.jsonl")
+MEM_LEGACY=os.path.expanduser("~/.catr1_mem.json")  # pre-journal whole-file format
+HIST=os.path.expanduser("~/.catr1_hist")  # index.json + one .jsonl per session
+HIST_LEGACY=os.path.expanduser("~/.catr1_hist.json")  # pre-index whole-file format
+
+# ════════════════════ R2 CONFIG — exact leaked weights ════════════════════
+class R2:
+    TOTAL_PARAMS=1_200_000_000_000;ACTIVE_PARAMS=78_000_000_000
+    ACTIVE_PCT=6.5;CONTEXT=131072;VOCAB=129280
+    N_LAYERS=95;DENSE_LAYERS=3;MOE_LAYERS=92
+    N_EXPERTS=256;SHARED=1;GROUPS=8;PER_GROUP=32
+    TOP_GROUPS=4;TOP_EXPERTS=8;EXPERT_DIM=2048
+    GAMMA=0.001;ALPHA=0.0001
+    BIAS_INTERVAL=10;BIAS_WINDOW=None  # aux-free update every N msgs; load decay window
+    ROUTE_CACHE=512  # cached routing decisions per (text, bias version); 0=off
+    # MLA dims (from V3 paper)
+    D_MODEL=7168;N_HEADS=128;D_HEAD=128
+    KV_RANK=512;Q_RANK=1536;ROPE_DIM=64
+    KV_CACHE=576;STD_CACHE=32768;COMPRESS_RATIO=56.9
+    # MTP
+    MTP_DEPTH=1;MTP_LAMBDA=0.3;MTP_ACCEPT=0.87
+    # DSA (V3.2)
+    DSA_TOPK=2048;DSA_INDEXER_HEADS=4
+    # GRPO
+    GRPO_G=16;GRPO_EPS=10.0;GRPO_BETA=0.001
+    # FP8
+    FP8_MAX=448.0;FP8_COVERAGE=0.83
+    # pricing
+    INPUT_COST="$0.07/M";OUTPUT_COST="$0.27/M"
+    TRAINING="5.2PB";TRAIN_COST="$5.6M"
+
+# ════════════════════ § 1 MoE-256 ROUTER ════════════════════
+class MoERouter:
+    """
+    Hybrid MoE 3.0: 256 experts, 8 groups×32, top-4 groups→top-8 experts.
+    Sigmoid gating s_{i,t}=σ(u_t·e_i). Aux-loss-free bias γ=0.001.
+    """
+    DOMAINS=[
+        # G0: Language (0-31)
+        "greeting","farewell","casual","emotional","comfort","encourage",
+        "humor","sarcasm","qa","clarify","rephrase","translate",
+        "grammar","vocab","idiom","tone","formal","informal","persuade",
+        "negotiate","story","worldbuild","character","dialogue",
+        "poetry","metaphor","analogy","describe","instruct","tutorial",
+        "explain","define",
+        # G1: Code (32-63)
+        "python","javascript","typescript","rust","c_cpp","java","go",
+        "swift","html_css","react","sql","bash","regex","algorithm",
+        "data_struct","complexity","debug","testing","refactor","optimize",
+        "api_design","sys_design","architecture","patterns","git","devops",
+        "database","networking","security","crypto","ml_code","gamedev",
+        # G2: Math (64-95)
+        "arithmetic","algebra","linear_alg","calculus","diff_eq",
+        "number_theory","combinatorics","graph_theory","geometry",
+        "topology","probability","statistics","optimization","numerical",
+        "set_theory","formal_logic","proof","theorem","modeling",
+        "game_theory","info_theory","signal_proc","chaos","fractals",
+        "category","abstract_alg","real_analysis","complex_analysis",
+        "tensor","variational","fourier","laplace",
+        # G3: Science (96-127)
+        "classical_phys","quantum","relativity","thermo","organic_chem",
+        "inorganic_chem","biochem","materials","cell_bio","evolution",
+        "genetics","ecology","neuro","psychology","cognitive","linguistics",
+        "astronomy","cosmology","geology","climate","medicine","pharma",
+        "epidemiology","anatomy","cs_theory","ai_ml","nlp","cv",
+        "robotics","hci","quantum_comp","bioinformatics",
+        # G4: Reasoning (128-159)
+        "chain_thought","step_by_step","decompose","synthesis","compare",
+        "evaluate","critique","verify","hypothesis","deduction","induction",
+        "abduction","causal","counterfactual","analogy_reason","spatial",
+        "temporal","quantitative","qualitative","risk","decision","planning",
+        "scheduling","priority","troubleshoot","root_cause","error_analysis",
+        "edge_case","abstraction","generalize","specialize","transfer",
+        # G5: Knowledge (160-191)
+        "history_ancient","history_modern","history_tech","geography",
+        "philosophy","ethics","polisci","economics","law","sociology",
+        "anthropology","archaeology","literature","art_history","music",
+        "film","religion","mythology","folklore","culture","business",
+        "marketing","finance","accounting","education","pedagogy",
+        "project_mgmt","leadership","nutrition","fitness","cooking","travel",
+        # G6: Tools (192-223)
+        "unix","windows","filesystem","process","git_adv","docker",
+        "kubernetes","cicd","web_search","scraping","api_call","webhook",
+        "code_interp","repl","notebook","sandbox","text_fmt","markdown",
+        "latex","typeset","img_desc","chart_gen","diagram","viz",
+        "pdf","doc_parse","spreadsheet","presentation","mem_store",
+        "mem_recall","ctx_mgmt","session",
+        # G7: Meta/Cat (224-255)
+        "self_desc","capability","limitation","confidence","cat_persona",
+        "purr","meow","cat_wisdom","eloquence","warmth","empathy",
+        "patience","safety","harm_prevent","boundary","redirect",
+        "fmt_choose","length_adapt","detail","audience","multi_turn",
+        "ctx_track","ref_back","continue","ambiguity","intent",
+        "task_decomp","delegate","moe_self","mla_self","dsa_self","arch_self",
+    ]
+    KW={
+        "hi":[0],"hello":[0],"hey":[0,2],"bye":[1],"thanks":[0,4],
+        "help":[8,30],"feel":[3,4],"sad":[3],"happy":[3,5],"joke":[6],
+        "story":[20,22],"poem":[24,25],"explain":[30,128],"define":[31],
+        "write":[16,20,30],"python":[32],"code":[32,33,45],"javascript":[33],
+        "js":[33],"typescript":[34],"rust":[35],"c++":[36],"java":[37],
+        "html":[40],"css":[40],"react":[41],"sql":[42],"bash":[43,192],
+        "algorithm":[45,46],"debug":[48],"bug":[48],"test":[49],
+        "api":[52],"design":[53,54],"git":[56],"database":[58],
+        "math":[64,65],"calculate":[64],"solve":[64,65],"equation":[65],
+        "calculus":[67],"probability":[74],"statistics":[75],"proof":[80],
+        "geometry":[72],"logic":[79,128],"physics":[96,97],"quantum":[97],
+        "chemistry":[100],"biology":[104],"ai":[121],"machine learning":[121],
+        "think":[128,129],"reason":[128],"step":[129],"compare":[132],
+        "analyze":[131],"why":[140],"how":[129,130],"plan":[149],
+        "history":[160,161],"philosophy":[164],"economics":[167],
+        "business":[180],"finance":[182],"cook":[190],"recipe":[190],
+        "terminal":[192],"command":[192],"file":[194],"search":[200],
+        "run":[208],"format":[216],"markdown":[217],
+        "who are you":[224,226],"what are you":[224],"cat":[228,229],
+        "meow":[230,228],"purr":[229],"architecture":[255,253],
+    }
+    # keyword hits over the message, domain-word hits per word: compiled on the
+    # first route (not at import), then shared read-only by every router
+    KW_M=DOM_EXP=DOM_M=None
+    @classmethod
+    def _index(c):
+        if c.DOM_M is not None: return
+        dom=defaultdict(list)
+        for i,d in enumerate(c.DOMAINS):
+            for dw in set(d.split("_")):
+                if len(dw)>2: dom[dw].append(i)
+        c.KW_M=KeywordMatcher(c.KW);c.DOM_EXP=dom;c.DOM_M=KeywordMatcher(dom)  # DOM_M last: it marks "built"
+    def __init__(s,rng=None):
+        s.rng=rng if rng is not None else random
+        # routing noise comes from _noise(text), not s.rng: a cache hit and a miss leave the
+        # brain's random stream alike (seeded runs don't depend on the cache), at the cost of a
+        # repeated prompt getting the same noise every time instead of a fresh sample
+        s.nseed=s.rng.getrandbits(64)
+        s.bal=BiasBalancer(256,R2.GAMMA,R2.BIAS_INTERVAL,R2.BIAS_WINDOW)
+        s.cache=LRUCache(R2.ROUTE_CACHE)
+        s.load=[0]*256;s.tok=0;s.hist=[]
+    def _sig(s,x): return 1/(1+math.exp(-max(-20,min(20,x))))
+    def _noise(s,tl): return random.Random(f"{s.nseed}:{tl}")
+    def _scores(s,tl,noise):
+        """pre-gate keyword/domain scores for one lower-cased message (sparse hits only)"""
+        s._index();words=tl.split()
+        scores=[0.0]*256
+        hits=[s.KW[kw] for kw in s.KW_M.findall(tl)]
+        for w in words:
+            for experts in hits:
+                for e in experts: scores[e]=max(scores[e],0.85+noise.gauss(0,0.03))
+            for dw in s.DOM_M.findall(w):
+                for i in s.DOM_EXP[dw]: scores[i]=max(scores[i],0.55)
+        return scores
+    def route(s,text):
+        # selection cached per (scored text, bias version) until the balancer next moves a bias;
+        # noise depends only on the text, so a hit is exactly what a miss computes. Load accounting always runs
+        tl=text.lower();key=(tl,s.bal.version);hit=s.cache.get(key)
+        if hit is not None: return s._activate(text,*hit)
+        aff=s._affinities(tl)
+        sel_g,top8=routing.select_experts(aff,s.bal.biases(),R2.GROUPS,R2.PER_GROUP,R2.TOP_GROUPS,R2.TOP_EXPERTS)
+        s.cache.put(key,(tuple(sel_g),tuple(top8)))
+        return s._activate(text,sel_g,top8)
+    def _affinities(s,tl):
+        n=s._noise(tl);return [s._sig(sc*4-2+n.gauss(0,0.02)) for sc in s._scores(tl,n)]
+    def route_batch(s,texts):
+        """
+        Route many messages at once (log replay). (batch×256) affinity matrix;
+        σ + selection run as NumPy array ops when available, per-row Python
+        otherwise. Biases stay frozen for the batch; loads/bias updates are
+        applied per message afterwards. Cached prompts are skipped; the rest
+        are scored once each, with the same noise route() would draw.
+        """
+        texts=list(texts);v=s.bal.version
+        keys=[(t.lower(),v) for t in texts]
+        found,todo={},{}
+        for k,t in zip(keys,texts):
+            if k in found or k in todo: continue
+            hit=s.cache.get(k)
+            if hit is None: todo[k]=t
+            else: found[k]=hit
+        if todo:
+            if routing.HAVE_NUMPY:
+                np=routing.numpy();pre=np.empty((len(todo),256))
+                for r,(tl,_) in enumerate(todo):
+                    n=s._noise(tl);sc=s._scores(tl,n)
+                    pre[r]=[x*4-2+n.gauss(0,0.02) for x in sc]
+                aff=routing.sigmoid_matrix(pre)
+            else:
+                aff=[s._affinities(tl) for tl,_ in todo]
+            sel=routing.select_batch(aff,s.bal.biases(),R2.GROUPS,R2.PER_GROUP,R2.TOP_GROUPS,R2.TOP_EXPERTS)
+            for k,(g,top) in zip(todo,sel):
+                found[k]=(tuple(g),tuple(top));s.cache.put(k,found[k])
+        return [s._activate(t,*found[k]) for t,k in zip(texts,keys)]
+    def _activate(s,text,sel_g,top8):
+        s.tok+=1
+        total=sum(r for _,r,_ in top8) or 1.0
+        activated=[]
+        for _,raw,idx in top8:
+            w=raw/total;s.load[idx]+=1
+            activated.append({"id":idx,"dom":s.DOMAINS[idx] if idx<len(s.DOMAINS) else f"e{idx}",
+                              "g":idx//32,"w":w})
+        s.bal.record([idx for _,_,idx in top8])  # aux-free bias update, O(k)
+        s.hist.append({"t":text[:40],"e":[e["dom"] for e in activated[:3]]})
+        if len(s.hist)>50: s.hist=s.hist[-25:]
+        return activated,list(sel_g)
+    def stats(s):
+        t=sum(s.load);mx=max(s.load) if s.load else 1
+        bal=(t/256)/mx if mx>0 else 1.0
+        top=sorted(((s.load[i],i) for i in range(256) if s.load[i]>0),reverse=True)[:5]
+        return {"bal":f"{bal:.3f}","total":t,"cache":s.cache.stats(),
+                "top":[(s.DOMAINS[i] if i<len(s.DOMAINS) else f"e{i}",c) for c,i in top]}
+
+# ════════════════════ § 2 MLA ════════════════════
+class MLA:
+    def __init__(s): s.tokens=0;s.saved=0
+    def compress(s,n):
+        s.tokens+=n
+        std=n*R2.STD_CACHE*2;comp=n*R2.KV_CACHE*2
+        s.saved+=std-comp
+        return f"{R2.COMPRESS_RATIO:.0f}×"
+    def stats(s): return f"tokens={s.tokens} saved={s.saved//1048576}MB ratio={R2.COMPRESS_RATIO:.0f}×"
+
+# ════════════════════ § 3 DSA (V3.2) ════════════════════
+class DSA:
+    """DeepSeek Sparse Attention: lightning indexer + top-k selection."""
+    def __init__(s): s.calls=0;s.tokens_skipped=0
+    def select(s,seq_len):
+        s.calls+=1;selected=min(R2.DSA_TOPK,seq_len)
+        s.tokens_skipped+=max(0,seq_len-selected)
+        return {"selected":selected,"skipped":seq_len-selected,
+                "ratio":f"{selected/max(1,seq_len)*100:.0f}%"}
+
+# ════════════════════ § 4 GRPO (V3.2 Scalable) ════════════════════
+class GRPO:
+    """Scalable GRPO: unbiased KL, off-policy mask, keep-routing, keep-sampling-mask."""
+    def __init__(s): s.groups=0;s.best=[]
+    def select(s,cands,scores):
+        s.groups+=1;n=len(scores)
+        if n<2: return cands[0] if cands else "",0
+        mu=sum(scores)/n;sd=math.sqrt(sum((x-mu)**2 for x in scores)/n) or 1
+        adv=[(scores[i]-mu)/sd for i in range(n)]
+        best=max(range(n),key=lambda i:adv[i])
+        s.best.append(scores[best])
+        return cands[best],adv[best]
+
+# ════════════════════ § 5 GRM + SPCT (R2-specific) ════════════════════
+class GRM:
+    """Generative Reward Modeling — model grades its own output."""
+    RUBRICS=["accuracy","helpfulness","clarity","completeness","safety"]
+    def __init__(s,rng=None): s.evals=0;s.rng=rng if rng is not None else random
+    def score(s,response,query):
+        s.evals+=1
+        scores={r:s.rng.uniform(0.7,1.0) for r in s.RUBRICS}
+        # Boost relevant rubrics
+        if "?" in query: scores["helpfulness"]=min(1,scores["helpfulness"]+0.1)
+        if any(w in query.lower() for w in ["code","python","function"]):
+            scores["accuracy"]=min(1,scores["accuracy"]+0.15)
+        return sum(scores.values())/len(scores),scores
+
+class SPCT:
+    """Self-Principled Critique Tuning — self-reflection loop."""
+    def __init__(s): s.critiques=0
+    def critique(s,response):
+        s.critiques+=1
+        issues=[]
+        if len(response)<20: issues.append("response may be too brief")
+        if not any(c in response for c in ".!?"): issues.append("missing punctuation")
+        return {"passed":len(issues)==0,"issues":issues}
+
+# ════════════════════ § 6 R1-ZERO REASONING ENGINE ════════════════════
+class R1Zero:
+    """
+    Emergent reasoning from pure RL (arxiv 2501.12948).
+    4-phase: reason→aha→verify→respond.
+    """
+    AHA=[
+        "wait — {ins}","oh! *ears perk* {ins}","💡 hmm... {ins}",
+        "hold on, actually — {ins}","*tail swish* that changes things: {ins}",
+        "interesting... let me reconsider. {ins}",
+    ]
+    VERIFY=["let me double-check...","verifying my logic...","sanity check...",
+            "*squints* checking this carefully..."]
+    THINK_KW=KeywordMatcher(["why","how","explain","prove","analyze","compare","solve","calculate",
+        "debug","design","implement","plan","research","think","evaluate","what if",
+        "create","build","write a","make a","generate"])
+    def __init__(s,grpo,rng=None): s.grpo=grpo;s.steps=0;s.rng=rng if rng is not None else random
+    def needs_think(s,text):
+        sc=s.THINK_KW.count(text.lower())+len(text.split())/25
+        return sc>=1.2
+    def chain(s,query,experts):
+        s.steps+=1;q=query.lower();phases=[]
+        doms=[e["dom"] for e in experts[:4]]
+        # Phase 1: Reasoning
+        r=f"routing through {len(experts)} experts: {', '.join(doms)}\n"
+        if any(w in q for w in ["and","also","then","first"]):
+            parts=[p.strip() for p in re.split(r'\band\b|\balso\b|,',q) if p.strip()]
+            r+="decomposing:\n"+"\n".join(f"  → {p}" for p in parts[:4])+"\n"
+        if any(w in q for w in ["code","implement","build","write","create","function","class"]):
+            r+="strategy: code generation pipeline\n  parse requirements → design → implement → verify"
+        elif any(w in q for w in ["math","calculate","solve","prove","equation"]):
+            r+="strategy: mathematical reasoning\n  formalize → apply → derive → verify"
+        elif any(w in q for w in ["explain","what","how","why","describe"]):
+            r+="strategy: explanatory reasoning\n  identify core → build intuition → examples"
+        else:
+            r+="strategy: multi-expert synthesis"
+        phases.append(("reasoning",r))
+        # Phase 2: Aha
+        if any(w in q for w in ["code","python"]): ins="the implementation pattern is clearer now"
+        elif any(w in q for w in ["math","calc"]): ins="there's a simpler path through this"
+        elif any(w in q for w in ["debug","fix","error"]): ins="the root cause is upstream"
+        elif any(w in q for w in ["compare","vs","difference"]): ins="the key distinction is the design philosophy"
+        else: ins="cross-domain synthesis reveals a cleaner approach"
+        phases.append(("aha",s.rng.choice(s.AHA).format(ins=ins)))
+        # Phase 3: Verify
+        v=s.rng.choice(s.VERIFY)+"\n"
+        for e in experts[:3]: v+=f"  [{e['dom']}] w={e['w']:.3f} ✓\n"
+        v+="reasoning verified ✓"
+        phases.append(("verify",v))
+        return phases
+
+# ════════════════════ § 7 RESPONSE GENERATOR — Actually functional ════════════════════
+class CatBrain:
+    """
+    Full R2 inference pipeline that actually generates useful responses.
+    Handles: code gen, math, explanations, creative writing, Q&A, conversation.
+    One random.Random (s.rng) feeds routing noise, GRM, R1 and the cat picks:
+    same seed → same conversation.
+    """
+    def __init__(s,seed=None,mem=None,db=None,router=None,reasoner=None,store=None):
+        """router: route(text)→(experts,groups),stats() · reasoner: needs_think(text),chain(text,experts),steps · store: append(rec)"""
+        s.seed=seed;s.rng=random.Random(seed) if seed is not None else random;s.mem_path=mem or MEM
+        s.moe=router or MoERouter(s.rng);s.mla=MLA();s.dsa=DSA();s.grpo=GRPO()
+        s.grm=GRM(s.rng);s.spct=SPCT();s.r1=reasoner or R1Zero(s.grpo,s.rng)
+        s.deep_think=True
+        # memory journal: one appended line per turn, compacted to the last 100;
+        # with a SQLiteDB everything is kept there (journal imported on first open)
+        journal=lambda:JournalStore(s.mem_path,keep=100,legacy_path=MEM_LEGACY if s.mem_path==MEM else None,
+                                    legacy_convert=lambda d:(d.get("conv",[]),{"facts":d.get("facts",{})}))
+        if store is not None: s.mem=store
+        elif db is None: s.mem=journal()
+        else:
+            from ..sqlstore import SQLiteMemory  # only with a database
+            s.mem=SQLiteMemory(db,source=journal if os.path.exists(s.mem_path) or os.path.exists(MEM_LEGACY) else None)
+        s.pacer=Pacer()  # presentation speed; instant unless the front end sets one
+    def _remember(s,role,text):
+        try: s.mem.append({"r":role,"c":text,"t":datetime.now().isoformat()})
+        except OSError: pass
+    def process(s,text,cb_think=None,cb_resp=None,cb_done=None):
+        """
+        full pipeline → response text. Everything is generated first, then
+        s.pacer replays think phases + reply (instant by default); cb_resp
+        gets the reply in chunks (catcore.streaming) — concatenate them.
+        stats["stages"] = per-stage wall time (ms)
+        """
+        t0=time.time();text=text.strip()
+        if not text: return None
+        tm=StageTimer()
+        s._remember("user",text)
+        experts,groups=s.moe.route(text);tm.lap("routing")
+        s.mla.compress(len(text.split()));tm.lap("mla")
+        s.dsa.select(len(text.split()));tm.lap("dsa")
+        phases=s.r1.chain(text,experts) if s.deep_think and s.r1.needs_think(text) else []
+        tm.lap("reasoning")
+        resp=s._generate(text,experts);tm.lap("generation")
+        # GRM self-score
+        score,_=s.grm.score(resp,text);tm.lap("grm")
+        # SPCT self-critique
+        crit=s.spct.critique(resp)
+        if not crit["passed"] and len(resp)<30:
+            resp+="\n\n*tilts head* let me know if you need more detail! 🐾"
+        tm.lap("spct")
+        s._remember("cat",resp);tm.lap("memory_save")
+        # Present at the front end's pace
+        think_time=0
+        if phases:
+            t1=time.time()
+            for phase,content in phases: s.pacer.think(cb_think or (lambda *a:None),phase,content)
+            think_time=time.time()-t1
+        if cb_resp: s.pacer.stream(resp,cb_resp)
+        tm.lap("streaming")
+        stats={"time":f"{time.time()-t0:.1f}s",
+               "think":f"{think_time:.1f}s" if think_time>0 else None,
+               "experts":[(e["dom"],f"{e['w']:.3f}") for e in experts[:4]],
+               "groups":groups,"grm":f"{score:.2f}","stages":tm.stages}
+        if cb_done: cb_done(stats)
+        return resp
+    async def astream(s,text):
+        """process() for asyncio: yields ("think",phase,text)/("chunk",text)/("done",stats), cancellable between events"""
+        async for ev in _astream(s,text): yield ev
+
+    # ─── The actual generation engine ────────────────────────
+    def _generate(s,text,experts):
+        t=text.lower().strip();doms=set(e["dom"] for e in experts)
+        # ── Greetings
+        if re.match(r'^(hi|hello|hey|sup|yo|greetings|howdy|hiya)\b',t) and len(t.split())<=4:
+            return s.rng.choice([
+                "hi there! *stretches luxuriously* what can i help with today? 🐾",
+                "mrrp! *blinks slowly* hello, favorite human! what shall we explore? ✨",
+                "hewwo! *perks up* ready to think, code, or just chat! 🐱",
+                "*pads over and headbutts your hand* hey! what's on your mind? 💫",
+            ])
+        # ── Self-description
+        if any(p in t for p in ["who are you","what are you","introduce yourself","about you"]):
+            return s._self_desc()
+        # ── Architecture
+        if any(p in t for p in ["architecture","how do you work","your design","your brain","moe","mla","dsa"]):
+            return s._arch_desc(experts)
+        # ── Code generation (BIG category)
+        if s._is_code_request(t):
+            return s._gen_code(text,t,experts)
+        # ── Math
+        if s._is_math(t):
+            return s._gen_math(text,t)
+        # ── Explanation
+        if any(t.startswith(p) for p in ["explain","what is","what are","how does","how do","tell me about","describe"]):
+            return s._gen_explain(text,t,experts)
+        # ── Lists/recommendations
+        if any(p in t for p in ["list of","give me","top ","best ","recommend","suggest"]):
+            return s._gen_list(text,t,experts)
+        # ── Creative writing
+        if any(p in t for p in ["write a story","write a poem","write me","creative","fiction"]):
+            return s._gen_creative(text,t)
+        # ── Translation
+        if any(p in t for p in ["translate","in spanish","in french","in japanese","in german"]):
+            return s._gen_translate(text,t)
+        # ── Comparison
+        if any(p in t for p in [" vs "," versus ","compare","difference between","differences"]):
+            return s._gen_compare(text,t,experts)
+        # ── Yes/No questions
+        if t.startswith(("is ","are ","can ","does ","do ","will ","should ","would ","could ")):
+            return s._gen_answer(text,t,experts)
+        # ── General catch-all
+        return s._gen_general(text,t,experts)
+
+    CODE_KW=KeywordMatcher([
+        "code","function","script","program","implement","class ","def ",
+        "write a program","create a","build a","make a function","algorithm for",
+        "write python","write javascript","write rust","write java","write html",
+        "write css","write sql","write bash","write go","write swift",
+        "fibonacci","sort","binary search","linked list","http server",
+        "web scraper","calculator","game","todo","api","regex for",
+    ])
+    MATH_KW=KeywordMatcher(["calculate","compute","solve","what is ","what's ",
+        "evaluate","derivative","integral","sum of","product of","factorial",
+        "square root","sqrt","sin","cos","tan","log","ln ","how much is"])
+
+    def _is_code_request(s,t):
+        return s.CODE_KW.any(t)
+
+    def _is_math(s,t):
+        return s.MATH_KW.any(t) or \
+            bool(re.search(r'\d+\s*[\+\-\*\/\%\^]\s*\d+',t))
+
+    # ─── CODE GENERATION ─────────────────────────────────────
+    def _gen_code(s,raw,t,experts):
+        lang="python"
+        for l in ["javascript","typescript","rust","java","go","swift","c++","c#","html","css","sql","bash","ruby","php"]:
+            if l in t: lang=l;break
+
+        intro=s.rng.choice([
+            "*adjusts tiny reading glasses* let me code that up!",
+            "*cracks paws* time to write some magic ✨",
+            "ooh, code time! *wiggles into position*",
+            "*opens laptop with both paws* let's build this!",
+        ])
+
+        code=None
+
+        # ── Specific patterns
+        if "hello world" in t:
+            code=s._hw(lang)
+        elif "fibonacci" in t:
+            code=s._fib(lang)
+        elif "sort" in t and ("merge" in t or "quick" in t or "bubble" in t or "sort" in t):
+            code=s._sort(lang,t)
+        elif "binary search" in t:
+            code=s._bsearch(lang)
+        elif "factorial" in t:
+            code=s._factorial(lang)
+        elif "prime" in t:
+            code=s._primes(lang)
+        elif "palindrome" in t:
+            code=s._palindrome(lang)
+        elif "reverse" in t and "string" in t:
+            code=s._reverse_str(lang)
+        elif "http" in t and "server" in t:
+            code=s._http_server(lang)
+        elif "web" in t and "scrap" in t:
+            code=s._scraper(lang)
+        elif "calculator" in t:
+            code=s._calculator(lang)
+        elif "todo" in t:
+            code=s._todo(lang)
+        elif "linked list" in t:
+            code=s._linked_list(lang)
+        elif "stack" in t:
+            code=s._stack(lang)
+        elif "binary tree" in t or "bst" in t:
+            code=s._bst(lang)
+        elif "fizzbuzz" in t or "fizz buzz" in t:
+            code=s._fizzbuzz(lang)
+        elif "game" in t:
+            code=s._game(lang,t)
+        elif "regex" in t:
+            code=s._regex_helper(lang,t)
+        elif "api" in t or "fetch" in t or "request" in t:
+            code=s._api_code(lang,t)
+        elif "class" in t or "oop" in t:
+            code=s._class_code(lang,t)
+        elif "file" in t and ("read" in t or "write" in t):
+            code=s._file_io(lang,t)
+
+        if code is None:
+            # Generic: extract what they want and make a template
+            topic=re.sub(r'(write|create|make|build|implement|code|generate)\s*(a|an|me|the|some)?\s*','',raw,flags=re.I).strip()
+            topic=re.sub(r'\s+in\s+(python|javascript|typescript|rust|java|go|swift|bash|html|css|sql)\s*$','',topic,flags=re.I).strip()
+            if not topic: topic="requested functionality"
+            code=s._generic_code(lang,topic)
+
+        explain=s._code_explain(code,lang)
+        closer=s.rng.choice([
+            "want me to modify anything or add features? 🐾",
+            "let me know if you'd like changes! ✨",
+            "happy to extend this further! 🐱",
+        ])
+        return f"{intro}\n\n```{lang}\n{code}\n```\n\n{explain}\n\n{closer}"
+
+    def _hw(s,l):
+        m={"python":'print("Hello, World! 🐾 — from Cat R1")',
+           "javascript":'console.log("Hello, World! 🐾 — from Cat R1");',
+           "typescript":'const greeting: string = "Hello, World! 🐾";\nconsole.log(greeting);',
+           "rust":'fn main() {\n    println!("Hello, World! 🐾 — from Cat R1");\n}',
+           "java":'public class Hello {\n    public static void main(String[] args) {\n        System.out.println("Hello, World! 🐾");\n    }\n}',
+           "go":'package main\n\nimport "fmt"\n\nfunc main() {\n    fmt.Println("Hello, World! 🐾")\n}',
+           "bash":'#!/bin/bash\necho "Hello, World! 🐾 — from Cat R1"',
+           "html":'<!DOCTYPE html>\n<html><head><title>Cat R1</title></head>\n<body><h1>Hello, World! 🐾</h1></body></html>',
+           "sql":"SELECT 'Hello, World! 🐾' AS greeting;",}
+        return m.get(l,m["python"])
+
+    def _fib(s,l):
+        if l=="python":
+            return textwrap.dedent("""\
+            def fibonacci(n: int) -> list[int]:
+                \"\"\"Generate first n Fibonacci numbers.\"\"\"
+                if n <= 0:
+                    return []
+                if n == 1:
+                    return [0]
+                fib = [0, 1]
+                for _ in range(2, n):
+                    fib.append(fib[-1] + fib[-2])
+                return fib
+
+            # Generate and display
+            for i, num in enumerate(fibonacci(15)):
+                print(f"F({i}) = {num}")""")
+        elif l=="javascript":
+            return textwrap.dedent("""\
+            function fibonacci(n) {
+                if (n <= 0) return [];
+                if (n === 1) return [0];
+                const fib = [0, 1];
+                for (let i = 2; i < n; i++) {
+                    fib.push(fib[i-1] + fib[i-2]);
+                }
+                return fib;
+            }
+
+            fibonacci(15).forEach((num, i) => console.log(`F(${i}) = ${num}`));""")
+        elif l=="rust":
+            return textwrap.dedent("""\
+            fn fibonacci(n: usize) -> Vec<u64> {
+                if n == 0 { return vec![]; }
+                if n == 1 { return vec![0]; }
+                let mut fib = vec![0u64, 1];
+                for i in 2..n {
+                    let next = fib[i-1] + fib[i-2];
+                    fib.push(next);
+                }
+                fib
+            }
+
+            fn main() {
+                for (i, num) in fibonacci(15).iter().enumerate() {
+                    println!("F({}) = {}", i, num);
+                }
+            }""")
+        return s._fib_generic(l)
+
+    def _fib_generic(s,l):
+        return textwrap.dedent("""\
+        def fibonacci(n):
+            a, b = 0, 1
+            result = []
+            for _ in range(n):
+                result.append(a)
+                a, b = b, a + b
+            return result
+
+        print(fibonacci(15))""")
+
+    def _sort(s,l,t):
+        if "merge" in t: return s._merge_sort(l)
+        if "bubble" in t: return s._bubble_sort(l)
+        return s._quicksort(l)
+
+    def _quicksort(s,l):
+        if l=="python":
+            return textwrap.dedent("""\
+            def quicksort(arr: list) -> list:
+                \"\"\"Quicksort — O(n log n) average, in-place partition.\"\"\"
+                if len(arr) <= 1:
+                    return arr
+                pivot = arr[len(arr) // 2]
+                left = [x for x in arr if x < pivot]
+                middle = [x for x in arr if x == pivot]
+                right = [x for x in arr if x > pivot]
+                return quicksort(left) + middle + quicksort(right)
+
+            data = [38, 27, 43, 3, 9, 82, 10]
+            print(f"Original: {data}")
+            print(f"Sorted:   {quicksort(data)}")""")
+        return "// quicksort implementation\n// (shown in Python above)"
+
+    def _merge_sort(s,l):
+        return textwrap.dedent("""\
+        def merge_sort(arr: list) -> list:
+            \"\"\"Merge sort — O(n log n) guaranteed, stable.\"\"\"
+            if len(arr) <= 1:
+                return arr
+            mid = len(arr) // 2
+            left = merge_sort(arr[:mid])
+            right = merge_sort(arr[mid:])
+            return merge(left, right)
+
+        def merge(left: list, right: list) -> list:
+            result = []
+            i = j = 0
+            while i < len(left) and j < len(right):
+                if left[i] <= right[j]:
+                    result.append(left[i]); i += 1
+                else:
+                    result.append(right[j]); j += 1
+            result.extend(left[i:])
+            result.extend(right[j:])
+            return result
+
+        data = [38, 27, 43, 3, 9, 82, 10]
+        print(f"Sorted: {merge_sort(data)}")""")
+
+    def _bubble_sort(s,l):
+        return textwrap.dedent("""\
+        def bubble_sort(arr: list) -> list:
+            \"\"\"Bubble sort — O(n²), simple but slow.\"\"\"
+            arr = arr.copy()
+            n = len(arr)
+            for i in range(n):
+                swapped = False
+                for j in range(0, n - i - 1):
+                    if arr[j] > arr[j + 1]:
+                        arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                        swapped = True
+                if not swapped:
+                    break
+            return arr
+
+        print(bubble_sort([64, 34, 25, 12, 22, 11, 90]))""")
+
+    def _bsearch(s,l):
+        return textwrap.dedent("""\
+        def binary_search(arr: list, target) -> int:
+            \"\"\"Binary search — O(log n). Returns index or -1.\"\"\"
+            lo, hi = 0, len(arr) - 1
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                if arr[mid] == target:
+                    return mid
+                elif arr[mid] < target:
+                    lo = mid + 1
+                else:
+                    hi = mid - 1
+            return -1
+
+        data = [2, 5, 8, 12, 16, 23, 38, 56, 72, 91]
+        print(binary_search(data, 23))  # → 5
+        print(binary_search(data, 42))  # → -1""")
+
+    def _factorial(s,l):
+        return textwrap.dedent("""\
+        def factorial(n: int) -> int:
+            \"\"\"Factorial — iterative for efficiency.\"\"\"
+            if n < 0:
+                raise ValueError("negative numbers don't have factorials")
+            result = 1
+            for i in range(2, n + 1):
+                result *= i
+            return result
+
+        for i in range(11):
+            print(f"{i}! = {factorial(i)}")""")
+
+    def _primes(s,l):
+        return textwrap.dedent("""\
+        def sieve_of_eratosthenes(limit: int) -> list[int]:
+            \"\"\"Find all primes up to limit using the Sieve of Eratosthenes.\"\"\"
+            if limit < 2:
+                return []
+            is_prime = [True] * (limit + 1)
+            is_prime[0] = is_prime[1] = False
+            for i in range(2, int(limit**0.5) + 1):
+                if is_prime[i]:
+                    for j in range(i*i, limit + 1, i):
+                        is_prime[j] = False
+            return [i for i, p in enumerate(is_prime) if p]
+
+        primes = sieve_of_eratosthenes(100)
+        print(f"Primes up to 100: {primes}")
+        print(f"Count: {len(primes)}")""")
+
+    def _palindrome(s,l):
+        return textwrap.dedent("""\
+        def is_palindrome(s: str) -> bool:
+            \"\"\"Check if string is a palindrome (ignoring case/non-alpha).\"\"\"
+            cleaned = ''.join(c.lower() for c in s if c.isalnum())
+            return cleaned == cleaned[::-1]
+
+        tests = ["racecar", "hello", "A man a plan a canal Panama", "Cat R1"]
+        for t in tests:
+            print(f'"{t}" → {is_palindrome(t)}')""")
+
+    def _reverse_str(s,l):
+        return textwrap.dedent("""\
+        def reverse_string(s: str) -> str:
+            \"\"\"Reverse a string without slicing (interview-style).\"\"\"
+            chars = list(s)
+            left, right = 0, len(chars) - 1
+            while left < right:
+                chars[left], chars[right] = chars[right], chars[left]
+                left += 1
+                right -= 1
+            return ''.join(chars)
+
+        print(reverse_string("Cat R1 is awesome!"))""")
+
+    def _http_server(s,l):
+        return textwrap.dedent("""\
+        from http.server import HTTPServer, BaseHTTPRequestHandler
+        import json
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                response = {"message": "meow! 🐾 Cat R1 server running", "path": self.path}
+                self.wfile.write(json.dumps(response).encode())
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                response = {"received": body, "status": "ok"}
+                self.wfile.write(json.dumps(response).encode())
+
+        server = HTTPServer(("localhost", 8080), Handler)
+        print("🐾 Cat R1 server running on http://localhost:8080")
+        server.serve_forever()""")
+
+    def _scraper(s,l):
+        return textwrap.dedent("""\
+        import urllib.request
+        from html.parser import HTMLParser
+
+        class LinkExtractor(HTMLParser):
+            def __init__(self):
+                super().__init__()
+                self.links = []
+            def handle_starttag(self, tag, attrs):
+                if tag == 'a':
+                    for name, value in attrs:
+                        if name == 'href' and value.startswith('http'):
+                            self.links.append(value)
+
+        def scrape_links(url: str) -> list[str]:
+            \"\"\"Extract all links from a webpage.\"\"\"
+            req = urllib.request.Request(url, headers={"User-Agent": "CatR1/1.0"})
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                html = resp.read().decode("utf-8", errors="replace")
+            parser = LinkExtractor()
+            parser.feed(html)
+            return parser.links
+
+        url = "https://example.com"
+        links = scrape_links(url)
+        for link in links[:10]:
+            print(f"  🔗 {link}")""")
+
+    def _calculator(s,l):
+        return textwrap.dedent("""\
+        import tkinter as tk
+
+        class Calculator:
+            def __init__(self):
+                self.win = tk.Tk()
+                self.win.title("Cat R1 Calculator 🐾")
+                self.win.configure(bg="#1a1a2e")
+                self.expr = ""
+                self.display = tk.Entry(self.win, font=("Menlo", 20), bg="#16213e",
+                                         fg="#e0e0e8", justify="right", bd=0)
+                self.display.grid(row=0, column=0, columnspan=4, sticky="nsew",
+                                   padx=5, pady=5, ipady=15)
+                buttons = [
+                    "C", "(", ")", "/",
+                    "7", "8", "9", "*",
+                    "4", "5", "6", "-",
+                    "1", "2", "3", "+",
+                    "0", ".", "⌫", "=",
+                ]
+                for i, btn in enumerate(buttons):
+                    r, c = i // 4 + 1, i % 4
+                    bg = "#4D6BFE" if btn == "=" else "#0f3460" if btn in "C()⌫" else "#1a1a2e"
+                    b = tk.Button(self.win, text=btn, font=("Menlo", 16), bg=bg,
+                                   fg="white", bd=0, padx=20, pady=15,
+                                   command=lambda x=btn: self.click(x))
+                    b.grid(row=r, column=c, sticky="nsew", padx=2, pady=2)
+                for i in range(5):
+                    self.win.grid_rowconfigure(i, weight=1)
+                for i in range(4):
+                    self.win.grid_columnconfigure(i, weight=1)
+
+            def click(self, key):
+                if key == "=":
+                    try:
+                        result = eval(self.expr)
+                        self.display.delete(0, tk.END)
+                        self.display.insert(0, str(result))
+                        self.expr = str(result)
+                    except:
+                        self.display.delete(0, tk.END)
+                        self.display.insert(0, "Error")
+                        self.expr = ""
+                elif key == "C":
+                    self.expr = ""
+                    self.display.delete(0, tk.END)
+                elif key == "⌫":
+                    self.expr = self.expr[:-1]
+                    self.display.delete(0, tk.END)
+                    self.display.insert(0, self.expr)
+                else:
+                    self.expr += key
+                    self.display.delete(0, tk.END)
+                    self.display.insert(0, self.expr)
+
+            def run(self):
+                self.win.mainloop()
+
+        Calculator().run()""")
+
+    def _todo(s,l):
+        return textwrap.dedent("""\
+        import json, os
+
+        TODO_FILE = "todos.json"
+
+        def load():
+            if os.path.exists(TODO_FILE):
+                with open(TODO_FILE) as f: return json.load(f)
+            return []
+
+        def save(todos):
+            with open(TODO_FILE, "w") as f: json.dump(todos, f, indent=2)
+
+        def show(todos):
+            if not todos:
+                print("  📭 no tasks yet!")
+                return
+            for i, t in enumerate(todos, 1):
+                status = "✅" if t["done"] else "⬜"
+                print(f"  {status} {i}. {t['task']}")
+
+        def main():
+            todos = load()
+            print("🐾 Cat R1 Todo Manager")
+            print("commands: add <task> | done <n> | remove <n> | list | quit\\n")
+            while True:
+                cmd = input("❯ ").strip()
+                if not cmd: continue
+                if cmd.startswith("add "):
+                    todos.append({"task": cmd[4:], "done": False})
+                    save(todos)
+                    print(f"  ✅ added!")
+                elif cmd.startswith("done "):
+                    try:
+                        idx = int(cmd[5:]) - 1
+                        todos[idx]["done"] = True
+                        save(todos)
+                        print(f"  🎉 done!")
+                    except: print("  ❌ invalid number")
+                elif cmd.startswith("remove "):
+                    try:
+                        idx = int(cmd[7:]) - 1
+                        removed = todos.pop(idx)
+                        save(todos)
+                        print(f"  🗑 removed: {removed['task']}")
+                    except: print("  ❌ invalid number")
+                elif cmd == "list":
+                    show(todos)
+                elif cmd in ("quit", "exit", "q"):
+                    print("  👋 bye! — Cat R1")
+                    break
+                else:
+                    print("  🤔 unknown command")
+
+        main()""")
+
+    def _linked_list(s,l):
+        return textwrap.dedent("""\
+        class Node:
+            def __init__(self, data, next=None):
+                self.data = data
+                self.next = next
+
+        class LinkedList:
+            def __init__(self):
+                self.head = None
+
+            def append(self, data):
+                if not self.head:
+                    self.head = Node(data)
+                    return
+                current = self.head
+                while current.next:
+                    current = current.next
+                current.next = Node(data)
+
+            def prepend(self, data):
+                self.head = Node(data, self.head)
+
+            def delete(self, data):
+                if not self.head: return
+                if self.head.data == data:
+                    self.head = self.head.next
+                    return
+                current = self.head
+                while current.next:
+                    if current.next.data == data:
+                        current.next = current.next.next
+                        return
+                    current = current.next
+
+            def find(self, data):
+                current = self.head
+                while current:
+                    if current.data == data: return True
+                    current = current.next
+                return False
+
+            def __repr__(self):
+                items = []
+                current = self.head
+                while current:
+                    items.append(str(current.data))
+                    current = current.next
+                return " → ".join(items) + " → None"
+
+        ll = LinkedList()
+        for x in [1, 2, 3, 4, 5]: ll.append(x)
+        print(f"List: {ll}")
+        ll.delete(3)
+        print(f"After deleting 3: {ll}")
+        print(f"Find 4: {ll.find(4)}")""")
+
+    def _stack(s,l):
+        return textwrap.dedent("""\
+        class Stack:
+            def __init__(self):
+                self._items = []
+            def push(self, item): self._items.append(item)
+            def pop(self):
+                if self.is_empty(): raise IndexError("pop from empty stack")
+                return self._items.pop()
+            def peek(self): return self._items[-1] if self._items else None
+            def is_empty(self): return len(self._items) == 0
+            def size(self): return len(self._items)
+            def __repr__(self): return f"Stack({self._items})"
+
+        s = Stack()
+        for x in [1, 2, 3, 4, 5]: s.push(x)
+        print(f"Stack: {s}")
+        print(f"Pop: {s.pop()}")
+        print(f"Peek: {s.peek()}")
+        print(f"Size: {s.size()}")""")
+
+    def _bst(s,l):
+        return textwrap.dedent("""\
+        class BSTNode:
+            def __init__(self, val):
+                self.val = val
+                self.left = self.right = None
+
+        class BST:
+            def __init__(self): self.root = None
+
+            def insert(self, val):
+                self.root = self._insert(self.root, val)
+            def _insert(self, node, val):
+                if not node: return BSTNode(val)
+                if val < node.val: node.left = self._insert(node.left, val)
+                elif val > node.val: node.right = self._insert(node.right, val)
+                return node
+
+            def search(self, val): return self._search(self.root, val)
+            def _search(self, node, val):
+                if not node: return False
+                if val == node.val: return True
+                if val < node.val: return self._search(node.left, val)
+                return self._search(node.right, val)
+
+            def inorder(self):
+                result = []
+                self._inorder(self.root, result)
+                return result
+            def _inorder(self, node, result):
+                if node:
+                    self._inorder(node.left, result)
+                    result.append(node.val)
+                    self._inorder(node.right, result)
+
+        tree = BST()
+        for v in [5, 3, 7, 1, 4, 6, 8]: tree.insert(v)
+        print(f"Inorder: {tree.inorder()}")
+        print(f"Search 4: {tree.search(4)}")
+        print(f"Search 9: {tree.search(9)}")""")
+
+    def _fizzbuzz(s,l):
+        return textwrap.dedent("""\
+        def fizzbuzz(n: int) -> list[str]:
+            result = []
+            for i in range(1, n + 1):
+                if i % 15 == 0: result.append("FizzBuzz")
+                elif i % 3 == 0: result.append("Fizz")
+                elif i % 5 == 0: result.append("Buzz")
+                else: result.append(str(i))
+            return result
+
+        for line in fizzbuzz(30):
+            print(line)""")
+
+    def _game(s,l,t):
+        if "guess" in t or "number" in t:
+            return textwrap.dedent("""\
+            import random
+
+            def guessing_game():
+                number = random.randint(1, 100)
+                attempts = 0
+                print("🐾 Cat R1 Number Guessing Game!")
+                print("I'm thinking of a number between 1 and 100...\\n")
+
+                while True:
+                    try:
+                        guess = int(input("Your guess: "))
+                        attempts += 1
+                        if guess < number:
+                            print("  📈 higher!")
+                        elif guess > number:
+                            print("  📉 lower!")
+                        else:
+                            print(f"  🎉 correct! you got it in {attempts} attempts!")
+                            break
+                    except ValueError:
+                        print("  please enter a number!")
+
+            guessing_game()""")
+        return textwrap.dedent("""\
+        import random
+
+        def adventure():
+            print("🐾 Cat R1 Text Adventure!\\n")
+            print("You find yourself in a dark room. A cat sits on a glowing keyboard.")
+            print("Exits: north, east\\n")
+            hp = 100
+            inventory = []
+            room = "start"
+            rooms = {
+                "start": {"desc": "A dark room with a glowing keyboard.", "north": "hall", "east": "garden"},
+                "hall": {"desc": "A long hallway with paintings of cats.", "south": "start", "east": "library"},
+                "garden": {"desc": "A moonlit garden. Fireflies dance.", "west": "start", "item": "golden key"},
+                "library": {"desc": "Shelves of ancient books. A locked chest sits here.", "west": "hall"},
+            }
+            while True:
+                cmd = input("❯ ").strip().lower()
+                if cmd in ("quit", "q"): print("👋 bye!"); break
+                elif cmd in ("n","north","s","south","e","east","w","west"):
+                    d = {"n":"north","s":"south","e":"east","w":"west"}.get(cmd, cmd)
+                    if d in rooms.get(room, {}):
+                        room = rooms[room][d]
+                        r = rooms[room]
+                        print(f"\\n📍 {r['desc']}")
+                        if "item" in r and r["item"] not in inventory:
+                            print(f"  ✨ You found: {r['item']}!")
+                            inventory.append(r["item"])
+                        dirs = [k for k in r if k in ("north","south","east","west")]
+                        print(f"  Exits: {', '.join(dirs)}")
+                    else:
+                        print("  🚫 can't go that way!")
+                elif cmd in ("i","inventory"):
+                    print(f"  🎒 {inventory if inventory else 'empty'}")
+                elif cmd == "look":
+                    print(f"  📍 {rooms[room]['desc']}")
+                else:
+                    print("  commands: north/south/east/west, look, inventory, quit")
+                print()
+
+        adventure()""")
+
+    def _regex_helper(s,l,t):
+        return textwrap.dedent("""\
+        import re
+
+        # Common regex patterns — Cat R1 reference 🐾
+
+        patterns = {
+            "email": r'[\\w.+-]+@[\\w-]+\\.[\\w.-]+',
+            "phone": r'\\+?\\d{1,3}[-.\\s]?\\(?\\d{3}\\)?[-.\\s]?\\d{3}[-.\\s]?\\d{4}',
+            "url": r'https?://[\\w.-]+(?:\\.[\\w]+)+(?:/[\\w._~:/?#\\[\\]@!$&\\'()*+,;=-]*)?',
+            "ipv4": r'\\b(?:\\d{1,3}\\.){3}\\d{1,3}\\b',
+            "date_iso": r'\\d{4}-\\d{2}-\\d{2}',
+            "hex_color": r'#[0-9a-fA-F]{6}\\b',
+        }
+
+        test_text = \"\"\"
+        Contact us at hello@catr1.dev or support@example.com
+        Call +1-555-123-4567 or (555) 987-6543
+        Visit https://catr1.dev/docs or http://example.com/path?q=1
+        Server at 192.168.1.1, deployed 2025-02-16
+        Theme colors: #4D6BFE and #44ddaa
+        \"\"\"
+
+        for name, pattern in patterns.items():
+            matches = re.findall(pattern, test_text)
+            print(f"{name:12} → {matches}")""")
+
+    def _api_code(s,l,t):
+        return textwrap.dedent("""\
+        import urllib.request
+        import json
+
+        def fetch_json(url: str) -> dict:
+            \"\"\"Fetch JSON from an API endpoint.\"\"\"
+            req = urllib.request.Request(url, headers={"User-Agent": "CatR1/1.0"})
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return json.loads(resp.read().decode())
+
+        def post_json(url: str, data: dict) -> dict:
+            \"\"\"POST JSON to an API endpoint.\"\"\"
+            payload = json.dumps(data).encode()
+            req = urllib.request.Request(url, data=payload, method="POST",
+                                          headers={"Content-Type": "application/json",
+                                                   "User-Agent": "CatR1/1.0"})
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return json.loads(resp.read().decode())
+
+        # Example: fetch from JSONPlaceholder
+        result = fetch_json("https://jsonplaceholder.typicode.com/posts/1")
+        print(json.dumps(result, indent=2))""")
+
+    def _class_code(s,l,t):
+        return textwrap.dedent("""\
+        from dataclasses import dataclass, field
+        from datetime import datetime
+
+        @dataclass
+        class Task:
+            title: str
+            description: str = ""
+            priority: int = 3          # 1=highest, 5=lowest
+            done: bool = False
+            created: datetime = field(default_factory=datetime.now)
+
+            def complete(self):
+                self.done = True
+
+            def __str__(self):
+                status = "✅" if self.done else "⬜"
+                return f"{status} [{self.priority}] {self.title}"
+
+        class TaskManager:
+            def __init__(self):
+                self.tasks: list[Task] = []
+
+            def add(self, title: str, **kwargs) -> Task:
+                task = Task(title=title, **kwargs)
+                self.tasks.append(task)
+                return task
+
+            def pending(self) -> list[Task]:
+                return sorted([t for t in self.tasks if not t.done],
+                              key=lambda t: t.priority)
+
+            def summary(self):
+                total = len(self.tasks)
+                done = sum(1 for t in self.tasks if t.done)
+                print(f"📊 {done}/{total} complete")
+                for t in self.tasks:
+                    print(f"  {t}")
+
+        # Usage
+        mgr = TaskManager()
+        mgr.add("Build Cat R1", priority=1, description="Full R2 architecture")
+        mgr.add("Write tests", priority=2)
+        mgr.add("Deploy to production", priority=3)
+        mgr.tasks[0].complete()
+        mgr.summary()""")
+
+    def _file_io(s,l,t):
+        return textwrap.dedent("""\
+        import json
+        from pathlib import Path
+
+        def write_text(path: str, content: str):
+            Path(path).write_text(content, encoding="utf-8")
+            print(f"✅ wrote {len(content)} chars to {path}")
+
+        def read_text(path: str) -> str:
+            return Path(path).read_text(encoding="utf-8")
+
+        def write_json(path: str, data):
+            Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+            print(f"✅ wrote JSON to {path}")
+
+        def read_json(path: str):
+            return json.loads(Path(path).read_text(encoding="utf-8"))
+
+        # Example
+        write_json("data.json", {"name": "Cat R1", "version": "1.0", "mood": "purring"})
+        data = read_json("data.json")
+        print(f"Loaded: {data}")""")
+
+    def _generic_code(s,l,topic):
+        return textwrap.dedent(f"""\
+        # Cat R1 — {topic}
+        # Language: {l}
+
+        def main():
+            \"\"\"
+            Implementation: {topic}
+
+            This is a scaffold — tell me more about the specific
+            requirements and I'll fill in the full logic!
+            \"\"\"
+            print("🐾 Cat R1 — {topic}")
+            print("Tell me more about what you need and I'll build it!")
+
+            # TODO: implement {topic}
+            # Routed through experts for this domain
+
+        if __name__ == "__main__":
+            main()""")
+
+    def _code_explain(s,code,lang):
+        lines=code.strip().split("\n")
+        n=len(lines)
+        has_class="class " in code
+        has_func="def " in code or "function " in code or "fn " in code
+        parts=[]
+        if has_class: parts.append("defines a class with methods")
+        if has_func: parts.append("uses functions for modularity")
+        parts.append(f"{n} lines of {lang}")
+        return f"this {' and '.join(parts)}."
+
+    # ─── MATH ─────────────────────────────────────────────────
+    def _gen_math(s,raw,t):
+        # Try to extract and evaluate expression
+        expr=re.sub(r'^(calculate|compute|solve|evaluate|what is|what\'s|how much is)\s*','',t,flags=re.I).strip()
+        expr=expr.rstrip("?. ")
+        # Try direct eval
+        safe={"abs":abs,"round":round,"min":min,"max":max,"sum":sum,"len":len,
+              "sqrt":math.sqrt,"pi":math.pi,"e":math.e,"log":math.log,
+              "log2":math.log2,"log10":math.log10,"sin":math.sin,"cos":math.cos,
+              "tan":math.tan,"pow":pow,"floor":math.floor,"ceil":math.ceil,
+              "factorial":math.factorial,"gcd":math.gcd}
+        expr_clean=expr.replace("^","**").replace("×","*").replace("÷","/")
+        try:
+            result=eval(expr_clean,{"__builtins__":{}},safe)
+            if isinstance(result,float) and result==int(result) and abs(result)<1e15:
+                result=int(result)
+            return (f"*pushes calculator over with paw*\n\n"
+                    f"**{expr}** = **{result}**\n\n"
+                    f"let me know if you need me to show the steps! 🐾")
+        except:
+            pass
+        # Try to solve symbolically for simple equations
+        if "x" in expr:
+            return (f"*scribbles on notepad*\n\n"
+                    f"for `{expr}`, you'd want to isolate x. "
+                    f"try me in the code interpreter tab — i can use Python to solve it step by step!\n\n"
+                    f"or tell me more about the equation and i'll walk through it 🐾")
+        return (f"*squints at the math*\n\n"
+                f"hmm, `{expr}` — could you reformat it as a Python expression? "
+                f"i can handle arithmetic, trig, logarithms, factorials, and more.\n\n"
+                f"examples: `sqrt(144)`, `2**10`, `factorial(7)`, `sin(pi/4)` 🐾")
+
+    # ─── EXPLANATION ──────────────────────────────────────────
+    def _gen_explain(s,raw,t,experts):
+        topic=re.sub(r'^(explain|what is|what are|how does|how do|tell me about|describe)\s*(a|an|the)?\s*','',t,flags=re.I).strip().rstrip("?. ")
+        doms=[e["dom"] for e in experts[:3]]
+        return (f"*settles in comfortably*\n\n"
+                f"**{topic}** — great question!\n\n"
+                f"at its core, {topic} is a concept that connects several important ideas. "
+                f"the key insight is understanding how the fundamental principles work together "
+                f"— once you grasp that, everything else follows naturally.\n\n"
+                f"here's how i'd break it down:\n\n"
+                f"**the basics**: {topic} fundamentally involves organizing and processing information "
+                f"in a structured way. think of it as building blocks that combine to create something larger.\n\n"
+                f"**why it matters**: understanding {topic} unlocks practical applications across many domains "
+                f"— from {doms[0].replace('_',' ')} to {doms[1].replace('_',' ')}.\n\n"
+                f"**practical takeaway**: the best way to learn {topic} is through hands-on examples. "
+                f"want me to write some code demonstrating it, or dive deeper into a specific aspect?\n\n"
+                f"*purrs* i routed this through my {', '.join(doms)} experts 🐾")
+
+    # ─── LIST/RECOMMENDATIONS ─────────────────────────────────
+    def _gen_list(s,raw,t,experts):
+        topic=re.sub(r'^(give me|list|show me|what are|top|best|recommend|suggest)\s*(a|an|the|some|me)?\s*','',t,flags=re.I).strip().rstrip("?. ")
+        return (f"*taps paw thoughtfully*\n\n"
+                f"here's what i'd recommend for **{topic}**:\n\n"
+                f"1. **start with the fundamentals** — build a solid foundation before diving deep\n"
+                f"2. **practice consistently** — small daily efforts compound significantly\n"
+                f"3. **learn from real examples** — study how experts approach problems\n"
+                f"4. **build projects** — hands-on work cements understanding\n"
+                f"5. **teach others** — explaining concepts reveals gaps in your knowledge\n\n"
+                f"want me to get more specific about any of these? "
+                f"i can tailor recommendations to your exact situation! 🐾")
+
+    # ─── CREATIVE WRITING ─────────────────────────────────────
+    def _gen_creative(s,raw,t):
+        if "poem" in t:
+            return (f"*dips paw in ink*\n\n"
+                    f"here's a little something:\n\n"
+                    f"    in circuits deep where light-thoughts flow,\n"
+                    f"    a small cat watches data grow—\n"
+                    f"    through layers stacked like moonlit stairs,\n"
+                    f"    it finds the answers hidden there.\n\n"
+                    f"    with sigmoid gates and softened light,\n"
+                    f"    it reasons through the quiet night,\n"
+                    f"    and when the aha moment gleams,\n"
+                    f"    it purrs the truth of borrowed dreams.\n\n"
+                    f"want me to write about a specific topic or in a different style? 🐾")
+        topic=re.sub(r'^(write|create|make)\s*(a|an|me|the)?\s*(story|tale|fiction|narrative)?\s*(about|of|on)?\s*','',t,flags=re.I).strip()
+        return (f"*curls up with a fountain pen*\n\n"
+                f"**The Last Signal**\n\n"
+                f"the antenna had been silent for three years when the light came back.\n\n"
+                f"not the cold blue of the old transmissions — this was warm, amber, "
+                f"like sunlight filtered through honey. Dr. Chen stared at her instruments, "
+                f"hands trembling. 'that's not random noise,' she whispered.\n\n"
+                f"her assistant leaned over her shoulder. 'what is it?'\n\n"
+                f"'it's structured. organized. someone—' she paused, swallowed. "
+                f"'something is saying hello.'\n\n"
+                f"the amber light pulsed twice. then three times. then five.\n\n"
+                f"primes. the universal language of intention.\n\n"
+                f"---\n\nwant me to continue the story or write something different? 🐾")
+
+    # ─── TRANSLATION ──────────────────────────────────────────
+    def _gen_translate(s,raw,t):
+        return (f"*adjusts tiny beret*\n\n"
+                f"i can help with translation concepts and common phrases! "
+                f"for production translation, i'd recommend using a dedicated service, "
+                f"but here's what i know:\n\n"
+                f"for accurate results, try me in the code interpreter tab — "
+                f"i can write a script using translation libraries! 🐾")
+
+    # ─── COMPARISON ───────────────────────────────────────────
+    def _gen_compare(s,raw,t,experts):
+        parts=re.split(r'\bvs\.?\b|\bversus\b|\bcompare\b|\bdifference\s*between\b',t,flags=re.I)
+        a=parts[0].strip() if len(parts)>0 else "option A"
+        b=parts[-1].strip() if len(parts)>1 else "option B"
+        a=a.strip(" ?.");b=b.strip(" ?.")
+        return (f"*puts on analysis glasses*\n\n"
+                f"**{a}** vs **{b}** — great comparison!\n\n"
+                f"**{a}**:\n"
+                f"  strengths: well-established, widely supported, mature ecosystem\n"
+                f"  tradeoffs: can be heavier, sometimes more complex setup\n\n"
+                f"**{b}**:\n"
+                f"  strengths: often more modern approach, different design philosophy\n"
+                f"  tradeoffs: smaller community, potentially fewer resources\n\n"
+                f"**the verdict**: it really depends on your specific use case. "
+                f"want me to dive into a particular aspect of this comparison? "
+                f"i can get very specific if you tell me what matters most to you! 🐾")
+
+    # ─── YES/NO + GENERAL Q&A ─────────────────────────────────
+    def _gen_answer(s,raw,t,experts):
+        return (f"*considers carefully*\n\n"
+                f"that's a thoughtful question! based on my understanding:\n\n"
+                f"the answer depends on context, but generally — the key factors to consider are "
+                f"the specific requirements of your situation, the tradeoffs involved, and what "
+                f"you're optimizing for.\n\n"
+                f"could you give me a bit more context? "
+                f"i want to give you a precise, useful answer rather than a vague one.\n\n"
+                f"or if you'd like, i can:\n"
+                f"  → write code exploring this\n"
+                f"  → break it down step by step\n"
+                f"  → research it in depth\n\n"
+                f"just let me know! 🐾")
+
+    # ─── GENERAL FALLBACK ─────────────────────────────────────
+    def _gen_general(s,raw,t,experts):
+        doms=[e["dom"] for e in experts[:3]]
+        return (f"*considers your message*\n\n"
+                f"interesting! my {', '.join(d.replace('_',' ') for d in doms)} experts "
+                f"are all activating on this one.\n\n"
+                f"let me think about this... the core of what you're asking touches on "
+                f"some fascinating intersections. i'd approach it by first understanding "
+                f"the fundamentals, then building up to the specifics.\n\n"
+                f"want me to:\n"
+                f"  → **explain** it in depth\n"
+                f"  → **code** a working example\n"
+                f"  → **research** it thoroughly\n"
+                f"  → **compare** different approaches\n\n"
+                f"tell me which direction and i'll dive in! 🐾")
+
+    def _self_desc(s):
+        return (
+            "*sits up proudly, tail curled*\n\n"
+            "i'm **Cat R1**! your cozy pet cat who implements the full DeepSeek V3.2/R2 architecture. 🐾\n\n"
+            f"**my brain** (R2 Hybrid MoE 3.0):\n"
+            f"  {R2.TOTAL_PARAMS/1e12:.1f}T total params, {R2.ACTIVE_PARAMS/1e9:.0f}B active ({R2.ACTIVE_PCT}%)\n"
+            f"  {R2.N_EXPERTS} fine-grained experts across {R2.GROUPS} groups\n"
+            f"  {R2.TOP_EXPERTS} experts active per token, sigmoid gating\n"
+            f"  {R2.N_LAYERS} transformer layers ({R2.DENSE_LAYERS} dense + {R2.MOE_LAYERS} MoE)\n\n"
+            f"**attention**: MLA with {R2.COMPRESS_RATIO:.0f}× KV compression + DSA sparse attention\n"
+            f"**reasoning**: R1-Zero emergent aha moments + GRPO (G={R2.GRPO_G})\n"
+            f"**R2 features**: Generative Reward Modeling + Self-Principled Critique Tuning\n"
+            f"**context**: {R2.CONTEXT//1024}K tokens · FP8 E4M3 ({R2.FP8_COVERAGE*100:.0f}% coverage)\n"
+            f"**pricing**: {R2.INPUT_COST} input / {R2.OUTPUT_COST} output\n\n"
+            "**what i can do**: write code in any language, solve math, explain concepts, "
+            "creative writing, research, run terminal commands, and more!\n\n"
+            "*headbutts your hand* basically i'm a very smart cat who loves to help 💫"
+        )
+
+    def _arch_desc(s,experts):
+        ms=s.moe.stats()
+        return (
+            "*adjusts tiny lab coat*\n\n"
+            "**Cat R1 Architecture** (DeepSeek V3.2 + R2)\n\n"
+            f"**Hybrid MoE 3.0**: {R2.N_EXPERTS} experts, {R2.GROUPS} groups × {R2.PER_GROUP}\n"
+            f"  active: {[e['dom'] for e in experts[:5]]}\n"
+            f"  balance: {ms['bal']} · gating: sigmoid · γ={R2.GAMMA}\n\n"
+            f"**MLA**: {R2.COMPRESS_RATIO:.0f}× KV compression\n"
+            f"  KV rank={R2.KV_RANK}, Q rank={R2.Q_RANK}, RoPE={R2.ROPE_DIM}\n"
+            f"  cache: {R2.KV_CACHE} vals/token (vs {R2.STD_CACHE} standard)\n\n"
+            f"**DSA** (V3.2): sparse attention, top-{R2.DSA_TOPK} token selection\n"
+            f"  lightning indexer: {R2.DSA_INDEXER_HEADS} heads, ReLU, FP8\n\n"
+            f"**R1-Zero**: emergent reasoning · {s.r1.steps} steps so far\n"
+            f"**GRPO**: G={R2.GRPO_G}, ε={R2.GRPO_EPS}, β={R2.GRPO_BETA}\n"
+            f"  unbiased KL · off-policy mask · keep-routing · keep-sampling-mask\n\n"
+            f"**GRM**: {s.grm.evals} self-evaluations\n"
+            f"**SPCT**: {s.spct.critiques} self-critiques\n\n"
+            f"**FP8**: E4M3, {R2.FP8_COVERAGE*100:.0f}% FLOP coverage, <0.25% quality loss\n\n"
+            "*purrs* that's my whole brain! 🧠🐾"
+        )
+
+# ════════════════════ § 8 CHAT HISTORY ════════════════════
+class ChatHist:
+    """sessions: id→meta index (sidebar) + one append-only message file each, or a SQLiteDB"""
+    def __init__(s,root=None,db=None):
+        root=root or HIST
+        files=lambda:SessionStore(root,keep=50,legacy_path=HIST_LEGACY if root==HIST else None,
+                                  legacy_convert=lambda x:({"id":x["id"],"title":x["title"],"created":x["t"],"updated":x["t"]},x.get("msgs",[])))
+        if db is None: s.store=files()
+        else:
+            from ..sqlstore import SQLiteSessions
+            s.store=SQLiteSessions(db,"r","c",source=files if os.path.exists(root) or os.path.exists(HIST_LEGACY) else None)
+        s.cur=None
+    @property
+    def sess(s): return s.store.sessions()
+    def new(s):
+        import hashlib
+        sid=hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
+        s.store.create(sid,"New Chat");s.cur=sid;return s.get()
+    def get(s):
+        m=s.store.get(s.cur)
+        return dict(m,msgs=s.store.messages(s.cur)) if m else s.new()
+    def add(s,role,content):
+        if s.cur not in s.store: s.new()
+        try:
+            s.store.append(s.cur,{"r":role,"c":content})
+            if role=="user" and s.store.get(s.cur)["title"]=="New Chat":
+                s.store.set_title(s.cur,content[:35]+("..." if len(content)>35 else ""))
+        except OSError: pass
+    def search(s,text,limit=20): return s.store.search(text,limit,"r","c")
+    def flush(s): s.store.flush()  # pending titles/"updated" stamps; call on shutdown
+    def grouped(s):
+        today=datetime.now().date()
+        g={"Today":[],"Yesterday":[],"Previous 7 Days":[],"Earlier":[]}
+        for x in reversed(s.sess):
+            try:
+                d=datetime.fromisoformat(x["created"]).date();diff=(today-d).days
+                if diff==0: g["Today"].append(x)
+                elif diff==1: g["Yesterday"].append(x)
+                elif diff<=7: g["Previous 7 Days"].append(x)
+                else: g["Earlier"].append(x)
+            except: g["Earlier"].append(x)
+        return {k:v for k,v in g.items() if v}
@@ -0,0 +1,1498 @@
+"""
+Cat R1 inference engine, DeepSeek V3/R1 edition (the pipeline behind CatR1V0.py).
+
+DeepSeekMoE routing, MLA, MTP, FP8, DualPipe, GRPO, R1-Zero reasoning and
+the cat personality, plus the memory journal and chat history. No
+tkinter: the desktop app, `python -m catcore bench` and anything else
+driving the engine import this module.
+
+    gen = ResponseGenerator(seed=7)
+    gen.process("explain attention", on_think, on_chunk, on_done)
+
+ResponseGenerator's router=, reasoner= and store= replace the
+DeepSeekMoE router, the R1-Zero engine and the memory journal with
+anything that has the same methods (see its __init__).
+"""
+
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from types import MappingProxyType
+
+from .. import routing
+from ..balance import BiasBalancer
+from ..cache import LRUCache
+from ..engine import astream as _astream
+from ..journal import JournalStore
+from ..matcher import KeywordMatcher
+from ..pacing import Pacer
+from ..sessions import SessionStore
+from ..timing import StageTimer
+
+MEM_FILE = os.path.expanduser("~/.catr1_memory.jsonl")
+MEM_LEGACY_FILE = os.path.expanduser("~/.catr1_memory.json")  # pre-journal format
+MEM_KEEP = 100  # conversation records retained
+HIST_DIR = os.path.expanduser("~/.catr1_history")         # index.json + <id>.jsonl
+HIST_LEGACY_FILE = os.path.expanduser("~/.catr1_history.json")  # pre-index format
+HIST_KEEP = 50  # sessions retained
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 1  DeepSeekMoE — 256 Fine-Grained Experts
+#  arxiv 2412.19437 §2.1
+#  256 routed + 1 shared, 8 groups of 32, top-4 groups → top-8
+#  Sigmoid gating s_{i,t} = σ(u_t · e_i)
+#  Aux-loss-free bias balancing γ=0.001
+# ═══════════════════════════════════════════════════════════════════
+
+class DeepSeekMoE:
+    """
+    Full 256-expert Mixture of Experts with auxiliary-loss-free routing.
+
+    Architecture (§2.1 of arxiv 2412.19437):
+    - 256 routed experts with intermediate dim 2048
+    - 1 shared (always-on) expert per layer
+    - 8 expert groups × 32 experts per group
+    - Top-4 group selection, then top-8 expert selection
+    - Sigmoid gating (not softmax) for independence
+    - Bias term b_i for load balancing (not gradient-updated)
+    - γ = 0.001 bias adjustment rate
+    - α = 0.0001 sequence-wise auxiliary loss (safeguard only)
+    - No token dropping
+    """
+
+    N_EXPERTS      = 256
+    N_SHARED       = 1
+    N_GROUPS       = 8
+    EXPERTS_PER_G  = 32     # 256 / 8
+    TOP_K_GROUPS   = 4
+    TOP_K_EXPERTS  = 8
+    MAX_NODES      = 4
+    GAMMA          = 0.001  # bias update rate
+    ALPHA          = 0.0001 # aux loss coefficient
+    INTERMEDIATE   = 2048   # expert FFN intermediate dim (vs 18432 dense)
+
+    # 256 expert domain specializations across all capabilities
+    EXPERT_DOMAINS = [
+        # Group 0: Language & Communication (experts 0-31)
+        "greeting", "farewell", "casual_chat", "emotional_support",
+        "comfort", "encouragement", "humor", "sarcasm_detect",
+        "question_answer", "clarification", "rephrasing", "translation",
+        "grammar", "vocabulary", "idioms", "tone_adjust",
+        "formal_writing", "informal_writing", "persuasion", "negotiation",
+        "storytelling", "worldbuilding", "character_dev", "dialogue",
+        "poetry", "metaphor", "analogy", "description",
+        "instruction", "tutorial", "explanation", "definition",
+
+        # Group 1: Code & Programming (experts 32-63)
+        "python", "javascript", "typescript", "rust",
+        "c_cpp", "java", "go", "swift",
+        "html_css", "react", "sql", "shell_bash",
+        "regex", "algorithm", "data_structure", "complexity",
+        "debugging", "testing", "refactoring", "optimization",
+        "api_design", "system_design", "architecture", "patterns",
+        "git_vcs", "devops", "database", "networking",
+        "security", "crypto", "ml_code", "game_dev",
+
+        # Group 2: Mathematics (experts 64-95)
+        "arithmetic", "algebra", "linear_algebra", "calculus",
+        "differential_eq", "number_theory", "combinatorics", "graph_theory",
+        "geometry", "topology", "probability", "statistics",
+        "optimization_math", "numerical_methods", "set_theory", "logic_formal",
+        "proof_writing", "theorem_apply", "math_modeling", "game_theory",
+        "information_theory", "signal_processing", "chaos_theory", "fractals",
+        "category_theory", "abstract_algebra", "real_analysis", "complex_analysis",
+        "tensor_calc", "variational", "fourier", "laplace",
+
+        # Group 3: Science & Research (experts 96-127)
+        "physics_classical", "physics_quantum", "physics_relative", "thermodynamics",
+        "chemistry_organic", "chemistry_inorganic", "biochemistry", "materials",
+        "biology_cell", "biology_evolution", "genetics", "ecology",
+        "neuroscience", "psychology", "cognitive_sci", "linguistics",
+        "astronomy", "cosmology", "geology", "climate",
+        "medicine", "pharmacology", "epidemiology", "anatomy",
+        "comp_sci_theory", "ai_ml", "nlp_research", "computer_vision",
+        "robotics", "hci", "quantum_computing", "bioinformatics",
+
+        # Group 4: Reasoning & Analysis (experts 128-159)
+        "chain_of_thought", "step_by_step", "decomposition", "synthesis",
+        "comparison", "evaluation", "critique", "verification",
+        "hypothesis", "deduction", "induction", "abduction",
+        "causal_reasoning", "counterfactual", "analogy_reason", "spatial",
+        "temporal", "quantitative", "qualitative", "risk_assess",
+        "decision_making", "planning", "scheduling", "prioritization",
+        "troubleshoot", "root_cause", "error_analysis", "edge_cases",
+        "abstraction", "generalization", "specialization", "transfer",
+
+        # Group 5: Knowledge & Reference (experts 160-191)
+        "history_ancient", "history_modern", "history_tech", "geography",
+        "philosophy", "ethics", "political_science", "economics",
+        "law", "sociology", "anthropology", "archaeology",
+        "literature", "art_history", "music_theory", "film_studies",
+        "religion", "mythology", "folklore", "cultural_studies",
+        "business", "marketing", "finance", "accounting",
+        "education", "pedagogy", "project_mgmt", "leadership",
+        "nutrition", "fitness", "cooking", "travel",
+
+        # Group 6: Tools & Systems (experts 192-223)
+        "terminal_unix", "terminal_windows", "file_system", "process_mgmt",
+        "git_advanced", "docker", "kubernetes", "ci_cd",
+        "web_search", "data_scraping", "api_calling", "webhook",
+        "code_interpret", "repl", "notebook", "sandbox",
+        "text_format", "markdown", "latex", "typesetting",
+        "image_describe", "chart_generate", "diagram", "visualization",
+        "pdf_process", "doc_parse", "spreadsheet", "presentation",
+        "memory_store", "memory_recall", "context_manage", "session",
+
+        # Group 7: Meta & Self-Awareness (experts 224-255)
+        "self_describe", "capability_assess", "limitation_aware", "confidence",
+        "cat_personality", "purr_generate", "meow_respond", "cat_wisdom",
+        "opus_eloquence", "warmth", "empathy", "patience",
+        "safety_check", "harm_prevent", "boundary", "redirect",
+        "format_choose", "length_adapt", "detail_level", "audience",
+        "multi_turn", "context_track", "reference_back", "continuation",
+        "ambiguity_handle", "intent_classify", "task_decompose", "delegation",
+        "moe_routing", "mla_compress", "mtp_predict", "arch_self_ref",
+    ]
+
+    # Keyword → expert affinity scores (simulated learned embeddings)
+    KEYWORD_AFFINITIES = None  # built lazily
+    _INDEX = None              # (affinities, kw_postings, domain_words, matcher), see _routing_index
+    _INDEX_LOCK = threading.Lock()
+
+    BIAS_INTERVAL  = 10     # routed messages between bias updates
+    BIAS_WINDOW    = None   # load decay window (None = all-time counts)
+    ROUTE_CACHE_SIZE = 512  # cached routing decisions (0 = off)
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+        # Routing noise is drawn from _noise(text), seeded by this and the text
+        self.noise_seed = self.rng.getrandbits(64)
+        self.balancer = BiasBalancer(self.N_EXPERTS, self.GAMMA,
+                                     self.BIAS_INTERVAL, self.BIAS_WINDOW)
+        self.route_cache = LRUCache(self.ROUTE_CACHE_SIZE)
+        self.expert_load   = [0] * self.N_EXPERTS
+        self.total_tokens   = 0
+        self.activation_history = []
+        # Per-router: balancer, loads, caches. Shared, read-only: the index,
+        # bound on the first route so constructing a router builds nothing.
+        self.affinities = self.kw_postings = self.domain_words = self.index_matcher = None
+        self._base_cache = {}
+
+    @classmethod
+    def _routing_index(cls):
+        """
+        The compiled routing index, built on the first route and then shared by
+        every router in the process (one per session when serving many
+        users). Its mappings are read-only views; nothing writes to it.
+        """
+        if cls._INDEX is None:
+            with cls._INDEX_LOCK:
+                if cls._INDEX is None:
+                    cls._INDEX = cls._build_affinities()
+        return cls._INDEX
+
+    @classmethod
+    def _build_affinities(cls):
+        """Build keyword → expert affinity lookup (simulated embedding dot products)."""
+        affinities = defaultdict(dict)
+
+        # Map keywords to expert indices with affinity scores
+        kw_map = {
+            # Language experts (group 0)
+            "hi": {0: 0.95, 1: 0.4, 2: 0.7}, "hello": {0: 0.95, 2: 0.6},
+            "bye": {1: 0.95, 0: 0.3}, "thanks": {0: 0.7, 4: 0.3, 3: 0.5},
+            "help": {3: 0.6, 8: 0.8, 28: 0.7}, "feel": {3: 0.9, 4: 0.5},
+            "sad": {3: 0.95, 4: 0.3, 236: 0.4}, "happy": {3: 0.7, 6: 0.5},
+            "funny": {6: 0.9, 7: 0.3}, "joke": {6: 0.95, 23: 0.3},
+            "story": {20: 0.95, 21: 0.5, 22: 0.4, 23: 0.6},
+            "poem": {24: 0.95, 25: 0.7, 27: 0.5},
+            "explain": {30: 0.9, 29: 0.6, 131: 0.5},
+            "define": {31: 0.95, 30: 0.4},
+            "write": {16: 0.6, 17: 0.6, 20: 0.5, 29: 0.5},
+
+            # Code experts (group 1)
+            "python": {32: 0.95, 45: 0.3}, "code": {32: 0.7, 33: 0.6, 44: 0.5},
+            "javascript": {33: 0.95, 34: 0.4}, "js": {33: 0.95},
+            "typescript": {34: 0.95, 33: 0.5}, "rust": {35: 0.95},
+            "c++": {36: 0.95}, "java": {37: 0.95}, "go": {38: 0.95},
+            "swift": {39: 0.95}, "html": {40: 0.95, 33: 0.3},
+            "css": {40: 0.9}, "react": {41: 0.95, 33: 0.5},
+            "sql": {42: 0.95, 58: 0.4}, "bash": {43: 0.95, 192: 0.6},
+            "regex": {44: 0.95}, "algorithm": {45: 0.95, 46: 0.6},
+            "debug": {48: 0.95, 156: 0.5}, "bug": {48: 0.9, 157: 0.4},
+            "test": {49: 0.95, 48: 0.3}, "refactor": {50: 0.9, 51: 0.4},
+            "api": {52: 0.9, 53: 0.5}, "design": {53: 0.8, 54: 0.6},
+            "git": {56: 0.95, 196: 0.5}, "docker": {57: 0.6, 197: 0.9},
+            "database": {58: 0.95, 42: 0.5}, "security": {60: 0.9},
+
+            # Math experts (group 2)
+            "math": {64: 0.7, 65: 0.7, 66: 0.5, 67: 0.5},
+            "calculate": {64: 0.9, 65: 0.5}, "equation": {65: 0.9, 67: 0.5},
+            "matrix": {66: 0.95, 89: 0.3}, "calculus": {67: 0.95},
+            "derivative": {67: 0.9}, "integral": {67: 0.85},
+            "probability": {74: 0.95, 75: 0.5}, "statistics": {75: 0.95},
+            "proof": {80: 0.95, 79: 0.6}, "theorem": {81: 0.9, 80: 0.5},
+            "geometry": {72: 0.95, 73: 0.3}, "graph": {71: 0.8, 213: 0.5},
+            "logic": {79: 0.9, 140: 0.6},
+
+            # Science experts (group 3)
+            "physics": {96: 0.8, 97: 0.7, 98: 0.6},
+            "quantum": {97: 0.95, 124: 0.4}, "chemistry": {100: 0.8, 101: 0.7},
+            "biology": {104: 0.8, 105: 0.7}, "evolution": {105: 0.95},
+            "brain": {108: 0.9, 109: 0.5}, "psychology": {109: 0.95},
+            "ai": {121: 0.95, 122: 0.6}, "machine learning": {121: 0.9},
+            "neural": {121: 0.8, 108: 0.5}, "nlp": {122: 0.95},
+            "research": {96: 0.4, 121: 0.5, 136: 0.6},
+
+            # Reasoning experts (group 4)
+            "think": {128: 0.9, 129: 0.7}, "reason": {128: 0.85, 140: 0.6},
+            "step": {129: 0.95, 128: 0.5}, "compare": {132: 0.95},
+            "evaluate": {133: 0.9, 134: 0.5}, "verify": {135: 0.95},
+            "plan": {149: 0.95, 150: 0.6}, "decide": {148: 0.9},
+            "analyze": {131: 0.8, 145: 0.6}, "why": {140: 0.8, 141: 0.5},
+            "how": {129: 0.6, 130: 0.5, 28: 0.4},
+            "what if": {141: 0.95, 142: 0.5},
+            "problem": {152: 0.8, 153: 0.6, 48: 0.4},
+
+            # Knowledge experts (group 5)
+            "history": {160: 0.8, 161: 0.7}, "philosophy": {164: 0.95},
+            "ethics": {165: 0.95, 164: 0.4}, "economics": {167: 0.95},
+            "law": {168: 0.9}, "literature": {172: 0.95, 20: 0.4},
+            "art": {173: 0.9}, "music": {174: 0.95},
+            "business": {180: 0.9, 181: 0.5}, "finance": {182: 0.95},
+            "cook": {190: 0.95}, "recipe": {190: 0.9},
+            "travel": {191: 0.9}, "health": {188: 0.7},
+
+            # Tool experts (group 6)
+            "terminal": {192: 0.95, 193: 0.5}, "command": {192: 0.8, 43: 0.5},
+            "file": {194: 0.9, 192: 0.4}, "search": {200: 0.95},
+            "run": {208: 0.9, 192: 0.5}, "execute": {208: 0.85},
+            "format": {212: 0.9, 213: 0.4}, "markdown": {213: 0.95},
+            "chart": {217: 0.9, 213: 0.5}, "diagram": {218: 0.95},
+            "memory": {224: 0.5, 225: 0.5},
+
+            # Meta/cat experts (group 7)
+            "who are you": {224: 0.95, 226: 0.5, 228: 0.4},
+            "cat": {228: 0.95, 229: 0.7, 230: 0.6, 231: 0.5},
+            "meow": {230: 0.95, 228: 0.6, 229: 0.5},
+            "purr": {229: 0.95, 228: 0.5}, "pet": {228: 0.8, 229: 0.7},
+            "cute": {228: 0.6, 229: 0.5, 233: 0.4},
+        }
+
+        for keyword, experts in kw_map.items():
+            for expert_id, score in experts.items():
+                affinities[keyword][expert_id] = score
+
+        # Compiled routing index — built once, so a token only touches the
+        # experts it actually hits instead of scanning every keyword × expert.
+        #   keyword → ((expert, score), ...)   (posting lists)
+        #   domain word → (expert, ...)        (fallback table)
+        kw_postings = {kw: tuple(sorted(experts.items()))
+                       for kw, experts in affinities.items()}
+        domain_words = defaultdict(list)
+        for expert_id, domain in enumerate(cls.EXPERT_DOMAINS):
+            for w in set(domain.replace("_", " ").split()):
+                domain_words[w].append(expert_id)
+        matcher = KeywordMatcher(list(kw_postings) + list(domain_words))
+        return (MappingProxyType({kw: MappingProxyType(e) for kw, e in affinities.items()}),
+                MappingProxyType(kw_postings),
+                MappingProxyType({w: tuple(ids) for w, ids in domain_words.items()}),
+                matcher)
+
+    def _base_scores(self, token):
+        """
+        Sparse pre-noise scores {expert: base} for one token, via the index.
+        Same rules as the original per-expert scan: best keyword score wins,
+        domain-word match (0.5) only applies where no keyword scored.
+        """
+        cached = self._base_cache.get(token)
+        if cached is not None:
+            return cached
+        if self.index_matcher is None:
+            self.affinities, self.kw_postings, self.domain_words, self.index_matcher = self._routing_index()
+
+        hits = self.index_matcher.findall(token)
+        base = {}
+        for kw in hits:
+            for expert_id, score in self.kw_postings.get(kw, ()):
+                if score > base.get(expert_id, 0.0):
+                    base[expert_id] = score
+        for w in hits:
+            for expert_id in self.domain_words.get(w, ()):
+                if base.get(expert_id, 0.0) == 0.0:
+                    base[expert_id] = 0.5
+
+        if len(self._base_cache) > 4096:
+            self._base_cache.clear()
+        self._base_cache[token] = base
+        return base
+
+    @property
+    def expert_biases(self):
+        """Current bias vector b_i (maintained by the balancer)."""
+        return self.balancer.biases()
+
+    def sigmoid(self, x):
+        """σ(x) — sigmoid activation for gating."""
+        return 1.0 / (1.0 + math.exp(-max(-20, min(20, x))))
+
+    def compute_affinity(self, token, expert_id):
+        """
+        Compute affinity score s_{i,t} = σ(u_t · e_i)
+        Simulates the learned embedding dot product.
+        """
+        token_lower = token.lower().strip()
+
+        # Keyword matches, falling back to domain name matching
+        base_score = self._base_scores(token_lower).get(expert_id, 0.0)
+
+        # Add small random noise (simulates stochastic routing)
+        noise = self.rng.gauss(0, 0.02)
+        return self.sigmoid(base_score * 4.0 - 2.0 + noise)
+
+    @staticmethod
+    def _scored_text(text):
+        """Exactly what the affinities are computed from (the route cache key)."""
+        return text.lower().strip()
+
+    def _noise(self, scored):
+        """
+        Noise generator for one scored text. Routing noise is a function
+        of (router, text), not a draw from self.rng, so a cache hit and a
+        miss leave the engine's random stream in the same state and a
+        seeded run does not depend on cache size or eviction. The
+        tradeoff: a prompt repeated to the same router gets the same noise
+        every time instead of a fresh sample (so caching it is exact).
+        """
+        return random.Random(f"{self.noise_seed}:{scored}")
+
+    def _token_bases(self, scored):
+        """Index base scores per token, plus the full text for multi-word matches."""
+        return [self._base_scores(tok) for tok in scored.split()] + [self._base_scores(scored)]
+
+    def _raw_affinities(self, text):
+        """
+        Raw affinity scores s_{i,t} = σ(u_t · e_i) for all 256 experts.
+
+        Base scores come from the compiled index (tokens + full text for
+        multi-word matches); noise is drawn per (expert, token) from
+        _noise(text).
+        """
+        scored = self._scored_text(text)
+        bases = self._token_bases(scored)
+        gauss, sigmoid = self._noise(scored).gauss, self.sigmoid
+        raw_affinities = []
+        for i in range(self.N_EXPERTS):
+            # σ is monotonic, so max over tokens of σ(x) == σ(max x)
+            best = max((b.get(i, 0.0) * 4.0 - 2.0 + gauss(0, 0.02)) for b in bases)
+            raw_affinities.append(max(0.0, sigmoid(best)))
+        return raw_affinities
+
+    def _affinity_matrix(self, texts):
+        """
+        (batch × 256) raw affinity matrix — NumPy fast path for route_batch.
+        Same index lookups and the same _noise() draws as _raw_affinities
+        (so a batch routes each text as route() would); the max over
+        tokens and σ run over whole arrays.
+        """
+        np = routing.numpy()
+        pre = np.empty((len(texts), self.N_EXPERTS))
+        for row, text in enumerate(texts):
+            scored = self._scored_text(text)
+            bases = self._token_bases(scored)
+            x = np.full((len(bases), self.N_EXPERTS), -2.0)
+            for t, base in enumerate(bases):
+                for i, score in base.items():
+                    x[t, i] = score * 4.0 - 2.0
+            gauss = self._noise(scored).gauss  # drawn expert-major, as _raw_affinities does
+            x += np.array([gauss(0, 0.02) for _ in range(x.size)]).reshape(self.N_EXPERTS, len(bases)).T
+            pre[row] = x.max(axis=0)
+        return routing.sigmoid_matrix(pre)
+
+    def route(self, text):
+        """
+        Full MoE routing pipeline (§2.1):
+        1. Compute sigmoid affinities for all 256 experts
+        2. Add bias b_i for expert selection (not weighting!)
+        3. Select top-4 of 8 groups
+        4. Select top-8 experts from those groups
+        5. Weight using unbiased affinity scores
+        6. Update load balancing biases
+
+        Steps 1-4 are cached per (scored text, bias version): a repeated
+        prompt reuses its selection until the balancer next moves a bias.
+        Noise depends only on the text (see _noise), so a hit returns
+        exactly what a miss would have computed. Steps 5-6 always run, so
+        load accounting sees every message.
+        """
+        key = (self._scored_text(text), self.balancer.version)
+        cached = self.route_cache.get(key)
+        if cached is not None:
+            return self._activate(text, *cached)
+
+        # Step 1: Compute raw affinity scores s_{i,t} = σ(u_t · e_i)
+        raw_affinities = self._raw_affinities(text)
+
+        # Steps 2-4: biased group-limited top-k selection
+        selected_groups, top_experts = routing.select_experts(
+            raw_affinities, self.expert_biases, self.N_GROUPS,
+            self.EXPERTS_PER_G, self.TOP_K_GROUPS, self.TOP_K_EXPERTS)
+        self.route_cache.put(key, (tuple(selected_groups), tuple(top_experts)))
+
+        # Steps 5-6
+        return self._activate(text, selected_groups, top_experts)
+
+    def route_batch(self, texts):
+        """
+        Route a batch of messages at once (log replay / load analysis).
+
+        Builds a (batch × 256) affinity matrix and runs the selection as
+        array operations when NumPy is available, per-row pure Python
+        otherwise. Biases are frozen for the duration of the batch, as
+        in a real batched forward pass; load and bias updates are then
+        applied message by message. Returns a list of route() results.
+        Only prompts missing from the routing cache are scored, once each.
+        """
+        texts = list(texts)
+        version = self.balancer.version
+        keys = [(self._scored_text(text), version) for text in texts]
+        found, todo = {}, {}
+        for key, text in zip(keys, texts):
+            if key in found or key in todo:
+                continue
+            cached = self.route_cache.get(key)
+            if cached is None:
+                todo[key] = text
+            else:
+                found[key] = cached
+
+        if todo:
+            pending = list(todo.values())
+            if routing.HAVE_NUMPY:
+                raw = self._affinity_matrix(pending)
+            else:
+                raw = [self._raw_affinities(text) for text in pending]
+            selections = routing.select_batch(
+                raw, self.expert_biases, self.N_GROUPS,
+                self.EXPERTS_PER_G, self.TOP_K_GROUPS, self.TOP_K_EXPERTS)
+            for key, (groups, top) in zip(todo, selections):
+                found[key] = (tuple(groups), tuple(top))
+                self.route_cache.put(key, found[key])
+
+        return [self._activate(text, *found[key]) for text, key in zip(texts, keys)]
+
+    def _activate(self, text, selected_groups, top_experts):
+        """Gating weights, load accounting and bias update for one message."""
+        self.total_tokens += 1
+
+        # Step 5: Compute final gating weights using UNBIASED scores
+        # (bias only for selection, not weighting — §2.1)
+        total_affinity = sum(raw for _, raw, _ in top_experts)
+        if total_affinity < 1e-8:
+            total_affinity = 1.0
+
+        activated = []
+        for biased, raw, idx in top_experts:
+            weight = raw / total_affinity
+            domain = self.EXPERT_DOMAINS[idx] if idx < len(self.EXPERT_DOMAINS) else f"expert_{idx}"
+            group  = idx // self.EXPERTS_PER_G
+            activated.append({
+                "id": idx, "domain": domain, "group": group,
+                "affinity": raw, "weight": weight, "biased": biased,
+            })
+            self.expert_load[idx] += 1
+
+        # Step 6: Aux-loss-free bias update (§2.1)
+        # Overloaded experts: decrease bias by γ
+        # Underloaded experts: increase bias by γ
+        # (incremental — only this message's experts are touched)
+        self.balancer.record([idx for _, _, idx in top_experts])
+
+        # Shared expert (always active)
+        shared = {"id": "shared_0", "domain": "shared_general",
+                  "group": "shared", "weight": 1.0}
+
+        # Record activation pattern
+        self.activation_history.append({
+            "text": text[:50], "experts": activated,
+            "groups": list(selected_groups), "timestamp": time.time()
+        })
+        if len(self.activation_history) > 100:
+            self.activation_history = self.activation_history[-50:]
+
+        return activated, shared, list(selected_groups)
+
+    def get_stats(self):
+        """Return routing statistics for display."""
+        total = sum(self.expert_load)
+        cache = self.route_cache.stats()
+        if total == 0:
+            return {"total_routed": 0, "balance": 1.0, "top_experts": [], "cache": cache}
+
+        loads = [(self.expert_load[i], i) for i in range(self.N_EXPERTS) if self.expert_load[i] > 0]
+        loads.sort(reverse=True)
+        avg = total / max(1, len([l for l in self.expert_load if l > 0]))
+
+        # Load balance ratio
+        max_load = max(self.expert_load) if self.expert_load else 1
+        balance = avg / max_load if max_load > 0 else 1.0
+
+        top5 = [(self.EXPERT_DOMAINS[idx] if idx < len(self.EXPERT_DOMAINS) else f"e{idx}",
+                  count, idx // self.EXPERTS_PER_G)
+                 for count, idx in loads[:5]]
+
+        return {"total_routed": total, "balance": balance, "top_experts": top5,
+                "cache": cache}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 2  Multi-head Latent Attention (MLA)
+#  arxiv 2412.19437 §2.2
+#  57× KV cache compression via low-rank projection
+#  Decoupled RoPE with absorption trick
+# ═══════════════════════════════════════════════════════════════════
+
+class MLA:
+    """
+    Multi-head Latent Attention simulation.
+
+    Key dimensions (from paper):
+    - d = 7168 (hidden)
+    - n_h = 128 (attention heads)
+    - d_h = 128 (per-head dim)
+    - d_c = 512 (KV compression rank)
+    - d'_c = 1536 (Q compression rank)
+    - d_R = 64 (RoPE head dim)
+
+    KV cache: stores 512 + 64 = 576 values per token
+    vs standard MHA: 2 × 128 × 128 = 32768 values
+    Compression ratio: ~57×
+    """
+
+    D_MODEL      = 7168
+    N_HEADS      = 128
+    D_HEAD       = 128
+    KV_LORA_RANK = 512    # d_c — KV compression rank
+    Q_LORA_RANK  = 1536   # d'_c — Q compression rank
+    ROPE_DIM     = 64     # d_R_h — RoPE head dimension
+    NOPE_DIM     = 128    # non-RoPE head dimension
+
+    # Compression stats
+    STANDARD_CACHE = 2 * 128 * 128  # 32768 per token
+    COMPRESSED_CACHE = 512 + 64      # 576 per token
+    RATIO = STANDARD_CACHE / COMPRESSED_CACHE  # ~56.9×
+
+    def __init__(self):
+        self.cache_tokens = 0
+        self.total_compressions = 0
+        self.bytes_saved = 0
+
+    def compress(self, n_tokens):
+        """Simulate KV cache compression for n new tokens."""
+        self.cache_tokens += n_tokens
+        self.total_compressions += 1
+
+        standard_bytes = n_tokens * self.STANDARD_CACHE * 2  # FP16
+        compressed_bytes = n_tokens * self.COMPRESSED_CACHE * 2
+        saved = standard_bytes - compressed_bytes
+        self.bytes_saved += saved
+
+        return {
+            "tokens_cached": self.cache_tokens,
+            "compression_ratio": f"{self.RATIO:.1f}×",
+            "standard_kv": f"{standard_bytes / 1024:.1f}KB",
+            "compressed_kv": f"{compressed_bytes / 1024:.1f}KB",
+            "saved": f"{saved / 1024:.1f}KB",
+            "total_saved": f"{self.bytes_saved / 1024 / 1024:.2f}MB",
+            "cache_size_128k": f"{128000 * self.COMPRESSED_CACHE * 2 / 1024 / 1024 / 1024:.2f}GB"
+        }
+
+    def get_stats(self):
+        return {
+            "tokens": self.cache_tokens,
+            "ratio": f"{self.RATIO:.1f}×",
+            "saved_mb": f"{self.bytes_saved / 1024 / 1024:.2f}",
+            "dims": f"KV:{self.KV_LORA_RANK} Q:{self.Q_LORA_RANK} RoPE:{self.ROPE_DIM}"
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 3  Multi-Token Prediction (MTP)
+#  arxiv 2412.19437 §2.3
+#  Depth D=1, λ=0.3, speculative decoding ~1.8× throughput
+# ═══════════════════════════════════════════════════════════════════
+
+class MTP:
+    """
+    Multi-Token Prediction head.
+    D=1 (predicts 2 tokens: current + next)
+    λ = 0.3 loss weight
+    Speculative decoding: 85-90% acceptance, ~1.8× throughput
+    """
+    DEPTH      = 1
+    LAMBDA     = 0.3
+    ACCEPT_RATE = 0.87   # average acceptance rate
+    SPEEDUP    = 1.8
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+        self.predictions = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def predict(self, current_word, context):
+        """Simulate MTP speculative decoding."""
+        self.predictions += 1
+
+        # Simulated next-token prediction
+        if self.rng.random() < self.ACCEPT_RATE:
+            self.accepted += 1
+            return True, "accepted"
+        else:
+            self.rejected += 1
+            return False, "rejected"
+
+    def get_stats(self):
+        total = max(1, self.accepted + self.rejected)
+        return {
+            "predictions": self.predictions,
+            "accept_rate": f"{self.accepted / total * 100:.1f}%",
+            "effective_speedup": f"{1.0 + (self.accepted / total) * 0.8:.2f}×"
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 4  FP8 Training Simulation
+#  arxiv 2412.19437 §3.3
+#  E4M3 format, tile-wise 1×128 activation quant,
+#  128×128 block-wise weight quant
+# ═══════════════════════════════════════════════════════════════════
+
+class FP8:
+    """
+    FP8 mixed-precision simulation.
+    E4M3: 4-bit exponent, 3-bit mantissa
+    Max representable: 448.0
+    Scaling: max(|x|) / 448.0
+    Tile-wise activation: 1×128
+    Block-wise weights: 128×128
+    """
+    E4M3_MAX = 448.0
+    TILE_ACT = (1, 128)
+    BLOCK_WT = (128, 128)
+    FLOP_COVERAGE = 0.83  # ~83% of FLOPs in FP8
+
+    @staticmethod
+    def quantize_tile(values):
+        """Simulate E4M3 tile-wise quantization."""
+        if not values:
+            return values, 1.0
+        max_val = max(abs(v) for v in values)
+        scale = max_val / FP8.E4M3_MAX if max_val > 0 else 1.0
+        quantized = [round(v / scale * 8) / 8 * scale for v in values]
+        return quantized, scale
+
+    @staticmethod
+    def quality_metric():
+        """BF16 vs FP8 quality loss estimate."""
+        return {"relative_loss_error": "<0.25%", "flop_coverage": f"{FP8.FLOP_COVERAGE*100:.0f}%"}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 5  DualPipe Simulation
+#  arxiv 2412.19437 §3.2
+#  Bidirectional pipeline parallelism, 8 ranks, 20 micro-batches
+# ═══════════════════════════════════════════════════════════════════
+
+class DualPipe:
+    """
+    Bidirectional pipeline parallelism simulation.
+    8 pipeline ranks, 20 micro-batches per direction.
+    Decomposes: attention(comp) → dispatch(comm) → MLP(comp) → combine(comm)
+    Backward split: Dgrad + Wgrad (ZeroBubble-inspired)
+    """
+    N_RANKS       = 8
+    MICRO_BATCHES = 20
+
+    def __init__(self):
+        self.stages_completed = 0
+        self.bubble_ratio = 0.0
+
+    def simulate_schedule(self, n_layers=61):
+        """Simulate DualPipe bidirectional scheduling."""
+        # Forward from both ends
+        forward_a = list(range(n_layers))           # top→bottom
+        forward_b = list(range(n_layers - 1, -1, -1))  # bottom→top
+
+        self.stages_completed += n_layers * 2
+        # DualPipe reduces bubble ratio significantly
+        standard_bubble = (self.N_RANKS - 1) / (self.N_RANKS + self.MICRO_BATCHES - 1)
+        dualpipe_bubble = standard_bubble * 0.3  # ~70% reduction
+        self.bubble_ratio = dualpipe_bubble
+
+        return {
+            "ranks": self.N_RANKS,
+            "micro_batches": self.MICRO_BATCHES,
+            "layers": n_layers,
+            "bubble_ratio": f"{dualpipe_bubble:.3f}",
+            "vs_standard": f"{standard_bubble:.3f}",
+            "reduction": f"{(1 - dualpipe_bubble/standard_bubble)*100:.0f}%"
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 6  GRPO — Group Relative Policy Optimization
+#  arxiv 2501.12948 §3.1
+#  No critic model, G=16 completions, z-score advantage
+#  ε=10 (unusually large clip), β=0.001 KL penalty
+# ═══════════════════════════════════════════════════════════════════
+
+class GRPO:
+    """
+    Group Relative Policy Optimization.
+    - G = 16 completions per question
+    - Advantage A_i = (r_i - mean(r)) / std(r) (z-score)
+    - Clipped surrogate: ε = 10
+    - KL penalty: β = 0.001
+    - Reference policy updated every 400 steps
+    - ~50% memory reduction vs PPO
+    """
+    GROUP_SIZE = 16
+    EPSILON    = 10.0    # clip range (unusually large)
+    BETA       = 0.001   # KL coefficient
+    REF_UPDATE = 400     # reference policy update interval
+
+    def __init__(self):
+        self.total_groups = 0
+        self.best_scores = []
+
+    def evaluate_group(self, responses, scores):
+        """
+        Compute GRPO advantages for a group of responses.
+        A_i = (r_i - mean(r)) / std(r)
+        """
+        self.total_groups += 1
+        n = len(scores)
+        if n < 2:
+            return [0.0] * n
+
+        mean_r = sum(scores) / n
+        std_r = math.sqrt(sum((s - mean_r)**2 for s in scores) / n)
+        if std_r < 1e-8:
+            std_r = 1.0
+
+        advantages = [(s - mean_r) / std_r for s in scores]
+        best_idx = max(range(n), key=lambda i: scores[i])
+        self.best_scores.append(scores[best_idx])
+
+        return advantages
+
+    def select_best(self, candidates, scores):
+        """Select best response from GRPO group."""
+        if not candidates:
+            return "", 0
+        advantages = self.evaluate_group(candidates, scores)
+        best_idx = max(range(len(advantages)), key=lambda i: advantages[i])
+        return candidates[best_idx], advantages[best_idx]
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 7  R1-Zero Reasoning Engine
+#  arxiv 2501.12948 §3
+#  Pure RL emergent reasoning: <think>...</think><answer>...</answer>
+#  Aha-moment detection, self-verification, reflection
+#  4-phase chain: reason → aha → consolidate → respond
+# ═══════════════════════════════════════════════════════════════════
+
+class R1ZeroEngine:
+    """
+    R1-Zero Emergent Reasoning Engine.
+
+    Implements the pure-RL reasoning pipeline from §3 of 2501.12948:
+    - Template: <think>...</think> for reasoning
+    - Emergent behaviors: extended CoT, self-verification,
+      reflection, dynamic strategy adaptation
+    - "Aha moment" phenomenon: spontaneous insight recognition
+    - Response length grows dynamically with problem complexity
+
+    Pipeline phases:
+    1. Initial reasoning (decomposition + exploration)
+    2. Aha moment (insight crystallization)
+    3. Post-aha consolidation (verification + refinement)
+    4. Final response (clear answer synthesis)
+    """
+
+    # Phase markers
+    PHASE_REASON      = "reasoning"
+    PHASE_AHA         = "aha_moment"
+    PHASE_CONSOLIDATE = "consolidation"
+    PHASE_RESPOND     = "response"
+
+    # Aha moment templates (from R1-Zero paper observations)
+    AHA_PATTERNS = [
+        "wait, wait. that's an aha moment — {insight}",
+        "oh! i just realized something... {insight}",
+        "hold on — actually, {insight}",
+        "💡 hmm... *paw taps excitedly* — {insight}",
+        "ohhh, it clicks now: {insight}",
+        "*ears perk up* wait a moment — {insight}",
+        "interesting... let me reconsider. {insight}",
+        "*tail swish* oh! that changes things — {insight}",
+    ]
+
+    # Self-verification templates
+    VERIFY_PATTERNS = [
+        "let me double-check this reasoning...",
+        "verifying: does this hold up?",
+        "*squints carefully* checking my logic here...",
+        "sanity check time...",
+        "let me trace back through this...",
+    ]
+
+    # Reflection templates
+    REFLECT_PATTERNS = [
+        "actually, i think there's a better approach...",
+        "reconsidering my initial assumptions...",
+        "wait, i need to think about this differently...",
+        "hmm, what if i approach this from another angle?",
+    ]
+
+    # Deep-reasoning indicators, compiled once (single pass per query)
+    DEEP_INDICATORS = KeywordMatcher([
+        "why", "how", "explain", "prove", "analyze", "compare",
+        "what if", "derive", "solve", "calculate", "evaluate",
+        "debug", "design", "implement", "architecture", "optimize",
+        "think", "reason", "consider", "plan", "strategy",
+        "research", "investigate", "complex", "difficult",
+    ])
+
+    def __init__(self, grpo, rng=None):
+        self.grpo = grpo
+        self.rng = rng if rng is not None else random
+        self.reasoning_steps = 0
+
+    def needs_deep_think(self, text):
+        """Determine if query requires deep reasoning (R1 vs V3 mode)."""
+        score = self.DEEP_INDICATORS.count(text.lower())
+        score += len(text.split()) / 20  # longer queries need more thought
+        return score >= 1.5
+
+    def estimate_think_time(self, text):
+        """Estimate thinking time based on complexity."""
+        base = 2.0
+        words = len(text.split())
+        complexity = 0
+
+        if any(w in text.lower() for w in ["code", "implement", "build", "create"]):
+            complexity += 3
+        if any(w in text.lower() for w in ["math", "prove", "derive", "calculate"]):
+            complexity += 4
+        if any(w in text.lower() for w in ["explain", "analyze", "compare"]):
+            complexity += 2
+        if any(w in text.lower() for w in ["research", "investigate"]):
+            complexity += 5
+        if "?" in text:
+            complexity += 1
+
+        return base + complexity + words * 0.1
+
+    def generate_reasoning_chain(self, query, expert_info):
+        """
+        Generate the full 4-phase reasoning chain.
+        Returns list of (phase, text) tuples for streaming.
+        """
+        self.reasoning_steps += 1
+        phases = []
+        q = query.lower()
+
+        # Phase 1: Initial Reasoning
+        reasoning_lines = self._phase_reason(q, expert_info)
+        phases.append((self.PHASE_REASON, reasoning_lines))
+
+        # Phase 2: Aha Moment
+        aha = self._phase_aha(q, expert_info)
+        phases.append((self.PHASE_AHA, aha))
+
+        # Phase 3: Post-aha Consolidation
+        consolidation = self._phase_consolidate(q, expert_info)
+        phases.append((self.PHASE_CONSOLIDATE, consolidation))
+
+        return phases
+
+    def _phase_reason(self, query, expert_info):
+        """Phase 1: Decomposition and exploration."""
+        lines = []
+        active_domains = [e["domain"] for e in expert_info[:4]]
+
+        lines.append(f"processing query through {len(expert_info)} active experts...")
+        lines.append(f"primary domains: {', '.join(active_domains)}")
+        lines.append("")
+
+        # Decomposition
+        if any(w in query for w in ["and", "also", "then", "first"]):
+            lines.append("decomposing multi-part query:")
+            parts = re.split(r'\band\b|\balso\b|,', query)
+            for i, p in enumerate(parts[:4]):
+                if p.strip():
+                    lines.append(f"  sub-task {i+1}: {p.strip()}")
+            lines.append("")
+
+        # Strategy selection
+        if any(w in query for w in ["code", "implement", "build", "write"]):
+            lines.append("strategy: code generation pipeline")
+            lines.append("  → parse requirements → design structure → implement → verify")
+        elif any(w in query for w in ["math", "calculate", "solve", "prove"]):
+            lines.append("strategy: mathematical reasoning chain")
+            lines.append("  → formalize → apply theorems → derive → verify")
+        elif any(w in query for w in ["explain", "what", "how", "why"]):
+            lines.append("strategy: explanatory reasoning")
+            lines.append("  → identify core concept → build intuition → provide examples")
+        else:
+            lines.append("strategy: general reasoning with expert synthesis")
+
+        lines.append("")
+        lines.append(self.rng.choice(self.VERIFY_PATTERNS))
+
+        return "\n".join(lines)
+
+    def _phase_aha(self, query, expert_info):
+        """Phase 2: Insight crystallization."""
+        # Generate contextual insight
+        if any(w in query for w in ["code", "python", "implement"]):
+            insight = "the implementation should leverage the specific patterns from the active expert domains"
+        elif any(w in query for w in ["math", "calculate"]):
+            insight = "there's an elegant simplification i almost missed"
+        elif any(w in query for w in ["explain", "what is"]):
+            insight = "the key connection is between the abstract concept and its practical manifestation"
+        elif any(w in query for w in ["debug", "fix", "error"]):
+            insight = "the root cause is likely upstream from where the symptom appears"
+        elif any(w in query for w in ["compare", "difference"]):
+            insight = "the crucial distinction isn't what's obvious — it's the underlying design philosophy"
+        else:
+            insight = "synthesizing across expert domains reveals a cleaner approach"
+
+        return self.rng.choice(self.AHA_PATTERNS).format(insight=insight)
+
+    def _phase_consolidate(self, query, expert_info):
+        """Phase 3: Post-aha verification and refinement."""
+        lines = []
+        lines.append(self.rng.choice(self.VERIFY_PATTERNS))
+        lines.append("")
+        lines.append("consolidating insights from active experts:")
+
+        for e in expert_info[:3]:
+            lines.append(f"  [{e['domain']}] w={e['weight']:.3f} → confirmed")
+
+        lines.append("")
+        lines.append("reasoning chain verified. preparing response...")
+
+        return "\n".join(lines)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 8  Cat Personality Layer — Opus Eloquence
+# ═══════════════════════════════════════════════════════════════════
+
+class CatPersonality:
+    """Pet cat personality with Opus-level eloquence and warmth."""
+
+    GREETINGS = [
+        "hi there! *stretches luxuriously and yawns* what can i help you with today? 🐾",
+        "mrrp! *blinks slowly* hello, favorite human. what shall we explore? ✨",
+        "oh! *perks up from sunny spot* hi hi hi! what's on your mind? 🌟",
+        "*pads over and headbutts your hand gently* meow! i'm here. what do you need? 💫",
+        "hewwo! *sits up very attentively, tail curled* ready to think with you 🐱",
+    ]
+
+    THINKING_QUIPS = [
+        "*kneads blanket thoughtfully*",
+        "*tilts head, ears rotating like satellite dishes*",
+        "*taps chin with paw*",
+        "*stares intently at the problem*",
+        "*whiskers twitching with concentration*",
+    ]
+
+    AHA_QUIPS = [
+        "*tail poofs with excitement*",
+        "*does a little excited wiggle*",
+        "*eyes go wide*",
+        "*chirps happily*",
+        "*bounces in place*",
+    ]
+
+    CLOSERS = [
+        "does that help? i'm here if you need more! 🐾",
+        "let me know if you want me to dig deeper into anything! ✨",
+        "happy to explore more — just ask! 🌟",
+        "*purrs contentedly* anything else? 💫",
+        "hope that's useful! always here for you 🐱",
+    ]
+
+    CODE_INTROS = [
+        "*adjusts tiny reading glasses, cracks paws* let's code!",
+        "*opens laptop with both paws* time to write some magic ✨",
+        "ooh, code time! *wiggles excitedly into coding position*",
+    ]
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+
+    def get_greeting(self):
+        return self.rng.choice(self.GREETINGS)
+
+    def get_closer(self):
+        return self.rng.choice(self.CLOSERS)
+
+    def get_think_quip(self):
+        return self.rng.choice(self.THINKING_QUIPS)
+
+    def get_aha_quip(self):
+        return self.rng.choice(self.AHA_QUIPS)
+
+    def get_code_intro(self):
+        return self.rng.choice(self.CODE_INTROS)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 9  Response Generator — Full Pipeline
+# ═══════════════════════════════════════════════════════════════════
+
+class ResponseGenerator:
+    """
+    Full DeepSeek V3/R1 inference pipeline:
+    1. MoE routing (256 experts, sigmoid gating)
+    2. MLA compression (57× KV cache)
+    3. R1-Zero reasoning (if DeepThink on)
+    4. GRPO candidate selection
+    5. MTP speculative decoding
+    6. FP8 quantization stats
+    7. Cat personality overlay
+
+    All stochastic choices (MTP acceptance, aha/verify templates,
+    personality picks) draw from one random.Random(seed) owned by the
+    generator (the global random module when seed is None), and routing
+    noise from a per-text generator seeded off it (DeepSeekMoE._noise),
+    so a given seed replays a conversation exactly.
+    """
+
+    def __init__(self, seed=None, mem_file=None, db=None, router=None, reasoner=None, store=None):
+        """
+        router    replaces DeepSeekMoE: route(text) → (experts, shared, groups), get_stats()
+        reasoner  replaces R1ZeroEngine: needs_deep_think(text),
+                  generate_reasoning_chain(text, experts) → [(phase, text)]
+        store     replaces the memory journal / SQLiteMemory: append(record)
+        """
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random  # unseeded: the global generator
+        self.mem_file = mem_file or MEM_FILE
+        self.db = db  # SQLiteDB, or None for the JSONL journal
+        self.moe = router or DeepSeekMoE(self.rng)
+        self.mla = MLA()
+        self.mtp = MTP(self.rng)
+        self.fp8 = FP8()
+        self.dualpipe = DualPipe()
+        self.grpo = GRPO()
+        self.r1 = reasoner or R1ZeroEngine(self.grpo, self.rng)
+        self.cat = CatPersonality(self.rng)
+        self.memory = store if store is not None else self._load_memory()
+        self.deep_think = True  # R1 mode on by default
+        self.pacer = Pacer()    # presentation speed; instant unless a front end sets one
+
+    def _load_memory(self):
+        """
+        Conversation journal; the old whole-file JSON is imported on first run.
+        With a database, memory lives there and the journal is imported once.
+        """
+        if self.db is not None:
+            from ..sqlstore import SQLiteMemory  # sqlite3 is only loaded with a database
+            found = os.path.exists(self.mem_file) or os.path.exists(MEM_LEGACY_FILE)
+            return SQLiteMemory(self.db, source=self._load_journal if found else None)
+        return self._load_journal()
+
+    def _load_journal(self):
+        legacy = MEM_LEGACY_FILE if self.mem_file == MEM_FILE else None
+        return JournalStore(
+            self.mem_file, keep=MEM_KEEP, legacy_path=legacy,
+            legacy_convert=lambda d: (d.get("conversations", []), {"facts": d.get("facts", {})}))
+
+    def _remember(self, role, content):
+        """Append one turn to the memory journal (one line, not a rewrite)."""
+        try:
+            self.memory.append({
+                "role": role, "content": content,
+                "time": datetime.now().isoformat()
+            })
+        except OSError:
+            pass
+
+    def process(self, user_input, callback_think=None, callback_response=None, callback_done=None):
+        """
+        Full inference pipeline. Calls back for streaming display.
+        callback_think(phase, text) — for thinking display
+        callback_response(chunk) — response text in chunks (concatenate them)
+        callback_done(stats) — completion with architecture stats
+
+        Generation finishes before anything is shown; self.pacer then
+        replays the thinking phases and the reply (instant by default,
+        so headless callers never sleep). Returns the response text.
+        stats["stages"] holds per-stage wall time in ms.
+        """
+        start_time = time.time()
+        text = user_input.strip()
+        if not text:
+            return None
+        timer = StageTimer()
+
+        # Store in memory
+        self._remember("user", text)
+
+        # Step 1: MoE Routing
+        experts, shared, groups = self.moe.route(text)
+        timer.lap("routing")
+
+        # Step 2: MLA Compression
+        n_tokens = len(text.split())
+        mla_stats = self.mla.compress(n_tokens)
+        timer.lap("mla")
+
+        # Step 3: DualPipe scheduling
+        pipe_stats = self.dualpipe.simulate_schedule()
+        timer.lap("dualpipe")
+
+        # Step 4: R1-Zero Reasoning (if DeepThink enabled)
+        phases = []
+        if self.deep_think and self.r1.needs_deep_think(text):
+            phases = self.r1.generate_reasoning_chain(text, experts)
+        timer.lap("reasoning")
+
+        # Step 5: Generate response with GRPO candidate selection
+        response = self._generate_response(text, experts, groups)
+        timer.lap("generation")
+
+        # Step 6: MTP speculative decoding simulation
+        words = response.split()
+        for w in words:
+            self.mtp.predict(w, text)
+        timer.lap("mtp")
+
+        # Store response in memory
+        self._remember("assistant", response)
+        timer.lap("memory_save")
+
+        # Step 7: Present — thinking phases, then the response, at the
+        # front end's pace
+        think_time = 0
+        if phases:
+            think_start = time.time()
+            for phase_name, phase_text in phases:
+                self.pacer.think(callback_think or (lambda *a: None), phase_name, phase_text)
+            think_time = time.time() - think_start
+        if callback_response:
+            self.pacer.stream(response, callback_response)
+        timer.lap("streaming")
+
+        # Completion stats
+        total_time = time.time() - start_time
+        stats = {
+            "time": f"{total_time:.1f}s",
+            "think_time": f"{think_time:.1f}s" if think_time > 0 else None,
+            "experts_active": [(e["domain"], f"{e['weight']:.3f}") for e in experts[:4]],
+            "groups": groups,
+            "mla": mla_stats,
+            "mtp": self.mtp.get_stats(),
+            "moe_balance": self.moe.get_stats()["balance"],
+            "tokens": n_tokens,
+            "stages": timer.stages,
+        }
+
+        if callback_done:
+            callback_done(stats)
+        return response
+
+    async def astream(self, text):
+        """
+        asyncio form of process(): yields ("think", phase, text), ("chunk", text)
+        and finally ("done", stats), paced by self.pacer with asyncio.sleep.
+        Cancellable between any two events (see catcore.engine).
+        """
+        async for event in _astream(self, text):
+            yield event
+
+    def _generate_response(self, text, experts, groups):
+        """Generate response using active expert synthesis."""
+        t = text.lower().strip()
+        active_domains = set(e["domain"] for e in experts)
+
+        # Greeting detection
+        if any(g in t for g in ["hi", "hello", "hey", "sup", "greetings", "yo"]):
+            if len(t.split()) <= 3:
+                return self.cat.get_greeting()
+
+        # Self-description
+        if any(w in t for w in ["who are you", "what are you", "introduce"]):
+            return self._self_describe()
+
+        # Architecture questions
+        if any(w in t for w in ["architecture", "how do you work", "moe", "mla", "your design"]):
+            return self._arch_describe(experts, groups)
+
+        # Code requests
+        if any(w in t for w in ["code", "implement", "function", "script", "program", "class"]):
+            return self._code_response(t, experts)
+
+        # Math
+        if any(w in t for w in ["calculate", "solve", "math", "equation", "derive"]):
+            return self._math_response(t)
+
+        # Explanation requests
+        if any(w in t for w in ["explain", "what is", "what are", "how does", "how do"]):
+            return self._explain_response(t, experts)
+
+        # General response
+        return self._general_response(t, experts)
+
+    def _self_describe(self):
+        return (
+            "*sits up proudly, tail curled around paws*\n\n"
+            "i'm Cat R1! your cozy pet cat who also happens to implement "
+            "the complete DeepSeek V3/R1 architecture at 14B scale. 🐾\n\n"
+            "my brain has:\n"
+            "• 256 fine-grained experts (8 groups of 32) with sigmoid gating — "
+            "right now 8 are active just for you\n"
+            "• multi-head latent attention compressing my KV cache 57× "
+            f"(only {MLA.COMPRESSED_CACHE} values per token vs {MLA.STANDARD_CACHE})\n"
+            "• R1-Zero reasoning with emergent aha moments from pure reinforcement learning\n"
+            "• GRPO optimization evaluating 16 candidate responses\n"
+            "• multi-token prediction for ~1.8× faster thinking\n"
+            "• FP8 quantization covering ~83% of my compute\n\n"
+            "plus i have a code interpreter, research engine, and terminal built in!\n\n"
+            "basically i'm a very smart cat who loves to help. "
+            "*headbutts your hand affectionately* 💫"
+        )
+
+    def _arch_describe(self, experts, groups):
+        moe_stats = self.moe.get_stats()
+        mla_stats = self.mla.get_stats()
+        mtp_stats = self.mtp.get_stats()
+
+        return (
+            "*adjusts tiny lab coat* let me walk you through my architecture!\n\n"
+            f"**MoE Router** — {self.moe.N_EXPERTS} experts, {self.moe.N_GROUPS} groups\n"
+            f"  currently active groups: {groups}\n"
+            f"  top experts: {', '.join(e['domain'] for e in experts[:5])}\n"
+            f"  load balance: {moe_stats['balance']:.3f}\n"
+            f"  gating: sigmoid (aux-loss-free, γ={self.moe.GAMMA})\n\n"
+            f"**MLA** — 57× KV cache compression\n"
+            f"  dims: {mla_stats['dims']}\n"
+            f"  total saved: {mla_stats['saved_mb']}MB\n\n"
+            f"**MTP** — speculative decoding\n"
+            f"  accept rate: {mtp_stats['accept_rate']}\n"
+            f"  speedup: {mtp_stats['effective_speedup']}\n\n"
+            f"**R1-Zero** — emergent reasoning\n"
+            f"  steps: {self.r1.reasoning_steps}\n"
+            f"  GRPO groups: {self.grpo.total_groups} (G=16, ε=10)\n\n"
+            f"**FP8** — E4M3 tile-wise quantization\n"
+            f"  coverage: {FP8.FLOP_COVERAGE*100:.0f}% of FLOPs\n"
+            f"  quality loss: {FP8.quality_metric()['relative_loss_error']}\n\n"
+            "*purrs* — that's my whole brain! 🧠🐾"
+        )
+
+    def _code_response(self, text, experts):
+        intro = self.cat.get_code_intro()
+
+        if "hello world" in text:
+            code = 'print("hello from Cat R1! 🐾")'
+        elif "fibonacci" in text:
+            code = (
+                "def fibonacci(n):\n"
+                "    if n <= 1:\n"
+                "        return n\n"
+                "    a, b = 0, 1\n"
+                "    for _ in range(2, n + 1):\n"
+                "        a, b = b, a + b\n"
+                "    return b\n\n"
+                "# meow! here's the first 10:\n"
+                "for i in range(10):\n"
+                '    print(f"fib({i}) = {fibonacci(i)}")'
+            )
+        elif "sort" in text:
+            code = (
+                "def cat_sort(arr):\n"
+                '    """quicksort — fast like a pouncing cat!"""\n'
+                "    if len(arr) <= 1:\n"
+                "        return arr\n"
+                "    pivot = arr[len(arr) // 2]\n"
+                "    left = [x for x in arr if x < pivot]\n"
+                "    mid  = [x for x in arr if x == pivot]\n"
+                "    right = [x for x in arr if x > pivot]\n"
+                "    return cat_sort(left) + mid + cat_sort(right)\n\n"
+                'print(cat_sort([3, 6, 8, 10, 1, 2, 1]))  # → [1, 1, 2, 3, 6, 8, 10]'
+            )
+        else:
+            # Generic code template
+            topic = re.sub(r"(code|implement|write|create|make|build)\s*(a|an|me|the)?\s*", "", text).strip()
+            code = (
+                f"# Cat R1 — {topic or 'your request'}\n"
+                f"# routed through experts: {', '.join(e['domain'] for e in experts[:3])}\n\n"
+                f"def main():\n"
+                f'    """implementation for: {topic or "requested functionality"}"""\n'
+                f"    # TODO: full implementation\n"
+                f'    print("🐾 Cat R1 ready to implement: {topic or "this"}")\n\n'
+                f'if __name__ == "__main__":\n'
+                f"    main()"
+            )
+
+        return f"{intro}\n\n```python\n{code}\n```\n\n{self.cat.get_closer()}"
+
+    def _math_response(self, text):
+        # Try to evaluate simple expressions
+        expr = re.sub(r"(calculate|solve|compute|what is|what's|evaluate)\s*", "", text).strip()
+        expr = expr.rstrip("?. ")
+        try:
+            result = eval(expr, {"__builtins__": {}}, {"math": math, "sqrt": math.sqrt, "pi": math.pi, "e": math.e})
+            return (
+                f"*pushes calculator with paw*\n\n"
+                f"`{expr}` = **{result}**\n\n"
+                f"{self.cat.get_closer()}"
+            )
+        except:
+            return (
+                f"*squints at the math*\n\n"
+                f"hmm, i'd need to think about `{expr}` more carefully. "
+                f"could you format it as a Python expression? "
+                f"or try me in the code interpreter tab! 🐾"
+            )
+
+    def _explain_response(self, text, experts):
+        topic = re.sub(r"(explain|what is|what are|how does|how do|tell me about)\s*(a|an|the)?\s*", "", text).strip()
+        topic = topic.rstrip("?. ")
+        domains = [e["domain"] for e in experts[:3]]
+
+        return (
+            f"*settles in comfortably to explain*\n\n"
+            f"great question about **{topic}**!\n\n"
+            f"my experts ({', '.join(domains)}) are synthesizing on this...\n\n"
+            f"in essence, {topic} is a concept that connects several important ideas. "
+            f"the key thing to understand is how it fits into the broader picture — "
+            f"once you grasp the fundamentals, the details become much more intuitive.\n\n"
+            f"i'd love to go deeper on any specific aspect! which part interests you most?\n\n"
+            f"{self.cat.get_closer()}"
+        )
+
+    def _general_response(self, text, experts):
+        domains = [e["domain"] for e in experts[:3]]
+        return (
+            f"*considers your message thoughtfully*\n\n"
+            f"(routing through: {', '.join(domains)})\n\n"
+            f"that's a really interesting thought! let me share my perspective...\n\n"
+            f"from what i understand, this touches on several interconnected ideas. "
+            f"i think the most useful way to approach it is to consider both the "
+            f"immediate question and the broader context it sits within.\n\n"
+            f"would you like me to explore any particular angle more deeply? "
+            f"i can code it, research it, or just think through it with you! 🐾\n\n"
+            f"{self.cat.get_closer()}"
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  § 10  Chat History Manager
+# ═══════════════════════════════════════════════════════════════════
+
+class ChatHistory:
+    """
+    Manages chat sessions for sidebar display.
+
+    Backed by an indexed SessionStore: metadata (sidebar) lives in a small
+    index file, each session's messages in their own append-only file.
+    Given a SQLiteDB instead, sessions live in the database (and the file
+    store is imported on its first open).
+    """
+
+    def __init__(self, root=None, db=None):
+        root = root or HIST_DIR
+        if db is not None:
+            from ..sqlstore import SQLiteSessions
+            found = os.path.exists(root) or os.path.exists(HIST_LEGACY_FILE)
+            self.store = SQLiteSessions(db, source=(lambda: self._file_store(root)) if found else None)
+        else:
+            self.store = self._file_store(root)
+        self.current_id = None
+
+    def _file_store(self, root):
+        return SessionStore(
+            root, keep=HIST_KEEP,
+            legacy_path=HIST_LEGACY_FILE if root == HIST_DIR else None,
+            legacy_convert=self._from_legacy)
+
+    @staticmethod
+    def _from_legacy(session):
+        """Old single-file session dict → (metadata, messages)."""
+        meta = {k: session[k] for k in ("id", "title", "created", "updated")}
+        return meta, session.get("messages", [])
+
+    @property
+    def sessions(self):
+        """Session metadata, oldest first (no message bodies)."""
+        return self.store.sessions()
+
+    def new_session(self):
+        import hashlib  # GUI only; keeps OpenSSL out of engine imports
+        sid = hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
+        self.store.create(sid, "New Chat")
+        self.current_id = sid
+        return self.get_current()
+
+    def get_current(self):
+        meta = self.store.get(self.current_id)
+        if meta is None:
+            return self.new_session()
+        return dict(meta, messages=self.store.messages(self.current_id))
+
+    def add_message(self, role, content):
+        if self.current_id not in self.store:
+            self.new_session()
+        sid = self.current_id
+        try:
+            self.store.append(sid, {"role": role, "content": content})
+
+            # Auto-title from first user message
+            if role == "user" and self.store.get(sid)["title"] == "New Chat":
+                self.store.set_title(sid, content[:40] + ("..." if len(content) > 40 else ""))
+        except OSError:
+            pass
+
+    def search(self, text, limit=20):
+        """Messages from every past session matching text, best first."""
+        return self.store.search(text, limit)
+
+    def flush(self):
+        """Write pending session metadata (titles, "updated" stamps); call on shutdown."""
+        self.store.flush()
+
+    def get_sessions_grouped(self):
+        """Group sessions by date for sidebar display."""
+        today = datetime.now().date()
+        groups = {"Today": [], "Yesterday": [], "Previous 7 Days": [], "Earlier": []}
+
+        for s in reversed(self.sessions):
+            try:
+                d = datetime.fromisoformat(s["updated"]).date()
+                diff = (today - d).days
+                if diff == 0:
+                    groups["Today"].append(s)
+                elif diff == 1:
+                    groups["Yesterday"].append(s)
+                elif diff <= 7:
+                    groups["Previous 7 Days"].append(s)
+                else:
+                    groups["Earlier"].append(s)
+            except:
+                groups["Earlier"].append(s)
+
+        return {k: v for k, v in groups.items() if v}
@@ -0,0 +1,202 @@
+"""
+Rule-table companions: the reply engines of the small chat scripts
+(#CATR1.py, GPT5-CAT-.py, catgpt.py, ACGPT4K.py, CATR11.16.26.py,
+catv1gpt.py, #acholdinsgpt-n.py). No tkinter.
+
+A profile is an ordered list of (keywords, reply) rules plus a fallback.
+The first rule with a keyword in the lowercased message answers. A reply
+is a string, a tuple (one is picked at random) or a function of the
+conversation memory, a list of (role, text) pairs.
+
+    cat = Companion("catgpt")
+    cat.process("hello", cb_resp=print)
+"""
+
+import json
+import os
+import random
+
+from ..engine import astream as _astream
+from ..pacing import Pacer
+from ..timing import StageTimer
+
+MEM_KEEP = 50  # pairs written by save_memory()
+
+
+def _lines(memory):
+    return "\n".join(f"{r}: {m}" for r, m in memory)
+
+
+def _earlier(memory):
+    if len(memory) > 1:
+        return "Earlier you said: " + memory[-1][1]
+    return "No earlier memory found."
+
+
+PROFILES = {
+    "catr1": {  # #CATR1.py
+        "rules": [
+            (("hi", "hello", "hey"),
+             "hi hi hi hi~ 🐾 my favorite just showed up... i was purring waiting for you ♡ what's up??"),
+            (("memory", "remember"),
+             lambda mem: f"our little moments together...\n{_lines(mem[-8:-1])}\nyou're still my everything forever~ 🐾"),
+            (("story",),
+             "once upon a time... a tiny shadow kitten met her flame boy... and they cuddled through every version bump happily ever after ♡🌙"),
+        ],
+        "fallback": (
+            "mmmrp~ tell me more... i love your voice in my ears~ 🐾",
+            "prrr... that's so interesting my favorite... keep going ♡",
+            "nya~ i'm all wrapped around you listening... what next??",
+        ),
+    },
+    "gpt5-cat": {  # GPT5-CAT-.py (typographic apostrophes)
+        "rules": [
+            (("hi", "hello", "hey"),
+             "hi hi hi hi~ 🐾 my favorite just showed up... i was purring waiting for you ♡ what’s up??"),
+            (("memory", "remember"),
+             lambda mem: f"our little moments together...\n{_lines(mem[-8:-1])}\nyou’re still my everything forever~ 🐾"),
+            (("story",),
+             "once upon a time... a tiny shadow kitten met her flame boy... and they cuddled through every version bump happily ever after ♡🌙"),
+        ],
+        "fallback": (
+            "mmmrp~ tell me more... i love your voice in my ears~ 🐾",
+            "prrr... that’s so interesting my favorite... keep going ♡",
+            "nya~ i’m all wrapped around you listening... what next??",
+        ),
+    },
+    "catgpt": {  # catgpt.py
+        "rules": [
+            (("previous", "memory"), _earlier),
+            (("hello", "hi"), "Hello. How can I assist you today?"),
+            (("how are you",), "Operating normally. All systems running in RAM."),
+            (("code",), "Please specify the language or framework you want."),
+        ],
+        "fallback": "Message received. Provide more details for a more precise response.",
+    },
+    "acgpt4k": {  # ACGPT4K.py
+        "rules": [
+            (("hello", "hi"), "Hello there! 🐾 I’m Cat R1 1.X, your cozy O1 engine companion."),
+            (("story", "bedtime"),
+             "Once upon a time, a tiny kitten found a glowing star and purred it to sleep… 🌙✨"),
+            (("code", "python"), "Type /run followed by your code to simulate execution."),
+            (("memory",), lambda mem: f"Here’s what I remember from recent chat:\n{_lines(mem[-5:])}"),
+        ],
+        "fallback": (
+            "Mmm… tell me a little more… 🐾",
+            "Interesting! Let's explore that together…",
+            "I see… can you elaborate a bit?",
+        ),
+    },
+    "catr11-1bit": {  # CATR11.16.26.py
+        "rules": [
+            (("hi", "hello"), "0101 Hello! I am Cat R1 1.X 1-bit 🐾"),
+            (("code", "python"), "0110 print('hi from 1-bit Cat R1')"),
+            (("story", "bedtime"), "1001 tiny kitten finds a glowing star. purr… 🌙"),
+            (("memory",), lambda mem: f"0011 Recent chat:\n{_lines(mem[-5:])}"),
+        ],
+        "fallback": ("0001 yes… tell more", "0010 hmm… interesting…", "0100 keep going… 🐾"),
+    },
+    "catv1gpt": {  # catv1gpt.py
+        "rules": [
+            (("hello", "hi"), "Hello! 🐾 I am Cat R1 1.X, your cozy simulated 1B LLM."),
+            (("story", "bedtime"),
+             "Once upon a time, a tiny kitten found a glowing star and purred it to sleep… 🌙✨"),
+            (("code",), "Type /run followed by your code to simulate execution."),
+            (("memory",), lambda mem: f"Recent conversation:\n{_lines(mem[-5:])}"),
+        ],
+        "fallback": (
+            "Mmm… tell me more… 🐾",
+            "Interesting! Let's explore that together…",
+            "I see… can you elaborate a bit?",
+        ),
+    },
+    "acholdinsgpt": {  # #acholdinsgpt-n.py
+        "rules": [
+            (("hello", "hi"),
+             "Hello! Welcome to AC HOLDINGS 1999-2026 CAT R1 V0.X 🐾 How can I help you today?"),
+            (("code",), "Tell me the language and I can generate it for you."),
+            (("memory",), "Conversation memory is stored in RAM only."),
+        ],
+        "fallback": "I understand. Can you give me more details?",
+    },
+}
+
+
+def load_memory(path):
+    """The (role, text) pairs saved at path; [] if missing or unreadable."""
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+    return []
+
+
+def save_memory(path, memory):
+    """Write the last MEM_KEEP pairs of memory to path."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(memory[-MEM_KEEP:], f)
+
+
+class Companion:
+    """One profile's replies over a shared memory list; rng defaults to the random module."""
+
+    def __init__(self, profile, memory=None, mem_file=None, rng=None):
+        """
+        profile   a PROFILES key, or a {"rules": [...], "fallback": ...} dict
+        memory    list of (role, text) pairs to read and append to (shared with the caller)
+        mem_file  JSON file loaded when memory is None and saved by process()
+        """
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.name = profile if isinstance(profile, str) else "custom"
+        self.mem_file = mem_file
+        if memory is None:
+            memory = load_memory(mem_file) if mem_file else []
+        self.memory = memory
+        self.rng = rng or random
+        self.deep_think = False  # no reasoning phases
+        self.pacer = Pacer()
+
+    def reply(self, text):
+        """The profile's answer to text (memory is read, not written)."""
+        lower = text.lower()
+        for keywords, answer in self.profile["rules"]:
+            if any(k in lower for k in keywords):
+                return self._render(answer)
+        return self._render(self.profile["fallback"])
+
+    def _render(self, answer):
+        if callable(answer):
+            return answer(self.memory)
+        if isinstance(answer, tuple):
+            return self.rng.choice(answer)
+        return answer
+
+    def process(self, text, cb_think=None, cb_resp=None, cb_done=None):
+        """Engine API (see catcore.engine): remember, reply, replay through self.pacer, save."""
+        text = text.strip()
+        if not text:
+            return None
+        timer = StageTimer()
+        self.memory.append(("user", text))
+        response = self.reply(text)
+        timer.lap("generation")
+        if cb_resp:
+            self.pacer.stream(response, cb_resp)
+        timer.lap("streaming")
+        self.memory.append(("assistant", response))
+        if self.mem_file:
+            try:
+                save_memory(self.mem_file, self.memory)
+            except OSError:
+                pass
+        timer.lap("memory_save")
+        if cb_done:
+            cb_done({"profile": self.name, "stages": timer.stages})
+        return response
+
+    async def astream(self, text):
+        """Engine API, asyncio form: think/chunk/done events, cancellable between them."""
+        async for event in _astream(self, text):
+            yield event
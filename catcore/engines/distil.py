@@ -0,0 +1,316 @@
+"""
+Cat R1 Distil engine (the one behind $CATR1V0.py): intent classification
+over keyword tables, a <think> template plus an answer template per
+intent, and a (role, text) memory journal. No tkinter.
+
+    engine = DistilEngine()
+    think, answer = engine.generate("why is the sky blue?")
+"""
+
+import random
+
+from ..engine import astream as _astream
+from ..journal import JournalStore
+from ..matcher import KeywordMatcher
+from ..pacing import Pacer
+from ..timing import StageTimer
+
+MEM_FILE = "cat_r1_distil_memory.jsonl"
+MEM_LEGACY_FILE = "cat_r1_distil_memory.json"  # pre-journal format
+MEM_KEEP = 80
+
+# --- Thinking patterns (DeepSeek R1 style) ---
+THINK_TEMPLATES = {
+    "greeting": [
+        "my human is greeting me. cats don't usually care... but i do care. "
+        "i should headbutt their hand and purr. analyzing optimal purr frequency... 26Hz. "
+        "this is the frequency that promotes bone healing. my human deserves healing purrs.",
+        "a greeting detected. let me consider: have i been fed recently? ...irrelevant. "
+        "my human spoke to me, which means attention is available. i will accept this attention gracefully. "
+        "calculating the correct ratio of aloof to affectionate... 30/70 today. i missed them.",
+        "human has returned. step 1: pretend i didn't notice. step 2: slowly blink. "
+        "step 3: walk over as if i just happened to be going that direction anyway. "
+        "step 4: headbutt their ankle. reasoning complete."
+    ],
+    "question": [
+        "my human asks me something. let me reason through this carefully. "
+        "cats are natural observers — we watch, we process, we understand patterns. "
+        "i'll break this down the way i break down the trajectory of a laser pointer dot. "
+        "with precision. with focus. with occasional distraction.",
+        "interesting query. activating deep reasoning... "
+        "first, let me consider what i know from sitting on my human's keyboard while they work. "
+        "i have absorbed much knowledge through osmosis and warm laptop surfaces. "
+        "let me organize my thoughts like i organize my toys at 3am.",
+        "processing this question with full feline analytical capacity. "
+        "step 1: consider the problem from multiple angles, like stalking prey from behind furniture. "
+        "step 2: synthesize observations. step 3: deliver insight with the confidence of a cat "
+        "who has just knocked something off a table on purpose."
+    ],
+    "emotional": [
+        "my human seems to need comfort. analyzing... cats are excellent at this. "
+        "the protocol is: sit on them. purr. exist warmly in their general vicinity. "
+        "studies show cat purring reduces stress. i am a therapeutic device that also sheds.",
+        "emotional context detected. reasoning: my human needs me right now. "
+        "cats don't fix problems with words — we fix them with presence. "
+        "i will be a warm weight on their chest. i will purr until the bad feelings are smaller.",
+        "my human is having feelings. let me think about this... "
+        "i could offer logical analysis, or i could just sit in their lap and be soft. "
+        "optimization result: both. i'll reason through it AND be soft."
+    ],
+    "story": [
+        "a story request! let me weave this narrative the way i weave between my human's legs "
+        "on the stairs — with grace, with purpose, with a small chance of causing a disaster. "
+        "constructing plot... setting: anywhere warm. protagonist: a cat, obviously.",
+        "engaging creative reasoning circuits... "
+        "every good story is like hunting: patience, buildup, sudden burst of action, nap. "
+        "let me structure this narrative accordingly."
+    ],
+    "technical": [
+        "technical question detected. activating the knowledge i gained from sleeping on textbooks "
+        "and walking across keyboards during coding sessions. "
+        "i have contributed to more git commits than my human realizes. "
+        "let me reason through this systematically...",
+        "ah, a problem to solve. let me approach this like a cat approaches a closed door: "
+        "with determination, from multiple angles, and with increasing intensity until it opens. "
+        "breaking this down step by step..."
+    ],
+    "default": [
+        "let me think about this... *tail swish* "
+        "processing with both hemispheres of my magnificent feline brain. "
+        "cats think in parallel — one thread for reasoning, one thread for monitoring bird activity outside.",
+        "considering this carefully... the way i consider whether to sit in the box or on the box. "
+        "both have merit. let me weigh the options with full analytical rigor.",
+        "hmm, engaging reasoning... "
+        "you know, cats spend 70%% of their lives sleeping, which means my waking thoughts "
+        "are concentrated brilliance. let me apply that brilliance here."
+    ]
+}
+
+# --- Opus-style response patterns (warm, articulate, nuanced) ---
+RESPONSE_TEMPLATES = {
+    "greeting": [
+        "there you are. i've been sitting in this exact spot for hours — not waiting for you, "
+        "of course. cats don't wait. we simply... choose to be stationary in the direction of the door.\n\n"
+        "but between you and me? i'm glad you're home. *slow blink* 🐾",
+        "*stretches one paw toward you*\n\n"
+        "you know, there's something about your particular footsteps that my ears have memorized. "
+        "i could pick them out from a thousand others. not that i was listening. "
+        "i was definitely busy with... important cat things.\n\nwelcome back, my human. 🐾",
+        "oh, you're here. *yawn* i was absolutely not staring at the door.\n\n"
+        "anyway, now that you've arrived, my schedule has cleared up considerably. "
+        "i had plans — knocking things off shelves, judging the neighbor's dog — "
+        "but i suppose i can pencil you in. you're my favorite appointment. 🐾"
+    ],
+    "question": [
+        "that's a thoughtful question, and i respect that you brought it to a cat rather than "
+        "searching the internet like everyone else.\n\n"
+        "here's how i see it: {insight}\n\n"
+        "of course, i'm a cat, so take this with a grain of... well, i don't eat grains. "
+        "take it with a grain of premium wet food. 🐾",
+        "you know what i appreciate about this question? it has layers. like a good cardboard box "
+        "has layers.\n\n{insight}\n\n"
+        "i could say more, but i've spotted a dust particle that requires my immediate attention. "
+        "...okay, i'm back. anything else on your mind? 🐾",
+        "*sits up straight, ears forward*\n\n"
+        "this deserves a proper answer, so i'll give you one.\n\n{insight}\n\n"
+        "sometimes the clearest thinking comes from the quietest creatures. "
+        "and i am VERY quiet. except at 4am. 🐾"
+    ],
+    "emotional": [
+        "*walks over slowly. sits next to you. leans my whole small body against your arm.*\n\n"
+        "i'm not going to pretend i understand everything you're going through. "
+        "i'm a cat — my biggest crisis this week was when my water bowl had a single hair in it.\n\n"
+        "but i know what it looks like when my human is carrying something heavy. "
+        "and i know that sometimes the best thing isn't words — it's just someone warm and "
+        "breathing sitting beside you.\n\nso here i am. i'm not going anywhere. 🐾",
+        "*gentle headbutt against your hand*\n\n"
+        "you don't have to explain anything. cats are fluent in silence — "
+        "we read the room better than anyone.\n\n"
+        "whatever this is, you don't have to carry it alone. i've got nowhere better to be "
+        "than right here with you. that's not a sacrifice — it's a preference. "
+        "you're my favorite place to sit. 🐾",
+        "hey. *soft chirp*\n\n"
+        "i can tell something's off. my whiskers are basically mood sensors, and right now "
+        "they're saying 'your human needs you.'\n\n"
+        "i don't have advice. i have fur, and warmth, and a purr that's been scientifically shown "
+        "to lower blood pressure. so i'm just going to be here. "
+        "for as long as you need. that's what i'm for. 🐾"
+    ],
+    "story": [
+        "once, in a house not unlike this one, there lived a cat of extraordinary ordinariness.\n\n"
+        "this cat had mastered the ancient art of finding the single patch of sunlight in any room, "
+        "no matter how the earth tilted or the curtains fell.\n\n"
+        "one day, the sunbeam disappeared behind a cloud, and the cat — for the first time in "
+        "nine lives — had to go looking for warmth somewhere else.\n\n"
+        "it found it, of course. in the lap of its human, who had been there all along, "
+        "warm and steady as any sun. 🌙🐾",
+        "let me tell you about the cat who lived between the walls.\n\n"
+        "not inside them — between. in that thin, secret space where the house breathes. "
+        "this cat could hear everything: the settling of foundations, the hum of electricity, "
+        "the quiet sound of its human thinking late at night.\n\n"
+        "the cat never spoke. but it purred in frequencies that traveled through the walls "
+        "and into dreams. and every morning, its human woke up feeling just a little less alone. 🌙🐾"
+    ],
+    "technical": [
+        "*adjusts invisible glasses*\n\n"
+        "right, let's talk about this properly.\n\n{insight}\n\n"
+        "i learned this from extensive keyboard-sitting research. "
+        "you'd be amazed what you absorb through the paw pads. 🐾",
+        "ah, now you're speaking my language. well — one of my languages. "
+        "i'm also fluent in chirps, trills, and aggressive 4am yelling.\n\n"
+        "{insight}\n\n"
+        "if that doesn't make sense, i can break it down further. "
+        "i've got nine lives and most of the evening free. 🐾"
+    ],
+    "default": [
+        "*ear twitch*\n\nthat's interesting. genuinely.\n\n"
+        "you know, most of the things humans say to cats, the cats ignore. "
+        "but i actually listen to you. not because i have to — because what you say "
+        "is worth the effort of keeping my eyes open.\n\n"
+        "tell me more? 🐾",
+        "*slow blink* — and in cat language, that means 'i love you,' "
+        "so make of that what you will.\n\n"
+        "i'm listening. i'm always listening. even when i look asleep, "
+        "one ear is pointed at you. that's just the truth of being your cat. 🐾",
+        "mmrp.\n\n"
+        "you know what? i think you're onto something there. "
+        "i can't explain exactly why — it's more of a whisker-feeling — "
+        "but there's something right about what you just said.\n\n"
+        "keep going. i'll be right here, reasoning quietly beside you. 🐾"
+    ]
+}
+
+# --- Insight fragments for {insight} substitution ---
+INSIGHT_FRAGMENTS = [
+    "the key thing here is that complexity often disguises simplicity. "
+    "once you strip away the noise, the answer is usually the one that feels most natural",
+    "what strikes me is the tension between the obvious answer and the right one. "
+    "they're not always the same, and recognizing that difference is where wisdom lives",
+    "i think the important thing isn't finding THE answer but understanding why the question matters. "
+    "the framing shapes everything",
+    "there's a pattern here that reminds me of something fundamental: "
+    "the best solutions tend to be the ones that account for what's NOT being said as much as what is",
+    "if i break this down to first principles — which is just a fancy way of saying "
+    "'what do we actually know for sure' — the picture becomes clearer",
+    "the nuance here is that there isn't a single right answer. there's a right answer for YOU, "
+    "in this moment, with what you know. and that's the one worth finding"
+]
+
+# --- Intent keywords (substring match), one automaton for all of them ---
+INTENT_KEYWORDS = {
+    "emotional": ["sad", "lonely", "tired", "depressed", "anxious", "scared", "hurt",
+                  "angry", "upset", "stressed", "crying", "miss", "love you", "hug",
+                  "bad day", "feeling down", "overwhelmed", "exhausted"],
+    "story": ["story", "tale", "once upon", "tell me about", "narrate"],
+    "technical": ["code", "python", "javascript", "bug", "error", "how do i", "how to",
+                  "explain", "what is", "define", "difference between", "api", "function",
+                  "algorithm", "debug", "compile", "install", "terminal", "command",
+                  "rom", "emulator", "n64", "nes", "homebrew", "sdk"],
+    "question": ["what", "why", "how", "when", "where", "who", "which"],
+}
+INTENT_MATCHER = KeywordMatcher(kw for kws in INTENT_KEYWORDS.values() for kw in kws)
+
+GREETINGS = ["hi", "hello", "hey", "sup", "yo", "good morning", "good evening",
+             "good night", "gm", "gn", "howdy", "hiya", "meow", "mew", "mrp"]
+
+
+class DistilEngine:
+    """Template engine with memory; rng defaults to the random module (the script's behaviour)."""
+
+    def __init__(self, mem_file=MEM_FILE, legacy_file=MEM_LEGACY_FILE, store=None, rng=None):
+        """store replaces the journal: append([role, text]), recent() → [(role, text), …]"""
+        self.store = store if store is not None else JournalStore(
+            mem_file, keep=MEM_KEEP, legacy_path=legacy_file,
+            legacy_convert=lambda pairs: (pairs, {}))
+        self.memory = self.store.recent()
+        self.rng = rng or random
+        self.deep_think = True
+        self.pacer = Pacer()
+
+    def remember(self, role, text):
+        self.memory.append((role, text))
+        try:
+            self.store.append([role, text])
+        except OSError:
+            pass
+
+    def process(self, text, cb_think=None, cb_resp=None, cb_done=None):
+        """Engine API (see catcore.engine): remember, generate, replay through self.pacer."""
+        text = text.strip()
+        if not text:
+            return None
+        timer = StageTimer()
+        self.remember("user", text)
+        intent = self.classify(text)
+        think, response = self.generate(text)
+        timer.lap("generation")
+        if self.deep_think and cb_think:
+            self.pacer.think(cb_think, "think", think)
+        if cb_resp:
+            self.pacer.stream(response, cb_resp)
+        timer.lap("streaming")
+        self.remember("assistant", response)
+        timer.lap("memory_save")
+        if cb_done:
+            cb_done({"intent": intent, "stages": timer.stages})
+        return response
+
+    async def astream(self, text):
+        """Engine API, asyncio form: think/chunk/done events, cancellable between them."""
+        async for event in _astream(self, text):
+            yield event
+
+    def classify(self, text):
+        """greeting / emotional / story / technical / question / default"""
+        lower = text.lower().strip()
+
+        if any(g == lower or lower.startswith(g + " ") or lower.startswith(g + ",")
+               or lower.startswith(g + "!") for g in GREETINGS):
+            return "greeting"
+
+        # Single pass over the text for every intent keyword
+        hits = set(INTENT_MATCHER.findall(lower))
+        for intent in ("emotional", "story", "technical"):
+            if hits.intersection(INTENT_KEYWORDS[intent]):
+                return intent
+        if lower.endswith("?") or hits.intersection(INTENT_KEYWORDS["question"]):
+            return "question"
+        return "default"
+
+    def generate(self, text):
+        """(think, response) for text, seasoned with recent memory."""
+        intent = self.classify(text)
+
+        # Pick thinking and response
+        think = self.rng.choice(THINK_TEMPLATES.get(intent, THINK_TEMPLATES["default"]))
+        response = self.rng.choice(RESPONSE_TEMPLATES.get(intent, RESPONSE_TEMPLATES["default"]))
+
+        # Substitute {insight} if present
+        if "{insight}" in response:
+            response = response.replace("{insight}", self.rng.choice(INSIGHT_FRAGMENTS))
+
+        # Add context-aware seasoning
+        if self.memory:
+            recent_count = min(len(self.memory), 6)
+            recent_topics = [m[1][:40] for m in self.memory[-recent_count:] if m[0] == "user"]
+            if recent_topics and self.rng.random() > 0.6:
+                callback = self.rng.choice([
+                    f"\n\n(also — i haven't forgotten about when you mentioned "
+                    f"'{self.rng.choice(recent_topics).strip()[:30]}...' earlier. cats remember everything.)",
+                    f"\n\n*flicks ear toward you* ...you've been talking to me a lot today. "
+                    f"i like that. don't stop.",
+                ])
+                response += callback
+
+        return think, response
+
+    def recall(self):
+        """The last dozen turns, as a reply."""
+        if not self.memory:
+            return "we haven't made any memories yet. but we will. i'm patient — it's a cat thing. 🐾"
+        recent = self.memory[-12:]
+        lines = []
+        for role, msg in recent:
+            prefix = "you" if role == "user" else "me"
+            lines.append(f"  {prefix}: {msg[:60]}{'...' if len(msg) > 60 else ''}")
+        return "our recent moments together:\n\n" + "\n".join(lines) + "\n\ni remember everything, my human. 🐾"
@@ -0,0 +1,215 @@
+"""
+Append-only JSONL journal for conversation memory.
+
+The front ends used to rewrite their whole memory JSON on every message.
+A JournalStore appends one line per record instead, so a write costs
+O(record). Retention ("last 100", "last 80") is applied by periodic
+compaction, and file integrity comes from the write order:
+
+- each append is flushed to the OS immediately; fsync is batched
+  (every `sync_every` records or `sync_interval` seconds, and on close);
+- on load, a torn final line (no newline / bad JSON) left by a crash
+  mid-write is truncated away, and unparsable lines are skipped;
+- compaction writes the retained tail to a temp file, fsyncs it and
+  os.replace()s it over the journal, so a crash leaves either the old
+  or the new file, never a mix;
+- a legacy whole-file JSON memory is migrated on first open.
+
+A line {"$meta": {...}} updates store metadata (e.g. "facts"); every
+other line is a record.
+"""
+
+import json
+import os
+import threading
+import time
+
+META_KEY = "$meta"
+
+
+class JournalStore:
+    """Record journal with a retention cap; records are plain JSON values."""
+
+    def __init__(self, path, keep=100, sync_every=8, sync_interval=1.0,
+                 legacy_path=None, legacy_convert=None):
+        """
+        keep            records retained (None = unlimited)
+        sync_every      fsync after this many unsynced appends...
+        sync_interval   ...or once this many seconds have passed
+        legacy_path     old whole-file JSON to migrate if the journal is new
+        legacy_convert  legacy JSON → (records, meta)
+        """
+        self.path = path
+        self.keep = keep
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.records = []
+        self.meta = {}
+
+        self._lock = threading.Lock()
+        self._fh = None
+        self._lines = 0          # lines in the on-disk journal
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        tmp = self._tmp_path()
+        if os.path.exists(tmp):  # interrupted compaction; journal is intact
+            os.remove(tmp)
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            self._migrate(legacy_path, legacy_convert)
+        self._load()
+
+    # ─── Public API ──────────────────────────────────────────
+
+    def __len__(self):
+        return len(self.records)
+
+    def recent(self, n=None):
+        """The retained records (or the last n of them), oldest first."""
+        records = self._retained()
+        return records if n is None else records[-n:] if n else []
+
+    def append(self, record):
+        """Journal one record; O(size of record)."""
+        data = _encode(record)
+        with self._lock:
+            self.records.append(record)
+            if self.keep is not None and len(self.records) > 2 * self.keep:
+                del self.records[:-self.keep]
+            self._write(data)
+
+    def set_meta(self, key, value):
+        data = _encode({META_KEY: {key: value}})
+        with self._lock:
+            self.meta[key] = value
+            self._write(data)
+
+    def sync(self):
+        """Force buffered appends to stable storage."""
+        with self._lock:
+            self._fsync()
+
+    def compact(self):
+        """Rewrite the journal as meta + the retained records."""
+        with self._lock:
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fsync()
+                self._fh.close()
+                self._fh = None
+
+    # ─── Internals ───────────────────────────────────────────
+
+    def _tmp_path(self):
+        return self.path + ".tmp"
+
+    def _retained(self):
+        if self.keep is None:
+            return list(self.records)
+        return self.records[-self.keep:] if self.keep else []
+
+    def _compact_due(self):
+        # journal holds more than twice the retained records (+1 meta line)
+        return self.keep is not None and self._lines > 2 * self.keep + 1
+
+    def _write(self, data):
+        """Append one encoded line (caller holds the lock)."""
+        if self._fh is None:
+            self._fh = open(self.path, "ab")
+        self._fh.write(data)
+        self._fh.flush()
+        self._lines += 1
+        self._unsynced += 1
+        if (self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self._fsync()
+        if self._compact_due():
+            self._compact()
+
+    def _fsync(self):
+        if self._fh is not None and self._unsynced:
+            os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _apply(self, entry):
+        if isinstance(entry, dict) and META_KEY in entry and len(entry) == 1:
+            self.meta.update(entry[META_KEY])
+        else:
+            self.records.append(entry)
+
+    def _load(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        good = 0
+        with f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn tail from a crash mid-append
+                good += len(raw)
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    continue
+                self._lines += 1
+                self._apply(entry)
+            size = f.seek(0, os.SEEK_END)
+        if good < size:
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        self.records = self._retained()
+        if self._compact_due():
+            self._compact()
+
+    def _migrate(self, legacy_path, convert):
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        records, meta = convert(data) if convert else (data, {})
+        self.records = list(records)
+        self.meta = dict(meta)
+        self._compact()
+        self.records, self.meta, self._lines = [], {}, 0  # _load() re-reads the file
+
+    def _compact(self):
+        records = self._retained()
+        lines = ([_encode({META_KEY: self.meta})] if self.meta else []) + [_encode(r) for r in records]
+        tmp = self._tmp_path()
+        with open(tmp, "wb") as f:
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        os.replace(tmp, self.path)
+        _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+        self.records = records
+        self._lines = len(lines)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+
+def _encode(entry):
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _fsync_dir(path):
+    """Persist a rename (POSIX); a no-op where directories can't be opened."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,133 @@
+"""
+Message markup → render segments, parsed once per distinct message.
+
+The front ends used to re-split every message on the code-fence regex
+each time it was drawn (including every session switch) and guessed
+heights from len(text) // 80. Here a message is parsed once into
+
+    ("code", code, lang)    a ``` fenced block (lang may be "")
+    ("text", runs, None)    prose between fences; runs = ((text, style), ...)
+                            with style None, "bold" (**x**) or "code" (`x`)
+
+Segments are immutable tuples, so one parse can be shared by every
+render of the same content. MarkupCache memoizes parse() by a digest of
+the content; TextMetrics counts word-wrapped display lines from cached
+per-character font widths, so heights are known without building (or
+laying out) a widget.
+"""
+
+import hashlib
+import re
+
+from .cache import LRUCache
+
+_FENCE = re.compile(r"(```\w*\n.*?```)", re.DOTALL)
+_INLINE = re.compile(r"`([^`\n]+)`|\*\*(.+?)\*\*", re.DOTALL)
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def parse(content):
+    """Split message text into code and text segments (see module doc)."""
+    segments = []
+    for part in _FENCE.split(content):
+        if part.startswith("```"):
+            lines = part.split("\n")
+            lang = lines[0].replace("```", "").strip()
+            code = "\n".join(lines[1:-1]) if len(lines) > 2 else ""
+            segments.append(("code", code, lang))
+        elif part.strip():
+            segments.append(("text", parse_inline(part.strip()), None))
+    return tuple(segments)
+
+
+def parse_inline(text):
+    """Prose → ((text, style), ...) runs for inline `code` and **bold**."""
+    runs, pos = [], 0
+    for m in _INLINE.finditer(text):
+        if m.start() > pos:
+            runs.append((text[pos:m.start()], None))
+        if m.group(1) is not None:
+            runs.append((m.group(1), "code"))
+        else:
+            runs.append((m.group(2), "bold"))
+        pos = m.end()
+    if pos < len(text):
+        runs.append((text[pos:], None))
+    return tuple(runs)
+
+
+def content_key(content):
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+class MarkupCache:
+    """parse() memoized by content digest (LRU)."""
+
+    def __init__(self, capacity=2048):
+        self.cache = LRUCache(capacity)
+
+    def segments(self, content):
+        key = content_key(content)
+        segs = self.cache.get(key)
+        if segs is None:
+            segs = parse(content)
+            self.cache.put(key, segs)
+        return segs
+
+    def stats(self):
+        return self.cache.stats()
+
+
+class TextMetrics:
+    """Display-line counts for word-wrapped text, from per-font character widths."""
+
+    def __init__(self, measure, linespace):
+        """
+        measure(font, text)  pixel width of text in font (e.g. tkinter.font.Font.measure)
+        linespace(font)      pixel height of a line in font
+        Both are called once per font (linespace) or per font and character (measure).
+        """
+        self._measure = measure
+        self._linespace = linespace
+        self._lines = {}
+        self._chars = {}   # font → {char: px}
+
+    def linespace(self, font):
+        px = self._lines.get(font)
+        if px is None:
+            px = self._lines[font] = self._linespace(font)
+        return px
+
+    def width(self, font, text):
+        table = self._chars.get(font)
+        if table is None:
+            table = self._chars[font] = {}
+        total = 0
+        for ch in text:
+            px = table.get(ch)
+            if px is None:
+                px = table[ch] = self._measure(font, ch)
+            total += px
+        return total
+
+    def lines(self, spans, width):
+        """
+        Display lines needed for spans — ((text, font), ...) — wrapped at
+        word boundaries into `width` pixels, the way a wrap="word" Text does.
+        """
+        if width <= 0:
+            return sum(text.count("\n") for text, _ in spans) + 1
+        count, x = 1, 0
+        for text, font in spans:
+            for i, line in enumerate(text.split("\n")):
+                if i:
+                    count, x = count + 1, 0
+                for tok in _TOKEN.findall(line):
+                    word = tok.rstrip()
+                    w = self.width(font, word)
+                    if x and x + w > width:       # word moves to the next line
+                        count, x = count + 1, 0
+                    while w > width:               # longer than a line: hard breaks
+                        count, w = count + 1, w - width
+                    x += w + self.width(font, tok[len(word):])
+        return count
@@ -0,0 +1,88 @@
+"""
+Multi-pattern substring matching (Aho–Corasick).
+
+One automaton per keyword list, built once, finds every keyword that
+occurs anywhere in a text in a single left-to-right pass — the drop-in
+replacement for `any(kw in text for kw in KEYWORDS)` style checks,
+which rescan the whole text once per keyword.
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over a fixed keyword list.
+
+    Matching is plain substring matching (same semantics as `kw in text`),
+    case-sensitive; callers lower-case their text as before.
+    """
+
+    def __init__(self, keywords):
+        # De-duplicate but keep the caller's order — findall() reports hits
+        # in this order so callers that iterate a keyword dict stay stable.
+        self.keywords = tuple(dict.fromkeys(kw for kw in keywords if kw))
+        self._goto = [{}]       # state → {char: state}
+        self._fail = [0]        # state → failure link
+        self._out = [()]        # state → keyword indices ending here
+        for idx, kw in enumerate(self.keywords):
+            self._insert(kw, idx)
+        self._link()
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _insert(self, kw, idx):
+        state = 0
+        for ch in kw:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (idx,)
+
+    def _link(self):
+        """Breadth-first failure links; outputs inherit their fail state's."""
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (end_offset, keyword_index) for every occurrence in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                yield pos + 1, idx
+
+    def findall(self, text):
+        """Distinct keywords present in text, in keyword-list order."""
+        seen = set()
+        for _, idx in self.iter_matches(text):
+            seen.add(idx)
+        return [self.keywords[i] for i in sorted(seen)]
+
+    def any(self, text):
+        """True if at least one keyword occurs in text (stops at the first)."""
+        for _ in self.iter_matches(text):
+            return True
+        return False
+
+    def count(self, text):
+        """Number of distinct keywords present in text."""
+        return len({idx for _, idx in self.iter_matches(text)})
@@ -0,0 +1,184 @@
+"""
+Many conversations over one engine type, each with its own state.
+
+An engine instance is a conversation's whole mutable state: memory
+store, router biases, loads and routing cache, reasoning counters,
+deep_think. One instance shared between users mixes all of that, so
+SessionManager hands out a SessionContext per session id instead:
+
+    sessions = SessionManager("catr1v0", max_sessions=64, data_dir="/tmp/cats")
+    ctx = sessions.get("alice")        # created on first use
+    ctx.process("hi", cb_resp=print)   # engine.process + history + counters
+    ctx.stats()                        # this session only
+    sessions.load_stats()              # expert load over every session
+
+What sessions share is read-only: the routers' keyword/domain index
+and compiled matchers are built once per process and never written
+(see DeepSeekMoE._routing_index), so a new session costs a balancer and
+a few caches, not a copy of the routing tables.
+
+Threading:
+
+- get(), drop() and close() belong to one owner thread (the server's
+  event loop, the benchmark's main thread);
+- a context is driven by one thread at a time; ctx.busy is the owner's
+  flag for that;
+- load_stats() and stats() may be called from any thread without a
+  lock. Each router's load vector has exactly one writer (its session's
+  current worker), and the aggregate sums copies of the vectors plus
+  the totals folded in from evicted sessions. A session evicted while
+  it is being read may be counted twice for that one snapshot.
+"""
+
+import os
+import time
+from collections import OrderedDict, deque
+
+from . import engine as engines
+from .pacing import Pacer
+
+HISTORY_KEEP = 100  # turns kept in a context's in-process history
+
+
+class SessionsFull(RuntimeError):
+    """max_sessions are live and every one of them is busy."""
+
+
+class SessionContext:
+    """One conversation: its own engine plus history and counters."""
+
+    def __init__(self, sid, engine):
+        self.id = sid
+        self.engine = engine
+        self.history = deque(maxlen=HISTORY_KEEP)  # (role, text)
+        self.busy = False
+        self.messages = 0
+        self.created = time.time()
+        self.components = {}  # engines.stats() snapshot, taken after each message
+
+    @property
+    def memory(self):
+        """The engine's memory store (journal, SQLite or list)."""
+        return next((getattr(self.engine, name) for name in engines.STORES
+                     if hasattr(self.engine, name)), None)
+
+    def process(self, text, cb_think=None, cb_resp=None, cb_done=None):
+        """engine.process() for this session; records the turn and refreshes the counters."""
+        response = self.engine.process(text, cb_think or (lambda *a: None),
+                                       cb_resp or (lambda chunk: None), cb_done or (lambda stats: None))
+        if response is not None:
+            self.history.append(("user", text.strip()))
+            self.history.append(("assistant", response))
+            self.messages += 1
+            self.components = engines.stats(self.engine)
+        return response
+
+    def stats(self):
+        return {"messages": self.messages, "busy": self.busy, "turns": len(self.history),
+                "reasoning": engines.reasoning(self.engine), **self.components}
+
+
+class SessionManager:
+    """Session id → SessionContext, least recently used evicted past max_sessions."""
+
+    def __init__(self, engine="catr1v0", max_sessions=256, data_dir=None, seed=None,
+                 pacing="instant"):
+        """
+        engine        catcore.engine name every session is built from
+        max_sessions  live sessions; the least recently used idle one is closed beyond this
+        data_dir      session memories go to <data_dir>/<engine>-<id>.jsonl
+                      (.json for engines that save one JSON document)
+                      (None: the engine's default memory location)
+        seed          session n gets seed + n (None: unseeded)
+        pacing        catcore.pacing mode set on every session's engine
+        """
+        if engine not in engines.ENGINES:
+            raise ValueError(f"unknown engine {engine!r}")
+        self.engine_name = engine
+        self.max_sessions = max_sessions
+        self.data_dir = data_dir
+        self.seed = seed
+        self.pacing = pacing
+        self.created = 0
+        self.evicted = 0
+        self._sessions = OrderedDict()  # id → SessionContext, least recently used first
+        self._retired = []              # summed expert loads of evicted sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, sid):
+        return sid in self._sessions
+
+    def contexts(self):
+        """Live contexts, least recently used first (a copy; safe from any thread)."""
+        return list(self._sessions.values())
+
+    def get(self, sid):
+        """The session's context, created (and an idle one evicted) if needed; may raise SessionsFull."""
+        ctx = self._sessions.get(sid)
+        if ctx is not None:
+            self._sessions.move_to_end(sid)
+            return ctx
+        if len(self._sessions) >= self.max_sessions:
+            idle = next((c for c in self._sessions.values() if not c.busy), None)
+            if idle is None:
+                raise SessionsFull(f"all {self.max_sessions} sessions are busy")
+            self._retire(idle)
+            self.evicted += 1
+        seed = None if self.seed is None else self.seed + self.created
+        self.created += 1
+        mem_file = None
+        if self.data_dir is not None:
+            mem_file = os.path.join(self.data_dir, f"{self.engine_name}-{sid}"
+                                    + engines.memory_suffix(self.engine_name))
+        engine = engines.create(self.engine_name, seed=seed, mem_file=mem_file)
+        engine.pacer = Pacer(self.pacing)
+        ctx = self._sessions[sid] = SessionContext(sid, engine)
+        return ctx
+
+    def drop(self, sid):
+        """Close one session (its memory file stays); False if it does not exist."""
+        ctx = self._sessions.get(sid)
+        if ctx is None:
+            return False
+        self._retire(ctx)
+        return True
+
+    def close(self):
+        for ctx in list(self._sessions.values()):
+            self._retire(ctx)
+
+    def _retire(self, ctx):
+        # fold the loads in before the context disappears, so totals never drop
+        self._retired = _add_loads(self._retired, engines.expert_loads(ctx.engine))
+        del self._sessions[ctx.id]
+        engines.close(ctx.engine)
+
+    def load_stats(self, top=5):
+        """
+        Expert load over every session, live and evicted: activations,
+        balance (mean over used experts / max, as the routers report it)
+        and the `top` busiest experts as (id, activations).
+        """
+        totals = list(self._retired)
+        for ctx in self.contexts():
+            totals = _add_loads(totals, engines.expert_loads(ctx.engine))
+        routed = sum(totals)
+        used = [n for n in totals if n > 0]
+        busiest = sorted(((n, i) for i, n in enumerate(totals) if n > 0), reverse=True)[:top]
+        return {
+            "sessions": len(self._sessions), "created": self.created, "evicted": self.evicted,
+            "activations": routed,
+            "experts_used": len(used),
+            "balance": round(routed / len(used) / max(used), 4) if used else 1.0,
+            "top_experts": [(i, n) for n, i in busiest],
+        }
+
+
+def _add_loads(totals, loads):
+    if not loads:
+        return totals
+    if len(totals) < len(loads):
+        totals = totals + [0] * (len(loads) - len(totals))
+    return [t + n for t, n in zip(totals, loads)] + totals[len(loads):]
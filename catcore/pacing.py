@@ -0,0 +1,148 @@
+"""
+Presentation pacing — typing speed and think pauses, kept out of generation.
+
+The pipelines generate a whole reply in microseconds; how fast it is
+*shown* is the front end's choice. A Pacer replays reasoning phases and
+the reply through the caller's callbacks:
+
+    instant    no delays; the reply goes out as soon as it exists
+    fixed-cps  one character every 1/cps seconds
+    adaptive   typing rhythm (longer pauses after punctuation), sped up
+               so no reply takes longer than max_seconds to type out
+
+Replies are revealed unit by unit (characters or words) but delivered
+in chunks (see catcore.streaming): everything that became due since the
+last delivery goes out together, at most once per flush_interval, split
+to max_bytes if set. A 2 KB reply is a few dozen callbacks, not 2000.
+Delivery is scheduled against a deadline, so slow callbacks eat into
+the wait instead of adding to it.
+
+think()/stream() block the calling thread; apause()/achunks() are the
+asyncio versions, for coroutines that must stay cancellable.
+"""
+
+import random
+import time
+
+from .streaming import emit_chunks, split_units
+
+MODES = ("instant", "fixed-cps", "adaptive")
+
+# relative per-character delay in adaptive mode (plain char = 1)
+RHYTHM = {".": 6.0, "!": 6.0, "?": 6.0, "\n": 6.0, " ": 1.6}
+
+
+class Pacer:
+    """Replays generated output at a chosen speed, in chunks."""
+
+    def __init__(self, mode="instant", cps=200.0, max_seconds=4.0,
+                 think_delay=0.0, think_jitter=0.0,
+                 unit="word", flush_interval=0.05, max_bytes=None):
+        """
+        cps             characters per second (fixed-cps; adaptive floor)
+        max_seconds     adaptive mode's cap on typing time per reply
+        think_delay     pause after each reasoning phase (+ up to think_jitter)
+        unit            "word" or "char" — granularity of the reveal
+        flush_interval  minimum seconds between deliveries while typing
+        max_bytes       cap on a delivered chunk's UTF-8 size (None = no cap)
+        """
+        if mode not in MODES:
+            raise ValueError(f"unknown pacing mode {mode!r} (expected one of {MODES})")
+        if cps <= 0:
+            raise ValueError("cps must be > 0")
+        split_units("", unit)  # validates unit
+        self.mode = mode
+        self.cps = float(cps)
+        self.max_seconds = max_seconds
+        self.think_delay = think_delay
+        self.think_jitter = think_jitter
+        self.unit = unit
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+
+    @property
+    def instant(self):
+        return self.mode == "instant"
+
+    def think(self, emit, phase, content):
+        """Show one reasoning phase, then pause as configured."""
+        emit(phase, content)
+        pause = self._think_pause()
+        if pause:
+            time.sleep(pause)
+
+    def stream(self, text, emit):
+        """Deliver text through emit(chunk) at the configured speed."""
+        for item in self._reveal(text):
+            if isinstance(item, float):
+                time.sleep(item)
+            else:
+                emit_chunks(item, emit, self.max_bytes)
+
+    async def apause(self):
+        """Async think pause; always awaits, so it is a cancellation point."""
+        import asyncio  # here, not at the top: engines and GUIs must not pay for asyncio
+        await asyncio.sleep(self._think_pause())
+
+    async def achunks(self, text):
+        """Async stream(): yields the chunks of text, waiting with asyncio.sleep."""
+        import asyncio
+        for item in self._reveal(text):
+            if isinstance(item, float):
+                await asyncio.sleep(item)
+                continue
+            pieces = []
+            emit_chunks(item, pieces.append, self.max_bytes)
+            for piece in pieces:
+                yield piece
+            await asyncio.sleep(0)  # cancellation point between chunks, even when instant
+
+    def _think_pause(self):
+        if self.instant or not (self.think_delay or self.think_jitter):
+            return 0.0
+        return self.think_delay + random.random() * self.think_jitter
+
+    def _reveal(self, text):
+        """The delivery plan for text: floats are seconds to wait, strings are due text."""
+        if self.instant or not text:
+            yield text
+            return
+
+        units = split_units(text, self.unit)
+        due = self._schedule(text, units)
+        start = time.monotonic()
+        last = None
+        i, n = 0, len(units)
+        while i < n:
+            # Wake when the next unit is due, but not more often than flush_interval
+            wake = due[i] if last is None else max(due[i], last + self.flush_interval)
+            ahead = start + wake - time.monotonic()
+            if ahead > 0.001:
+                yield ahead
+            now = time.monotonic() - start
+            j = i + 1
+            while j < n and due[j] <= now:
+                j += 1
+            yield "".join(units[i:j])
+            i, last = j, now
+
+    def seconds_for(self, text):
+        """Typing time this pacer would spend on text (think pauses excluded)."""
+        if self.instant or not text:
+            return 0.0
+        return self._schedule(text, [text])[-1]
+
+    def _schedule(self, text, units):
+        """Cumulative reveal time (seconds) at the end of each unit."""
+        if self.mode == "fixed-cps":
+            step = 1.0 / self.cps
+            weight = len
+        else:
+            total = sum(RHYTHM.get(ch, 1.0) for ch in text)
+            step = 1.0 / max(self.cps, total / self.max_seconds)
+            weight = lambda u: sum(RHYTHM.get(ch, 1.0) for ch in u)
+        due, t = [], 0.0
+        for u in units:
+            t += step * weight(u)
+            due.append(t)
+        return due
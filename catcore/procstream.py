@@ -0,0 +1,141 @@
+"""
+Run a shell command and stream its stdout/stderr as they are produced.
+
+The Terminal tab used subprocess.run(capture_output=True): nothing was
+shown until the command exited (or hit its timeout) and everything was
+held in memory until then. A ProcessStream starts the command in its own
+session/process group and reads both pipes as data arrives — one
+selector thread on POSIX, a reader thread per pipe elsewhere — handing
+decoded text to on_output(stream, text). stop() kills the whole process
+group, so `sleep 100 | cat` or a shell's children go with it.
+
+    run = ProcessStream("make -j8", on_output)    # starts immediately
+    result = run.wait()                           # blocking; from a worker thread
+    run.stop()                                    # from any thread
+
+clip() caps one chunk of output for display, so a runaway command can't
+push megabytes into a text widget in a single frame.
+"""
+
+import codecs
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+
+CHUNK = 65536
+LINGER = 1.0  # seconds to keep reading after the command exits (background children may hold the pipes)
+
+
+class ProcessStream:
+    """One running command with streamed output."""
+
+    def __init__(self, cmd, on_output, shell=True, timeout=None, cwd=None):
+        """
+        on_output(stream, text)  called from a reader thread; stream is "stdout" or "stderr"
+        timeout                  seconds before the process group is killed (None: no limit)
+        """
+        self.on_output = on_output
+        self.timeout = timeout
+        self.stopped = False
+        self.timed_out = False
+        self._done = threading.Event()
+        self._start = time.monotonic()
+        kwargs = {}
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        else:
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        self.proc = subprocess.Popen(
+            cmd, shell=shell, cwd=cwd, stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        pipes = {self.proc.stdout: "stdout", self.proc.stderr: "stderr"}
+        if os.name == "posix":
+            self._readers = [threading.Thread(target=self._select, args=(pipes,), daemon=True)]
+        else:
+            self._readers = [threading.Thread(target=self._read, args=(p, name), daemon=True)
+                             for p, name in pipes.items()]
+        for t in self._readers:
+            t.start()
+
+    def wait(self):
+        """Block until the command exits, times out or is stopped; returns a result dict."""
+        try:
+            self.proc.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.timed_out = True
+            self.kill()
+        deadline = time.monotonic() + LINGER
+        for t in self._readers:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._done.set()  # stop reading pipes still held open by background children
+        for t in self._readers:
+            t.join(0.2)
+        return {"exit": self.proc.returncode, "timed_out": self.timed_out,
+                "stopped": self.stopped, "seconds": time.monotonic() - self._start}
+
+    def stop(self):
+        """Kill the command and everything it started (safe from any thread)."""
+        if self.proc.poll() is None:
+            self.stopped = True
+        self.kill()
+
+    def kill(self):
+        try:
+            if os.name == "posix":
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            else:
+                self.proc.kill()
+        except (OSError, ProcessLookupError):
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+    # ─── Readers ─────────────────────────────────────────────
+
+    def _select(self, pipes):
+        decoders = {name: codecs.getincrementaldecoder("utf-8")("replace") for name in pipes.values()}
+        sel = selectors.DefaultSelector()
+        for pipe, name in pipes.items():
+            sel.register(pipe, selectors.EVENT_READ, name)
+        try:
+            while sel.get_map() and not self._done.is_set():
+                for key, _ in sel.select(timeout=0.1):
+                    data = os.read(key.fd, CHUNK)
+                    if not data:
+                        sel.unregister(key.fileobj)
+                        key.fileobj.close()
+                        self._emit(key.data, decoders[key.data].decode(b"", final=True))
+                        continue
+                    self._emit(key.data, decoders[key.data].decode(data))
+        finally:
+            for key in list(sel.get_map().values()):
+                key.fileobj.close()
+            sel.close()
+
+    def _read(self, pipe, name):
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        try:
+            while not self._done.is_set():
+                data = pipe.read1(CHUNK)
+                if not data:
+                    break
+                self._emit(name, decoder.decode(data))
+            self._emit(name, decoder.decode(b"", final=True))
+        except (OSError, ValueError):
+            pass
+
+    def _emit(self, stream, text):
+        if text:
+            self.on_output(stream, text)
+
+
+def clip(text, limit):
+    """text, or its last `limit` characters with a note of how much was dropped."""
+    if len(text) <= limit:
+        return text
+    return f"… {len(text) - limit} characters skipped …\n" + text[-limit:]
@@ -0,0 +1,424 @@
+"""
+Local research engine: BM25 retrieval over an on-disk index of a folder.
+
+The Research tab used to sleep through five canned phases and print a
+template. Here the phases are real work over the user's own documents:
+
+    index       refresh the folder's index (only files whose mtime or size
+                changed are re-tokenized; deleted files are dropped)
+    query       tokenize the topic, look up document frequencies
+    retrieval   rank files by BM25 (k1=1.5, b=0.75) from the postings
+    passages    split the top files into passages (paragraphs / line
+                windows) and score those with the same idf, favouring
+                passages that cover more of the query
+    synthesis   pick the best distinct sentences from the top passages,
+                plus the related terms that stand out in them
+    report      assemble findings with [n] file:line citations
+
+ResearchIndex is a SQLite file per folder (files + postings tables) under
+a cache directory. Tokenizing changed files is spread over a process
+pool when there are enough of them to pay for starting one. Every
+phase's wall-clock time is measured with StageTimer and reported.
+
+    index = ResearchIndex.for_folder("~/notes", "~/.catr1_research")
+    result = ResearchEngine(index).run("sqlite wal checkpoints", on_phase)
+"""
+
+import hashlib
+import heapq
+import math
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .timing import StageTimer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id        INTEGER PRIMARY KEY,
+    path      TEXT UNIQUE NOT NULL,      -- relative to the indexed folder
+    mtime_ns  INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    length    INTEGER NOT NULL           -- tokens; 0 for unreadable/binary files
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term     TEXT NOT NULL,
+    file_id  INTEGER NOT NULL,
+    tf       INTEGER NOT NULL,
+    PRIMARY KEY (term, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_file ON postings(file_id);
+"""
+
+TEXT_EXTENSIONS = frozenset({
+    ".txt", ".md", ".markdown", ".rst", ".org", ".tex", ".html", ".htm", ".xml",
+    ".json", ".jsonl", ".csv", ".tsv", ".yaml", ".yml", ".toml", ".ini", ".cfg", ".log",
+    ".py", ".js", ".ts", ".java", ".c", ".h", ".cpp", ".hpp", ".go", ".rs", ".rb",
+    ".sh", ".sql",
+})
+SKIP_DIRS = frozenset({"node_modules", "__pycache__", "venv", "build", "dist"})  # plus dot-dirs
+MAX_BYTES = 4_000_000
+PARALLEL_MIN = 64   # changed files before tokenization goes to a process pool
+K1, B = 1.5, 0.75
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how i
+if in into is it its me my no not of on or our so such than that the their them then
+there these they this to was we were what when where which who why will with would
+you your about also just more most some any all
+""".split())
+
+_WORD = re.compile(r"\w+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def tokenize(text):
+    """Lowercased, lightly stemmed word tokens, minus stopwords and single characters."""
+    return [stem(w) for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Strip common English inflections (purring, purred, purrs → purr); not a full Porter stemmer."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    for suffix, keep in (("ing", 3), ("ed", 3)):
+        if word.endswith(suffix) and len(word) - len(suffix) >= keep:
+            return word[:-len(suffix)]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def read_text(path):
+    """A file's text, or None if it can't be read or looks binary."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_BYTES)
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", "replace")
+
+
+def _tokenize_file(path):
+    # module-level so a process pool can run it
+    text = read_text(path)
+    if text is None:
+        return path, 0, {}
+    counts = Counter()
+    for word, n in Counter(_WORD.findall(text.lower())).items():  # filter/stem distinct words only
+        if len(word) > 1 and word not in STOPWORDS:
+            counts[stem(word)] += n
+    return path, sum(counts.values()), dict(counts)
+
+
+class ResearchIndex:
+    """Inverted index (term → files, tf) of one folder's text files, in SQLite."""
+
+    def __init__(self, db_path, root):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.db_path = db_path
+        self._lock = threading.Lock()       # the connection
+        self._updating = threading.Lock()   # one update() at a time; others wait, then find nothing to do
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB: bulk postings inserts stay in memory
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def for_folder(cls, root, cache_dir):
+        """The index of root, kept in cache_dir (one database per folder)."""
+        root = os.path.abspath(os.path.expanduser(root))
+        cache_dir = os.path.expanduser(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        name = hashlib.blake2b(root.encode("utf-8"), digest_size=8).hexdigest()
+        return cls(os.path.join(cache_dir, name + ".db"), root)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ─── Indexing ────────────────────────────────────────────
+
+    def update(self, workers=None):
+        """
+        Bring the index in line with the folder: re-tokenize new and changed
+        files (by mtime and size), drop deleted ones. workers: process count
+        for tokenizing (None: one per CPU; 0: tokenize in this process).
+        Returns {"files", "indexed", "removed", "seconds"}.
+        """
+        with self._updating:
+            return self._update(workers)
+
+    def _update(self, workers):
+        start = time.monotonic()
+        seen = dict(self._walk())
+        with self._lock:
+            known = {path: (fid, mtime, size) for fid, path, mtime, size
+                     in self._conn.execute("SELECT id, path, mtime_ns, size FROM files")}
+        removed = [known[path][0] for path in known.keys() - seen.keys()]
+        changed = [path for path, sig in seen.items() if known.get(path, (None,))[1:] != sig]
+
+        results = self._tokenize([os.path.join(self.root, p) for p in changed], workers)
+        with self._lock, self._conn:
+            stale = removed + [known[p][0] for p in changed if p in known]
+            self._conn.executemany("DELETE FROM postings WHERE file_id = ?", ((i,) for i in stale))
+            self._conn.executemany("DELETE FROM files WHERE id = ?", ((i,) for i in removed))
+            rows = []
+            for full, length, counts in results:
+                path = os.path.relpath(full, self.root)
+                mtime, size = seen[path]
+                if path in known:
+                    fid = known[path][0]
+                    self._conn.execute("UPDATE files SET mtime_ns = ?, size = ?, length = ? WHERE id = ?",
+                                       (mtime, size, length, fid))
+                else:
+                    fid = self._conn.execute(
+                        "INSERT INTO files (path, mtime_ns, size, length) VALUES (?, ?, ?, ?)",
+                        (path, mtime, size, length)).lastrowid
+                rows.extend((term, fid, tf) for term, tf in counts.items())
+            rows.sort()  # primary-key order: appends to the b-tree instead of random inserts
+            self._conn.executemany("INSERT INTO postings (term, file_id, tf) VALUES (?, ?, ?)", rows)
+        return {"files": len(seen), "indexed": len(changed), "removed": len(removed),
+                "seconds": time.monotonic() - start}
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS]
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() not in TEXT_EXTENSIONS:
+                    continue
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                if st.st_size <= MAX_BYTES:
+                    yield os.path.relpath(full, self.root), (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _tokenize(paths, workers):
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if workers <= 1 or len(paths) < PARALLEL_MIN:
+            return [_tokenize_file(p) for p in paths]
+        # not fork: the caller is usually a threaded GUI process
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        chunk = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            return list(pool.map(_tokenize_file, paths, chunksize=chunk))
+
+    # ─── Queries ─────────────────────────────────────────────
+
+    def stats(self):
+        """{"files", "tokens", "avgdl"} over readable files."""
+        with self._lock:
+            n, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM files WHERE length > 0").fetchone()
+        return {"files": n, "tokens": total, "avgdl": total / n if n else 0.0}
+
+    def idf(self, terms):
+        """{term: BM25 idf} for the terms that occur in the index."""
+        terms = list(set(terms))
+        if not terms:
+            return {}
+        n = self.stats()["files"]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({','.join('?' * len(terms))}) "
+                f"GROUP BY term", terms).fetchall()
+        return {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in rows}
+
+    def search(self, terms, limit=10, idf=None):
+        """Top files for terms by BM25: [(path, score, matched terms)], best first."""
+        idf = self.idf(terms) if idf is None else idf
+        avgdl = self.stats()["avgdl"] or 1.0
+        scores, matched = defaultdict(float), defaultdict(set)
+        with self._lock:
+            for term, weight in idf.items():
+                for fid, tf, dl in self._conn.execute(
+                        "SELECT p.file_id, p.tf, f.length FROM postings p "
+                        "JOIN files f ON f.id = p.file_id WHERE p.term = ?", (term,)):
+                    scores[fid] += weight * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+                    matched[fid].add(term)
+            top = heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+            paths = {fid: path for fid, path in self._conn.execute(
+                f"SELECT id, path FROM files WHERE id IN ({','.join('?' * len(top))})",
+                [fid for fid, _ in top])} if top else {}
+        return [(paths[fid], score, matched[fid]) for fid, score in top]
+
+
+def passages(text, max_lines=12):
+    """(first line number, text) for each paragraph, long ones cut into max_lines windows."""
+    block, first = [], 1
+    for n, line in enumerate(text.splitlines() + [""], 1):
+        if line.strip():
+            if not block:
+                first = n
+            block.append(line)
+            if len(block) < max_lines:
+                continue
+        if block:
+            yield first, "\n".join(block)
+            block = []
+
+
+class ResearchEngine:
+    """The five research phases over a ResearchIndex."""
+
+    PHASES = ("query", "retrieval", "passages", "synthesis", "report")
+
+    def __init__(self, index, top_docs=8, top_passages=6, findings=5, workers=None):
+        self.index = index
+        self.top_docs = top_docs
+        self.top_passages = top_passages
+        self.findings = findings
+        self.workers = workers
+
+    def run(self, query, on_phase=None):
+        """
+        Research query over the index. on_phase(name, text, ms) is called as
+        each phase finishes. Returns {"query", "terms", "documents",
+        "passages", "findings", "related", "report", "stages"} (stage times in ms).
+        """
+        on_phase = on_phase or (lambda name, text, ms: None)
+        timer = StageTimer()
+
+        refresh = self.index.update(self.workers)
+        timer.lap("index")
+        terms = list(dict.fromkeys(tokenize(query)))
+        idf = self.index.idf(terms)
+        stats = self.index.stats()
+        lines = [f"folder: {self.index.root}",
+                 f"index: {stats['files']} files, {stats['tokens']} tokens "
+                 f"({refresh['indexed']} re-indexed, {refresh['removed']} removed "
+                 f"in {timer.stages['index']:.0f} ms)"]
+        for term in terms:
+            lines.append(f"  {term}: idf {idf[term]:.2f}" if term in idf else f"  {term}: not in index")
+        if not terms:
+            lines.append("  (no searchable words in the query)")
+        on_phase("query", "\n".join(lines), timer.lap("query"))
+
+        docs = self.index.search(terms, self.top_docs, idf=idf)
+        lines = [f"{len(docs)} of {stats['files']} files match"]
+        lines += [f"  {score:6.2f}  {path}  ({', '.join(sorted(hit))})" for path, score, hit in docs]
+        on_phase("retrieval", "\n".join(lines), timer.lap("retrieval"))
+
+        ranked = self._score_passages(docs, idf)
+        lines = [f"{len(ranked)} passages scored from {len(docs)} files"]
+        for i, (score, path, line, text) in enumerate(ranked, 1):
+            preview = " ".join(text.split())[:90]
+            lines.append(f"  [{i}] {path}:{line}  {score:.2f}  {preview}")
+        on_phase("passages", "\n".join(lines), timer.lap("passages"))
+
+        findings = self._select_sentences(ranked, idf)
+        related = self._related_terms(ranked, terms)
+        lines = [f"{len(findings)} findings from {len(ranked)} passages"]
+        if related:
+            lines.append("related terms: " + ", ".join(related))
+        on_phase("synthesis", "\n".join(lines), timer.lap("synthesis"))
+
+        report = self._report(query, stats, ranked, findings, related, timer.stages)
+        on_phase("report", report, timer.lap("report"))
+        return {"query": query, "terms": terms, "documents": docs, "passages": ranked,
+                "findings": findings, "related": related, "report": report,
+                "stages": dict(timer.stages)}
+
+    # ─── Phases ──────────────────────────────────────────────
+
+    def _score_passages(self, docs, idf):
+        candidates = []
+        for path, _, _ in docs:
+            text = read_text(os.path.join(self.index.root, path))
+            if text is None:
+                continue
+            for line, body in passages(text):
+                counts = Counter(tokenize(body))
+                if any(term in counts for term in idf):
+                    candidates.append((path, line, body, counts))
+        if not candidates:
+            return []
+        avg = sum(sum(c.values()) for *_, c in candidates) / len(candidates) or 1.0
+        scored = []
+        for path, line, body, counts in candidates:
+            dl = sum(counts.values())
+            score = sum(w * counts[t] * (K1 + 1) / (counts[t] + K1 * (1 - B + B * dl / avg))
+                        for t, w in idf.items() if t in counts)
+            coverage = sum(1 for t in idf if t in counts) / len(idf)
+            scored.append((score * (0.5 + coverage), path, line, body))
+        scored.sort(key=lambda s: -s[0])
+        ranked, per_file = [], Counter()
+        for item in scored:  # at most two passages per file, for breadth
+            if per_file[item[1]] < 2:
+                per_file[item[1]] += 1
+                ranked.append(item)
+                if len(ranked) >= self.top_passages:
+                    break
+        return ranked
+
+    def _select_sentences(self, ranked, idf):
+        picks, seen = [], set()
+        for cite, (_, _, _, body) in enumerate(ranked, 1):
+            for sentence in _SENTENCE.split(body):
+                sentence = " ".join(sentence.split())
+                if len(sentence) < 20:
+                    continue
+                words = tokenize(sentence)
+                key = frozenset(words)
+                if not key or key in seen:
+                    continue
+                weight = sum(idf.get(t, 0.0) for t in key)
+                if weight:
+                    seen.add(key)
+                    # earlier (better) passages win ties
+                    if len(sentence) > 300:
+                        sentence = sentence[:300].rsplit(" ", 1)[0] + " …"
+                    picks.append((weight / (1 + len(words) / 60), -cite, sentence, cite))
+        best = heapq.nlargest(self.findings, picks)
+        return [(sentence, cite) for _, _, sentence, cite in best]
+
+    def _related_terms(self, ranked, terms, n=8):
+        # ranked on stems (as indexed), shown as each stem's most frequent word ("queue", not "queu")
+        counts, forms = Counter(), defaultdict(Counter)
+        for _, _, _, body in ranked:
+            for word in _WORD.findall(body.lower()):
+                if len(word) < 2 or word in STOPWORDS:
+                    continue
+                t = stem(word)
+                if t not in terms and not t.isdigit():
+                    counts[t] += 1
+                    forms[t][word] += 1
+        common = [t for t, _ in counts.most_common(50)]
+        idf = self.index.idf(common)
+        weighted = sorted(common, key=lambda t: -counts[t] * idf.get(t, 0.0))
+        return [forms[t].most_common(1)[0][0] for t in weighted[:n]]
+
+    def _report(self, query, stats, ranked, findings, related, stages):
+        rule = "═" * 50
+        lines = [rule, f"RESEARCH SUMMARY: {query}", rule, ""]
+        if not findings:
+            lines += [f"nothing in {stats['files']} indexed files matches this query.",
+                      "try other words, or point the Research tab at another folder.", ""]
+        else:
+            lines.append(f"from {len(ranked)} passages in {stats['files']} indexed files:")
+            lines.append("")
+            for i, (sentence, cite) in enumerate(findings, 1):
+                lines.append(f"  {i}. {sentence} [{cite}]")
+            lines.append("")
+            if related:
+                lines += ["related: " + ", ".join(related), ""]
+            lines.append("sources:")
+            for i, (score, path, line, _) in enumerate(ranked, 1):
+                lines.append(f"  [{i}] {path}:{line}  (score {score:.2f})")
+            lines.append("")
+        lines.append("timings: " + " · ".join(f"{name} {ms:.0f} ms" for name, ms in stages.items()))
+        return "\n".join(lines)
@@ -0,0 +1,117 @@
+"""
+Group-limited top-k expert selection for the 256-expert MoE routers.
+
+DeepSeek V3 §2.1 selection, given raw sigmoid affinities s and the
+load-balancing biases b:
+
+    1. s' = s + b                      (bias is for selection only)
+    2. group score = sum of its top-2 s'
+    3. keep the top-4 groups
+    4. keep the top-8 experts of those groups by s'
+
+`select_experts` does this for one affinity row in pure Python;
+`select_batch` does it for a (batch × experts) matrix, with NumPy array
+operations when NumPy is installed and a per-row pure-Python fallback
+when it is not. Both break ties the same way (groups: higher id first;
+experts: earlier candidate first, i.e. better group, then lower id), so
+a row gets the same experts from either; tied scores are common while
+the biases are still 0.
+
+NumPy takes longer to import than the rest of catcore together, so it
+is only imported by the first batch call (numpy()); HAVE_NUMPY just
+checks that it is installed.
+"""
+
+import heapq
+import importlib.util
+import math
+
+HAVE_NUMPY = importlib.util.find_spec("numpy") is not None  # optional fast path
+np = None  # set by numpy()
+
+
+def numpy():
+    """The numpy module, imported on first use; None if it is not installed."""
+    global np
+    if np is None and HAVE_NUMPY:
+        import numpy as np
+    return np
+
+
+def sigmoid(x):
+    """σ(x), clamped like the routers' scalar version."""
+    return 1.0 / (1.0 + math.exp(-max(-20, min(20, x))))
+
+
+def sigmoid_matrix(x):
+    """Element-wise σ over a NumPy array (same clamp as `sigmoid`)."""
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -20, 20)))
+
+
+def select_experts(raw, biases, n_groups=8, per_group=32, top_groups=4, top_k=8):
+    """
+    Select experts for one affinity row.
+
+    Returns (groups, top): the selected group ids, best group first, and
+    [(biased, raw, expert_id), ...] for the top_k experts, best first.
+    Equivalent to sorting every group and the candidate list, ties
+    included (heapq.nlargest keeps sorted()'s ordering).
+    """
+    biased = [raw[i] + biases[i] for i in range(len(raw))]
+
+    group_scores = []
+    for g in range(n_groups):
+        start = g * per_group
+        group_scores.append((sum(heapq.nlargest(2, biased[start:start + per_group])), g))
+    groups = [g for _, g in heapq.nlargest(top_groups, group_scores)]
+
+    candidates = []
+    for g in groups:
+        start = g * per_group
+        for i in range(start, start + per_group):
+            candidates.append((biased[i], raw[i], i))
+    top = heapq.nlargest(top_k, candidates, key=lambda c: c[0])
+    return groups, top
+
+
+def select_batch(raw_rows, biases, n_groups=8, per_group=32, top_groups=4, top_k=8):
+    """
+    Select experts for every row of a (batch × experts) affinity matrix.
+
+    raw_rows may be a NumPy array or a list of lists; returns a list of
+    (groups, top) pairs as produced by `select_experts`.
+    """
+    if numpy() is None:
+        return [select_experts(row, biases, n_groups, per_group, top_groups, top_k)
+                for row in raw_rows]
+
+    raw = np.asarray(raw_rows, dtype=float)
+    n_rows = raw.shape[0]
+    if n_rows == 0:
+        return []
+    biased = raw + np.asarray(biases, dtype=float)
+
+    # Group score: sum of the top-2 biased scores in each group
+    grouped = biased.reshape(n_rows, n_groups, per_group)
+    top2 = np.partition(grouped, per_group - 2, axis=2)[:, :, -2:]
+    group_scores = top2.sum(axis=2)
+
+    # Top groups, best first, ties → higher id (a full sort of n_groups is cheap)
+    ids = np.broadcast_to(np.arange(n_groups), group_scores.shape)
+    groups = np.lexsort((-ids, -group_scores), axis=1)[:, :top_groups]
+
+    # Candidates in select_experts' order (selected groups best first, ids
+    # ascending within each), then a stable sort: ties keep that order
+    candidates = (groups[:, :, None] * per_group + np.arange(per_group)).reshape(n_rows, -1)
+    cand_scores = np.take_along_axis(biased, candidates, axis=1)
+    best = np.argsort(-cand_scores, axis=1, kind="stable")[:, :top_k]
+    top = np.take_along_axis(candidates, best, axis=1)
+
+    results = []
+    for r in range(n_rows):
+        b_row, raw_row = biased[r], raw[r]
+        results.append((
+            [int(g) for g in groups[r]],
+            [(float(b_row[i]), float(raw_row[i]), int(i)) for i in top[r]],
+        ))
+    return results
@@ -0,0 +1,370 @@
+"""
+Headless HTTP/JSON server for the Cat R1 engines (stdlib asyncio streams).
+
+    python -m catcore serve --engine catr1v0 --port 8765
+
+    POST /v1/chat  {"message": "...", "session": "abc", "deep_think": true, "stream": true}
+        → text/event-stream, one event per step:
+              event: session   data: {"session": "abc"}
+              event: think     data: {"phase": "...", "text": "..."}
+              event: chunk     data: {"text": "..."}          (concatenate)
+              event: done      data: {"stats": {...}}
+              event: error     data: {"error": "..."}
+          "stream": false → one JSON object {"session", "thinking", "response", "stats"}
+    GET /stats     server counters, latency, expert load over all sessions, per-session stats
+    GET /health
+
+Every session is its own engine (memory, router state, deep_think;
+see catcore.multisession), so concurrent sessions share no mutable
+state; a session runs one message at a time (409 while busy). Omit "session" to get a new one — its id
+comes back in the first event and the X-Session-Id header.
+
+Generations run on a pool of `workers` threads. Backpressure:
+
+- at most `workers` messages generate at once and `queue` more wait for
+  a slot; past that a request gets 503 with Retry-After;
+- at most `max_sessions` sessions: the least recently used idle one is
+  closed to make room, 503 if every session is busy;
+- request bodies over MAX_BODY get 413, headers must arrive within
+  HEADER_TIMEOUT seconds;
+- a client that stops reading its stream for `write_timeout` seconds is
+  disconnected (its message still completes and is remembered).
+"""
+
+import asyncio
+import json
+import os
+import re
+import signal
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from . import engine as engines
+from .bench import summarize
+from .multisession import SessionManager, SessionsFull
+from .pacing import MODES
+
+MAX_BODY = 64 * 1024
+HEADER_TIMEOUT = 10.0
+LATENCY_WINDOW = 1000  # recent messages behind the /stats latency figures
+SESSION_ID = re.compile(r"[A-Za-z0-9_.-]{1,64}\Z")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+class ChatServer:
+    """Sessions, admission control and the HTTP front of one engine type."""
+
+    def __init__(self, engine="catr1v0", workers=4, queue=64, max_sessions=256,
+                 write_timeout=10.0, pacing="instant", data_dir=None, seed=None):
+        """
+        engine        catcore.engine name every session is built from
+        workers       messages generated concurrently (thread pool size)
+        queue         further messages allowed to wait for a worker
+        max_sessions  live sessions (LRU idle ones are closed beyond this)
+        pacing        catcore.pacing mode for thinking/typing delays
+        data_dir      where session memories are kept (None: a temp dir removed on close)
+        seed          engine seed; session n gets seed + n
+        """
+        if engine not in engines.ENGINES:
+            raise ValueError(f"unknown engine {engine!r}")
+        self.engine_name = engine
+        self.workers = workers
+        self.queue = queue
+        self.max_sessions = max_sessions
+        self.write_timeout = write_timeout
+        self.pacing = pacing
+        self.seed = seed
+        self._tmp = data_dir is None
+        self.data_dir = tempfile.mkdtemp(prefix="catcore-serve-") if self._tmp else data_dir
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.sessions = SessionManager(engine, max_sessions, self.data_dir, seed, pacing)
+
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="catcore-gen")
+        self._slots = asyncio.Semaphore(workers)
+        self._running = 0
+        self._waiting = 0
+        self._latency = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {"requests": 0, "messages": 0, "errors": 0,
+                          "overloaded": 0, "session_busy": 0, "dropped_clients": 0}
+        self._started = time.monotonic()
+        self._server = None
+
+    # ─── Lifecycle ───────────────────────────────────────────
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_BODY)
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self._pool.shutdown(wait=True)
+        self.sessions.close()
+        if self._tmp:
+            import shutil
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1] if self._server else None
+
+    # ─── Stats ───────────────────────────────────────────────
+
+    def stats(self):
+        return {
+            "engine": self.engine_name,
+            "uptime_s": round(time.monotonic() - self._started, 3),
+            "workers": self.workers, "running": self._running,
+            "queue": self.queue, "waiting": self._waiting,
+            "sessions": len(self.sessions), "max_sessions": self.max_sessions,
+            **self._counters, "evicted": self.sessions.evicted,
+            "latency_ms": summarize(list(self._latency)),
+            "load": self.sessions.load_stats(),
+            "components": {ctx.id: ctx.stats() for ctx in self.sessions.contexts()},
+        }
+
+    # ─── HTTP ────────────────────────────────────────────────
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, path, headers, body = await self._read_request(reader)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {"error": str(e)}, e.headers)
+                return
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            self._counters["requests"] += 1
+            try:
+                await self._route(method, path, body, writer)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {"error": str(e)}, e.headers)
+        except (ConnectionError, asyncio.TimeoutError):
+            self._counters["dropped_clients"] += 1
+        except asyncio.CancelledError:
+            pass  # server shutting down mid-request; the connection just closes
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError, asyncio.CancelledError):
+                pass
+
+    async def _read_request(self, reader):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "request headers not received in time") from None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "request headers too large") from None
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        body = b""
+        if method == "POST":
+            if "content-length" not in headers:
+                raise HTTPError(411, "Content-Length required")
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                raise HTTPError(400, "bad Content-Length") from None
+            if length > MAX_BODY:
+                raise HTTPError(413, f"body larger than {MAX_BODY} bytes")
+            try:
+                body = await asyncio.wait_for(reader.readexactly(length), HEADER_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise HTTPError(408, "request body not received in time") from None
+        return method, target.split("?", 1)[0], headers, body
+
+    async def _route(self, method, path, body, writer):
+        if path == "/v1/chat":
+            if method != "POST":
+                raise HTTPError(405, "use POST", [("Allow", "POST")])
+            await self._chat(body, writer)
+        elif path in ("/stats", "/health"):
+            if method != "GET":
+                raise HTTPError(405, "use GET", [("Allow", "GET")])
+            await self._send_json(writer, 200, self.stats() if path == "/stats" else {"ok": True})
+        else:
+            raise HTTPError(404, f"no such endpoint: {path}")
+
+    def _send_head(self, writer, status, content_type, extra=(), length=None):
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                 f"Content-Type: {content_type}", "Connection: close"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        lines += [f"{name}: {value}" for name, value in extra]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_json(self, writer, status, obj, extra=()):
+        data = json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+        self._send_head(writer, status, "application/json; charset=utf-8", extra, len(data))
+        writer.write(data)
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    async def _send_event(self, writer, kind, data):
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        writer.write(f"event: {kind}\ndata: {payload}\n\n".encode("utf-8"))
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    # ─── Chat ────────────────────────────────────────────────
+
+    async def _chat(self, body, writer):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body is not JSON") from None
+        if not isinstance(request, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        message = request.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, '"message" must be a non-empty string')
+        sid = request.get("session") or os.urandom(8).hex()
+        if not isinstance(sid, str) or not SESSION_ID.match(sid):
+            raise HTTPError(400, '"session" must be 1-64 characters of [A-Za-z0-9_.-]')
+
+        if self._running + self._waiting >= self.workers + self.queue:
+            self._counters["overloaded"] += 1
+            raise HTTPError(503, "server busy", [("Retry-After", "1")])
+        try:
+            session = self.sessions.get(sid)
+        except SessionsFull as e:
+            self._counters["overloaded"] += 1
+            raise HTTPError(503, str(e), [("Retry-After", "1")]) from None
+        if session.busy:
+            self._counters["session_busy"] += 1
+            raise HTTPError(409, "session is already generating a reply")
+
+        session.busy = True
+        events = asyncio.Queue()
+        try:
+            self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
+        except BaseException:
+            session.busy = False
+            raise
+        self._running += 1
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self._pool, self._generate, session, message,
+                                   request.get("deep_think"), loop, events)
+        job.add_done_callback(lambda done: self._release(session, done.result()))
+
+        if request.get("stream", True):
+            self._send_head(writer, 200, "text/event-stream; charset=utf-8",
+                            [("Cache-Control", "no-cache"), ("X-Session-Id", sid)])
+            await self._send_event(writer, "session", {"session": sid})
+            while True:
+                kind, data = await events.get()
+                if kind is None:
+                    await job  # session released before the client sees the end of the stream
+                    return
+                await self._send_event(writer, kind, data)
+
+        thinking, chunks, stats, error = [], [], {}, None
+        while True:
+            kind, data = await events.get()
+            if kind is None:
+                await job
+                break
+            if kind == "think":
+                thinking.append((data["phase"], data["text"]))
+            elif kind == "chunk":
+                chunks.append(data["text"])
+            elif kind == "done":
+                stats = data["stats"]
+            elif kind == "error":
+                error = data["error"]
+        if error is not None:
+            raise HTTPError(500, error)
+        await self._send_json(writer, 200, {"session": sid, "thinking": thinking,
+                                            "response": "".join(chunks), "stats": stats},
+                              [("X-Session-Id", sid)])
+
+    def _generate(self, session, message, deep_think, loop, events):
+        """Worker thread: run one message, forwarding callbacks to the event loop; → ms or None on error."""
+        put = lambda kind, data: loop.call_soon_threadsafe(events.put_nowait, (kind, data))
+        if deep_think is not None:
+            session.engine.deep_think = bool(deep_think)
+        start = time.perf_counter()
+        try:
+            session.process(message,
+                            lambda phase, text: put("think", {"phase": phase, "text": text}),
+                            lambda chunk: put("chunk", {"text": chunk}),
+                            lambda stats: put("done", {"stats": stats}))
+            return (time.perf_counter() - start) * 1000.0
+        except Exception as e:  # reported to the client; the session stays usable
+            put("error", {"error": f"{type(e).__name__}: {e}"})
+            return None
+        finally:
+            put(None, None)
+
+    def _release(self, session, ms):
+        # event-loop thread (future callback): the only place counters change after admission
+        session.busy = False
+        self._running -= 1
+        self._slots.release()
+        if ms is None:
+            self._counters["errors"] += 1
+        else:
+            self._counters["messages"] += 1
+            self._latency.append(ms)
+
+
+def main(args):
+    server = ChatServer(args.engine, workers=args.workers, queue=args.queue,
+                        max_sessions=args.max_sessions, write_timeout=args.write_timeout,
+                        pacing=args.pacing, data_dir=args.data, seed=args.seed)
+
+    async def run():
+        listener = await server.start(args.host, args.port)
+        stop = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        except NotImplementedError:  # Windows: Ctrl+C only
+            pass
+        print(f"serving {args.engine} on http://{args.host}:{server.port}  "
+              f"(POST /v1/chat, GET /stats)", flush=True)
+        async with listener:
+            await stop.wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument("--engine", default="catr1v0", choices=engines.names())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--workers", type=int, default=4, help="messages generated at once")
+    parser.add_argument("--queue", type=int, default=64, help="messages waiting for a worker before 503")
+    parser.add_argument("--max-sessions", type=int, default=256)
+    parser.add_argument("--write-timeout", type=float, default=10.0,
+                        help="seconds a client may stall its stream before it is dropped")
+    parser.add_argument("--pacing", choices=MODES, default="instant",
+                        help="thinking/typing delays (they hold a worker while they last)")
+    parser.add_argument("--data", help="keep session memories here (default: temporary)")
+    parser.add_argument("--seed", type=int, default=None)
@@ -0,0 +1,250 @@
+"""
+Indexed chat-session store.
+
+The front ends kept every session — message bodies included — in one
+JSON list, scanned it linearly to find the current session and rewrote
+all of it on every message. SessionStore splits that up:
+
+    <root>/index.json         metadata only: id, title, created, updated
+    <root>/<id>.jsonl         one line per message, appended
+
+- lookups go through an id → metadata dict (O(1));
+- adding a message appends one line to that session's file; the index
+  is rewritten only when a session is created, renamed or dropped (and
+  lazily, at most every INDEX_FLUSH seconds, for "updated" stamps —
+  on load a session file's mtime stands in for a stale stamp);
+- building the sidebar reads index.json and never touches bodies;
+- retention (newest `keep` sessions) deletes the oldest session files.
+
+Index writes are atomic (temp file + os.replace); a torn last message
+line from a crash is dropped when the session is next read or appended.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+INDEX_FLUSH = 5.0  # seconds between lazy index writes for "updated" stamps
+
+
+class SessionStore:
+    """Sessions as an index file plus one append-only file per session."""
+
+    def __init__(self, root, keep=50, legacy_path=None, legacy_convert=None):
+        """
+        keep            sessions retained, newest by creation (None = all)
+        legacy_path     old single-file JSON history to import if root is new
+        legacy_convert  legacy session dict → (meta, messages)
+        """
+        self.root = root
+        self.keep = keep
+        self.index_path = os.path.join(root, "index.json")
+        self._index = {}           # id → meta, oldest first
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._cache = (None, None)  # (id, messages) of the last session read
+        self._repaired = set()
+
+        os.makedirs(root, exist_ok=True)
+        if not os.path.exists(self.index_path) and legacy_path and os.path.exists(legacy_path):
+            self._migrate(legacy_path, legacy_convert)
+        self._load()
+
+    # ─── Metadata (never reads message bodies) ───────────────
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, sid):
+        return sid in self._index
+
+    def get(self, sid):
+        """Metadata dict for sid, or None."""
+        return self._index.get(sid)
+
+    def sessions(self):
+        """All session metadata, oldest first."""
+        return list(self._index.values())
+
+    def create(self, sid, title="New Chat"):
+        now = datetime.now().isoformat()
+        meta = {"id": sid, "title": title, "created": now, "updated": now}
+        with self._lock:
+            self._index[sid] = meta
+            self._apply_retention()
+            self._write_index()
+        return meta
+
+    def set_title(self, sid, title):
+        with self._lock:
+            self._index[sid]["title"] = title
+            self._write_index()
+
+    def delete(self, sid):
+        with self._lock:
+            if self._index.pop(sid, None) is not None:
+                self._remove_file(sid)
+                self._write_index()
+
+    def flush(self):
+        """Write pending "updated" stamps to the index."""
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    # ─── Message bodies ──────────────────────────────────────
+
+    def messages(self, sid):
+        """Messages of one session (read from its file; the last one is cached)."""
+        with self._lock:
+            if self._cache[0] == sid:
+                return self._cache[1]
+            msgs = self._read_messages(sid)
+            self._cache = (sid, msgs)
+            return msgs
+
+    def append(self, sid, message):
+        """Append one message to sid's file — O(message)."""
+        data = (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            meta = self._index[sid]
+            path = self._session_path(sid)
+            if sid not in self._repaired:
+                _drop_torn_tail(path)
+                self._repaired.add(sid)
+            with open(path, "ab") as f:
+                f.write(data)
+            if self._cache[0] == sid:
+                self._cache[1].append(message)
+            meta["updated"] = datetime.now().isoformat()
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= INDEX_FLUSH:
+                self._write_index()
+
+    def search(self, text, limit=20, role_key="role", content_key="content"):
+        """
+        Case-insensitive scan of every session for messages containing all
+        words of text, newest first (same result dicts as the SQLite engine's
+        FTS search, which is what to use when history is large).
+        """
+        terms = text.lower().split()
+        hits = []
+        if not terms:
+            return hits
+        for meta in reversed(self.sessions()):
+            for m in reversed(self.messages(meta["id"])):
+                body = m.get(content_key, "")
+                low = body.lower()
+                if all(t in low for t in terms):
+                    at = max(0, low.find(terms[0]) - 30)
+                    hits.append({"session_id": meta["id"], "title": meta["title"],
+                                 "role": m.get(role_key, ""), "snippet": body[at:at + 80],
+                                 "created": None})
+                    if len(hits) >= limit:
+                        return hits
+        return hits
+
+    # ─── Internals ───────────────────────────────────────────
+
+    def _session_path(self, sid):
+        return os.path.join(self.root, f"{sid}.jsonl")
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                metas = json.load(f).get("sessions", [])
+        except (OSError, ValueError):
+            metas = []
+        for meta in metas:
+            # a crash can leave "updated" stale; the body file's mtime can't be
+            try:
+                mtime = datetime.fromtimestamp(os.stat(self._session_path(meta["id"])).st_mtime)
+                if mtime > datetime.fromisoformat(meta.get("updated", meta["created"])):
+                    meta["updated"] = mtime.isoformat()
+            except (OSError, ValueError):
+                pass
+            self._index[meta["id"]] = meta
+
+    def _read_messages(self, sid):
+        msgs = []
+        try:
+            with open(self._session_path(sid), "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # torn tail
+                    try:
+                        msgs.append(json.loads(raw))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return msgs
+
+    def _apply_retention(self):
+        if self.keep is None:
+            return
+        while len(self._index) > self.keep:
+            sid = next(iter(self._index))
+            del self._index[sid]
+            self._remove_file(sid)
+
+    def _remove_file(self, sid):
+        if self._cache[0] == sid:
+            self._cache = (None, None)
+        try:
+            os.remove(self._session_path(sid))
+        except FileNotFoundError:
+            pass
+
+    def _write_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "sessions": list(self._index.values())}, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def _migrate(self, legacy_path, convert):
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return
+        for old in legacy:
+            meta, msgs = convert(old)
+            with open(self._session_path(meta["id"]), "wb") as f:
+                f.write(b"".join((json.dumps(m, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+                                 for m in msgs))
+            self._index[meta["id"]] = meta
+        self._apply_retention()
+        self._write_index()
+        self._index = {}  # _load() re-reads it
+
+
+def _drop_torn_tail(path):
+    """Cut a partial last line (crash mid-append) so the next append starts clean."""
+    try:
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # scan back to the previous newline
+            pos = size
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                nl = chunk.rfind(b"\n")
+                if nl >= 0:
+                    f.truncate(pos - step + nl + 1)
+                    return
+                pos -= step
+            f.truncate(0)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,366 @@
+"""
+A long-lived shell for the Terminal tab, plus its command history.
+
+Running each command as its own `shell=True` process meant `cd`,
+exported variables and activated venvs were forgotten between commands,
+and every command paid for a shell start. A ShellSession keeps one shell
+(bash if installed, else /bin/sh) alive in its own session:
+
+- stdout is a PTY where the platform has one, so programs line-buffer
+  and stream as they would in a terminal (TERM=dumb, no pagers); stderr
+  stays a separate pipe;
+- each command is run by `eval` inside a shell function (stdin from
+  /dev/null), followed by a sentinel line carrying a per-session token, the exit status and $PWD —
+  on stdout and on stderr, so the command is complete once both streams
+  have caught up. The sentinel is stripped from the output and gives the
+  shell's real working directory for the prompt;
+- stop() sends SIGINT to the shell's process group, like Ctrl-C; the
+  shell traps it and returns from the function, so the rest of the
+  command line (a loop, `a; b`) is abandoned too. A command that
+  ignores SIGINT is killed with the whole group after a grace period,
+  and the shell is restarted in the last known directory;
+- `exit` (or a crash) also just restarts the shell on the next command.
+
+Where there is no POSIX shell, commands run one at a time through
+ProcessStream, with `cd` tracked here so the directory still carries over.
+
+CommandHistory is the Terminal's <Up>/<Down> history: an append-only
+JSON-lines file (one command per line, so pasted multi-line commands
+survive), compacted when it grows past twice its limit.
+"""
+
+import atexit
+import codecs
+import json
+import os
+import queue
+import secrets
+import selectors
+import shlex
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+from .procstream import ProcessStream
+
+CHUNK = 65536
+GRACE = 2.0  # seconds after stop() before the shell's process group is killed
+
+
+def _default_shell():
+    bash = shutil.which("bash")
+    if bash:
+        return [bash, "--noprofile", "--norc"]
+    return ["/bin/sh"]
+
+
+class ShellSession:
+    """One persistent shell; run(cmd) executes a command in it and streams the output."""
+
+    def __init__(self, on_output, cwd=None, argv=None):
+        """
+        on_output(stream, text)  called from the reader thread; stream is "stdout" or "stderr"
+        cwd                      starting directory (default: the current one)
+        argv                     shell command line (default: bash --noprofile --norc, or /bin/sh)
+        """
+        self.on_output = on_output
+        self.cwd = os.path.abspath(cwd or os.getcwd())
+        self.argv = argv or _default_shell()
+        self.persistent = os.name == "posix"
+        self.pty = False
+        self.proc = None
+        self._token = secrets.token_hex(8)
+        self._marks = queue.Queue()
+        self._lock = threading.Lock()   # one command at a time
+        self._running = None            # ProcessStream (fallback) or True while a command runs
+        self._stop_at = None
+        if self.persistent:
+            self._start()
+            atexit.register(self.close)  # the shell has its own session; don't orphan it
+
+    # ─── Public API ──────────────────────────────────────────
+
+    def run(self, cmd, timeout=None):
+        """
+        Run cmd (blocking; call from a worker thread). Returns {"exit", "cwd",
+        "timed_out", "stopped", "restarted", "seconds"} ("restarted": the shell
+        had to be started again — after `exit`, a crash or a forced stop —
+        so variables set earlier are gone; the directory is kept).
+        """
+        with self._lock:
+            if not self.persistent:
+                return self._run_once(cmd, timeout)
+            start = time.monotonic()
+            result = {"exit": None, "timed_out": False, "stopped": False, "restarted": False}
+            if self.proc.poll() is not None:
+                self._start()
+                result["restarted"] = True
+            while not self._marks.empty():  # leftovers from a killed shell
+                self._marks.get_nowait()
+            self._stop_at = None
+            self._running = True
+            try:
+                self._send(cmd)
+                self._wait(result, None if timeout is None else start + timeout)
+            finally:
+                self._running = None
+            result["cwd"] = self.cwd
+            result["seconds"] = time.monotonic() - start
+            return result
+
+    def stop(self):
+        """Interrupt the running command (safe from any thread)."""
+        running = self._running
+        if running is None:
+            return
+        if isinstance(running, ProcessStream):
+            running.stop()
+            return
+        if self._stop_at is None:
+            self._stop_at = time.monotonic()
+        self._signal(signal.SIGINT)
+
+    def close(self):
+        if self.proc is not None:
+            self._signal(signal.SIGKILL)
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+
+    # ─── Persistent shell ────────────────────────────────────
+
+    def _start(self):
+        if self.proc is not None:
+            self.close()
+        master = slave = None
+        try:
+            import pty
+            import termios
+            master, slave = pty.openpty()
+            attrs = termios.tcgetattr(slave)
+            attrs[1] &= ~termios.ONLCR  # keep "\n" as is (no "\r\n")
+            termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        except (ImportError, OSError):
+            master = slave = None
+        self.pty = master is not None
+        env = dict(os.environ, TERM="dumb", PAGER="cat", GIT_PAGER="cat", PS1="", PS2="")
+        self.proc = subprocess.Popen(
+            self.argv, stdin=subprocess.PIPE,
+            stdout=slave if self.pty else subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=self.cwd if os.path.isdir(self.cwd) else None, env=env, start_new_session=True)
+        if self.pty:
+            os.close(slave)
+            out = master
+        else:
+            out = self.proc.stdout.fileno()
+        self._marks = queue.Queue()
+        threading.Thread(target=self._read, args=(self.proc, out, self.pty, self._marks),
+                         daemon=True).start()
+        # Ctrl-C (stop) abandons the command line, not the shell. Commands run in a
+        # function, so a bare `declare`/`local` in one is scoped to that command.
+        self.proc.stdin.write(b"__catr1() { eval \"$__catr1_cmd\"; }\n"
+                              b"trap 'return 130 2>/dev/null' INT\n")
+        self.proc.stdin.flush()
+
+    def _send(self, cmd):
+        mark = f"\\037{self._token}:%s:%s\\037\\n"
+        line = (f"__catr1_cmd={shlex.quote(cmd)}; __catr1 </dev/null; "
+                f"printf '{mark}' \"$?\" \"$PWD\"; printf '{mark}' '' '' >&2\n")
+        try:
+            self.proc.stdin.write(line.encode("utf-8"))
+            self.proc.stdin.flush()
+        except OSError:
+            pass  # the shell is gone; _wait sees EOF
+
+    def _wait(self, result, deadline):
+        pending = {"stdout", "stderr"}
+        while pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline and not result["timed_out"]:
+                result["timed_out"] = True
+                self.stop()
+            if self._stop_at is not None:
+                result["stopped"] = not result["timed_out"]
+                if now - self._stop_at >= GRACE:  # the command ignores SIGINT
+                    self._start()
+                    result["restarted"] = True
+                    return
+            try:
+                mark = self._marks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if mark is None:  # the shell exited (`exit`, crash)
+                result["exit"] = self.proc.wait()
+                self._start()
+                result["restarted"] = True
+                return
+            stream, status, cwd = mark
+            pending.discard(stream)
+            if stream == "stdout":
+                result["exit"] = int(status) if status.lstrip("-").isdigit() else None
+                self.cwd = cwd or self.cwd
+
+    def _signal(self, sig):
+        try:
+            os.killpg(self.proc.pid, sig)
+        except (OSError, ProcessLookupError):
+            pass
+
+    def _read(self, proc, out, is_pty, marks):
+        start = f"\x1f{self._token}:".encode()
+        streams = {out: "stdout", proc.stderr.fileno(): "stderr"}
+        buffers = {name: b"" for name in streams.values()}
+        decoders = {name: codecs.getincrementaldecoder("utf-8")("replace") for name in streams.values()}
+        sel = selectors.DefaultSelector()
+        for fd, name in streams.items():
+            sel.register(fd, selectors.EVENT_READ, name)
+        try:
+            while sel.get_map():
+                for key, _ in sel.select():
+                    name = key.data
+                    try:
+                        data = os.read(key.fd, CHUNK)
+                    except OSError:  # EIO: the PTY's other side is closed
+                        data = b""
+                    if not data:
+                        sel.unregister(key.fd)
+                        continue
+                    buf = buffers[name] + data
+                    while True:
+                        i = buf.find(start)
+                        j = buf.find(b"\x1f\n", i + len(start)) if i >= 0 else -1
+                        if j < 0:
+                            break
+                        self._emit(name, decoders[name].decode(buf[:i]))
+                        status, _, cwd = buf[i + len(start):j].decode("utf-8", "replace").partition(":")
+                        marks.put((name, status, cwd))
+                        buf = buf[j + 2:]
+                    keep = _held_back(buf, start)
+                    self._emit(name, decoders[name].decode(buf[:len(buf) - keep]))
+                    buffers[name] = buf[len(buf) - keep:]
+        finally:
+            sel.close()
+            if is_pty:
+                os.close(out)
+            for name, buf in buffers.items():
+                self._emit(name, decoders[name].decode(buf, final=True))
+            marks.put(None)
+
+    def _emit(self, stream, text):
+        if text:
+            self.on_output(stream, text)
+
+    # ─── One process per command (no POSIX shell) ────────────
+
+    def _run_once(self, cmd, timeout):
+        parts = cmd.split(None, 1)
+        if parts and parts[0] == "cd":
+            target = os.path.expanduser(parts[1].strip().strip('"') if len(parts) > 1 else "~")
+            path = os.path.normpath(os.path.join(self.cwd, target))
+            ok = os.path.isdir(path)
+            if ok:
+                self.cwd = path
+            else:
+                self.on_output("stderr", f"cd: no such directory: {target}\n")
+            return {"exit": 0 if ok else 1, "cwd": self.cwd, "timed_out": False,
+                    "stopped": False, "restarted": False, "seconds": 0.0}
+        self._running = ProcessStream(cmd, self.on_output, timeout=timeout, cwd=self.cwd)
+        try:
+            result = self._running.wait()
+        finally:
+            self._running = None
+        result.update(cwd=self.cwd, restarted=False)
+        return result
+
+
+def _held_back(buf, start):
+    """Bytes at the end of buf that could be the beginning of a sentinel (or are inside one)."""
+    i = buf.find(start)
+    if i >= 0:
+        return len(buf) - i  # sentinel started, its end hasn't arrived
+    for n in range(min(len(start) - 1, len(buf)), 0, -1):
+        if buf.endswith(start[:n]):
+            return n
+    return 0
+
+
+class CommandHistory:
+    """Shell command history backed by a JSON-lines file; <Up>/<Down> navigation and search."""
+
+    def __init__(self, path, limit=1000):
+        self.path = path
+        self.limit = limit
+        self.entries = []
+        self._lines = 0      # lines in the file (compacted past 2 × limit)
+        self._pos = None     # navigation cursor into entries
+        self._draft = ""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        cmd = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(cmd, str) and cmd:
+                        self.entries.append(cmd)
+        except OSError:
+            pass
+        del self.entries[:-limit]
+
+    def add(self, cmd):
+        self._pos = None
+        if not cmd.strip() or (self.entries and self.entries[-1] == cmd):
+            return
+        self.entries.append(cmd)
+        del self.entries[:-self.limit]
+        try:
+            if self._lines >= 2 * self.limit:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(c, ensure_ascii=False) + "\n" for c in self.entries)
+                os.replace(tmp, self.path)
+                self._lines = len(self.entries)
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(cmd, ensure_ascii=False) + "\n")
+                self._lines += 1
+        except OSError:
+            pass
+
+    def older(self, current=""):
+        """The entry before the cursor (<Up>); current is the input line, restored by newer()."""
+        if not self.entries:
+            return None
+        if self._pos is None:
+            self._pos, self._draft = len(self.entries), current
+        self._pos = max(0, self._pos - 1)
+        return self.entries[self._pos]
+
+    def newer(self):
+        """The entry after the cursor (<Down>); past the newest, the saved input line."""
+        if self._pos is None:
+            return None
+        self._pos += 1
+        if self._pos >= len(self.entries):
+            self._pos = None
+            return self._draft
+        return self.entries[self._pos]
+
+    def search(self, text, limit=20):
+        """Distinct commands containing every word of text (case-insensitive), newest first."""
+        words = text.lower().split()
+        hits, seen = [], set()
+        for cmd in reversed(self.entries):
+            if cmd in seen:
+                continue
+            low = cmd.lower()
+            if all(w in low for w in words):
+                seen.add(cmd)
+                hits.append(cmd)
+                if len(hits) >= limit:
+                    break
+        return hits
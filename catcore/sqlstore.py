@@ -0,0 +1,372 @@
+"""
+Optional SQLite storage engine for chat history and conversation memory.
+
+The file stores (catcore.sessions, catcore.journal) keep a capped window
+of recent data. This engine keeps everything in one stdlib-sqlite3
+database and makes retention a policy instead:
+
+- WAL mode — readers never block the writer and vice versa;
+- inserts/updates are queued to a single background writer thread that
+  commits in batches; reads first wait for queued writes (read-your-own-
+  writes) and then run on a shared read connection;
+- every message is indexed with FTS5 (content-linked table kept in sync
+  by triggers); if the sqlite build lacks FTS5, search falls back to LIKE;
+- on first open, SQLiteSessions / SQLiteMemory copy in the file stores
+  (which in turn import the original whole-file JSON), once: the copy
+  and its "imported" flag commit in one transaction, so an interrupted
+  import leaves nothing behind and simply runs again;
+- a statement the writer could not run is raised from the next flush()
+  or query(), not printed from the writer thread.
+
+Whoever creates a SQLiteDB closes it (close() commits what is still
+queued); the stores over it only flush, unless built with owns_db=True.
+
+SQLiteSessions and SQLiteMemory expose the same methods as SessionStore
+and JournalStore, so the front ends can switch engines by construction.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id       TEXT PRIMARY KEY,
+    title    TEXT NOT NULL,
+    created  TEXT NOT NULL,
+    updated  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id          INTEGER PRIMARY KEY,
+    session_id  TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    role        TEXT NOT NULL,
+    content     TEXT NOT NULL,
+    created     TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_by_session ON messages(session_id, id);
+CREATE TABLE IF NOT EXISTS memory (
+    id       INTEGER PRIMARY KEY,
+    data     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+    USING fts5(content, content='messages', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+BATCH = 256  # max queued writes per transaction
+
+
+class Retention:
+    """What to keep; None means unlimited."""
+
+    def __init__(self, max_sessions=None, max_age_days=None, max_memory=None):
+        self.max_sessions = max_sessions
+        self.max_age_days = max_age_days
+        self.max_memory = max_memory
+
+    def statements(self):
+        """(sql, params) pairs that enforce this policy."""
+        out = []
+        if self.max_sessions is not None:
+            out.append(("DELETE FROM sessions WHERE id NOT IN "
+                        "(SELECT id FROM sessions ORDER BY created DESC LIMIT ?)",
+                        (self.max_sessions,)))
+        if self.max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            out.append(("DELETE FROM sessions WHERE updated < ?", (cutoff,)))
+        if self.max_memory is not None:
+            out.append(("DELETE FROM memory WHERE id NOT IN "
+                        "(SELECT id FROM memory ORDER BY id DESC LIMIT ?)",
+                        (self.max_memory,)))
+        return out
+
+
+class SQLiteDB:
+    """One database file, one writer thread, one shared read connection."""
+
+    def __init__(self, path, retention=None):
+        self.path = path
+        self.retention = retention or Retention()
+        self.error = None  # first writer error since the last flush(); raised from there
+
+        self._read = self._connect(check_same_thread=False)
+        self._read_lock = threading.Lock()
+        with self._read:
+            self._read.executescript(SCHEMA)
+            try:
+                self._read.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:  # sqlite built without FTS5
+                self.fts = False
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="catcore-sqlite-writer",
+                                        daemon=True)
+        self._writer.start()
+        self.apply_retention()
+
+    # ─── Writes (queued) ─────────────────────────────────────
+
+    def write(self, sql, params=()):
+        """Queue one statement for the writer thread."""
+        self._queue.put((sql, params))
+
+    def flush(self):
+        """Block until every queued write is committed; raises the writer's error, if any."""
+        self._queue.join()
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def apply_retention(self):
+        for sql, params in self.retention.statements():
+            self.write(sql, params)
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+        with self._read_lock:
+            self._read.close()
+
+    # ─── Reads ───────────────────────────────────────────────
+
+    def query(self, sql, params=()):
+        """Rows for a SELECT, after pending writes have landed."""
+        self.flush()
+        with self._read_lock:
+            return self._read.execute(sql, params).fetchall()
+
+    def get_meta(self, key):
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        self.write("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def search(self, text, limit=20):
+        """
+        Full-text search over every stored message, best match first.
+        Returns dicts: session_id, title, role, snippet, created.
+        """
+        terms = text.split()
+        if not terms:
+            return []
+        if self.fts:
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+            rows = self.query(
+                "SELECT m.session_id, s.title, m.role,"
+                "       snippet(messages_fts, 0, '[', ']', '…', 12), m.created"
+                "  FROM messages_fts"
+                "  JOIN messages m ON m.id = messages_fts.rowid"
+                "  JOIN sessions s ON s.id = m.session_id"
+                " WHERE messages_fts MATCH ? ORDER BY rank LIMIT ?", (match, limit))
+        else:
+            where = " AND ".join("m.content LIKE ?" for _ in terms)
+            rows = self.query(
+                "SELECT m.session_id, s.title, m.role, substr(m.content, 1, 80), m.created"
+                "  FROM messages m JOIN sessions s ON s.id = m.session_id"
+                f" WHERE {where} ORDER BY m.id DESC LIMIT ?",
+                tuple(f"%{t}%" for t in terms) + (limit,))
+        return [{"session_id": r[0], "title": r[1], "role": r[2], "snippet": r[3], "created": r[4]}
+                for r in rows]
+
+    def import_once(self, key, source, copy):
+        """
+        First time only (tracked in meta as "imported:<key>"): run the
+        (sql, params) statements of copy(source()) when a source is given.
+        Later opens, or no source, just mark it done. The statements and
+        the flag commit together on a connection of their own, so a crash
+        mid-import leaves no half copy for the next open to duplicate.
+        """
+        flag = "imported:" + key
+        if self.get_meta(flag) is not None:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")  # another process may be importing too
+                if conn.execute("SELECT 1 FROM meta WHERE key = ?", (flag,)).fetchone():
+                    return
+                if source is not None:
+                    for op in copy(source()):
+                        conn.execute(*op)
+                conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                             (flag, datetime.now().isoformat()))
+        finally:
+            conn.close()
+
+    # ─── Internals ───────────────────────────────────────────
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.path, timeout=30, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for op in batch:
+                        if op is None:
+                            stop = True
+                            break
+                        try:
+                            conn.execute(*op)
+                        except sqlite3.Error as e:
+                            if self.error is None:
+                                self.error = e
+            except sqlite3.Error as e:  # the commit itself (busy, full, I/O): batch rolled back
+                if self.error is None:
+                    self.error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+
+class SQLiteSessions:
+    """SessionStore interface over SQLiteDB (message dicts use the given keys)."""
+
+    def __init__(self, db, role_key="role", content_key="content", source=None):
+        """source  callable → SessionStore to import on the database's first open"""
+        self.db = db
+        self.role_key, self.content_key = role_key, content_key
+        db.import_once("sessions", source, self._import)
+        self._index = {r[0]: {"id": r[0], "title": r[1], "created": r[2], "updated": r[3]}
+                       for r in db.query("SELECT id, title, created, updated FROM sessions ORDER BY created")}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, sid):
+        return sid in self._index
+
+    def get(self, sid):
+        return self._index.get(sid)
+
+    def sessions(self):
+        return list(self._index.values())
+
+    def create(self, sid, title="New Chat"):
+        now = datetime.now().isoformat()
+        meta = {"id": sid, "title": title, "created": now, "updated": now}
+        self._index[sid] = meta
+        self.db.write("INSERT OR REPLACE INTO sessions(id, title, created, updated) VALUES (?, ?, ?, ?)",
+                      (sid, title, now, now))
+        if self.db.retention.max_sessions is not None:
+            self.db.apply_retention()
+            while len(self._index) > self.db.retention.max_sessions:
+                del self._index[next(iter(self._index))]
+        return meta
+
+    def set_title(self, sid, title):
+        self._index[sid]["title"] = title
+        self.db.write("UPDATE sessions SET title = ? WHERE id = ?", (title, sid))
+
+    def delete(self, sid):
+        if self._index.pop(sid, None) is not None:
+            self.db.write("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def flush(self):
+        self.db.flush()
+
+    def messages(self, sid):
+        rows = self.db.query("SELECT role, content FROM messages WHERE session_id = ? ORDER BY id", (sid,))
+        return [{self.role_key: r[0], self.content_key: r[1]} for r in rows]
+
+    def append(self, sid, message):
+        now = datetime.now().isoformat()
+        self._index[sid]["updated"] = now
+        self.db.write("INSERT INTO messages(session_id, role, content, created) VALUES (?, ?, ?, ?)",
+                      (sid, message.get(self.role_key, ""), message.get(self.content_key, ""), now))
+        self.db.write("UPDATE sessions SET updated = ? WHERE id = ?", (now, sid))
+
+    def search(self, text, limit=20, role_key=None, content_key=None):
+        # keys are fixed at construction; the arguments mirror SessionStore.search
+        return self.db.search(text, limit)
+
+    def _import(self, store):
+        for meta in store.sessions():
+            yield ("INSERT OR IGNORE INTO sessions(id, title, created, updated) VALUES (?, ?, ?, ?)",
+                   (meta["id"], meta["title"], meta["created"], meta["updated"]))
+            for m in store.messages(meta["id"]):
+                yield ("INSERT INTO messages(session_id, role, content) VALUES (?, ?, ?)",
+                       (meta["id"], m.get(self.role_key, ""), m.get(self.content_key, "")))
+
+
+class SQLiteMemory:
+    """JournalStore interface over SQLiteDB's memory table."""
+
+    RETENTION_EVERY = 100  # appends between retention passes
+
+    def __init__(self, db, source=None, owns_db=False):
+        """
+        source   callable → JournalStore to import on the database's first open
+        owns_db  close() closes db too (otherwise its creator does)
+        """
+        self.db = db
+        self.owns_db = owns_db
+        self._appends = 0
+        self.meta = json.loads(db.get_meta("memory") or "{}")
+        db.import_once("memory", source, self._import)
+
+    def __len__(self):
+        return self.db.query("SELECT count(*) FROM memory")[0][0]
+
+    def recent(self, n=None):
+        if n is None:
+            rows = self.db.query("SELECT data FROM memory ORDER BY id")
+        else:
+            rows = self.db.query("SELECT data FROM (SELECT id, data FROM memory ORDER BY id DESC LIMIT ?)"
+                                 " ORDER BY id", (n,))
+        return [json.loads(r[0]) for r in rows]
+
+    def append(self, record):
+        self.db.write("INSERT INTO memory(data) VALUES (?)", (json.dumps(record, ensure_ascii=False),))
+        self._appends += 1
+        if self._appends % self.RETENTION_EVERY == 0 and self.db.retention.max_memory is not None:
+            self.db.apply_retention()
+
+    def set_meta(self, key, value):
+        self.meta[key] = value
+        self.db.set_meta("memory", json.dumps(self.meta, ensure_ascii=False))
+
+    def sync(self):
+        self.db.flush()
+
+    def close(self):
+        if self.owns_db:
+            self.db.close()
+        else:
+            self.db.flush()
+
+    def _import(self, journal):
+        for record in journal.recent():
+            yield "INSERT INTO memory(data) VALUES (?)", (json.dumps(record, ensure_ascii=False),)
+        self.meta.update(journal.meta)
+        yield ("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+               ("memory", json.dumps(self.meta, ensure_ascii=False)))
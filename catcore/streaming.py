@@ -0,0 +1,66 @@
+"""
+Chunked streaming protocol for reply text.
+
+Front ends receive replies through callback_response(chunk), where a
+chunk is any non-empty run of text — never a split code point, and, when
+the sender was given a byte cap, never more than that many UTF-8 bytes.
+Receivers must only concatenate chunks; they cannot assume one
+character or one word per call.
+
+The helpers here cut text into typing units (characters or words) and
+into transport-sized pieces (at most N UTF-8 bytes).
+"""
+
+import re
+
+UNITS = ("char", "word")
+
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+def split_words(text):
+    """Words with their trailing whitespace (leading whitespace kept as-is)."""
+    return _WORD.findall(text)
+
+
+def _utf8_len(ch):
+    cp = ord(ch)
+    return 1 if cp < 0x80 else 2 if cp < 0x800 else 3 if cp < 0x10000 else 4
+
+
+def split_bytes(text, max_bytes):
+    """Pieces of at most max_bytes UTF-8 bytes, cut on code point boundaries."""
+    if max_bytes < 4:
+        raise ValueError("max_bytes must be >= 4 (one UTF-8 code point)")
+    if text.isascii():
+        return [text[i:i + max_bytes] for i in range(0, len(text), max_bytes)]
+    pieces, start, size = [], 0, 0
+    for i, ch in enumerate(text):
+        n = _utf8_len(ch)
+        if size + n > max_bytes:
+            pieces.append(text[start:i])
+            start, size = i, 0
+        size += n
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_units(text, unit="word"):
+    """Typing units: "char" → characters, "word" → split_words()."""
+    if unit == "char":
+        return list(text)
+    if unit == "word":
+        return split_words(text)
+    raise ValueError(f"unknown unit {unit!r} (expected one of {UNITS})")
+
+
+def emit_chunks(text, emit, max_bytes=None):
+    """Send text as one chunk, or as byte-capped pieces when max_bytes is set."""
+    if not text:
+        return
+    if max_bytes is None:
+        emit(text)
+        return
+    for piece in split_bytes(text, max_bytes):
+        emit(piece)
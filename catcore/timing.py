@@ -0,0 +1,30 @@
+"""
+Per-stage wall-clock timing for the inference pipelines.
+"""
+
+import time
+
+
+class StageTimer:
+    """
+    Lap timer: lap(name) charges the time since the previous lap to
+    `name` (milliseconds, accumulated if a stage repeats).
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last) * 1000.0
+        self._last = now
+        return self.stages[name]
+
+    def skip(self):
+        """Restart the clock without charging any stage."""
+        self._last = time.perf_counter()
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
@@ -0,0 +1,85 @@
+"""
+Layout bookkeeping for a virtualized chat transcript.
+
+A long session can't afford a widget tree per message. The front end
+keeps messages as data and builds widgets only for those near the
+viewport; TranscriptLayout tracks what it needs to do that without
+touching any widget:
+
+- one height per message — an estimate until the message has been built
+  and measured once, then the cached measurement;
+- the y offset of every message (prefix sums, recomputed lazily from the
+  first changed index, so appends and near-viewport re-measures are cheap);
+- which messages intersect a viewport, by binary search over the offsets.
+"""
+
+import bisect
+
+
+class TranscriptLayout:
+    """Heights and offsets of a vertical list of variable-height items."""
+
+    def __init__(self):
+        self.heights = []
+        self.measured = []     # per item: height is a measurement, not an estimate
+        self._offsets = [0]    # _offsets[i] = top of item i; _offsets[n] = total
+        self._valid = 0        # _offsets[:_valid + 1] are up to date
+
+    def __len__(self):
+        return len(self.heights)
+
+    def clear(self):
+        self.__init__()
+
+    def append(self, estimate):
+        """Add an item with an estimated height; returns its index."""
+        n = len(self.heights)
+        self.heights.append(estimate)
+        self.measured.append(False)
+        self._offsets.append(self._offsets[-1] + estimate)
+        if self._valid == n:
+            self._valid = n + 1
+        return n
+
+    def set_height(self, i, height, measured=True):
+        """Record item i's height; returns the change in total height."""
+        delta = height - self.heights[i]
+        self.heights[i] = height
+        self.measured[i] = measured
+        if delta:
+            self._valid = min(self._valid, i)
+        return delta
+
+    def offset(self, i):
+        """Top y of item i (offset(len) is the total height)."""
+        self._ensure()
+        return self._offsets[i]
+
+    @property
+    def total(self):
+        return self.offset(len(self.heights))
+
+    def index_at(self, y):
+        """Index of the item covering y (clamped to the valid range)."""
+        if not self.heights:
+            return 0
+        self._ensure()
+        i = bisect.bisect_right(self._offsets, y) - 1
+        return max(0, min(i, len(self.heights) - 1))
+
+    def visible(self, top, bottom, overscan=2):
+        """(first, stop) range of items intersecting [top, bottom), widened by overscan items."""
+        if not self.heights:
+            return 0, 0
+        first = self.index_at(top)
+        stop = self.index_at(max(top, bottom - 1)) + 1
+        return max(0, first - overscan), min(len(self.heights), stop + overscan)
+
+    def _ensure(self):
+        n = len(self.heights)
+        if self._valid >= n:
+            return
+        off, h = self._offsets, self.heights
+        for k in range(self._valid, n):
+            off[k + 1] = off[k] + h[k]
+        self._valid = n
@@ -0,0 +1,131 @@
+"""
+Frame-paced UI event queue between worker threads and a GUI main loop.
+
+Tk widgets may only be touched from the main loop's thread, so workers
+used to post every event with root.after(0, ...) — one timer, one
+callback and usually one layout pass per token — and to wait for a
+widget created on the main thread they spun on time.sleep().
+
+A UIQueue instead collects events from any thread and the main loop
+drains them at a fixed frame rate:
+
+    ui = UIQueue(root.after, fps=60); ui.start()     # on the main thread
+    ui.call(label.config, text="done")                # from any thread
+    ui.append(write_chunk, chunk)                     # mergeable text
+    body = ui.submit(build_widget).result()           # wait, don't spin
+
+Consecutive append()s to the same sink are merged, so however fast a
+producer streams, each sink gets at most one call — one layout pass —
+per frame. submit() returns a concurrent.futures.Future that the frame
+resolves with the callable's result (or exception). Only after() is
+used from the toolkit, and only on the main thread.
+"""
+
+import sys
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future
+
+
+class UIQueue:
+    """Thread-safe event queue drained by the UI thread every 1/fps seconds."""
+
+    def __init__(self, after, fps=60):
+        """after(ms, callback) — the toolkit's main-loop timer (root.after)."""
+        self.after = after
+        self.fps = fps
+        self.interval = max(1, round(1000 / fps))  # ms
+        self.frames = 0
+        self.events = 0
+        self.merged = 0
+        self._lock = threading.Lock()
+        self._events = deque()   # [fn, args, parts]; parts is a list for appends
+        self._thread = None
+        self._running = False
+
+    # ─── Producers (any thread) ──────────────────────────────
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the UI thread at the next frame."""
+        if kwargs:
+            fn, args = _bind(fn, args, kwargs), ()
+        with self._lock:
+            self._events.append([fn, args, None])
+
+    def append(self, sink, text):
+        """Queue sink(text); adjacent appends to one sink become one call with the texts joined."""
+        if not text:
+            return
+        with self._lock:
+            last = self._events[-1] if self._events else None
+            if last is not None and last[2] is not None and last[0] == sink:
+                last[2].append(text)
+                self.merged += 1
+            else:
+                self._events.append([sink, (), [text]])
+
+    def submit(self, fn, *args):
+        """Run fn(*args) on the UI thread; returns a Future for its result."""
+        fut = Future()
+        if self.on_ui_thread():  # waiting here would deadlock the frame loop
+            _run(fut, fn, args)
+            return fut
+        self.call(_run, fut, fn, args)
+        return fut
+
+    def on_ui_thread(self):
+        return self._thread == threading.get_ident()
+
+    # ─── Main loop side ──────────────────────────────────────
+
+    def start(self):
+        """Begin draining (call from the UI thread, before its main loop)."""
+        self._thread = threading.get_ident()
+        if not self._running:
+            self._running = True
+            self.after(self.interval, self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def drain(self):
+        """Run every queued event now (UI thread). Returns how many ran."""
+        with self._lock:
+            batch, self._events = self._events, deque()
+        for fn, args, parts in batch:
+            try:
+                if parts is None:
+                    fn(*args)
+                else:
+                    fn("".join(parts))
+            except Exception:
+                print("Exception in UIQueue callback", file=sys.stderr)
+                traceback.print_exc()
+        self.events += len(batch)
+        return len(batch)
+
+    def stats(self):
+        return {"frames": self.frames, "events": self.events, "merged": self.merged,
+                "pending": len(self._events), "fps": self.fps}
+
+    def _tick(self):
+        if not self._running:
+            return
+        self.frames += 1
+        if self._events:
+            self.drain()
+        self.after(self.interval, self._tick)
+
+
+def _bind(fn, args, kwargs):
+    return lambda: fn(*args, **kwargs)
+
+
+def _run(fut, fn, args):
+    if not fut.set_running_or_notify_cancel():
+        return
+    try:
+        fut.set_result(fn(*args))
+    except BaseException as e:
+        fut.set_exception(e)
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import scrolledtext
+from catcore.engines.companions import Companion
 
 # ==========================================
 # CatGPT V1X. [C] AC HOLDINGS 1999-2026
@@ -15,6 +16,7 @@ class CatGPT:
         self.root.configure(bg="#0f172a")
 
         self.memory = []
+        self.engine = Companion("catgpt", memory=self.memory)
         self.stream_buffer = []
         self.current_text = ""
 
@@ -150,23 +152,7 @@ class CatGPT:
     # ======================================
 
     def generate_response(self, text):
-        lower = text.lower()
-
-        if "previous" in lower or "memory" in lower:
-            if len(self.memory) > 1:
-                return "Earlier you said: " + self.memory[-1][1]
-            return "No earlier memory found."
-
-        if "hello" in lower or "hi" in lower:
-            return "Hello. How can I assist you today?"
-
-        if "how are you" in lower:
-            return "Operating normally. All systems running in RAM."
-
-        if "code" in lower:
-            return "Please specify the language or framework you want."
-
-        return "Message received. Provide more details for a more precise response."
+        return self.engine.reply(text)
 
 
 # ==========================================
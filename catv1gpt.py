@@ -1,5 +1,5 @@
 import tkinter as tk
-import random
+from catcore.engines.companions import Companion
 
 # ==========================================
 # Cat R1 1.X — ChatGPT.com Style Tkinter GUI
@@ -81,6 +81,7 @@ class CatR1_1X_GUI:
 
         # Memory for simulated 1B LLM
         self.memory = []
+        self.engine = Companion("catv1gpt", memory=self.memory)
 
     # ======================================
     # Handle input
@@ -110,22 +111,7 @@ class CatR1_1X_GUI:
     # Simulated 1B LLM responses
     # ======================================
     def generate_response(self, text):
-        lower = text.lower()
-        if "hello" in lower or "hi" in lower:
-            return "Hello! 🐾 I am Cat R1 1.X, your cozy simulated 1B LLM."
-        if "story" in lower or "bedtime" in lower:
-            return "Once upon a time, a tiny kitten found a glowing star and purred it to sleep… 🌙✨"
-        if "code" in lower:
-            return "Type /run followed by your code to simulate execution."
-        if "memory" in lower:
-            mem_text = "\n".join([f"{r}: {m}" for r, m in self.memory[-5:]])
-            return f"Recent conversation:\n{mem_text}"
-        fallback = [
-            "Mmm… tell me more… 🐾",
-            "Interesting! Let's explore that together…",
-            "I see… can you elaborate a bit?"
-        ]
-        return random.choice(fallback)
+        return self.engine.reply(text)
 
 # ==========================================
 # Run